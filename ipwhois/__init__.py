@@ -22,8 +22,47 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import sys
+
 from .exceptions import *
-from .net import Net
-from .ipwhois import IPWhois
 
 __version__ = '1.3.0'
+
+# The public classes, by module. These are imported on first access (PEP
+# 562), so that importing the package, or ipwhois.utils, does not load the
+# network modules and dnspython.
+LAZY_IMPORTS = {
+    'Net': 'net',
+    'IPWhois': 'ipwhois',
+    'Session': 'session'
+}
+
+
+def __getattr__(name):
+
+    try:
+
+        module = LAZY_IMPORTS[name]
+
+    except KeyError:
+
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(
+            __name__, name))
+
+    # A relative import, as with the import statement.
+    value = getattr(__import__(module, globals(), None, [name], 1), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+
+    return sorted(set(globals()) | set(LAZY_IMPORTS))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+
+    # No module __getattr__ support.
+    from .net import Net
+    from .ipwhois import IPWhois
+    from .session import Session
@@ -0,0 +1,1688 @@
+# Copyright (c) 2013-2024 Philip Hane
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Python 3.6+ only. The synchronous API in ipwhois.net/ipwhois.ipwhois remains
+# the default, this module is not imported by the package.
+
+import asyncio
+import functools
+import logging
+import weakref
+
+import dns.asyncresolver
+import dns.resolver
+import dns.exception
+
+from .exceptions import (NetError, ASNLookupError, ASNRegistryError,
+                         BlacklistError, WhoisLookupError, HTTPLookupError,
+                         WhoisRateLimitError)
+from .net import (Net, CYMRU_WHOIS, BLACKLIST)
+from .asn import IPASN
+from .rdap import (RDAP, RIR_RDAP, BOOTSTRAP_URL, _RDAPNetwork, _RDAPEntity)
+from .whois import (Whois, RIR_WHOIS, RWHOIS)
+from .nir import (NIRWhois, NIR_WHOIS)
+from .ratelimit import get_registry_key
+
+from ipaddress import ip_network
+
+log = logging.getLogger(__name__)
+
+# The default maximum number of in-flight requests per registry/service.
+# Keys not matching a registry (e.g., referral or bootstrap servers) fall
+# under 'other'.
+ASYNC_LIMITS = {
+    'arin': 20,
+    'ripencc': 20,
+    'apnic': 20,
+    'lacnic': 5,
+    'afrinic': 10,
+    'jpnic': 5,
+    'krnic': 5,
+    'cymru': 50,
+    'dns': 100,
+    'other': 10
+}
+
+# The default semaphores, one set per event loop.
+_LOOP_SEMAPHORES = weakref.WeakKeyDictionary()
+
+
+def build_semaphores(limits=None):
+    """
+    The function for building a mapping of registry/service keys to
+    semaphores, used to bound in-flight requests. Must be called with an
+    event loop running (or set) on the current thread.
+
+    Args:
+        limits (:obj:`dict`): Mapping of ASYNC_LIMITS keys to the maximum
+            number of in-flight requests, overriding the defaults. Defaults to
+            None.
+
+    Returns:
+        dict: Mapping of ASYNC_LIMITS keys to asyncio.Semaphore objects.
+    """
+
+    tmp_limits = ASYNC_LIMITS.copy()
+
+    if limits:
+
+        tmp_limits.update(limits)
+
+    return dict((k, asyncio.Semaphore(v)) for k, v in tmp_limits.items())
+
+
+def get_semaphores():
+    """
+    The function for retrieving the default semaphores for the running event
+    loop. These are shared by every AsyncNet object not provided its own
+    semaphores.
+
+    Returns:
+        dict: Mapping of ASYNC_LIMITS keys to asyncio.Semaphore objects.
+    """
+
+    loop = asyncio.get_event_loop()
+
+    try:
+
+        return _LOOP_SEMAPHORES[loop]
+
+    except KeyError:
+
+        _LOOP_SEMAPHORES[loop] = build_semaphores()
+        return _LOOP_SEMAPHORES[loop]
+
+
+async def _gather_ordered(coros):
+    """
+    The function for running coroutines concurrently, returning the results in
+    the order provided. Unlike a plain asyncio.gather(), every coroutine is
+    awaited before the first exception (in order) is raised.
+
+    Args:
+        coros (:obj:`list`): The coroutines to run.
+
+    Returns:
+        list: The coroutine results.
+    """
+
+    results = await asyncio.gather(*coros, return_exceptions=True)
+
+    for result in results:
+
+        if isinstance(result, BaseException):
+
+            raise result
+
+    return results
+
+
+class AsyncNet:
+    """
+    The class for performing network queries from an asyncio event loop. This
+    is the asyncio counterpart to :obj:`ipwhois.net.Net`, which it wraps for
+    address validation and the HTTP queries.
+
+    DNS and WHOIS (port 43) queries are performed natively on the event loop.
+    HTTP queries run the ipwhois.net.Net urllib logic (proxy openers,
+    redirects, rate limit handling) in the loop's default executor. Use
+    loop.set_default_executor() to raise the number of worker threads if
+    more than the default number of concurrent HTTP queries are required.
+
+    Args:
+        address (:obj:`str`/:obj:`int`/:obj:`IPv4Address`/:obj:`IPv6Address`):
+            An IPv4 or IPv6 address
+        timeout (:obj:`int`): The default timeout for socket connections in
+            seconds. Defaults to 5.
+        proxy_opener (:obj:`urllib.request.OpenerDirector`): The request for
+            proxy support. Defaults to None.
+        http_pool (:obj:`ipwhois.pool.HTTPConnectionPool`): The keep-alive
+            connection pool for HTTP queries. Ignored if proxy_opener is
+            provided. Defaults to None.
+        semaphores (:obj:`dict`): Mapping of ASYNC_LIMITS keys to
+            asyncio.Semaphore objects, as returned by
+            :obj:`ipwhois.aio.build_semaphores`. Defaults to None, which
+            shares the event loop defaults from
+            :obj:`ipwhois.aio.get_semaphores`.
+        dns_resolver (:obj:`dns.asyncresolver.Resolver`): The DNS resolver to
+            use. Defaults to None, which creates a new resolver.
+        asn_table (:obj:`ipwhois.asntable.ASNTable`): The offline IP to ASN
+            table for local ASN lookups. Defaults to None.
+
+    Raises:
+        IPDefinedError: The address provided is defined (does not need to be
+            resolved).
+    """
+
+    def __init__(self, address, timeout=5, proxy_opener=None,
+                 http_pool=None, semaphores=None, dns_resolver=None,
+                 asn_table=None):
+
+        # Validation and query strings are handled by the sync Net object.
+        self.net = Net(address=address, timeout=timeout,
+                       proxy_opener=proxy_opener, http_pool=http_pool,
+                       asn_table=asn_table)
+
+        self.address = self.net.address
+        self.address_str = self.net.address_str
+        self.version = self.net.version
+        self.timeout = self.net.timeout
+
+        self._semaphores = semaphores
+
+        if dns_resolver is None:
+
+            dns_resolver = dns.asyncresolver.Resolver()
+            dns_resolver.timeout = timeout
+            dns_resolver.lifetime = timeout
+
+        self.dns_resolver = dns_resolver
+
+    @property
+    def semaphores(self):
+        """
+        dict: Mapping of ASYNC_LIMITS keys to asyncio.Semaphore objects.
+        """
+
+        if self._semaphores is None:
+
+            self._semaphores = get_semaphores()
+
+        return self._semaphores
+
+    def get_semaphore(self, key):
+        """
+        The function for retrieving the semaphore for an ASYNC_LIMITS key.
+
+        Args:
+            key (:obj:`str`): The ASYNC_LIMITS key.
+
+        Returns:
+            asyncio.Semaphore: The semaphore for key, or the 'other'
+                semaphore if key is not found.
+        """
+
+        try:
+
+            return self.semaphores[key]
+
+        except KeyError:
+
+            return self.semaphores['other']
+
+    async def _run_in_executor(self, key, func, **kwargs):
+        """
+        The function for running a blocking ipwhois.net.Net method in the
+        default executor, bounded by the semaphore for key.
+
+        Args:
+            key (:obj:`str`): The ASYNC_LIMITS key.
+            func (:obj:`callable`): The function to run.
+            **kwargs: Keyword arguments passed to func.
+
+        Returns:
+            The func return value.
+        """
+
+        loop = asyncio.get_event_loop()
+
+        async with self.get_semaphore(key):
+
+            return await loop.run_in_executor(
+                None, functools.partial(func, **kwargs)
+            )
+
+    async def _query_whois(self, key, server, port, query):
+        """
+        The function for sending a query to a whois server, and reading the
+        response until the connection is closed.
+
+        Args:
+            key (:obj:`str`): The ASYNC_LIMITS key.
+            server (:obj:`str`): The server to connect to.
+            port (:obj:`int`): The network port to connect on.
+            query (:obj:`str`): The query to send.
+
+        Returns:
+            bytes: The raw response.
+
+        Raises:
+            asyncio.TimeoutError: The connection or a read timed out.
+            OSError: A socket error occurred.
+        """
+
+        async with self.get_semaphore(key):
+
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(server, port), self.timeout
+            )
+
+            try:
+
+                writer.write(query.encode())
+                await writer.drain()
+
+                data = []
+                while True:
+
+                    d = await asyncio.wait_for(reader.read(4096),
+                                               self.timeout)
+
+                    if not d:
+
+                        break
+
+                    data.append(d)
+
+            finally:
+
+                writer.close()
+
+        return b''.join(data)
+
+    async def get_asn_dns(self):
+        """
+        The function for retrieving ASN information for an IP address from
+        Cymru via port 53 (DNS).
+
+        Returns:
+            list: The raw ASN data.
+
+        Raises:
+            ASNLookupError: The ASN lookup failed.
+        """
+
+        try:
+
+            log.debug('ASN query for {0}'.format(self.net.dns_zone))
+
+            async with self.get_semaphore('dns'):
+
+                data = await self.dns_resolver.resolve(self.net.dns_zone,
+                                                       'TXT')
+
+            log.debug('ASN query results using {0}: {1}'.format(
+                self.net.dns_zone, list(data)))
+            return list(data)
+
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoNameservers,
+                dns.resolver.NoAnswer, dns.exception.Timeout) as e:
+
+            raise ASNLookupError(
+                'ASN lookup failed (DNS {0}) for {1}.'.format(
+                    e.__class__.__name__, self.address_str)
+            )
+
+        except Exception:  # pragma: no cover
+
+            raise ASNLookupError(
+                'ASN lookup failed for {0}.'.format(self.address_str)
+            )
+
+    async def get_asn_verbose_dns(self, asn=None):
+        """
+        The function for retrieving the information for an ASN from
+        Cymru via port 53 (DNS).
+
+        Args:
+            asn (:obj:`str`): The AS number (required).
+
+        Returns:
+            str: The raw ASN data.
+
+        Raises:
+            ASNLookupError: The ASN lookup failed.
+        """
+
+        if asn[0:2] != 'AS':
+
+            asn = 'AS{0}'.format(asn)
+
+        zone = '{0}.asn.cymru.com.'.format(asn)
+
+        try:
+
+            log.debug('ASN verbose query for {0}'.format(zone))
+
+            async with self.get_semaphore('dns'):
+
+                data = await self.dns_resolver.resolve(zone, 'TXT')
+
+            return str(data[0])
+
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoNameservers,
+                dns.resolver.NoAnswer, dns.exception.Timeout) as e:
+
+            raise ASNLookupError(
+                'ASN lookup failed (DNS {0}) for {1}.'.format(
+                    e.__class__.__name__, asn)
+            )
+
+        except Exception:  # pragma: no cover
+
+            raise ASNLookupError(
+                'ASN lookup failed for {0}.'.format(asn)
+            )
+
+    async def get_asn_whois(self, retry_count=3):
+        """
+        The function for retrieving ASN information for an IP address from
+        Cymru via port 43/tcp (WHOIS).
+
+        Args:
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+
+        Returns:
+            str: The raw ASN data.
+
+        Raises:
+            ASNLookupError: The ASN lookup failed.
+        """
+
+        while True:
+
+            try:
+
+                log.debug('ASN query for {0}'.format(self.address_str))
+                data = await self._query_whois(
+                    'cymru', CYMRU_WHOIS, 43,
+                    ' -r -a -c -p -f {0}{1}'.format(self.address_str, '\r\n')
+                )
+
+                return data.decode()
+
+            except (asyncio.TimeoutError, OSError) as e:  # pragma: no cover
+
+                log.debug('ASN query socket error: {0}'.format(e))
+                if retry_count > 0:
+
+                    log.debug('ASN query retrying (count: {0})'.format(
+                        str(retry_count)))
+                    retry_count -= 1
+                    continue
+
+                raise ASNLookupError(
+                    'ASN lookup failed for {0}.'.format(self.address_str)
+                )
+
+            except Exception:  # pragma: no cover
+
+                raise ASNLookupError(
+                    'ASN lookup failed for {0}.'.format(self.address_str)
+                )
+
+    async def get_asn_http(self, retry_count=3):
+        """
+        The function for retrieving ASN information for an IP address from
+        Arin via HTTP. See :obj:`ipwhois.net.Net.get_asn_http`.
+
+        Args:
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+
+        Returns:
+            dict: The ASN data in json format.
+
+        Raises:
+            ASNLookupError: The ASN lookup failed.
+        """
+
+        return await self._run_in_executor(
+            'arin', self.net.get_asn_http, retry_count=retry_count
+        )
+
+    async def get_whois(self, asn_registry='arin', retry_count=3, server=None,
+                        port=43, extra_blacklist=None, get_recursive=True):
+        """
+        The function for retrieving whois or rwhois information for an IP
+        address via any port. Defaults to port 43/tcp (WHOIS).
+
+        Args:
+            asn_registry (:obj:`str`): The NIC to run the query against.
+                Defaults to 'arin'.
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+            server (:obj:`str`): An optional server to connect to. If
+                provided, asn_registry will be ignored.
+            port (:obj:`int`): The network port to connect on. Defaults to 43.
+            extra_blacklist (:obj:`list` of :obj:`str`): Blacklisted whois
+                servers in addition to the global BLACKLIST. Defaults to None.
+            get_recursive (:obj:`bool`): Whether to ask the server to perform
+                recursive queries. If False, passes the '-r' flag to RIPE
+                WHOIS servers. Defaults to True.
+
+        Returns:
+            str: The raw whois data.
+
+        Raises:
+            BlacklistError: Raised if the whois server provided is in the
+                global BLACKLIST or extra_blacklist.
+            WhoisLookupError: The whois lookup failed.
+            WhoisRateLimitError: The Whois request rate limited and retries
+                were exhausted.
+        """
+
+        extra_bl = extra_blacklist if extra_blacklist else []
+
+        if any(server in srv for srv in (BLACKLIST, extra_bl)):
+            raise BlacklistError(
+                'The server {0} is blacklisted.'.format(server)
+            )
+
+        key = asn_registry if server is None else get_registry_key(
+            server=server)
+
+        if server is None:
+            server = RIR_WHOIS[asn_registry]['server']
+
+        # Prep the query.
+        query = self.address_str + '\r\n'
+        if asn_registry == 'arin':
+            query = 'n + {0}'.format(query)
+        if asn_registry == 'ripencc' and get_recursive is False:
+            query = '-r {0}'.format(query)
+
+        while True:
+
+            try:
+
+                log.debug('WHOIS query for {0} at {1}:{2}'.format(
+                    self.address_str, server, port))
+                response = (await self._query_whois(
+                    key, server, port, query
+                )).decode('ascii', 'ignore')
+
+            except (asyncio.TimeoutError, OSError) as e:
+
+                log.debug('WHOIS query socket error: {0}'.format(e))
+                if retry_count > 0:
+
+                    log.debug('WHOIS query retrying (count: {0})'.format(
+                        str(retry_count)))
+                    retry_count -= 1
+                    continue
+
+                raise WhoisLookupError(
+                    'WHOIS lookup failed for {0}.'.format(self.address_str)
+                )
+
+            if 'Query rate limit exceeded' in response:  # pragma: no cover
+
+                if retry_count > 0:
+
+                    log.debug('WHOIS query rate limit exceeded. Waiting...')
+                    await asyncio.sleep(1)
+                    retry_count -= 1
+                    continue
+
+                raise WhoisRateLimitError(
+                    'Whois lookup failed for {0}. Rate limit '
+                    'exceeded, wait and try again (possibly a '
+                    'temporary block).'.format(self.address_str))
+
+            elif 'error 501' in response:  # pragma: no cover
+
+                log.debug('WHOIS query error: {0}'.format(response))
+                raise WhoisLookupError(
+                    'WHOIS lookup failed for {0}.'.format(self.address_str)
+                )
+
+            elif 'error 230' in response:  # pragma: no cover
+
+                # No results found
+                log.debug('WHOIS query error: {0}'.format(response))
+
+            return str(response)
+
+    async def get_http_json(self, url=None, retry_count=3,
+                            rate_limit_timeout=120, headers=None):
+        """
+        The function for retrieving a json result via HTTP. See
+        :obj:`ipwhois.net.Net.get_http_json`.
+
+        Args:
+            url (:obj:`str`): The URL to retrieve (required).
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+            rate_limit_timeout (:obj:`int`): The number of seconds to wait
+                before retrying when a rate limit notice is returned via
+                rdap+json or HTTP error 429. Defaults to 120.
+            headers (:obj:`dict`): The HTTP headers. The Accept header
+                defaults to 'application/rdap+json'.
+
+        Returns:
+            dict: The data in json format.
+
+        Raises:
+            HTTPLookupError: The HTTP lookup failed.
+            HTTPRateLimitError: The HTTP request rate limited and retries
+                were exhausted.
+        """
+
+        return await self._run_in_executor(
+            get_registry_key(url=url), self.net.get_http_json, url=url,
+            retry_count=retry_count, rate_limit_timeout=rate_limit_timeout,
+            headers=headers
+        )
+
+    async def get_http_raw(self, url=None, retry_count=3, headers=None,
+                           request_type='GET', form_data=None):
+        """
+        The function for retrieving a raw HTML result via HTTP. See
+        :obj:`ipwhois.net.Net.get_http_raw`.
+
+        Args:
+            url (:obj:`str`): The URL to retrieve (required).
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+            headers (:obj:`dict`): The HTTP headers. The Accept header
+                defaults to 'text/html'.
+            request_type (:obj:`str`): Request type 'GET' or 'POST'. Defaults
+                to 'GET'.
+            form_data (:obj:`dict`): Optional form POST data.
+
+        Returns:
+            str: The raw data.
+
+        Raises:
+            HTTPLookupError: The HTTP lookup failed.
+        """
+
+        return await self._run_in_executor(
+            get_registry_key(url=url), self.net.get_http_raw, url=url,
+            retry_count=retry_count, headers=headers,
+            request_type=request_type, form_data=form_data
+        )
+
+    async def get_host(self, retry_count=3):
+        """
+        The function for retrieving host information for an IP address. See
+        :obj:`ipwhois.net.Net.get_host`.
+
+        Args:
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+
+        Returns:
+            namedtuple:
+
+            :hostname (str): The hostname returned mapped to the given IP
+                address.
+            :aliaslist (list): Alternate names for the given IP address.
+            :ipaddrlist (list): IPv4/v6 addresses mapped to the same hostname.
+
+        Raises:
+            HostLookupError: The host lookup failed.
+        """
+
+        return await self._run_in_executor(
+            'dns', self.net.get_host, retry_count=retry_count
+        )
+
+
+class AsyncIPASN:
+    """
+    The class for retrieving and parsing ASN data for an IP address from an
+    asyncio event loop. Parsing is performed by :obj:`ipwhois.asn.IPASN`.
+
+    Args:
+        net (:obj:`ipwhois.aio.AsyncNet`): An ipwhois.aio.AsyncNet object.
+
+    Raises:
+        NetError: The parameter provided is not an instance of
+            ipwhois.aio.AsyncNet
+    """
+
+    def __init__(self, net):
+
+        if isinstance(net, AsyncNet):
+
+            self._net = net
+
+        else:
+
+            raise NetError('The provided net parameter is not an instance of '
+                           'ipwhois.aio.AsyncNet')
+
+        self._ipasn = IPASN(net.net)
+
+    async def lookup(self, inc_raw=False, retry_count=3, extra_org_map=None,
+                     asn_methods=None, get_asn_description=True):
+        """
+        The function for retrieving and parsing ASN information for an IP
+        address. See :obj:`ipwhois.asn.IPASN.lookup`.
+
+        Args:
+            inc_raw (:obj:`bool`): Whether to include the raw results in the
+                returned dictionary. Defaults to False.
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+            extra_org_map (:obj:`dict`): Mapping org handles to RIRs. See
+                :obj:`ipwhois.asn.IPASN.lookup`. Defaults to None.
+            asn_methods (:obj:`list`): ASN lookup types to attempt, in order.
+                If None, defaults to all: ['dns', 'whois', 'http'], preceded
+                by 'local' if the Net object has an asn_table.
+            get_asn_description (:obj:`bool`): Whether to run an additional
+                query when pulling ASN information via dns, in order to get
+                the ASN description. Defaults to True.
+
+        Returns:
+            dict: The ASN lookup results, see
+                :obj:`ipwhois.asn.IPASN.lookup`.
+
+        Raises:
+            ValueError: methods argument requires one of local, dns, whois,
+                http.
+            ASNRegistryError: ASN registry does not match.
+        """
+
+        if asn_methods is None:
+
+            lookups = ['dns', 'whois', 'http']
+
+            if self._net.net.asn_table is not None:
+
+                lookups.insert(0, 'local')
+
+        else:
+
+            if {'local', 'dns', 'whois', 'http'}.isdisjoint(asn_methods):
+
+                raise ValueError('methods argument requires at least one of '
+                                 'local, dns, whois, http.')
+
+            lookups = asn_methods
+
+        response = None
+        asn_data = None
+        dns_success = False
+        for lookup_method in lookups:
+
+            if lookup_method == 'local':
+
+                try:
+
+                    response = self._net.net.get_asn_local()
+                    asn_data = self._ipasn.parse_fields_dns(response)
+                    break
+
+                except (ASNLookupError, ASNRegistryError) as e:
+
+                    log.debug('ASN local lookup failed: {0}'.format(e))
+                    pass
+
+            elif lookup_method == 'dns':
+
+                try:
+
+                    self._net.dns_resolver.lifetime = (
+                        self._net.dns_resolver.timeout * (
+                            retry_count and retry_count or 1
+                        )
+                    )
+                    response = await self._net.get_asn_dns()
+                    asn_data_list = []
+                    for asn_entry in response:
+
+                        asn_data_list.append(self._ipasn.parse_fields_dns(
+                            str(asn_entry)))
+
+                    # Iterate through the parsed ASN results to find the
+                    # smallest CIDR
+                    asn_data = asn_data_list.pop(0)
+                    try:
+
+                        prefix_len = ip_network(asn_data['asn_cidr']).prefixlen
+                        for asn_parsed in asn_data_list:
+                            prefix_len_comp = ip_network(
+                                asn_parsed['asn_cidr']).prefixlen
+                            if prefix_len_comp > prefix_len:
+                                asn_data = asn_parsed
+                                prefix_len = prefix_len_comp
+
+                    except (KeyError, ValueError):  # pragma: no cover
+
+                        pass
+
+                    dns_success = True
+                    break
+
+                except (ASNLookupError, ASNRegistryError) as e:
+
+                    log.debug('ASN DNS lookup failed: {0}'.format(e))
+                    pass
+
+            elif lookup_method == 'whois':
+
+                try:
+
+                    response = await self._net.get_asn_whois(retry_count)
+                    asn_data = self._ipasn.parse_fields_whois(response)
+                    break
+
+                except (ASNLookupError, ASNRegistryError) as e:
+
+                    log.debug('ASN WHOIS lookup failed: {0}'.format(e))
+                    pass
+
+            elif lookup_method == 'http':
+
+                try:
+
+                    response = await self._net.get_asn_http(
+                        retry_count=retry_count
+                    )
+                    asn_data = self._ipasn.parse_fields_http(response,
+                                                             extra_org_map)
+                    break
+
+                except (ASNLookupError, ASNRegistryError) as e:
+
+                    log.debug('ASN HTTP lookup failed: {0}'.format(e))
+                    pass
+
+        if asn_data is None:
+
+            raise ASNRegistryError('ASN lookup failed with no more methods to '
+                                   'try.')
+
+        if get_asn_description and dns_success:
+
+            try:
+
+                response = await self._net.get_asn_verbose_dns(
+                    'AS{0}'.format(asn_data['asn']))
+                asn_verbose_data = self._ipasn.parse_fields_verbose_dns(
+                    response)
+                asn_data['asn_description'] = asn_verbose_data[
+                    'asn_description']
+
+            except (ASNLookupError, ASNRegistryError) as e:  # pragma: no cover
+
+                log.debug('ASN DNS verbose lookup failed: {0}'.format(e))
+                pass
+
+        if inc_raw:
+
+            asn_data['raw'] = response
+
+        return asn_data
+
+
+class AsyncRDAP:
+    """
+    The class for retrieving and parsing IP address whois information via
+    RDAP from an asyncio event loop. Parsing is performed by
+    :obj:`ipwhois.rdap.RDAP`. Entities referenced at the same depth are
+    retrieved concurrently.
+
+    Args:
+        net (:obj:`ipwhois.aio.AsyncNet`): An ipwhois.aio.AsyncNet object.
+
+    Raises:
+        NetError: The parameter provided is not an instance of
+            ipwhois.aio.AsyncNet
+    """
+
+    def __init__(self, net):
+
+        if isinstance(net, AsyncNet):
+
+            self._net = net
+
+        else:
+
+            raise NetError('The provided net parameter is not an instance of '
+                           'ipwhois.aio.AsyncNet')
+
+        self._rdap = RDAP(net.net)
+
+    async def _get_entity_response(self, entity=None, retry_count=3,
+                                   asn_data=None, bootstrap=False,
+                                   rate_limit_timeout=120, entity_cache=None):
+        """
+        The function for retrieving the JSON response for an entity via RDAP
+        (HTTP), or from an entity cache.
+
+        Args:
+            entity (:obj:`str`): The entity name to lookup.
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+            asn_data (:obj:`dict`): Result from
+                :obj:`ipwhois.aio.AsyncIPASN.lookup`. Optional if the
+                bootstrap parameter is True.
+            bootstrap (:obj:`bool`): If True, performs lookups via ARIN
+                bootstrap rather than lookups based on ASN data. Defaults to
+                False.
+            rate_limit_timeout (:obj:`int`): The number of seconds to wait
+                before retrying when a rate limit notice is returned via
+                rdap+json. Defaults to 120.
+            entity_cache (:obj:`ipwhois.cache.EntityCache`): If provided,
+                cached entities are not retrieved, and failed lookups are
+                cached. Defaults to None.
+
+        Returns:
+            tuple: (vars, response), see
+                :obj:`ipwhois.rdap.RDAP._fetch_entity`.
+        """
+
+        registry = 'bootstrap' if bootstrap else asn_data['asn_registry']
+        if entity_cache is not None:
+
+            cached = entity_cache.get(registry, entity)
+
+            if cached is not None:
+
+                return cached.vars, cached.response
+
+        entity_url = self._rdap._get_entity_url(
+            entity=entity, asn_data=asn_data, bootstrap=bootstrap
+        )
+
+        try:
+
+            return None, await self._net.get_http_json(
+                url=entity_url, retry_count=retry_count,
+                rate_limit_timeout=rate_limit_timeout
+            )
+
+        except HTTPLookupError:
+
+            if entity_cache is not None:
+
+                entity_cache.set_failed(registry, entity)
+
+            return None, None
+
+    async def lookup(self, inc_raw=False, retry_count=3, asn_data=None,
+                     depth=0, excluded_entities=None, response=None,
+                     bootstrap=False, rate_limit_timeout=120,
+                     root_ent_check=True, entity_cache=None):
+        """
+        The function for retrieving and parsing information for an IP
+        address via RDAP (HTTP). See :obj:`ipwhois.rdap.RDAP.lookup`.
+
+        Args:
+            inc_raw (:obj:`bool`, optional): Whether to include the raw
+                results in the returned dictionary. Defaults to False.
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+            asn_data (:obj:`dict`): Result from
+                :obj:`ipwhois.aio.AsyncIPASN.lookup`. Optional if the
+                bootstrap parameter is True.
+            depth (:obj:`int`): How many levels deep to run queries when
+                additional referenced objects are found. Defaults to 0.
+            excluded_entities (:obj:`list`): Entity handles to not perform
+                lookups. Defaults to None.
+            response (:obj:`str`): Optional response object, this bypasses the
+                RDAP lookup.
+            bootstrap (:obj:`bool`): If True, performs lookups via ARIN
+                bootstrap rather than lookups based on ASN data. Defaults to
+                False.
+            rate_limit_timeout (:obj:`int`): The number of seconds to wait
+                before retrying when a rate limit notice is returned via
+                rdap+json. Defaults to 120.
+            root_ent_check (:obj:`bool`): If True, will perform
+                additional RDAP HTTP queries for missing entity data at the
+                root level. Defaults to True.
+            entity_cache (:obj:`ipwhois.cache.EntityCache`): If provided,
+                parsed entities are retrieved from and stored in this cache.
+                Defaults to None.
+
+        Returns:
+            dict: The IP RDAP lookup results, see
+                :obj:`ipwhois.rdap.RDAP.lookup`.
+        """
+
+        if not excluded_entities:
+
+            excluded_entities = []
+
+        # Create the return dictionary.
+        results = {
+            'query': self._net.address_str,
+            'network': None,
+            'entities': None,
+            'objects': None,
+            'raw': None
+        }
+
+        if bootstrap:
+
+            ip_url = '{0}/ip/{1}'.format(BOOTSTRAP_URL, self._net.address_str)
+
+        else:
+
+            ip_url = str(RIR_RDAP[asn_data['asn_registry']]['ip_url']).format(
+                self._net.address_str)
+
+        # Only fetch the response if we haven't already.
+        if response is None:
+
+            log.debug('Response not given, perform RDAP lookup for {0}'.format(
+                ip_url))
+
+            # Retrieve the whois data.
+            response = await self._net.get_http_json(
+                url=ip_url, retry_count=retry_count,
+                rate_limit_timeout=rate_limit_timeout
+            )
+
+        if inc_raw:
+
+            results['raw'] = response
+
+        log.debug('Parsing RDAP network object')
+        result_net = _RDAPNetwork(response)
+        result_net.parse()
+        results['network'] = result_net.vars
+        results['entities'] = []
+        results['objects'] = {}
+        roles = {}
+
+        entity_kwargs = {
+            'retry_count': retry_count,
+            'asn_data': asn_data,
+            'bootstrap': bootstrap,
+            'rate_limit_timeout': rate_limit_timeout,
+            'entity_cache': entity_cache
+        }
+        parse_kwargs = {
+            'roles': roles,
+            'inc_raw': inc_raw,
+            'registry': 'bootstrap' if bootstrap else asn_data['asn_registry'],
+            'entity_cache': entity_cache
+        }
+
+        # Retrieve the root level entities missing vcard data concurrently,
+        # then parse in order, the same as RDAP.lookup().
+        log.debug('Parsing RDAP root level entities')
+        try:
+
+            root_ents = [ent for ent in response['entities'] if
+                         ent['handle'] not in [results['entities'],
+                                               excluded_entities]]
+
+        except KeyError:
+
+            root_ents = []
+
+        fetch = []
+        for ent in root_ents:
+
+            if ('vcardArray' not in ent and root_ent_check and
+                    ent['handle'] not in fetch):
+
+                fetch.append(ent['handle'])
+
+        fetched = dict(zip(fetch, await _gather_ordered([
+            self._get_entity_response(entity=handle, **entity_kwargs)
+            for handle in fetch
+        ])))
+
+        try:
+
+            for ent in root_ents:
+
+                if ent['handle'] in fetched:
+
+                    results['objects'][ent['handle']] = (
+                        self._rdap._parse_fetched_entity(
+                            entity=ent['handle'],
+                            fetched=fetched[ent['handle']],
+                            **parse_kwargs
+                        )
+                    )
+
+                else:
+
+                    result_ent = _RDAPEntity(ent)
+                    result_ent.parse()
+
+                    results['objects'][ent['handle']] = result_ent.vars
+
+                results['entities'].append(ent['handle'])
+
+                try:
+
+                    for tmp in ent['entities']:
+
+                        roles[tmp['handle']] = tmp['roles']
+
+                except KeyError:
+
+                    pass
+
+        except KeyError:
+
+            pass
+
+        # Iterate through to the defined depth, retrieving all unique
+        # entities for a level concurrently, then parsing in order.
+        temp_objects = results['objects']
+
+        if depth > 0 and len(temp_objects) > 0:
+
+            log.debug('Parsing RDAP sub-entities to depth: {0}'.format(str(
+                depth)))
+
+        while depth > 0 and len(temp_objects) > 0:
+
+            level = []
+            for obj in temp_objects.values():
+
+                try:
+
+                    for ent in obj['entities']:
+
+                        if ent not in (list(results['objects'].keys()) +
+                                       level + excluded_entities):
+
+                            level.append(ent)
+
+                except (KeyError, TypeError):
+
+                    pass
+
+            level_responses = await _gather_ordered([
+                self._get_entity_response(entity=ent, **entity_kwargs)
+                for ent in level
+            ])
+
+            new_objects = {}
+            for ent, ent_response in zip(level, level_responses):
+
+                new_objects[ent] = self._rdap._parse_fetched_entity(
+                    entity=ent, fetched=ent_response, **parse_kwargs
+                )
+
+            # Update the result objects, and set the new temp object list to
+            # iterate for the next depth of entities.
+            results['objects'].update(new_objects)
+            temp_objects = new_objects
+            depth -= 1
+
+        return results
+
+
+class AsyncWhois:
+    """
+    The class for retrieving and parsing whois information via port 43 from
+    an asyncio event loop. Parsing is performed by
+    :obj:`ipwhois.whois.Whois`.
+
+    Args:
+        net (:obj:`ipwhois.aio.AsyncNet`): An ipwhois.aio.AsyncNet object.
+
+    Raises:
+        NetError: The parameter provided is not an instance of
+            ipwhois.aio.AsyncNet
+    """
+
+    def __init__(self, net):
+
+        if isinstance(net, AsyncNet):
+
+            self._net = net
+
+        else:
+
+            raise NetError('The provided net parameter is not an instance of '
+                           'ipwhois.aio.AsyncNet')
+
+        self._whois = Whois(net.net)
+
+    async def lookup(self, inc_raw=False, retry_count=3, response=None,
+                     get_referral=False, extra_blacklist=None,
+                     ignore_referral_errors=False, asn_data=None,
+                     field_list=None, is_offline=False, get_recursive=True,
+                     parser='regex'):
+        """
+        The function for retrieving and parsing whois information for an IP
+        address via port 43/tcp (WHOIS). See
+        :obj:`ipwhois.whois.Whois.lookup`.
+
+        Args:
+            inc_raw (:obj:`bool`, optional): Whether to include the raw
+                results in the returned dictionary. Defaults to False.
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+            response (:obj:`str`): Optional response object, this bypasses the
+                whois lookup. Required when is_offline=True.
+            get_referral (:obj:`bool`): Whether to retrieve referral whois
+                information, if available. Defaults to False.
+            extra_blacklist (:obj:`list`): Blacklisted whois servers in
+                addition to the global BLACKLIST. Defaults to None.
+            ignore_referral_errors (:obj:`bool`): Whether to ignore and
+                continue when an exception is encountered on referral whois
+                lookups. Defaults to False.
+            asn_data (:obj:`dict`): Result from
+                :obj:`ipwhois.aio.AsyncIPASN.lookup` (required).
+            field_list (:obj:`list` of :obj:`str`): If provided, fields to
+                parse. Defaults to all.
+            is_offline (:obj:`bool`): Whether to perform lookups offline. If
+                True, response and asn_data must be provided. Defaults to
+                False.
+            get_recursive (:obj:`bool`): Whether to ask the server to perform
+                recursive queries. Defaults to True.
+            parser (:obj:`str`): The field parsing engine, 'regex' or 'rpsl'.
+                Defaults to 'regex'.
+
+        Returns:
+            dict: The IP whois lookup results, see
+                :obj:`ipwhois.whois.Whois.lookup`.
+        """
+
+        referral_server = None
+        referral_port = 0
+
+        # Only fetch the response if we haven't already.
+        if response is None or (not is_offline and
+                                asn_data['asn_registry'] != 'arin'):
+
+            log.debug('Response not given, perform WHOIS lookup for {0}'
+                      .format(self._net.address_str))
+
+            # Retrieve the whois data.
+            response = await self._net.get_whois(
+                asn_registry=asn_data['asn_registry'], retry_count=retry_count,
+                extra_blacklist=extra_blacklist, get_recursive=get_recursive
+            )
+
+            if get_referral:
+
+                # Search for a referral server.
+                referral_server, referral_port = (
+                    self._whois.get_referral_server(response)
+                )
+
+        # Parse the response, no further queries are performed.
+        results = self._whois.lookup(
+            inc_raw=inc_raw, response=response, asn_data=asn_data,
+            field_list=field_list, is_offline=True, parser=parser
+        )
+
+        # Retrieve the referral whois data.
+        if get_referral and referral_server:
+
+            log.debug('Perform referral WHOIS lookup')
+
+            response_ref = None
+
+            try:
+
+                response_ref = await self._net.get_whois(
+                    asn_registry='', retry_count=retry_count,
+                    server=referral_server, port=referral_port,
+                    extra_blacklist=extra_blacklist
+                )
+
+            except (BlacklistError, WhoisLookupError):
+
+                if not ignore_referral_errors:
+
+                    raise
+
+            if response_ref:
+
+                log.debug('Parsing referral WHOIS data')
+
+                if inc_raw:
+
+                    results['raw_referral'] = response_ref
+
+                results['referral'] = self._whois.parse_fields(
+                    response_ref,
+                    RWHOIS['fields'],
+                    field_list=field_list
+                )
+
+        return results
+
+
+class AsyncNIRWhois:
+    """
+    The class for retrieving and parsing NIR (National Internet Registry)
+    whois data from an asyncio event loop. Parsing is performed by
+    :obj:`ipwhois.nir.NIRWhois`. Contacts are retrieved concurrently.
+
+    Args:
+        net (:obj:`ipwhois.aio.AsyncNet`): An ipwhois.aio.AsyncNet object.
+
+    Raises:
+        NetError: The parameter provided is not an instance of
+            ipwhois.aio.AsyncNet
+    """
+
+    def __init__(self, net):
+
+        if isinstance(net, AsyncNet):
+
+            self._net = net
+
+        else:
+
+            raise NetError('The provided net parameter is not an instance of '
+                           'ipwhois.aio.AsyncNet')
+
+        self._nir = NIRWhois(net.net)
+
+    async def get_contact(self, response=None, nir=None, handle=None,
+                          retry_count=3, dt_format=None):
+        """
+        The function for retrieving and parsing NIR whois data based on
+        NIR_WHOIS contact_fields. See :obj:`ipwhois.nir.NIRWhois.get_contact`.
+
+        Args:
+            response (:obj:`str`): Optional response object, this bypasses the
+                lookup.
+            nir (:obj:`str`): The NIR to query ('jpnic' or 'krnic'). Required
+                if response is None.
+            handle (:obj:`str`): For NIRs that have separate contact queries
+                (JPNIC), this is the contact handle to use in the query.
+                Defaults to None.
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+            dt_format (:obj:`str`): The format of datetime fields if known.
+                Defaults to None.
+
+        Returns:
+            dict: Mapping of the fields provided in contact_fields, to their
+                parsed results.
+        """
+
+        if response or nir == 'krnic':
+
+            contact_response = response
+
+        else:
+
+            # Retrieve the whois data.
+            contact_response = await self._net.get_http_raw(
+                url=str(NIR_WHOIS[nir]['url']).format(handle),
+                retry_count=retry_count,
+                headers=NIR_WHOIS[nir]['request_headers'],
+                request_type=NIR_WHOIS[nir]['request_type']
+            )
+
+        return self._nir.get_contact(response=contact_response, nir=nir,
+                                     dt_format=dt_format)
+
+    async def lookup(self, nir=None, inc_raw=False, retry_count=3,
+                     response=None, field_list=None, is_offline=False):
+        """
+        The function for retrieving and parsing NIR whois information for an
+        IP address via HTTP (HTML scraping). See
+        :obj:`ipwhois.nir.NIRWhois.lookup`.
+
+        Args:
+            nir (:obj:`str`): The NIR to query ('jpnic' or 'krnic'). Required
+                if response is None.
+            inc_raw (:obj:`bool`, optional): Whether to include the raw
+                results in the returned dictionary. Defaults to False.
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+            response (:obj:`str`): Optional response object, this bypasses the
+                NIR lookup. Required when is_offline=True.
+            field_list (:obj:`list` of :obj:`str`): If provided, fields to
+                parse. Defaults to :obj:`ipwhois.nir.BASE_NET`.
+            is_offline (:obj:`bool`): Whether to perform lookups offline. If
+                True, response must be provided. Defaults to False.
+
+        Returns:
+            dict: The NIR whois results, see
+                :obj:`ipwhois.nir.NIRWhois.lookup`.
+        """
+
+        if nir not in NIR_WHOIS.keys():
+
+            raise KeyError('Invalid arg for nir (National Internet Registry')
+
+        # Create the return dictionary.
+        results = {
+            'query': self._net.address_str,
+            'raw': None
+        }
+
+        # Only fetch the response if we haven't already.
+        if response is None:
+
+            if is_offline:
+
+                raise KeyError('response argument required when '
+                               'is_offline=True')
+
+            log.debug('Response not given, perform WHOIS lookup for {0}'
+                      .format(self._net.address_str))
+
+            form_data = None
+            if NIR_WHOIS[nir]['form_data_ip_field']:
+                form_data = {NIR_WHOIS[nir]['form_data_ip_field']:
+                             self._net.address_str}
+
+            # Retrieve the whois data.
+            response = await self._net.get_http_raw(
+                url=str(NIR_WHOIS[nir]['url']).format(self._net.address_str),
+                retry_count=retry_count,
+                headers=NIR_WHOIS[nir]['request_headers'],
+                request_type=NIR_WHOIS[nir]['request_type'],
+                form_data=form_data
+            )
+
+        # If inc_raw parameter is True, add the response to return dictionary.
+        if inc_raw:
+
+            results['raw'] = response
+
+        if nir == 'jpnic':
+
+            nets = self._nir.get_nets_jpnic(response)
+
+        else:
+
+            nets = self._nir.get_nets_krnic(response)
+
+        dt_format = NIR_WHOIS[nir]['dt_format']
+
+        # Parse the network sections, collecting the unique contacts to
+        # retrieve.
+        log.debug('Parsing NIR WHOIS data')
+        net_contacts = []
+        unique_contacts = []
+        for index, net in enumerate(nets):
+
+            section_end = None
+            if index + 1 < len(nets):
+                section_end = nets[index + 1]['start']
+
+            temp_net = self._nir.parse_fields(
+                response=response,
+                fields_dict=NIR_WHOIS[nir]['fields'],
+                net_start=section_end,
+                net_end=net['end'],
+                dt_format=dt_format,
+                field_list=field_list,
+                hourdelta=int(NIR_WHOIS[nir]['dt_hourdelta'])
+            )
+            temp_net['country'] = NIR_WHOIS[nir]['country_code']
+            contacts = {
+                'admin': temp_net['contact_admin'],
+                'tech': temp_net['contact_tech']
+            }
+
+            del (
+                temp_net['contact_admin'],
+                temp_net['contact_tech']
+            )
+
+            # Merge the net dictionaries.
+            net.update(temp_net)
+
+            # The start and end values are no longer needed.
+            del net['start'], net['end']
+
+            if is_offline:
+
+                continue
+
+            for key, val in contacts.items():
+
+                if len(val) > 0:
+
+                    if isinstance(val, str):
+
+                        val = val.splitlines()
+
+                    for contact in val:
+
+                        net_contacts.append((net, key, contact))
+
+                        if contact not in unique_contacts:
+
+                            unique_contacts.append(contact)
+
+        # Retrieve the unique contacts concurrently.
+        contact_results = await _gather_ordered([
+            self.get_contact(
+                response=contact if nir == 'krnic' else None,
+                handle=None if nir == 'krnic' else contact,
+                nir=nir,
+                retry_count=retry_count,
+                dt_format=dt_format
+            ) for contact in unique_contacts
+        ])
+        global_contacts = dict(zip(unique_contacts, contact_results))
+
+        for net, key, contact in net_contacts:
+
+            net['contacts'][key] = global_contacts[contact]
+
+        # Add the networks to the return dictionary.
+        results['nets'] = nets
+
+        return results
+
+
+class AsyncIPWhois:
+    """
+    The wrapper class for performing whois/RDAP lookups and parsing for
+    IPv4 and IPv6 addresses from an asyncio event loop. This is the asyncio
+    counterpart to :obj:`ipwhois.ipwhois.IPWhois`, returning the same
+    results.
+
+    Args:
+        address (:obj:`str`/:obj:`int`/:obj:`IPv4Address`/:obj:`IPv6Address`):
+            An IPv4 or IPv6 address
+        timeout (:obj:`int`): The default timeout for socket connections in
+            seconds. Defaults to 5.
+        proxy_opener (:obj:`urllib.request.OpenerDirector`): The request for
+            proxy support. Defaults to None.
+        http_pool (:obj:`ipwhois.pool.HTTPConnectionPool`): The keep-alive
+            connection pool for HTTP queries. Ignored if proxy_opener is
+            provided. Defaults to None.
+        semaphores (:obj:`dict`): Mapping of ASYNC_LIMITS keys to
+            asyncio.Semaphore objects, as returned by
+            :obj:`ipwhois.aio.build_semaphores`. Defaults to None, which
+            shares the event loop defaults.
+        dns_resolver (:obj:`dns.asyncresolver.Resolver`): The DNS resolver to
+            use. Defaults to None, which creates a new resolver.
+        entity_cache (:obj:`ipwhois.cache.EntityCache`): The cache for
+            parsed RDAP entities, may be shared across AsyncIPWhois objects.
+            Defaults to None.
+        asn_table (:obj:`ipwhois.asntable.ASNTable`): The offline IP to ASN
+            table, may be shared across AsyncIPWhois objects. If provided,
+            ASN lookups try it first ('local' asn_methods). Defaults to None.
+    """
+
+    def __init__(self, address, timeout=5, proxy_opener=None,
+                 http_pool=None, semaphores=None, dns_resolver=None,
+                 entity_cache=None, asn_table=None):
+
+        self.net = AsyncNet(
+            address=address, timeout=timeout, proxy_opener=proxy_opener,
+            http_pool=http_pool, semaphores=semaphores,
+            dns_resolver=dns_resolver, asn_table=asn_table
+        )
+        self.ipasn = AsyncIPASN(self.net)
+        self.entity_cache = entity_cache
+
+        self.address = self.net.address
+        self.timeout = self.net.timeout
+        self.address_str = self.net.address_str
+        self.version = self.net.version
+
+    def __repr__(self):
+
+        return 'AsyncIPWhois({0}, {1}, {2})'.format(
+            self.address_str, str(self.timeout), repr(self.net.net.opener)
+        )
+
+    async def _lookup_nir(self, asn_data, inc_raw, retry_count,
+                          nir_field_list):
+        """
+        The function for retrieving NIR results if the ASN country code
+        belongs to a supported NIR.
+
+        Args:
+            asn_data (:obj:`dict`): Result from
+                :obj:`ipwhois.aio.AsyncIPASN.lookup`.
+            inc_raw (:obj:`bool`): Whether to include the raw results in the
+                returned dictionary.
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered.
+            nir_field_list (:obj:`list`): If provided, a list of fields to
+                parse.
+
+        Returns:
+            dict: ipwhois.nir.NIRWhois results, None if not applicable.
+        """
+
+        nir = None
+        if asn_data and 'JP' == asn_data['asn_country_code']:
+            nir = 'jpnic'
+        elif asn_data and 'KR' == asn_data['asn_country_code']:
+            nir = 'krnic'
+
+        if not nir:
+
+            return None
+
+        nir_whois = AsyncNIRWhois(self.net)
+        return await nir_whois.lookup(
+            nir=nir, inc_raw=inc_raw, retry_count=retry_count,
+            response=None, field_list=nir_field_list, is_offline=False
+        )
+
+    async def lookup_whois(self, inc_raw=False, retry_count=3,
+                           get_referral=False, extra_blacklist=None,
+                           ignore_referral_errors=False, field_list=None,
+                           extra_org_map=None, inc_nir=True,
+                           nir_field_list=None, asn_methods=None,
+                           get_asn_description=True, get_recursive=True,
+                           parser='regex'):
+        """
+        The function for retrieving and parsing whois information for an IP
+        address via port 43 (WHOIS). Arguments and results are the same as
+        :obj:`ipwhois.ipwhois.IPWhois.lookup_whois`.
+        """
+
+        # Create the return dictionary.
+        results = {'nir': None}
+
+        # Retrieve the ASN information.
+        log.debug('ASN lookup for {0}'.format(self.address_str))
+
+        asn_data = await self.ipasn.lookup(
+            inc_raw=inc_raw, retry_count=retry_count,
+            extra_org_map=extra_org_map, asn_methods=asn_methods,
+            get_asn_description=get_asn_description
+        )
+
+        # Add the ASN information to the return dictionary.
+        results.update(asn_data)
+
+        # Retrieve the whois data and parse.
+        whois = AsyncWhois(self.net)
+        log.debug('WHOIS lookup for {0}'.format(self.address_str))
+        whois_data = await whois.lookup(
+            inc_raw=inc_raw, retry_count=retry_count, response=None,
+            get_referral=get_referral, extra_blacklist=extra_blacklist,
+            ignore_referral_errors=ignore_referral_errors, asn_data=asn_data,
+            field_list=field_list, get_recursive=get_recursive,
+            parser=parser
+        )
+
+        # Add the WHOIS information to the return dictionary.
+        results.update(whois_data)
+
+        if inc_nir:
+
+            results['nir'] = await self._lookup_nir(
+                asn_data, inc_raw, retry_count, nir_field_list
+            )
+
+        return results
+
+    async def lookup_rdap(self, inc_raw=False, retry_count=3, depth=0,
+                          excluded_entities=None, bootstrap=False,
+                          rate_limit_timeout=120, extra_org_map=None,
+                          inc_nir=True, nir_field_list=None, asn_methods=None,
+                          get_asn_description=True, root_ent_check=True):
+        """
+        The function for retrieving and parsing whois information for an IP
+        address via HTTP (RDAP). Arguments and results are the same as
+        :obj:`ipwhois.ipwhois.IPWhois.lookup_rdap`.
+        """
+
+        # Create the return dictionary.
+        results = {'nir': None}
+
+        asn_data = None
+        if not bootstrap:
+
+            # Retrieve the ASN information.
+            log.debug('ASN lookup for {0}'.format(self.address_str))
+            asn_data = await self.ipasn.lookup(
+                inc_raw=inc_raw, retry_count=retry_count,
+                extra_org_map=extra_org_map, asn_methods=asn_methods,
+                get_asn_description=get_asn_description
+            )
+
+            # Add the ASN information to the return dictionary.
+            results.update(asn_data)
+
+        # Retrieve the RDAP data and parse.
+        rdap = AsyncRDAP(self.net)
+        log.debug('RDAP lookup for {0}'.format(self.address_str))
+        rdap_data = await rdap.lookup(
+            inc_raw=inc_raw, retry_count=retry_count, asn_data=asn_data,
+            depth=depth, excluded_entities=excluded_entities,
+            bootstrap=bootstrap, rate_limit_timeout=rate_limit_timeout,
+            root_ent_check=root_ent_check, entity_cache=self.entity_cache
+        )
+
+        # Add the RDAP information to the return dictionary.
+        results.update(rdap_data)
+
+        if inc_nir:
+
+            results['nir'] = await self._lookup_nir(
+                asn_data, inc_raw, retry_count, nir_field_list
+            )
+
+        return results
@@ -24,12 +24,12 @@
 
 import re
 import sys
-import copy
 import logging
 
 from .exceptions import (NetError, ASNRegistryError, ASNParseError,
                          ASNLookupError, HTTPLookupError, WhoisLookupError,
                          WhoisRateLimitError, ASNOriginLookupError)
+from .utils import compile_field_pattern
 
 if sys.version_info >= (3, 3):  # pragma: no cover
     from ipaddress import ip_network
@@ -39,6 +39,7 @@ else:  # pragma: no cover
 
 log = logging.getLogger(__name__)
 
+# Base ASN origin output dictionary (shallow copied per network).
 BASE_NET = {
     'cidr': None,
     'description': None,
@@ -403,7 +404,8 @@ class IPASN:
                 the REST result): 'ARIN', 'RIPE', 'apnic', 'lacnic', 'afrinic'
                 Defaults to None.
             asn_methods (:obj:`list`): ASN lookup types to attempt, in order.
-                If None, defaults to all: ['dns', 'whois', 'http'].
+                If None, defaults to all: ['dns', 'whois', 'http'], preceded
+                by 'local' if the Net object has an asn_table.
             get_asn_description (:obj:`bool`): Whether to run an additional
                 query when pulling ASN information via dns, in order to get
                 the ASN description. Defaults to True.
@@ -425,7 +427,8 @@ class IPASN:
                 }
 
         Raises:
-            ValueError: methods argument requires one of dns, whois, http.
+            ValueError: methods argument requires one of local, dns, whois,
+                http.
             ASNRegistryError: ASN registry does not match.
         """
 
@@ -433,12 +436,16 @@ class IPASN:
 
             lookups = ['dns', 'whois', 'http']
 
+            if self._net.asn_table is not None:
+
+                lookups.insert(0, 'local')
+
         else:
 
-            if {'dns', 'whois', 'http'}.isdisjoint(asn_methods):
+            if {'local', 'dns', 'whois', 'http'}.isdisjoint(asn_methods):
 
                 raise ValueError('methods argument requires at least one of '
-                                 'dns, whois, http.')
+                                 'local, dns, whois, http.')
 
             lookups = asn_methods
 
@@ -447,7 +454,20 @@ class IPASN:
         dns_success = False
         for index, lookup_method in enumerate(lookups):
 
-            if lookup_method == 'dns':
+            if lookup_method == 'local':
+
+                try:
+
+                    response = self._net.get_asn_local()
+                    asn_data = self.parse_fields_dns(response)
+                    break
+
+                except (ASNLookupError, ASNRegistryError) as e:
+
+                    log.debug('ASN local lookup failed: {0}'.format(e))
+                    pass
+
+            elif lookup_method == 'dns':
 
                 try:
 
@@ -602,10 +622,7 @@ class ASNOrigin:
 
         for field, pattern in generate:
 
-            pattern = re.compile(
-                str(pattern),
-                re.DOTALL
-            )
+            pattern = compile_field_pattern(pattern)
 
             if net_start is not None:
 
@@ -696,7 +713,7 @@ class ASNOrigin:
 
             try:
 
-                net = copy.deepcopy(BASE_NET)
+                net = BASE_NET.copy()
                 net['cidr'] = match.group(1).strip()
                 net['start'] = match.start()
                 net['end'] = match.end()
@@ -0,0 +1,578 @@
+# Copyright (c) 2013-2024 Philip Hane
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+import io
+import os
+import re
+import bz2
+import gzip
+import mmap
+import struct
+import logging
+from bisect import bisect_right
+
+if sys.version_info >= (3, 3):  # pragma: no cover
+    from ipaddress import (ip_address,
+                           ip_network,
+                           IPv4Address,
+                           IPv6Address)
+else:  # pragma: no cover
+    from ipaddr import (IPAddress as ip_address,
+                        IPNetwork as ip_network,
+                        IPv4Address,
+                        IPv6Address)
+
+log = logging.getLogger(__name__)
+
+# The table file signature.
+TABLE_MAGIC = b'IPWASNT1'
+
+# The table file header: signature, the record counts of the IPv4 prefix,
+# IPv6 prefix, IPv4 allocation and IPv6 allocation tables, and the size of
+# the values section.
+TABLE_HEADER = struct.Struct('>8s5Q')
+
+# The interval records by IP version: start, end (big-endian, so that the
+# packed bytes sort as the addresses do), value index and prefix length.
+TABLE_RECORDS = {
+    4: struct.Struct('>IIIB'),
+    6: struct.Struct('>QQQQIB')
+}
+
+# The number of bytes in a packed address, by IP version.
+ADDRESS_BYTES = {4: 4, 6: 16}
+
+# The delegated-stats statuses included in the allocation tables.
+DELEGATED_STATUS = ('allocated', 'assigned')
+
+# The separators of multi-origin ASNs and AS sets in pfx2as files.
+ASN_SEPARATORS = re.compile('[_,]')
+
+
+def open_source(file_path):
+    """
+    The function for opening a snapshot file for reading, decompressing
+    .gz and .bz2 files.
+
+    Args:
+        file_path (:obj:`str`): The path to the file.
+
+    Returns:
+        file: The text file object.
+    """
+
+    if file_path.endswith('.gz'):
+
+        data_file = gzip.open(file_path, 'rb')
+
+    elif file_path.endswith('.bz2'):
+
+        data_file = bz2.BZ2File(file_path, 'rb')
+
+    else:
+
+        data_file = io.open(file_path, 'rb')
+
+    return io.TextIOWrapper(data_file, encoding='utf-8', errors='replace')
+
+
+def parse_pfx2as(lines):
+    """
+    The generator for parsing routed prefixes from pfx2as style BGP snapshot
+    lines, e.g., CAIDA Routeviews prefix2as (prefix, length and ASN
+    separated by whitespace), or CIDR and ASN separated by whitespace.
+    Multi-origin ASNs and AS sets are space separated, as in Cymru results.
+
+    Args:
+        lines (:obj:`iterable` of :obj:`str`): The snapshot lines.
+
+    Yields:
+        tuple: (IP version int, start address int, end address int,
+            prefix length int, ASN str)
+    """
+
+    for line in lines:
+
+        fields = line.split()
+
+        if not fields or fields[0].startswith('#'):
+
+            continue
+
+        try:
+
+            if '/' in fields[0]:
+
+                address, prefixlen = fields[0].split('/', 1)
+                asn = fields[1]
+
+            else:
+
+                address, prefixlen = fields[0], fields[1]
+                asn = fields[2]
+
+            # Parsed with ip_address() rather than ip_network(), which is
+            # several times slower for the ~1M prefixes in a full table.
+            address = ip_address(address)
+            prefixlen = int(prefixlen)
+            host_bits = ADDRESS_BYTES[address.version] * 8 - prefixlen
+
+            if not 0 <= host_bits <= ADDRESS_BYTES[address.version] * 8:
+
+                raise ValueError('Invalid prefix length {0}'.format(
+                    prefixlen))
+
+        except (IndexError, ValueError) as e:
+
+            log.debug('Skipping pfx2as line {0!r}: {1}'.format(line, e))
+            continue
+
+        start = (int(address) >> host_bits) << host_bits
+        yield (address.version, start, start | ((1 << host_bits) - 1),
+               prefixlen, ' '.join(ASN_SEPARATORS.split(asn)))
+
+
+def parse_delegated(lines):
+    """
+    The generator for parsing allocations from RIR delegated-stats (and
+    delegated-extended) snapshot lines. Header, summary and unallocated
+    lines are skipped.
+
+    Args:
+        lines (:obj:`iterable` of :obj:`str`): The snapshot lines.
+
+    Yields:
+        tuple: (IP version int, start address int, end address int,
+            registry str, country code str, allocation date str
+            (YYYY-MM-DD, or empty if unknown))
+    """
+
+    for line in lines:
+
+        fields = line.strip().split('|')
+
+        if (len(fields) < 7 or fields[2] not in ('ipv4', 'ipv6') or
+                fields[6] not in DELEGATED_STATUS):
+
+            continue
+
+        try:
+
+            if fields[2] == 'ipv4':
+
+                start = int(ip_address(fields[3]))
+                end = start + int(fields[4]) - 1
+                version = 4
+
+            else:
+
+                network = ip_network('{0}/{1}'.format(fields[3], fields[4]),
+                                     strict=False)
+                start = int(network.network_address)
+                end = int(network.broadcast_address)
+                version = 6
+
+        except ValueError as e:
+
+            log.debug('Skipping delegated line {0!r}: {1}'.format(line, e))
+            continue
+
+        date = fields[5]
+        if len(date) == 8 and date.isdigit() and date != '00000000':
+
+            date = '{0}-{1}-{2}'.format(date[0:4], date[4:6], date[6:8])
+
+        else:
+
+            date = ''
+
+        yield version, start, end, fields[0], fields[1].upper(), date
+
+
+def _append_interval(intervals, start, end, value, prefixlen):
+    """
+    The function for appending a flattened interval, merging it with the
+    previous interval if adjacent with the same value and prefix length.
+
+    Args:
+        intervals (:obj:`list`): The flattened intervals.
+        start (:obj:`int`): The first address.
+        end (:obj:`int`): The last address.
+        value (:obj:`int`): The value index.
+        prefixlen (:obj:`int`): The prefix length.
+    """
+
+    if intervals:
+
+        last = intervals[-1]
+        if (last[1] + 1 == start and last[2] == value and
+                last[3] == prefixlen):
+
+            intervals[-1] = (last[0], end, value, prefixlen)
+            return
+
+    intervals.append((start, end, value, prefixlen))
+
+
+def flatten_intervals(intervals):
+    """
+    The function for flattening nested address intervals into sorted,
+    non-overlapping intervals, where the most specific interval wins
+    (longest prefix match). Identical intervals are resolved to the last
+    one provided. Partially overlapping intervals are truncated to the
+    enclosing interval.
+
+    Args:
+        intervals (:obj:`list` of :obj:`tuple`): The intervals (start int,
+            end int, value int, prefix length int). Sorted in place.
+
+    Returns:
+        list of tuple: The flattened intervals, in the same format.
+    """
+
+    intervals.sort(key=lambda interval: (interval[0], -interval[1]))
+
+    ret = []
+
+    # The enclosing intervals, and the first address not yet output.
+    stack = []
+    cursor = 0
+
+    for start, end, value, prefixlen in intervals:
+
+        while stack and stack[-1][1] < start:
+
+            top = stack.pop()
+            if cursor <= top[1]:
+
+                _append_interval(ret, cursor, top[1], top[2], top[3])
+                cursor = top[1] + 1
+
+        if stack:
+
+            if cursor < start:
+
+                top = stack[-1]
+                _append_interval(ret, cursor, start - 1, top[2], top[3])
+
+            end = min(end, stack[-1][1])
+
+        cursor = start
+        stack.append((start, end, value, prefixlen))
+
+    while stack:
+
+        top = stack.pop()
+        if cursor <= top[1]:
+
+            _append_interval(ret, cursor, top[1], top[2], top[3])
+            cursor = top[1] + 1
+
+    return ret
+
+
+def build_asn_table(file_path, pfx2as_files=None, delegated_files=None):
+    """
+    The function for building an on disk IP to ASN table from BGP (pfx2as)
+    and RIR delegated-stats snapshot files, for use with
+    :obj:`ipwhois.asntable.ASNTable`. The ASN and CIDR are taken from the
+    most specific routed prefix, and the registry, country code and date
+    from the RIR allocation, as with Cymru. Files ending in .gz or .bz2 are
+    decompressed. The table is written to a temporary file and moved into
+    place, so open tables are not affected.
+
+    Args:
+        file_path (:obj:`str`): The path to write the table to.
+        pfx2as_files (:obj:`list` of :obj:`str`): The pfx2as style file
+            paths, see :obj:`ipwhois.asntable.parse_pfx2as`.
+        delegated_files (:obj:`list` of :obj:`str`): The delegated-stats
+            file paths, see :obj:`ipwhois.asntable.parse_delegated`.
+
+    Returns:
+        dict: The number of records written per table:
+
+        ::
+
+            {
+                'prefix' (dict) - Mapping of IP version (int) to count
+                'allocation' (dict) - Mapping of IP version (int) to count
+            }
+    """
+
+    values = []
+    value_index = {}
+
+    prefixes = {4: [], 6: []}
+    for pfx2as_file in pfx2as_files or []:
+
+        with open_source(pfx2as_file) as data_file:
+
+            for (version, start, end, prefixlen,
+                 asn) in parse_pfx2as(data_file):
+
+                if asn not in value_index:
+
+                    value_index[asn] = len(values)
+                    values.append(asn)
+
+                prefixes[version].append((start, end, value_index[asn],
+                                          prefixlen))
+
+    allocations = {4: [], 6: []}
+    for delegated_file in delegated_files or []:
+
+        with open_source(delegated_file) as data_file:
+
+            for (version, start, end, registry, country,
+                 date) in parse_delegated(data_file):
+
+                value = '|'.join((registry, country, date))
+                if value not in value_index:
+
+                    value_index[value] = len(values)
+                    values.append(value)
+
+                allocations[version].append((start, end, value_index[value],
+                                             0))
+
+    tables = []
+    for intervals in (prefixes[4], prefixes[6], allocations[4],
+                      allocations[6]):
+
+        tables.append(flatten_intervals(intervals))
+
+    values_data = '\n'.join(values).encode('utf-8')
+
+    tmp_path = '{0}.{1}.tmp'.format(file_path, os.getpid())
+    with open(tmp_path, 'wb') as table_file:
+
+        table_file.write(TABLE_HEADER.pack(
+            TABLE_MAGIC, len(tables[0]), len(tables[1]), len(tables[2]),
+            len(tables[3]), len(values_data)
+        ))
+
+        for version, intervals in zip((4, 6, 4, 6), tables):
+
+            record = TABLE_RECORDS[version]
+            for start, end, value, prefixlen in intervals:
+
+                if version == 4:
+
+                    table_file.write(record.pack(start, end, value,
+                                                 prefixlen))
+
+                else:
+
+                    table_file.write(record.pack(
+                        start >> 64, start & 0xFFFFFFFFFFFFFFFF, end >> 64,
+                        end & 0xFFFFFFFFFFFFFFFF, value, prefixlen
+                    ))
+
+        table_file.write(values_data)
+
+    try:
+
+        os.replace(tmp_path, file_path)
+
+    except AttributeError:  # pragma: no cover
+
+        os.rename(tmp_path, file_path)
+
+    log.debug('Built ASN table {0}: {1} prefixes, {2} allocations'.format(
+        file_path, len(tables[0]) + len(tables[1]),
+        len(tables[2]) + len(tables[3])))
+
+    return {
+        'prefix': {4: len(tables[0]), 6: len(tables[1])},
+        'allocation': {4: len(tables[2]), 6: len(tables[3])}
+    }
+
+
+class _RecordKeys:
+    """
+    The sequence of interval start addresses (packed) in a table, for
+    binary searching the memory-mapped records without loading them.
+
+    Args:
+        data (:obj:`mmap.mmap`): The table data.
+        offset (:obj:`int`): The offset of the first record.
+        count (:obj:`int`): The number of records.
+        version (:obj:`int`): The IP version.
+    """
+
+    def __init__(self, data, offset, count, version):
+
+        self.data = data
+        self.offset = offset
+        self.count = count
+        self.record = TABLE_RECORDS[version]
+        self.width = ADDRESS_BYTES[version]
+
+    def __len__(self):
+
+        return self.count
+
+    def __getitem__(self, index):
+
+        position = self.offset + index * self.record.size
+        return self.data[position:position + self.width]
+
+    def find(self, packed):
+        """
+        The function for finding the record containing an address.
+
+        Args:
+            packed (:obj:`bytes`): The packed address.
+
+        Returns:
+            tuple: (value index, prefix length), None if not found.
+        """
+
+        index = bisect_right(self, packed) - 1
+
+        if index < 0:
+
+            return None
+
+        position = self.offset + index * self.record.size
+        end = self.data[position + self.width:position + self.width * 2]
+
+        if end < packed:
+
+            return None
+
+        return self.record.unpack_from(self.data, position)[-2:]
+
+
+class ASNTable:
+    """
+    The class for offline IP to ASN lookups from a table built by
+    :obj:`ipwhois.asntable.build_asn_table`. The table file is
+    memory-mapped, so processes opening the same file share one copy in
+    the page cache. Only the ASN and allocation values are loaded into
+    memory. Thread safe.
+
+    Args:
+        file_path (:obj:`str`): The path to the table file.
+
+    Raises:
+        ValueError: The file is not an ASN table.
+    """
+
+    def __init__(self, file_path):
+
+        self.file_path = file_path
+
+        with open(file_path, 'rb') as table_file:
+
+            self._data = mmap.mmap(table_file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+
+        try:
+
+            header = TABLE_HEADER.unpack_from(self._data, 0)
+
+        except struct.error:
+
+            header = None
+
+        if header is None or header[0] != TABLE_MAGIC:
+
+            self._data.close()
+            raise ValueError('{0} is not an ASN table.'.format(file_path))
+
+        offset = TABLE_HEADER.size
+        self._tables = []
+        for version, count in zip((4, 6, 4, 6), header[1:5]):
+
+            self._tables.append(_RecordKeys(self._data, offset, count,
+                                            version))
+            offset += count * TABLE_RECORDS[version].size
+
+        values_data = self._data[offset:offset + header[5]]
+        self.values = values_data.decode('utf-8').split('\n')
+
+    def __len__(self):
+
+        return sum(len(table) for table in self._tables)
+
+    def close(self):
+        """
+        The function for closing the memory-mapped table.
+        """
+
+        self._data.close()
+
+    def lookup(self, address):
+        """
+        The function for looking up the ASN information for an IP address.
+
+        Args:
+            address (:obj:`str`/:obj:`IPv4Address`/:obj:`IPv6Address`): The
+                IP address.
+
+        Returns:
+            str: The ASN information, in Cymru DNS format
+                ('ASN | CIDR | country code | registry | date', see
+                :obj:`ipwhois.asn.IPASN.parse_fields_dns`), None if the
+                address is not routed. The country code, registry and date
+                are empty if the address is not in an allocation.
+        """
+
+        if not isinstance(address, (IPv4Address, IPv6Address)):
+
+            address = ip_address(address)
+
+        packed = address.packed
+
+        if address.version == 4:
+
+            prefix_table, allocation_table = self._tables[0], self._tables[2]
+
+        else:
+
+            prefix_table, allocation_table = self._tables[1], self._tables[3]
+
+        prefix = prefix_table.find(packed)
+
+        if prefix is None:
+
+            return None
+
+        host_bits = len(packed) * 8 - prefix[1]
+        cidr = '{0}/{1}'.format(
+            ip_address((int(address) >> host_bits) << host_bits), prefix[1]
+        )
+
+        registry = country = date = ''
+        allocation = allocation_table.find(packed)
+
+        if allocation is not None:
+
+            registry, country, date = self.values[allocation[0]].split('|')
+
+        return '{0} | {1} | {2} | {3} | {4}'.format(
+            self.values[prefix[0]], cidr, country, registry, date
+        )
@@ -0,0 +1,647 @@
+# Copyright (c) 2013-2024 Philip Hane
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+import os
+import copy
+import json
+import hashlib
+import threading
+import logging
+from collections import (OrderedDict, namedtuple)
+from time import time
+
+from .utils import json_loads
+
+if sys.version_info >= (3, 3):  # pragma: no cover
+    from ipaddress import (ip_address,
+                           ip_network)
+else:  # pragma: no cover
+    from ipaddr import (IPAddress as ip_address,
+                        IPNetwork as ip_network)
+
+log = logging.getLogger(__name__)
+
+
+def get_result_networks(results):
+    """
+    The function for determining the networks an IPWhois/RDAP/Whois lookup
+    result is valid for. This is the most specific network (RDAP network
+    cidr, or WHOIS nets cidr) containing the queried address. If ASN data is
+    present, the network is narrowed to the ASN cidr where it is more
+    specific, since a different ASN may be announced for part of a
+    registered network.
+
+    Args:
+        results (:obj:`dict`): The lookup results, e.g., from
+            IPWhois.lookup_rdap(), IPWhois.lookup_whois() or RDAP.lookup().
+
+    Returns:
+        list of IPv4Network/IPv6Network: The networks the results are valid
+            for. Empty if undetermined.
+    """
+
+    try:
+
+        address = ip_address(results['query'])
+
+    except (KeyError, TypeError, ValueError):
+
+        return []
+
+    cidrs = []
+    if results.get('network'):
+
+        cidrs.append(results['network'].get('cidr'))
+
+    for net in results.get('nets') or []:
+
+        cidrs.append(net.get('cidr'))
+
+    # Collect the most specific networks containing the address.
+    nets = []
+    for cidr in cidrs:
+
+        for tmp in (cidr or '').split(','):
+
+            try:
+
+                net = ip_network(tmp.strip())
+
+            except ValueError:
+
+                continue
+
+            if net.version != address.version or address not in net:
+
+                continue
+
+            if not nets or net.prefixlen > nets[0].prefixlen:
+
+                nets = [net]
+
+            elif net.prefixlen == nets[0].prefixlen and net not in nets:
+
+                nets.append(net)
+
+    try:
+
+        asn_net = ip_network(results['asn_cidr'])
+
+    except (KeyError, TypeError, ValueError):
+
+        return nets
+
+    if asn_net.version != address.version or address not in asn_net:
+
+        return []
+
+    return [net if net.prefixlen >= asn_net.prefixlen else asn_net
+            for net in nets]
+
+
+class PrefixCache:
+    """
+    The class for caching lookup results by network. Results are indexed by
+    the networks they were returned for (see
+    :obj:`ipwhois.cache.get_result_networks`), in a binary radix trie per
+    namespace and IP version. Any address within a cached network is answered
+    with the longest matching prefix, without network queries. Entries are
+    expired after ttl seconds, and the least recently used entries are evicted
+    once maxsize is reached. Thread safe.
+
+    Args:
+        maxsize (:obj:`int`): The maximum number of cached networks.
+            Defaults to 10000.
+        ttl (:obj:`int`): The number of seconds a cached result is valid.
+            Defaults to 3600.
+    """
+
+    def __init__(self, maxsize=10000, ttl=3600):
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Mapping of (namespace, version) to trie root nodes. Each node is a
+        # list of [zero child, one child, entry key].
+        self._tries = {}
+
+        # Mapping of entry keys (namespace, version, network int, prefixlen)
+        # to (expiry time, value), in least to most recently used order.
+        self._entries = OrderedDict()
+
+        self._lock = threading.RLock()
+
+    def __len__(self):
+
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        """
+        dict: The cache counters {'hits', 'misses', 'evictions', 'size'}.
+        """
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries)
+        }
+
+    def _remove(self, key):
+        """
+        The function for removing an entry from the LRU and trie, pruning
+        empty trie nodes.
+
+        Args:
+            key (:obj:`tuple`): The entry key.
+        """
+
+        namespace, version, net_int, prefixlen = key
+        del self._entries[key]
+
+        root = self._tries.get((namespace, version))
+        if root is None:  # pragma: no cover
+
+            return
+
+        max_bits = 32 if version == 4 else 128
+        node = root
+        path = []
+        for i in range(prefixlen):
+
+            bit = (net_int >> (max_bits - i - 1)) & 1
+            path.append((node, bit))
+            node = node[bit]
+
+            if node is None:  # pragma: no cover
+
+                return
+
+        node[2] = None
+
+        # Prune the nodes no longer leading to an entry.
+        for parent, bit in reversed(path):
+
+            child = parent[bit]
+            if child[0] is None and child[1] is None and child[2] is None:
+
+                parent[bit] = None
+
+            else:
+
+                break
+
+    def set(self, networks, value, namespace=None):
+        """
+        The function for caching a value for one or more networks.
+
+        Args:
+            networks (:obj:`list`): The networks (str, IPv4Network or
+                IPv6Network) to index value by.
+            value: The value to cache. A deep copy is stored.
+            namespace: A hashable namespace, separating values for different
+                lookup types/arguments. Defaults to None.
+        """
+
+        value = copy.deepcopy(value)
+        expires = time() + self.ttl
+
+        with self._lock:
+
+            for net in networks:
+
+                net = ip_network(str(net))
+                max_bits = 32 if net.version == 4 else 128
+                net_int = int(net.network_address)
+                key = (namespace, net.version, net_int, net.prefixlen)
+
+                if key in self._entries:
+
+                    del self._entries[key]
+
+                self._entries[key] = (expires, value)
+
+                node = self._tries.setdefault((namespace, net.version),
+                                              [None, None, None])
+                for i in range(net.prefixlen):
+
+                    bit = (net_int >> (max_bits - i - 1)) & 1
+                    if node[bit] is None:
+
+                        node[bit] = [None, None, None]
+
+                    node = node[bit]
+
+                node[2] = key
+
+            while len(self._entries) > self.maxsize:
+
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get(self, address, namespace=None):
+        """
+        The function for retrieving the cached value for the longest prefix
+        (most specific network) containing an address.
+
+        Args:
+            address (:obj:`str`/:obj:`IPv4Address`/:obj:`IPv6Address`): The
+                IP address.
+            namespace: The namespace provided to set(). Defaults to None.
+
+        Returns:
+            The cached value (a deep copy), None if not cached.
+        """
+
+        address = ip_address(str(address))
+        max_bits = 32 if address.version == 4 else 128
+        addr_int = int(address)
+        now = time()
+
+        with self._lock:
+
+            node = self._tries.get((namespace, address.version))
+            match = None
+            expired = []
+            i = 0
+            while node is not None:
+
+                key = node[2]
+                if key is not None:
+
+                    if self._entries[key][0] > now:
+
+                        match = key
+
+                    else:
+
+                        expired.append(key)
+
+                if i == max_bits:
+
+                    break
+
+                node = node[(addr_int >> (max_bits - i - 1)) & 1]
+                i += 1
+
+            for key in expired:
+
+                self._remove(key)
+
+            if match is None:
+
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+            # Move to the most recently used position.
+            entry = self._entries.pop(match)
+            self._entries[match] = entry
+
+            return copy.deepcopy(entry[1])
+
+    def set_result(self, results, namespace=None):
+        """
+        The function for caching lookup results, indexed by the networks
+        from :obj:`ipwhois.cache.get_result_networks`. Results are not cached
+        if the networks cannot be determined.
+
+        Args:
+            results (:obj:`dict`): The lookup results.
+            namespace: A hashable namespace. Defaults to None.
+
+        Returns:
+            list: The networks the results were cached for.
+        """
+
+        networks = get_result_networks(results)
+        if networks:
+
+            log.debug('Caching results for {0}'.format(
+                ', '.join(str(n) for n in networks)))
+            self.set(networks, results, namespace=namespace)
+
+        return networks
+
+    def get_result(self, address, namespace=None):
+        """
+        The function for retrieving cached lookup results for an address,
+        with the query fields (including the NIR results) set to the address.
+
+        Args:
+            address (:obj:`str`/:obj:`IPv4Address`/:obj:`IPv6Address`): The
+                IP address.
+            namespace: The namespace provided to set_result(). Defaults to
+                None.
+
+        Returns:
+            dict: The lookup results, None if not cached.
+        """
+
+        results = self.get(address, namespace=namespace)
+        if results is not None:
+
+            log.debug('Cache hit for {0}'.format(address))
+            results['query'] = str(address)
+
+            if isinstance(results.get('nir'), dict):
+
+                results['nir']['query'] = str(address)
+
+        return results
+
+    def clear(self):
+        """
+        The function for removing all cached values. Counters are not reset.
+        """
+
+        with self._lock:
+
+            self._tries = {}
+            self._entries = OrderedDict()
+
+
+class EntityCache:
+    """
+    The class for caching parsed RDAP entities, keyed by registry and handle,
+    for reuse across RDAP lookups. Failed entity queries (HTTPLookupError,
+    or an invalid entity object) are cached for negative_ttl seconds. The
+    least recently used entries are evicted once maxsize is reached.
+    Optionally, entries are also stored as JSON files in a directory, shared
+    across processes and runs. Thread safe.
+
+    Args:
+        maxsize (:obj:`int`): The maximum number of cached entities in
+            memory. Defaults to 10000.
+        ttl (:obj:`int`): The number of seconds a cached entity is valid.
+            Defaults to 86400.
+        negative_ttl (:obj:`int`): The number of seconds a failed entity
+            query is cached. Defaults to 300.
+        path (:obj:`str`): An optional directory for storing entities on
+            disk. Created if it does not exist. Defaults to None.
+    """
+
+    def __init__(self, maxsize=10000, ttl=86400, negative_ttl=300,
+                 path=None):
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.path = path
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Mapping of (registry, handle) to (expiry time, entity vars,
+        # response), in least to most recently used order. Failed queries
+        # have entity vars and response of None.
+        self._entries = OrderedDict()
+
+        self._lock = threading.RLock()
+
+        if path is not None and not os.path.isdir(path):
+
+            os.makedirs(path)
+
+    def __len__(self):
+
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        """
+        dict: The cache counters {'hits', 'misses', 'evictions', 'size'}.
+        """
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries)
+        }
+
+    def _get_file(self, registry, handle):
+        """
+        The function for generating the on disk file path for an entity.
+
+        Args:
+            registry (:obj:`str`): The registry.
+            handle (:obj:`str`): The entity handle.
+
+        Returns:
+            str: The file path.
+        """
+
+        digest = hashlib.sha1(handle.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, '{0}_{1}.json'.format(registry,
+                                                             digest))
+
+    def _load(self, registry, handle):
+        """
+        The function for loading an entity from disk.
+
+        Args:
+            registry (:obj:`str`): The registry.
+            handle (:obj:`str`): The entity handle.
+
+        Returns:
+            tuple: (expiry time, entity vars, response), None if not found.
+        """
+
+        try:
+
+            with open(self._get_file(registry, handle), 'rb') as data_file:
+
+                data = json_loads(data_file.read())
+
+            return data['expires'], data['vars'], data['response']
+
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+
+            return None
+
+    def _store(self, registry, handle, entry):
+        """
+        The function for storing an entity on disk.
+
+        Args:
+            registry (:obj:`str`): The registry.
+            handle (:obj:`str`): The entity handle.
+            entry (:obj:`tuple`): (expiry time, entity vars, response)
+        """
+
+        file_path = self._get_file(registry, handle)
+        tmp_path = '{0}.{1}.{2}.tmp'.format(file_path, os.getpid(),
+                                            threading.current_thread().ident)
+
+        try:
+
+            with open(tmp_path, 'w') as data_file:
+
+                json.dump({'expires': entry[0], 'vars': entry[1],
+                           'response': entry[2]}, data_file)
+
+            try:
+
+                os.replace(tmp_path, file_path)
+
+            except AttributeError:  # pragma: no cover
+
+                os.rename(tmp_path, file_path)
+
+        except (IOError, OSError, TypeError, ValueError) as e:
+
+            log.debug('Failed to store entity {0} on disk: {1}'.format(
+                handle, e))
+
+    def _set(self, key, entry):
+        """
+        The function for adding an entry, evicting the least recently used
+        entries beyond maxsize.
+
+        Args:
+            key (:obj:`tuple`): (registry, handle)
+            entry (:obj:`tuple`): (expiry time, entity vars, response)
+        """
+
+        with self._lock:
+
+            if key in self._entries:
+
+                del self._entries[key]
+
+            self._entries[key] = entry
+
+            while len(self._entries) > self.maxsize:
+
+                del self._entries[next(iter(self._entries))]
+                self.evictions += 1
+
+    def get(self, registry, handle):
+        """
+        The function for retrieving a cached entity.
+
+        Args:
+            registry (:obj:`str`): The registry (asn_registry, or
+                'bootstrap').
+            handle (:obj:`str`): The entity handle.
+
+        Returns:
+            namedtuple: None if not cached, otherwise:
+
+            :vars (dict): The ipwhois.rdap._RDAPEntity vars (a deep copy),
+                with raw set to None. None if the query failed.
+            :response (dict): The entity query response (a deep copy). None
+                if the query failed.
+        """
+
+        key = (registry, handle)
+        now = time()
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] <= now:
+
+                del self._entries[key]
+                entry = None
+
+            if entry is None and self.path is not None:
+
+                entry = self._load(registry, handle)
+
+                if entry is not None and entry[0] <= now:
+
+                    entry = None
+
+                if entry is not None:
+
+                    self._set(key, entry)
+
+            if entry is None:
+
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+            # Move to the most recently used position.
+            self._entries[key] = self._entries.pop(key)
+
+        return_tuple = namedtuple('return_tuple', ['vars', 'response'])
+        return return_tuple(copy.deepcopy(entry[1]), copy.deepcopy(entry[2]))
+
+    def set(self, registry, handle, entity_vars, response):
+        """
+        The function for caching a parsed entity.
+
+        Args:
+            registry (:obj:`str`): The registry (asn_registry, or
+                'bootstrap').
+            handle (:obj:`str`): The entity handle.
+            entity_vars (:obj:`dict`): The ipwhois.rdap._RDAPEntity vars,
+                with raw set to None.
+            response (:obj:`dict`): The entity query response.
+        """
+
+        entry = (time() + self.ttl, copy.deepcopy(entity_vars),
+                 copy.deepcopy(response))
+        self._set((registry, handle), entry)
+
+        if self.path is not None:
+
+            self._store(registry, handle, entry)
+
+    def set_failed(self, registry, handle):
+        """
+        The function for caching a failed entity query. Failed queries are
+        not stored on disk.
+
+        Args:
+            registry (:obj:`str`): The registry (asn_registry, or
+                'bootstrap').
+            handle (:obj:`str`): The entity handle.
+        """
+
+        self._set((registry, handle),
+                  (time() + self.negative_ttl, None, None))
+
+    def clear(self):
+        """
+        The function for removing all entities cached in memory. Counters
+        and entities stored on disk are not removed.
+        """
+
+        with self._lock:
+
+            self._entries = OrderedDict()
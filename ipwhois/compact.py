@@ -0,0 +1,429 @@
+# Copyright (c) 2013-2024 Philip Hane
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import logging
+
+try:  # pragma: no cover
+    from sys import intern
+
+except ImportError:  # pragma: no cover
+    intern = intern
+
+# The string types (including unicode on Python 2).
+try:  # pragma: no cover
+    STRING_TYPES = (str, unicode)
+
+except NameError:  # pragma: no cover
+    STRING_TYPES = (str,)
+
+log = logging.getLogger(__name__)
+
+# Strings up to this length are interned when no strings pool is provided
+# (registries, country codes, statuses, roles, event actions, etc.).
+INTERN_MAX_LENGTH = 32
+
+# Field type marker: the value is stored as is (raw responses).
+RAW = 'raw'
+
+
+class _Compact(object):
+    """
+    The base class for compact (slotted) lookup result objects. Lists are
+    stored as tuples, and strings are interned or de-duplicated. Fields are
+    available as attributes, or by key as with the result dictionaries.
+    Fields not in the result are unset, and keys not known to the class are
+    kept in the extra dict.
+    """
+
+    __slots__ = ('extra',)
+
+    # Mapping of fields to the class (or (dict, class) for mappings of keys
+    # to objects, or RAW) of their values. Other fields are plain values.
+    _types = {}
+
+    @classmethod
+    def from_dict(cls, data, strings=None):
+        """
+        The function for creating a compact object from a result dictionary.
+
+        Args:
+            data (:obj:`dict`): The result dictionary.
+            strings (:obj:`dict`): The pool for de-duplicating strings, may
+                be shared across results. Defaults to None (intern strings up
+                to INTERN_MAX_LENGTH).
+
+        Returns:
+            _Compact: The compact object.
+        """
+
+        obj = cls.__new__(cls)
+        obj.extra = None
+
+        for key, value in data.items():
+
+            value = _compact_value(value, cls._types.get(key), strings)
+
+            if key in cls.__slots__ and key != 'extra':
+
+                setattr(obj, key, value)
+
+            else:
+
+                if obj.extra is None:
+
+                    obj.extra = {}
+
+                obj.extra[key] = value
+
+        return obj
+
+    def keys(self):
+        """
+        The function for listing the fields set.
+
+        Returns:
+            list: The field names.
+        """
+
+        ret = [key for key in self.__slots__ if key != 'extra' and
+               hasattr(self, key)]
+
+        if self.extra:
+
+            ret.extend(self.extra)
+
+        return ret
+
+    def to_dict(self):
+        """
+        The function for converting to the result dictionary shape.
+
+        Returns:
+            dict: The result dictionary.
+        """
+
+        ret = {}
+        for key in self.keys():
+
+            if self._types.get(key) == RAW:
+
+                ret[key] = self[key]
+
+            else:
+
+                ret[key] = _dict_value(self[key])
+
+        return ret
+
+    def __getitem__(self, key):
+
+        if key != 'extra' and key in self.__slots__:
+
+            try:
+
+                return getattr(self, key)
+
+            except AttributeError:
+
+                raise KeyError(key)
+
+        if self.extra and key in self.extra:
+
+            return self.extra[key]
+
+        raise KeyError(key)
+
+    def __contains__(self, key):
+
+        return key in self.keys()
+
+    def get(self, key, default=None):
+
+        try:
+
+            return self[key]
+
+        except KeyError:
+
+            return default
+
+    def __eq__(self, other):
+
+        if isinstance(other, _Compact):
+
+            other = other.to_dict()
+
+        return self.to_dict() == other
+
+    def __ne__(self, other):
+
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+
+        return '{0}({1})'.format(self.__class__.__name__, ', '.join(
+            '{0}={1!r}'.format(key, self[key]) for key in self.keys()
+        ))
+
+
+def _compact_value(value, value_type, strings):
+    """
+    The function for converting a result value to its compact form.
+
+    Args:
+        value: The value.
+        value_type: The value type from _Compact._types, or None.
+        strings (:obj:`dict`): The strings pool, or None.
+
+    Returns:
+        The compact value.
+    """
+
+    if value_type == RAW:
+
+        return value
+
+    if isinstance(value, STRING_TYPES):
+
+        if strings is not None:
+
+            return strings.setdefault(value, value)
+
+        # intern() only accepts str (not unicode on Python 2).
+        if isinstance(value, str) and len(value) <= INTERN_MAX_LENGTH:
+
+            return intern(value)
+
+        return value
+
+    if isinstance(value, list):
+
+        return tuple(_compact_value(v, value_type, strings) for v in value)
+
+    if isinstance(value, dict):
+
+        if isinstance(value_type, tuple):
+
+            return dict(
+                (_compact_value(k, None, strings),
+                 _compact_value(v, value_type[1], strings))
+                for k, v in value.items()
+            )
+
+        if value_type is not None:
+
+            return value_type.from_dict(value, strings)
+
+    return value
+
+
+def _dict_value(value):
+    """
+    The function for converting a compact value to the result dictionary
+    shape.
+
+    Args:
+        value: The compact value.
+
+    Returns:
+        The value as returned by the lookups.
+    """
+
+    if isinstance(value, _Compact):
+
+        return value.to_dict()
+
+    if isinstance(value, tuple):
+
+        return [_dict_value(v) for v in value]
+
+    if isinstance(value, dict):
+
+        return dict((k, _dict_value(v)) for k, v in value.items())
+
+    return value
+
+
+class CompactEvent(_Compact):
+    """
+    The class for a compact RDAP event (action, timestamp, actor).
+    """
+
+    __slots__ = ('action', 'timestamp', 'actor')
+
+
+class CompactNotice(_Compact):
+    """
+    The class for a compact RDAP notice or remark (title, description,
+    links).
+    """
+
+    __slots__ = ('title', 'description', 'links')
+
+
+class CompactContactValue(_Compact):
+    """
+    The class for a compact RDAP contact address, phone or email (type,
+    value).
+    """
+
+    __slots__ = ('type', 'value')
+
+
+class CompactContact(_Compact):
+    """
+    The class for a compact RDAP entity contact.
+    """
+
+    __slots__ = ('name', 'kind', 'address', 'phone', 'email', 'role', 'title')
+
+    _types = {
+        'address': CompactContactValue,
+        'phone': CompactContactValue,
+        'email': CompactContactValue
+    }
+
+
+class CompactNetwork(_Compact):
+    """
+    The class for a compact RDAP network.
+    """
+
+    __slots__ = ('handle', 'status', 'remarks', 'notices', 'links', 'events',
+                 'raw', 'start_address', 'end_address', 'cidr', 'ip_version',
+                 'type', 'name', 'country', 'parent_handle')
+
+    _types = {
+        'remarks': CompactNotice,
+        'notices': CompactNotice,
+        'events': CompactEvent,
+        'raw': RAW
+    }
+
+
+class CompactEntity(_Compact):
+    """
+    The class for a compact RDAP entity.
+    """
+
+    __slots__ = ('handle', 'status', 'remarks', 'notices', 'links', 'events',
+                 'raw', 'roles', 'contact', 'events_actor', 'entities')
+
+    _types = {
+        'remarks': CompactNotice,
+        'notices': CompactNotice,
+        'events': CompactEvent,
+        'events_actor': CompactEvent,
+        'contact': CompactContact,
+        'raw': RAW
+    }
+
+
+class CompactWhoisNet(_Compact):
+    """
+    The class for a compact whois network, or referral.
+    """
+
+    __slots__ = ('cidr', 'name', 'handle', 'range', 'description', 'country',
+                 'state', 'city', 'address', 'postal_code', 'emails',
+                 'created', 'updated')
+
+
+class CompactNIRContact(_Compact):
+    """
+    The class for a compact NIR contact.
+    """
+
+    __slots__ = ('name', 'email', 'reply_email', 'organization', 'division',
+                 'title', 'phone', 'fax', 'updated')
+
+
+class CompactNIRNet(_Compact):
+    """
+    The class for a compact NIR network.
+    """
+
+    __slots__ = ('cidr', 'name', 'handle', 'range', 'country', 'address',
+                 'postal_code', 'nameservers', 'created', 'updated',
+                 'contacts')
+
+    _types = {
+        'contacts': (dict, CompactNIRContact)
+    }
+
+
+class CompactNIRResult(_Compact):
+    """
+    The class for compact NIR lookup results.
+    """
+
+    __slots__ = ('query', 'nets', 'raw')
+
+    _types = {
+        'nets': CompactNIRNet,
+        'raw': RAW
+    }
+
+
+class CompactResult(_Compact):
+    """
+    The class for compact IPWhois (RDAP or whois) lookup results.
+    """
+
+    __slots__ = ('query', 'asn_registry', 'asn', 'asn_cidr',
+                 'asn_country_code', 'asn_date', 'asn_description', 'network',
+                 'entities', 'objects', 'nets', 'referral', 'raw',
+                 'raw_referral', 'nir')
+
+    _types = {
+        'network': CompactNetwork,
+        'objects': (dict, CompactEntity),
+        'nets': CompactWhoisNet,
+        'referral': CompactWhoisNet,
+        'nir': CompactNIRResult,
+        'raw': RAW,
+        'raw_referral': RAW
+    }
+
+
+def compact_result(results, strings=None):
+    """
+    The function for converting lookup results (IPWhois.lookup_rdap(),
+    IPWhois.lookup_whois(), RDAP.lookup() or Whois.lookup()) to a compact
+    object, which uses far less memory when keeping many results. Convert
+    back with to_dict().
+
+    Args:
+        results (:obj:`dict`): The lookup results.
+        strings (:obj:`dict`): The pool for de-duplicating strings (e.g.,
+            notices repeated in every result), may be shared across results.
+            Defaults to None (intern strings up to INTERN_MAX_LENGTH).
+
+    Returns:
+        CompactResult: The compact results.
+    """
+
+    return CompactResult.from_dict(results, strings)
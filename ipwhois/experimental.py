@@ -23,17 +23,34 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 import socket
+import select
 import logging
-import time
-from collections import namedtuple
+import threading
+from time import sleep
+from collections import (namedtuple, OrderedDict, deque)
+from itertools import (chain, islice)
 
 from .exceptions import (ASNLookupError, HTTPLookupError, HTTPRateLimitError,
-                         ASNRegistryError)
+                         ASNRegistryError, ASNParseError, BlacklistError,
+                         WhoisLookupError, WhoisRateLimitError)
 from .asn import IPASN
 from .net import (CYMRU_WHOIS, Net)
+from .pool import HTTPConnectionPool
+from .cache import EntityCache
+from .ratelimit import (RateLimiter, get_registry_key)
 from .rdap import RDAP
+from .nir import NIRWhois
+from .compact import compact_result
+from .session import Session
+from .whois import (Whois, RWHOIS)
 from .utils import unique_everseen
 
+try:  # pragma: no cover
+    from concurrent.futures import (ThreadPoolExecutor, wait,
+                                    FIRST_COMPLETED)
+except ImportError:  # pragma: no cover
+    ThreadPoolExecutor = None
+
 log = logging.getLogger(__name__)
 
 
@@ -78,19 +95,20 @@ def get_bulk_asn_whois(addresses=None, retry_count=3, timeout=120):
                 '\n'.join(addresses))
         ).encode())
 
-        data = ''
+        data = []
         while True:
 
-            d = conn.recv(4096).decode()
-            data += d
+            d = conn.recv(4096)
 
             if not d:
 
                 break
 
+            data.append(d)
+
         conn.close()
 
-        return str(data)
+        return b''.join(data).decode()
 
     except (socket.timeout, socket.error) as e:  # pragma: no cover
 
@@ -110,9 +128,728 @@ def get_bulk_asn_whois(addresses=None, retry_count=3, timeout=120):
         raise ASNLookupError('ASN bulk lookup failed.')
 
 
+def _stream_bulk_asn_whois(address_iter, pending, timeout=120,
+                           chunk_size=1000, server=CYMRU_WHOIS, port=43):
+    """
+    The generator for a single Cymru bulk ASN whois (port 43/tcp) query.
+    Addresses are sent in chunks while the response is read into a reusable
+    buffer, yielding the response lines as they arrive.
+
+    Args:
+        address_iter (:obj:`iterator`): The IP addresses to send.
+        pending (:obj:`OrderedDict`): Mapping of addresses sent, that have not
+            yet been answered. Updated with each address sent.
+        timeout (:obj:`int`): The timeout for socket connections and reads in
+            seconds. Defaults to 120.
+        chunk_size (:obj:`int`): The number of addresses to send at a time.
+            Defaults to 1000.
+        server (:obj:`str`): The server to connect to. Defaults to
+            CYMRU_WHOIS.
+        port (:obj:`int`): The network port to connect on. Defaults to 43.
+
+    Yields:
+        str: A line from the raw ASN bulk data.
+
+    Raises:
+        socket.timeout: The connection or a read timed out.
+        socket.error: A socket error occurred.
+    """
+
+    conn = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+
+    try:
+
+        log.debug('ASN bulk query initiated.')
+        conn.connect((server, port))
+
+        out = bytearray(b' -r -a -c -p -f begin\n')
+        sending = True
+
+        buf = bytearray(65536)
+        view = memoryview(buf)
+        partial = b''
+
+        while True:
+
+            if sending and not out:
+
+                for address in islice(address_iter, chunk_size):
+
+                    pending[address] = None
+                    out.extend('{0}\n'.format(address).encode())
+
+                if not out:
+
+                    out.extend(b'end\n')
+                    sending = False
+
+            readable, writable, _ = select.select(
+                [conn], [conn] if out else [], [], timeout
+            )
+
+            if not readable and not writable:
+
+                raise socket.timeout('ASN bulk query timed out.')
+
+            if writable:
+
+                sent = conn.send(out)
+                del out[:sent]
+
+            if readable:
+
+                received = conn.recv_into(buf)
+
+                if not received:
+
+                    break
+
+                lines = (partial + view[:received].tobytes()).split(b'\n')
+                partial = lines.pop()
+
+                for line in lines:
+
+                    yield line.decode('utf-8', 'ignore')
+
+        if partial:
+
+            yield partial.decode('utf-8', 'ignore')
+
+    finally:
+
+        conn.close()
+
+
+def iter_bulk_asn_whois(addresses=None, retry_count=3, timeout=120,
+                        chunk_size=1000):
+    """
+    The generator for retrieving and parsing ASN information for multiple IP
+    addresses from Cymru via port 43/tcp (WHOIS). Unlike get_bulk_asn_whois(),
+    addresses are sent in chunks and results are yielded as they are
+    received, so memory use does not grow with the number of addresses.
+
+    Args:
+        addresses (:obj:`iterable` of :obj:`str`): IP addresses to lookup. May
+            be a generator.
+        retry_count (:obj:`int`): The number of times to retry in case socket
+            errors, timeouts, connection resets, etc. are encountered. Only
+            the addresses not yet answered are sent again. Defaults to 3.
+        timeout (:obj:`int`): The timeout for socket connections and reads in
+            seconds. Defaults to 120.
+        chunk_size (:obj:`int`): The number of addresses to send at a time.
+            Defaults to 1000.
+
+    Yields:
+        tuple: (address, asn_data). asn_data is the
+            :obj:`ipwhois.asn.IPASN.parse_fields_whois` result, None if the
+            ASN registry is not known or parsing failed. Duplicate results
+            returned by Cymru are yielded as received.
+
+    Raises:
+        ValueError: addresses argument must be an iterable of IPv4/v6 address
+            strings.
+        ASNLookupError: The ASN bulk lookup failed.
+    """
+
+    if addresses is None or isinstance(addresses, (str, bytes)):
+
+        raise ValueError('addresses argument must be an iterable of IPv4/v6 '
+                         'address strings.')
+
+    # We need to instantiate IPASN, which currently needs a Net object,
+    # IP doesn't matter here
+    ipasn = IPASN(Net('1.2.3.4'))
+
+    address_iter = iter(addresses)
+    pending = OrderedDict()
+
+    while True:
+
+        try:
+
+            for line in _stream_bulk_asn_whois(
+                    address_iter, pending, timeout=timeout,
+                    chunk_size=chunk_size):
+
+                temp = line.split('|')
+
+                # Not a valid entry (e.g., the header or an error), move on
+                if len(temp) == 1:
+
+                    continue
+
+                ip = temp[1].strip()
+                pending.pop(ip, None)
+
+                try:
+
+                    asn_data = ipasn.parse_fields_whois(line)
+
+                except (ASNRegistryError, ASNParseError) as e:
+
+                    log.debug('ASN bulk parsing failed for {0}: {1}'.format(
+                        ip, e))
+                    asn_data = None
+
+                yield ip, asn_data
+
+            return
+
+        except (socket.timeout, socket.error) as e:
+
+            log.debug('ASN bulk query socket error: {0}'.format(e))
+            if retry_count > 0:
+
+                log.debug('ASN bulk query retrying (count: {0})'.format(
+                    str(retry_count)))
+                retry_count -= 1
+
+                # Send the unanswered addresses again, followed by the rest.
+                address_iter = chain(list(pending), address_iter)
+                pending.clear()
+                continue
+
+            raise ASNLookupError('ASN bulk lookup failed.')
+
+
+def _queue_bulk_lookups(addresses, cache, cache_namespace, asn_timeout):
+    """
+    The function for preparing bulk lookups: de-duplicating the addresses,
+    answering those within cached networks, and queueing the rest by RIR
+    using bulk ASN Whois lookups.
+
+    Args:
+        addresses (:obj:`list` of :obj:`str`): IP addresses to lookup.
+        cache (:obj:`ipwhois.cache.PrefixCache`): The result cache, or None.
+        cache_namespace (:obj:`tuple`): The result cache namespace.
+        asn_timeout (:obj:`int`): The timeout for bulk ASN lookups in
+            seconds.
+
+    Returns:
+        namedtuple:
+
+        :results (dict): IP address keys with the cached results.
+        :stats (dict): The initial bulk lookup stats, with the totals of
+            the lookups to perform.
+        :queues (OrderedDict): Mapping of RIRs, in the order to alternate
+            between, to deques of (ip, asn_data) tuples to lookup.
+
+    Raises:
+        ASNLookupError: The ASN bulk lookup failed.
+    """
+
+    # Initialize the dicts/lists
+    results = {}
+    stats = {
+        'ip_input_total': len(addresses),
+        'ip_unique_total': 0,
+        'ip_lookup_total': 0,
+        'ip_failed_total': 0,
+        'ip_cached_total': 0,
+        'lacnic': {'failed': [], 'rate_limited': [], 'total': 0},
+        'ripencc': {'failed': [], 'rate_limited': [], 'total': 0},
+        'apnic': {'failed': [], 'rate_limited': [], 'total': 0},
+        'afrinic': {'failed': [], 'rate_limited': [], 'total': 0},
+        'arin': {'failed': [], 'rate_limited': [], 'total': 0},
+        'jpnic': {'failed': [], 'total': 0},
+        'krnic': {'failed': [], 'total': 0},
+        'unallocated_addresses': []
+    }
+    asn_parsed_results = {}
+
+    # Make sure addresses is unique
+    unique_ip_list = list(unique_everseen(addresses))
+
+    # Get the unique count to return
+    stats['ip_unique_total'] = len(unique_ip_list)
+
+    if cache is not None:
+
+        # Answer any addresses within previously cached networks, these do
+        # not need ASN or registry lookups.
+        for ip in unique_ip_list:
+
+            cached = cache.get_result(ip, namespace=cache_namespace)
+            if cached is not None:
+
+                results[ip] = cached
+                stats['ip_cached_total'] += 1
+
+        unique_ip_list = [ip for ip in unique_ip_list if ip not in results]
+
+    # This is needed for iteration order
+    rir_keys_ordered = ['lacnic', 'ripencc', 'apnic', 'afrinic', 'arin']
+
+    if unique_ip_list:
+
+        # First query the ASN data for all IPs, parsing the results as they
+        # are received. Can raise ASNLookupError, no catch
+        for ip, asn_parsed in iter_bulk_asn_whois(unique_ip_list,
+                                                  timeout=asn_timeout):
+
+            # We need this since ASN bulk lookup is returning duplicates
+            # This is an issue on the Cymru end
+            if ip in asn_parsed_results:  # pragma: no cover
+
+                continue
+
+            # The ASN registry is not known, or the result failed to parse
+            if asn_parsed is None:  # pragma: no cover
+
+                continue
+
+            # Add valid IP ASN result to asn_parsed_results for lookup
+            asn_parsed_results[ip] = asn_parsed
+            stats[asn_parsed['asn_registry']]['total'] += 1
+
+    # Set the list of IPs that are not allocated/failed ASN lookup
+    stats['unallocated_addresses'] = list(k for k in addresses if k not in
+                                          asn_parsed_results and
+                                          k not in results)
+
+    # Set the total lookup count after unique IP and ASN result filtering
+    stats['ip_lookup_total'] = len(asn_parsed_results)
+
+    # Queue the IPs for lookups by RIR
+    queues = OrderedDict((rir, deque()) for rir in rir_keys_ordered)
+    for ip, asn_data in asn_parsed_results.items():
+
+        queues[asn_data['asn_registry']].append((ip, asn_data))
+
+    return_tuple = namedtuple('return_tuple', ['results', 'stats', 'queues'])
+    return return_tuple(results, stats, queues)
+
+
+def _compact_results(results):
+    """
+    The function for converting bulk results to compact objects in place,
+    sharing one strings pool across the results.
+
+    Args:
+        results (:obj:`dict`): The results dictionary, IP address keys.
+    """
+
+    strings = {}
+    for ip in results:
+
+        results[ip] = compact_result(results[ip], strings)
+
+
+def _bulk_lookup_nir(results, stats, inc_raw=False, retry_count=3,
+                     field_list=None, socket_timeout=10, http_pool=None,
+                     rate_limiter=None, cache=None, cache_namespace=None,
+                     max_workers=4):
+    """
+    The function for the NIR (JPNIC/KRNIC) stage of bulk lookups. The network
+    pages of the JP and KR addresses are retrieved concurrently, within the
+    NIR rate limits. The contacts are then retrieved once per unique handle
+    across all of the addresses, and the nir key of each result is set.
+
+    Args:
+        results (:obj:`dict`): The bulk results dictionary to update, IP
+            address keys. Results with a nir value are skipped.
+        stats (:obj:`dict`): The bulk stats dictionary to update, with
+            'jpnic' and 'krnic' keys.
+        inc_raw (:obj:`bool`): Whether to include the raw NIR results.
+            Defaults to False.
+        retry_count (:obj:`int`): The number of times to retry in case
+            socket errors, timeouts, connection resets, etc. are
+            encountered. Defaults to 3.
+        field_list (:obj:`list` of :obj:`str`): If provided, NIR fields to
+            parse. Defaults to None (all).
+        socket_timeout (:obj:`int`): The timeout for socket connections in
+            seconds. Defaults to 10.
+        http_pool (:obj:`ipwhois.pool.HTTPConnectionPool`): The keep-alive
+            connection pool. Defaults to None.
+        rate_limiter (:obj:`ipwhois.ratelimit.RateLimiter`): The rate limiter
+            per NIR. Defaults to None.
+        cache (:obj:`ipwhois.cache.PrefixCache`): The result cache to update
+            with the NIR results, or None.
+        cache_namespace (:obj:`tuple`): The result cache namespace.
+        max_workers (:obj:`int`): The maximum number of concurrent network
+            page queries. Defaults to 4.
+    """
+
+    # The NIR for each JP/KR address
+    nirs = OrderedDict()
+    for ip, result in results.items():
+
+        if result.get('nir') is not None:
+
+            continue
+
+        nir = {'JP': 'jpnic', 'KR': 'krnic'}.get(
+            result.get('asn_country_code'))
+        if nir:
+
+            nirs[ip] = nir
+            stats[nir]['total'] += 1
+
+    if not nirs:
+
+        return
+
+    nir_whois = dict(
+        (ip, NIRWhois(Net(ip, timeout=socket_timeout, http_pool=http_pool,
+                          rate_limiter=rate_limiter)))
+        for ip in nirs
+    )
+
+    def get_response(ip):
+
+        try:
+
+            return nir_whois[ip].get_response(nir=nirs[ip],
+                                              retry_count=retry_count)
+
+        except HTTPLookupError:
+
+            log.debug('Failed NIR lookup for IP: {0}'.format(ip))
+            return None
+
+    # Retrieve the network pages.
+    if ThreadPoolExecutor and max_workers and max_workers > 1:
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        try:
+
+            responses = list(executor.map(get_response, nirs))
+
+        finally:
+
+            executor.shutdown(wait=True)
+
+    else:
+
+        responses = [get_response(ip) for ip in nirs]
+
+    # Parse the network pages, retrieving each unique contact once.
+    contacts = {}
+    for (ip, nir), response in zip(nirs.items(), responses):
+
+        nir_data = None
+        if response is not None:
+
+            try:
+
+                nir_data = nir_whois[ip].lookup(
+                    nir=nir, inc_raw=inc_raw, retry_count=retry_count,
+                    response=response, field_list=field_list,
+                    contacts=contacts
+                )
+
+            except HTTPLookupError:
+
+                log.debug('Failed NIR contact lookup for IP: {0}'.format(ip))
+
+        if nir_data is None:
+
+            stats[nir]['failed'].append(ip)
+            continue
+
+        results[ip]['nir'] = nir_data
+
+        if cache is not None:
+
+            cache.set_result(results[ip], namespace=cache_namespace)
+
+
+class _BulkRDAPScheduler:
+    """
+    The class for scheduling bulk RDAP lookups from a work queue (deque) per
+    RIR. Dispatching and re-queueing an IP are O(1).
+
+    Args:
+        queues (:obj:`OrderedDict`): Mapping of RIRs, in the order to
+            alternate between, to deques of (ip, asn_data) tuples to lookup.
+        results (:obj:`dict`): The results dictionary to update, IP address
+            keys.
+        stats (:obj:`dict`): The bulk_lookup_rdap() stats dictionary to
+            update.
+        proxy_openers (:obj:`list` of :obj:`OpenerDirector`): Proxy openers
+            to rotate through for each lookup. None for no proxy.
+        rate_limiter (:obj:`ipwhois.ratelimit.RateLimiter`): The rate limiter
+            per RIR and proxy opener.
+        retry_count (:obj:`int`): The number of lookups to attempt for an IP
+            before it is failed.
+        socket_timeout (:obj:`int`): The timeout for socket connections in
+            seconds.
+        http_pool (:obj:`ipwhois.pool.HTTPConnectionPool`): The keep-alive
+            connection pool.
+        cache (:obj:`ipwhois.cache.PrefixCache`): The result cache, or None.
+        cache_namespace (:obj:`tuple`): The result cache namespace.
+        inc_raw (:obj:`bool`): Whether to include the raw results.
+        depth (:obj:`int`): How many levels deep to run entity queries.
+        excluded_entities (:obj:`list` of :obj:`str`): Entity handles to not
+            perform lookups.
+        entity_cache (:obj:`ipwhois.cache.EntityCache`): The entity cache.
+    """
+
+    def __init__(self, queues, results, stats, proxy_openers, rate_limiter,
+                 retry_count, socket_timeout, http_pool, cache,
+                 cache_namespace, inc_raw, depth, excluded_entities,
+                 entity_cache):
+
+        self.queues = queues
+        self.results = results
+        self.stats = stats
+        self.proxy_openers = proxy_openers
+        self.rate_limiter = rate_limiter
+        self.retry_count = retry_count
+        self.socket_timeout = socket_timeout
+        self.http_pool = http_pool
+        self.cache = cache
+        self.cache_namespace = cache_namespace
+        self.lookup_kwargs = {
+            'inc_raw': inc_raw,
+            'depth': depth,
+            'excluded_entities': excluded_entities,
+            'entity_cache': entity_cache
+        }
+
+        # The number of failed lookups per IP
+        self.failed = {}
+
+        # Rotate through the proxy openers for each lookup
+        self.opener_index = 0
+
+        # Guards the shared counters when running concurrently
+        self._lock = threading.Lock()
+
+    def get_opener(self):
+        """
+        The function for retrieving the next proxy opener to use, without
+        advancing the rotation.
+
+        Returns:
+            OpenerDirector: The proxy opener, or None.
+        """
+
+        return self.proxy_openers[self.opener_index % len(self.proxy_openers)]
+
+    def lookup_next(self, rir):
+        """
+        The function for performing the RDAP lookup of the next IP queued for
+        a RIR. Failed and rate limited IPs are re-queued.
+
+        Args:
+            rir (:obj:`str`): The RIR queue.
+
+        Returns:
+            str: The lookup status: 'success', 'cached', 'failed' or
+                'rate_limited'.
+        """
+
+        queue = self.queues[rir]
+        ip, asn_data = queue.popleft()
+
+        # An earlier lookup may have returned a network containing this IP
+        if self.cache is not None:
+
+            cached = self.cache.get_result(ip, namespace=self.cache_namespace)
+            if cached is not None:
+
+                self.results[ip] = cached
+
+                with self._lock:
+
+                    self.stats['ip_cached_total'] += 1
+
+                return 'cached'
+
+        log.debug('Starting lookup for IP: {0} RIR: {1}'.format(ip, rir))
+
+        with self._lock:
+
+            opener = self.get_opener()
+            self.opener_index += 1
+
+        # Instantiate the objects needed for the RDAP lookup. Net takes rate
+        # limit tokens for each query, and backs off the RIR on rate limit
+        # notices.
+        net = Net(ip, timeout=self.socket_timeout, proxy_opener=opener,
+                  http_pool=self.http_pool, rate_limiter=self.rate_limiter)
+        rdap = RDAP(net)
+
+        try:
+
+            # Perform the RDAP lookup. retry_count is set to 0 here since we
+            # handle that in this class
+            rdap_result = rdap.lookup(
+                retry_count=0, asn_data=asn_data, **self.lookup_kwargs
+            )
+
+        except HTTPLookupError:  # pragma: no cover
+
+            log.debug('Failed lookup for IP: {0} RIR: {1}'.format(ip, rir))
+
+            self.failed[ip] = self.failed.get(ip, 0) + 1
+
+            # Stop trying once retry_count is reached, otherwise retry after
+            # the rest of the queue
+            if self.failed[ip] >= max(self.retry_count, 1):
+
+                self.stats[rir]['failed'].append(ip)
+
+                with self._lock:
+
+                    self.stats['ip_failed_total'] += 1
+
+            else:
+
+                queue.append((ip, asn_data))
+
+            return 'failed'
+
+        except HTTPRateLimitError:  # pragma: no cover
+
+            if ip not in self.stats[rir]['rate_limited']:
+
+                self.stats[rir]['rate_limited'].append(ip)
+
+            log.debug('Rate limiting triggered for IP: {0} RIR: {1}'.format(
+                ip, rir))
+
+            # Retry first, once the rate limiter allows this RIR again
+            queue.appendleft((ip, asn_data))
+
+            return 'rate_limited'
+
+        log.debug('Successful lookup for IP: {0} RIR: {1}'.format(ip, rir))
+
+        # Lookup was successful, add to result. The nir key is set by the NIR
+        # stage once all lookups are done (if inc_nir)
+        self.results[ip] = asn_data
+        self.results[ip].update(rdap_result)
+        self.results[ip]['nir'] = None
+
+        if self.cache is not None:
+
+            self.cache.set_result(self.results[ip],
+                                  namespace=self.cache_namespace)
+
+        # If this IP failed previously, remove it from the failed counts
+        self.failed.pop(ip, None)
+
+        return 'success'
+
+    def run(self):
+        """
+        The function for performing all queued lookups, alternating between
+        RIRs to minimize lookups in a row to the same RIR. LACNIC lookups are
+        prioritized whenever its rate limit allows.
+        """
+
+        rir_keys_ordered = list(self.queues.keys())
+
+        while any(self.queues.values()):
+
+            # Whether any lookups were attempted in this pass
+            dispatched = False
+
+            for rir in rir_keys_ordered:
+
+                queue = self.queues[rir]
+
+                if not queue:
+
+                    continue
+
+                opener = self.get_opener()
+
+                # If there are still LACNIC IPs left to lookup and the rate
+                # limit allows it, skip to lookup a LACNIC IP
+                if (
+                    rir != 'lacnic' and self.queues.get('lacnic') and
+                    self.rate_limiter.wait_time('lacnic', opener) <= 0
+                   ):  # pragma: no cover
+
+                    continue
+
+                # If the RIR rate limit has been reached, move on to the next
+                # RIR
+                wait = self.rate_limiter.wait_time(rir, opener)
+                if wait > 0:  # pragma: no cover
+
+                    continue
+
+                # Try each IP queued for this RIR at most once per pass, until
+                # a lookup succeeds or is rate limited
+                for i in range(len(queue)):
+
+                    status = self.lookup_next(rir)
+
+                    if status != 'cached':
+
+                        dispatched = True
+
+                    if status in ('success', 'rate_limited'):
+
+                        break
+
+            # Every RIR with IPs left is rate limited, wait for the first to
+            # allow another lookup
+            if (not dispatched and
+                    any(self.queues.values())):  # pragma: no cover
+
+                opener = self.get_opener()
+                wait = min(self.rate_limiter.wait_time(rir, opener)
+                           for rir, queue in self.queues.items() if queue)
+
+                log.debug('Rate limited, waiting {0:.2f} seconds...'.format(
+                    wait))
+                sleep(wait)
+
+    def run_queue(self, rir):
+        """
+        The function for performing all lookups queued for a RIR. Lookups
+        wait for the rate limiter as needed.
+
+        Args:
+            rir (:obj:`str`): The RIR queue.
+        """
+
+        queue = self.queues[rir]
+
+        while queue:
+
+            self.lookup_next(rir)
+
+    def run_concurrent(self, max_workers):
+        """
+        The function for performing all queued lookups, running the RIR
+        queues concurrently.
+
+        Args:
+            max_workers (:obj:`int`): The maximum number of RIR queues to run
+                at once.
+        """
+
+        rirs = [rir for rir, queue in self.queues.items() if queue]
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        try:
+
+            # Raise the first exception, if any
+            for future in [executor.submit(self.run_queue, rir)
+                           for rir in rirs]:
+
+                future.result()
+
+        finally:
+
+            executor.shutdown(wait=True)
+
+
 def bulk_lookup_rdap(addresses=None, inc_raw=False, retry_count=3, depth=0,
                      excluded_entities=None, rate_limit_timeout=60,
-                     socket_timeout=10, asn_timeout=240, proxy_openers=None):
+                     socket_timeout=10, asn_timeout=240, proxy_openers=None,
+                     http_pool=None, cache=None, entity_cache=None,
+                     rate_limiter=None, max_workers=None, inc_nir=True,
+                     nir_field_list=None, compact=False):
     """
     The function for bulk retrieving and parsing whois information for a list
     of IP addresses via HTTP (RDAP). This bulk lookup method uses bulk
@@ -131,15 +868,43 @@ def bulk_lookup_rdap(addresses=None, inc_raw=False, retry_count=3, depth=0,
             referenced objects are found. Defaults to 0.
         excluded_entities (:obj:`list` of :obj:`str`): Entity handles to not
             perform lookups. Defaults to None.
-        rate_limit_timeout (:obj:`int`): The number of seconds to wait before
-            retrying when a rate limit notice is returned via rdap+json.
-            Defaults to 60.
+        rate_limit_timeout (:obj:`int`): The number of seconds LACNIC allows
+            9 queries in, for the default rate_limiter. Defaults to 60.
         socket_timeout (:obj:`int`): The default timeout for socket
             connections in seconds. Defaults to 10.
         asn_timeout (:obj:`int`): The default timeout for bulk ASN lookups in
             seconds. Defaults to 240.
         proxy_openers (:obj:`list` of :obj:`OpenerDirector`): Proxy openers
             for single/rotating proxy support. Defaults to None.
+        http_pool (:obj:`ipwhois.pool.HTTPConnectionPool`): The keep-alive
+            connection pool for RDAP queries made without a proxy opener.
+            Defaults to None, which uses a new pool for the duration of this
+            call.
+        cache (:obj:`ipwhois.cache.PrefixCache`): If provided, addresses
+            within a previously returned network (including those returned
+            earlier in this call) are answered from the cache, and new results
+            are cached. Defaults to None.
+        entity_cache (:obj:`ipwhois.cache.EntityCache`): The cache for
+            parsed RDAP entities. Defaults to None, which uses a new cache for
+            the duration of this call, so each unique entity is only queried
+            once.
+        rate_limiter (:obj:`ipwhois.ratelimit.RateLimiter`): The token bucket
+            rate limiter per RIR and proxy opener. Rate limit notices back off
+            the RIR. Defaults to None, which uses a new rate limiter for the
+            duration of this call.
+        max_workers (:obj:`int`): If greater than 1, the maximum number of RIR
+            queues to run concurrently (thread pool). Defaults to None
+            (alternate between RIRs serially).
+        inc_nir (:obj:`bool`): Whether to retrieve NIR (National Internet
+            Registry) information for JP and KR addresses, once all RDAP
+            lookups are done. Each unique NIR contact is queried once.
+            Defaults to True.
+        nir_field_list (:obj:`list` of :obj:`str`): If provided and inc_nir,
+            NIR fields to parse. Defaults to None (all).
+        compact (:obj:`bool`): Whether to return each result as a
+            :obj:`ipwhois.compact.CompactResult` (slotted objects sharing
+            de-duplicated strings, for keeping many results in memory) rather
+            than a dict. Defaults to False.
 
     Returns:
         namedtuple:
@@ -161,6 +926,8 @@ def bulk_lookup_rdap(addresses=None, inc_raw=False, retry_count=3, depth=0,
                 'ip_failed_total' (int) - The total number of addresses that
                     lookups failed for. Excludes any that failed initially, but
                     succeeded after further retries.
+                'ip_cached_total' (int) - The total number of addresses
+                    answered from the cache argument.
                 'lacnic' (dict) -
                 {
                     'failed' (list) - The addresses that failed to lookup.
@@ -176,6 +943,14 @@ def bulk_lookup_rdap(addresses=None, inc_raw=False, retry_count=3, depth=0,
                 'apnic' (dict) - Same as 'lacnic' above.
                 'afrinic' (dict) - Same as 'lacnic' above.
                 'arin' (dict) - Same as 'lacnic' above.
+                'jpnic' (dict) -
+                {
+                    'failed' (list) - The addresses that NIR lookups failed
+                        for, the nir value is None.
+                    'total' (int) - The total number of addresses that NIR
+                        lookups were attempted for.
+                }
+                'krnic' (dict) - Same as 'jpnic' above.
                 'unallocated_addresses' (list) - The addresses that are
                     unallocated/failed ASN lookups. These can be addresses that
                     are not listed for one of the 5 RIRs (other). No attempt
@@ -191,274 +966,716 @@ def bulk_lookup_rdap(addresses=None, inc_raw=False, retry_count=3, depth=0,
 
         raise ValueError('addresses must be a list of IP address strings')
 
-    # Initialize the dicts/lists
-    results = {}
-    failed_lookups_dict = {}
-    rated_lookups = []
-    stats = {
-        'ip_input_total': len(addresses),
-        'ip_unique_total': 0,
-        'ip_lookup_total': 0,
-        'ip_failed_total': 0,
-        'lacnic': {'failed': [], 'rate_limited': [], 'total': 0},
-        'ripencc': {'failed': [], 'rate_limited': [], 'total': 0},
-        'apnic': {'failed': [], 'rate_limited': [], 'total': 0},
-        'afrinic': {'failed': [], 'rate_limited': [], 'total': 0},
-        'arin': {'failed': [], 'rate_limited': [], 'total': 0},
-        'unallocated_addresses': []
-    }
-    asn_parsed_results = {}
-
     if proxy_openers is None:
 
         proxy_openers = [None]
 
-    proxy_openers_copy = iter(proxy_openers)
+    # Rate limit queries per RIR and proxy opener. LACNIC allows 9 queries
+    # per rate_limit_timeout by default.
+    if rate_limiter is None:
 
-    # Make sure addresses is unique
-    unique_ip_list = list(unique_everseen(addresses))
+        rate_limiter = RateLimiter(limits={
+            'lacnic': (9. / rate_limit_timeout, 9)
+        })
 
-    # Get the unique count to return
-    stats['ip_unique_total'] = len(unique_ip_list)
+    # Reuse connections to each RIR across lookups.
+    pool_created = http_pool is None
+    if pool_created:
 
-    # This is needed for iteration order
-    rir_keys_ordered = ['lacnic', 'ripencc', 'apnic', 'afrinic', 'arin']
+        http_pool = HTTPConnectionPool()
 
-    # First query the ASN data for all IPs, can raise ASNLookupError, no catch
-    bulk_asn = get_bulk_asn_whois(unique_ip_list, timeout=asn_timeout)
+    # Query each unique entity once across lookups.
+    if entity_cache is None:
 
-    # ASN results are returned as string, parse lines to list and remove first
-    asn_result_list = bulk_asn.split('\n')
-    del asn_result_list[0]
+        entity_cache = EntityCache()
 
-    # We need to instantiate IPASN, which currently needs a Net object,
-    # IP doesn't matter here
-    net = Net('1.2.3.4')
-    ipasn = IPASN(net)
+    cache_namespace = ('bulk_lookup_rdap', inc_raw, depth,
+                       tuple(excluded_entities or ()), inc_nir,
+                       tuple(nir_field_list or ()))
+
+    try:
 
-    # Iterate each IP ASN result, and add valid RIR results to
-    # asn_parsed_results for RDAP lookups
-    for asn_result in asn_result_list:
+        # Can raise ASNLookupError, no catch
+        results, stats, queues = _queue_bulk_lookups(
+            addresses=addresses, cache=cache, cache_namespace=cache_namespace,
+            asn_timeout=asn_timeout
+        )
 
-        temp = asn_result.split('|')
+        scheduler = _BulkRDAPScheduler(
+            queues=queues, results=results, stats=stats,
+            proxy_openers=proxy_openers, rate_limiter=rate_limiter,
+            retry_count=retry_count, socket_timeout=socket_timeout,
+            http_pool=http_pool, cache=cache, cache_namespace=cache_namespace,
+            inc_raw=inc_raw, depth=depth, excluded_entities=excluded_entities,
+            entity_cache=entity_cache
+        )
 
-        # Not a valid entry, move on to next
-        if len(temp) == 1:
+        if max_workers and max_workers > 1 and ThreadPoolExecutor:
 
-            continue
+            scheduler.run_concurrent(max_workers)
 
-        ip = temp[1].strip()
+        else:
 
-        # We need this since ASN bulk lookup is returning duplicates
-        # This is an issue on the Cymru end
-        if ip in asn_parsed_results.keys():  # pragma: no cover
+            scheduler.run()
 
-            continue
+        if inc_nir:
+
+            _bulk_lookup_nir(
+                results=results, stats=stats, inc_raw=inc_raw,
+                retry_count=retry_count, field_list=nir_field_list,
+                socket_timeout=socket_timeout, http_pool=http_pool,
+                rate_limiter=rate_limiter, cache=cache,
+                cache_namespace=cache_namespace
+            )
+
+    finally:
+
+        # Close the keep-alive connections, also on errors.
+        if pool_created:
+
+            http_pool.clear()
+
+    if compact:
+
+        _compact_results(results)
+
+    return_tuple = namedtuple('return_tuple', ['results', 'stats'])
+    return return_tuple(results, stats)
+
+
+class _BulkWhoisScheduler:
+    """
+    The class for scheduling bulk whois lookups from a work queue (deque)
+    per RIR, with a bounded number of workers per RIR whois server.
+
+    Args:
+        queues (:obj:`OrderedDict`): Mapping of RIRs to deques of
+            (ip, asn_data) tuples to lookup.
+        results (:obj:`dict`): The results dictionary to update, IP address
+            keys.
+        stats (:obj:`dict`): The bulk_lookup_whois() stats dictionary to
+            update.
+        rate_limiter (:obj:`ipwhois.ratelimit.RateLimiter`): The rate limiter
+            per RIR (and referral servers, under 'other').
+        retry_count (:obj:`int`): The number of lookups to attempt for an IP
+            before it is failed.
+        socket_timeout (:obj:`int`): The timeout for socket connections in
+            seconds.
+        cache (:obj:`ipwhois.cache.PrefixCache`): The result cache, or None.
+        cache_namespace (:obj:`tuple`): The result cache namespace.
+        inc_raw (:obj:`bool`): Whether to include the raw results.
+        get_referral (:obj:`bool`): Whether to retrieve referral whois
+            information.
+        extra_blacklist (:obj:`list` of :obj:`str`): Blacklisted whois
+            servers in addition to the global BLACKLIST.
+        ignore_referral_errors (:obj:`bool`): Whether to ignore failed
+            referral lookups, rather than failing the IP.
+        field_list (:obj:`list` of :obj:`str`): The fields to parse, or None.
+        get_recursive (:obj:`bool`): Whether to ask the server to perform
+            recursive queries.
+        parser (:obj:`str`): The field parsing engine, 'regex' or 'rpsl'.
+    """
+
+    def __init__(self, queues, results, stats, rate_limiter, retry_count,
+                 socket_timeout, cache, cache_namespace, inc_raw,
+                 get_referral, extra_blacklist, ignore_referral_errors,
+                 field_list, get_recursive, parser):
+
+        self.queues = queues
+        self.results = results
+        self.stats = stats
+        self.rate_limiter = rate_limiter
+        self.retry_count = retry_count
+        self.socket_timeout = socket_timeout
+        self.cache = cache
+        self.cache_namespace = cache_namespace
+        self.inc_raw = inc_raw
+        self.get_referral = get_referral
+        self.extra_blacklist = extra_blacklist
+        self.ignore_referral_errors = ignore_referral_errors
+        self.lookup_kwargs = {
+            'extra_blacklist': extra_blacklist,
+            'field_list': field_list,
+            'get_recursive': get_recursive,
+            'parser': parser
+        }
+
+        # The number of failed lookups per IP
+        self.failed = {}
+
+        # The (server, port) referral servers that failed, these are not
+        # queried again
+        self.referral_failed = set()
+
+        # Guards the queues and shared counters
+        self._lock = threading.Lock()
+
+    def _fail(self, ip, asn_data, rir, queue):
+        """
+        The function for counting a failed lookup, re-queueing the IP until
+        retry_count is reached.
+
+        Args:
+            ip (:obj:`str`): The IP address.
+            asn_data (:obj:`dict`): The IP ASN data.
+            rir (:obj:`str`): The RIR queue.
+            queue (:obj:`collections.deque`): The RIR queue.
+        """
+
+        with self._lock:
+
+            self.failed[ip] = self.failed.get(ip, 0) + 1
+
+            # Stop trying once retry_count is reached, otherwise retry after
+            # the rest of the queue
+            if self.failed[ip] >= max(self.retry_count, 1):
+
+                self.stats[rir]['failed'].append(ip)
+                self.stats['ip_failed_total'] += 1
+
+            else:
+
+                queue.append((ip, asn_data))
+
+    def lookup_referral(self, whois, response):
+        """
+        The function for retrieving and parsing the referral whois data
+        for a whois response. Referral servers that fail are skipped for the
+        remaining lookups.
+
+        Args:
+            whois (:obj:`ipwhois.whois.Whois`): The Whois object of the IP.
+            response (:obj:`str`): The RIR whois response.
+
+        Returns:
+            namedtuple:
+
+            :referral (dict): The parsed referral whois data, None if not
+                available.
+            :raw_referral (str): The raw referral whois data, None if not
+                available.
+
+        Raises:
+            BlacklistError: The referral server is blacklisted, and
+                ignore_referral_errors is False.
+            WhoisLookupError: The referral lookup failed, and
+                ignore_referral_errors is False.
+        """
+
+        return_tuple = namedtuple('return_tuple', ['referral', 'raw_referral'])
+
+        server, port = whois.get_referral_server(response)
+
+        if not server:
+
+            return return_tuple(None, None)
+
+        if (server, port) in self.referral_failed:
+
+            if self.ignore_referral_errors:
+
+                return return_tuple(None, None)
+
+            raise WhoisLookupError('Referral server {0}:{1} failed.'.format(
+                server, port))
+
+        self.rate_limiter.acquire(get_registry_key(server=server))
 
         try:
 
-            asn_parsed = ipasn.parse_fields_whois(asn_result)
+            response_ref = whois._net.get_whois(
+                asn_registry='', retry_count=0, server=server, port=port,
+                extra_blacklist=self.extra_blacklist
+            )
 
-        except ASNRegistryError:  # pragma: no cover
+        except (BlacklistError, WhoisLookupError):
 
-            continue
+            with self._lock:
 
-        # Add valid IP ASN result to asn_parsed_results for RDAP lookup
-        asn_parsed_results[ip] = asn_parsed
-        stats[asn_parsed['asn_registry']]['total'] += 1
+                self.referral_failed.add((server, port))
 
-    # Set the list of IPs that are not allocated/failed ASN lookup
-    stats['unallocated_addresses'] = list(k for k in addresses if k not in
-                                          asn_parsed_results)
+            if self.ignore_referral_errors:
 
-    # Set the total lookup count after unique IP and ASN result filtering
-    stats['ip_lookup_total'] = len(asn_parsed_results)
+                return return_tuple(None, None)
 
-    # Track the total number of LACNIC queries left. This is tracked in order
-    # to ensure the 9 priority LACNIC queries/min don't go into infinite loop
-    lacnic_total_left = stats['lacnic']['total']
+            raise
 
-    # Set the start time, this value is updated when the rate limit is reset
-    old_time = time.time()
+        referral = whois.parse_fields(
+            response_ref, RWHOIS['fields'],
+            field_list=self.lookup_kwargs['field_list']
+        )
 
-    # Rate limit tracking dict for all RIRs
-    rate_tracker = {
-        'lacnic': {'time': old_time, 'count': 0},
-        'ripencc': {'time': old_time, 'count': 0},
-        'apnic': {'time': old_time, 'count': 0},
-        'afrinic': {'time': old_time, 'count': 0},
-        'arin': {'time': old_time, 'count': 0}
-    }
+        return return_tuple(referral, response_ref)
 
-    # Iterate all of the IPs to perform RDAP lookups until none are left
-    while len(asn_parsed_results) > 0:
+    def lookup_next(self, rir):
+        """
+        The function for performing the whois lookup of the next IP queued
+        for a RIR. Failed and rate limited IPs are re-queued.
 
-        # Sequentially run through each RIR to minimize lookups in a row to
-        # the same RIR.
-        for rir in rir_keys_ordered:
+        Args:
+            rir (:obj:`str`): The RIR queue.
 
-            # If there are still LACNIC IPs left to lookup and the rate limit
-            # hasn't been reached, skip to find a LACNIC IP to lookup
-            if (
-                rir != 'lacnic' and lacnic_total_left > 0 and
-                (rate_tracker['lacnic']['count'] != 9 or
-                    (time.time() - rate_tracker['lacnic']['time']
-                     ) >= rate_limit_timeout
-                 )
-               ):  # pragma: no cover
+        Returns:
+            str: The lookup status: 'success', 'cached', 'failed',
+                'rate_limited' or None if the queue is empty.
+        """
 
-                continue
+        queue = self.queues[rir]
 
-            # If the RIR rate limit has been reached and hasn't expired,
-            # move on to the next RIR
-            if (
-                rate_tracker[rir]['count'] == 9 and (
-                    (time.time() - rate_tracker[rir]['time']
-                     ) < rate_limit_timeout)
-               ):  # pragma: no cover
+        with self._lock:
 
-                continue
+            if not queue:
 
-            # If the RIR rate limit has expired, reset the count/timer
-            # and perform the lookup
-            elif ((time.time() - rate_tracker[rir]['time']
-                   ) >= rate_limit_timeout):  # pragma: no cover
+                return None
 
-                rate_tracker[rir]['count'] = 0
-                rate_tracker[rir]['time'] = time.time()
+            ip, asn_data = queue.popleft()
 
-            # Create a copy of the lookup IP dict so we can modify on
-            # successful/failed queries. Loop each IP until it matches the
-            # correct RIR in the parent loop, and attempt lookup
-            tmp_dict = asn_parsed_results.copy()
+        # An earlier lookup may have returned a network containing this IP
+        if self.cache is not None:
 
-            for ip, asn_data in tmp_dict.items():
+            cached = self.cache.get_result(ip, namespace=self.cache_namespace)
+            if cached is not None:
 
-                # Check to see if IP matches parent loop RIR for lookup
-                if asn_data['asn_registry'] == rir:
+                self.results[ip] = cached
 
-                    log.debug('Starting lookup for IP: {0} '
-                              'RIR: {1}'.format(ip, rir))
+                with self._lock:
 
-                    # Add to count for rate-limit tracking only for LACNIC,
-                    # since we have not seen aggressive rate-limiting from the
-                    # other RIRs yet
-                    if rir == 'lacnic':
+                    self.stats['ip_cached_total'] += 1
 
-                        rate_tracker[rir]['count'] += 1
+                return 'cached'
 
-                    # Get the next proxy opener to use, or None
-                    try:
+        log.debug('Starting lookup for IP: {0} RIR: {1}'.format(ip, rir))
 
-                        opener = next(proxy_openers_copy)
+        self.rate_limiter.acquire(rir)
 
-                    # Start at the beginning if all have been used
-                    except StopIteration:
+        whois = Whois(Net(ip, timeout=self.socket_timeout))
 
-                        proxy_openers_copy = iter(proxy_openers)
-                        opener = next(proxy_openers_copy)
+        try:
 
-                    # Instantiate the objects needed for the RDAP lookup
-                    net = Net(ip, timeout=socket_timeout, proxy_opener=opener)
-                    rdap = RDAP(net)
+            # Perform the whois lookup. retry_count is set to 0 here since we
+            # handle that in this class. The raw response is needed for
+            # referrals.
+            whois_result = whois.lookup(
+                inc_raw=True, retry_count=0, asn_data=asn_data,
+                get_referral=False, **self.lookup_kwargs
+            )
 
-                    try:
+            if self.get_referral:
 
-                        # Perform the RDAP lookup. retry_count is set to 0
-                        # here since we handle that in this function
-                        rdap_result = rdap.lookup(
-                            inc_raw=inc_raw, retry_count=0, asn_data=asn_data,
-                            depth=depth, excluded_entities=excluded_entities
-                        )
+                whois_result['referral'], whois_result['raw_referral'] = (
+                    self.lookup_referral(whois, whois_result['raw'])
+                )
 
-                        log.debug('Successful lookup for IP: {0} '
-                                  'RIR: {1}'.format(ip, rir))
+        except WhoisRateLimitError:
 
-                        # Lookup was successful, add to result. Set the nir
-                        # key to None as this is not supported
-                        # (yet - requires more queries)
-                        results[ip] = asn_data
-                        results[ip].update(rdap_result)
+            with self._lock:
 
-                        results[ip]['nir'] = None
+                if ip not in self.stats[rir]['rate_limited']:
 
-                        # Remove the IP from the lookup queue
-                        del asn_parsed_results[ip]
+                    self.stats[rir]['rate_limited'].append(ip)
 
-                        # If this was LACNIC IP, reduce the total left count
-                        if rir == 'lacnic':
+                # Retry first, once the rate limiter allows this RIR again
+                queue.appendleft((ip, asn_data))
 
-                            lacnic_total_left -= 1
+            log.debug('Rate limiting triggered for IP: {0} RIR: {1}'.format(
+                ip, rir))
+            self.rate_limiter.penalize(rir)
 
-                        log.debug(
-                            '{0} total lookups left, {1} LACNIC lookups left'
-                            ''.format(str(len(asn_parsed_results)),
-                                      str(lacnic_total_left))
-                        )
+            return 'rate_limited'
 
-                        # If this IP failed previously, remove it from the
-                        # failed return dict
-                        if (
-                            ip in failed_lookups_dict.keys()
-                        ):  # pragma: no cover
+        except (BlacklistError, WhoisLookupError):
 
-                            del failed_lookups_dict[ip]
+            log.debug('Failed lookup for IP: {0} RIR: {1}'.format(ip, rir))
+            self._fail(ip, asn_data, rir, queue)
 
-                        # Break out of the IP list loop, we need to change to
-                        # the next RIR
-                        break
+            return 'failed'
 
-                    except HTTPLookupError:  # pragma: no cover
+        log.debug('Successful lookup for IP: {0} RIR: {1}'.format(ip, rir))
+        self.rate_limiter.reward(rir)
 
-                        log.debug('Failed lookup for IP: {0} '
-                                  'RIR: {1}'.format(ip, rir))
+        if not self.inc_raw:
 
-                        # Add the IP to the failed lookups dict if not there
-                        if ip not in failed_lookups_dict.keys():
+            whois_result['raw'] = None
+            whois_result['raw_referral'] = None
 
-                            failed_lookups_dict[ip] = 1
+        # Lookup was successful, add to result. The nir key is set by the NIR
+        # stage once all lookups are done (if inc_nir)
+        result = dict(asn_data)
+        result.update(whois_result)
+        result['nir'] = None
+        self.results[ip] = result
 
-                        # This IP has already failed at least once, increment
-                        # the failure count until retry_count reached, then
-                        # stop trying
-                        else:
+        if self.cache is not None:
 
-                            failed_lookups_dict[ip] += 1
+            self.cache.set_result(result, namespace=self.cache_namespace)
 
-                            if failed_lookups_dict[ip] == retry_count:
+        # If this IP failed previously, remove it from the failed counts
+        with self._lock:
 
-                                del asn_parsed_results[ip]
-                                stats[rir]['failed'].append(ip)
-                                stats['ip_failed_total'] += 1
+            self.failed.pop(ip, None)
 
-                                if rir == 'lacnic':
+        return 'success'
 
-                                    lacnic_total_left -= 1
+    def run_queue(self, rir):
+        """
+        The function for performing lookups queued for a RIR until the queue
+        is empty. Lookups wait for the rate limiter as needed. Run by each
+        worker of the RIR.
 
-                        # Since this IP failed, we don't break to move to next
-                        # RIR, we check the next IP for this RIR
-                        continue
+        Args:
+            rir (:obj:`str`): The RIR queue.
+        """
 
-                    except HTTPRateLimitError:  # pragma: no cover
+        while self.lookup_next(rir) is not None:
 
-                        # Add the IP to the rate-limited lookups dict if not
-                        # there
-                        if ip not in rated_lookups:
+            pass
 
-                            rated_lookups.append(ip)
-                            stats[rir]['rate_limited'].append(ip)
+    def run_concurrent(self, max_workers):
+        """
+        The function for performing all queued lookups, with up to
+        max_workers concurrent lookups per RIR whois server.
 
-                        log.debug('Rate limiting triggered for IP: {0} '
-                                  'RIR: {1}'.format(ip, rir))
+        Args:
+            max_workers (:obj:`int`): The maximum number of concurrent lookups
+                per RIR.
+        """
 
-                        # Since rate-limit was reached, reset the timer and
-                        # max out the count
-                        rate_tracker[rir]['time'] = time.time()
-                        rate_tracker[rir]['count'] = 9
+        workers = [rir for rir, queue in self.queues.items() if queue
+                   for i in range(min(max_workers, len(queue)))]
 
-                        # Break out of the IP list loop, we need to change to
-                        # the next RIR
-                        break
+        if not workers:
+
+            return
+
+        executor = ThreadPoolExecutor(max_workers=len(workers))
+
+        try:
+
+            # Raise the first exception, if any
+            for future in [executor.submit(self.run_queue, rir)
+                           for rir in workers]:
+
+                future.result()
+
+        finally:
+
+            executor.shutdown(wait=True)
+
+
+def bulk_lookup_whois(addresses=None, inc_raw=False, retry_count=3,
+                      get_referral=False, extra_blacklist=None,
+                      ignore_referral_errors=False, field_list=None,
+                      get_recursive=True, parser='rpsl', socket_timeout=10,
+                      asn_timeout=240, cache=None, rate_limiter=None,
+                      max_workers=2, inc_nir=True, nir_field_list=None,
+                      compact=False):
+    """
+    The function for bulk retrieving and parsing legacy whois information for
+    a list of IP addresses via port 43/tcp (WHOIS). This bulk lookup method
+    uses bulk ASN Whois lookups first to retrieve the ASN registry for each
+    IP. It then runs a bounded number of concurrent lookups against each RIR
+    whois server, rate limited per RIR. Whois servers answer a single query
+    per connection, so each lookup connects once; there is no sleep and
+    recursion on rate limit notices, the IP is re-queued and the RIR backed
+    off instead.
+
+    Args:
+        addresses (:obj:`list` of :obj:`str`): IP addresses to lookup.
+        inc_raw (:obj:`bool`, optional): Whether to include the raw whois
+            results in the returned dictionary. Defaults to False.
+        retry_count (:obj:`int`): The number of times to retry in case socket
+            errors, timeouts, connection resets, etc. are encountered.
+            Defaults to 3.
+        get_referral (:obj:`bool`): Whether to retrieve referral whois
+            information, if available. Referral servers that fail are not
+            queried again for the remaining addresses. Defaults to False.
+        extra_blacklist (:obj:`list`): Blacklisted whois servers in
+            addition to the global BLACKLIST. Defaults to None.
+        ignore_referral_errors (:obj:`bool`): Whether to ignore and continue
+            when an exception is encountered on referral whois lookups. If
+            False, the address is failed. Defaults to False.
+        field_list (:obj:`list` of :obj:`str`): If provided, fields to
+            parse. Defaults to all fields (see Whois.lookup()).
+        get_recursive (:obj:`bool`): Whether to ask the server to perform
+            recursive queries. Defaults to True.
+        parser (:obj:`str`): The field parsing engine, 'regex' or 'rpsl'
+            (see Whois.lookup()). Defaults to 'rpsl'.
+        socket_timeout (:obj:`int`): The default timeout for socket
+            connections in seconds. Defaults to 10.
+        asn_timeout (:obj:`int`): The default timeout for bulk ASN lookups in
+            seconds. Defaults to 240.
+        cache (:obj:`ipwhois.cache.PrefixCache`): If provided, addresses
+            within a previously returned network (including those returned
+            earlier in this call) are answered from the cache, and new results
+            are cached. Defaults to None.
+        rate_limiter (:obj:`ipwhois.ratelimit.RateLimiter`): The token bucket
+            rate limiter per RIR. Rate limit notices back off the RIR.
+            Defaults to None, which uses a new rate limiter for the duration
+            of this call.
+        max_workers (:obj:`int`): The maximum number of concurrent lookups
+            per RIR whois server (thread pool). Defaults to 2.
+        inc_nir (:obj:`bool`): Whether to retrieve NIR (National Internet
+            Registry) information for JP and KR addresses, once all whois
+            lookups are done. Each unique NIR contact is queried once.
+            Defaults to True.
+        nir_field_list (:obj:`list` of :obj:`str`): If provided and inc_nir,
+            NIR fields to parse. Defaults to None (all).
+        compact (:obj:`bool`): Whether to return each result as a
+            :obj:`ipwhois.compact.CompactResult` (slotted objects sharing
+            de-duplicated strings, for keeping many results in memory) rather
+            than a dict. Defaults to False.
+
+    Returns:
+        namedtuple:
+
+        :results (dict): IP address keys with the values as dictionaries
+            returned by IPWhois.lookup_whois().
+        :stats (dict): Stats for the lookups, as returned by
+            bulk_lookup_rdap(), with the addition of:
+
+        ::
+
+            {
+                'referral_failed' (list) - The 'server:port' referral
+                    servers that failed, and were not queried again.
+            }
+
+    Raises:
+        ASNLookupError: The ASN bulk lookup failed, cannot proceed with bulk
+            whois lookup.
+        ValueError: addresses must be a list, and parser 'regex' or 'rpsl'.
+    """
+
+    if not isinstance(addresses, list):
+
+        raise ValueError('addresses must be a list of IP address strings')
+
+    if parser not in ('regex', 'rpsl'):
+
+        raise ValueError('parser must be \'regex\' or \'rpsl\'')
+
+    # Rate limit queries per RIR, using the default limits.
+    if rate_limiter is None:
+
+        rate_limiter = RateLimiter()
+
+    cache_namespace = ('bulk_lookup_whois', inc_raw, get_referral,
+                       tuple(field_list or ()), inc_nir,
+                       tuple(nir_field_list or ()))
+
+    # Can raise ASNLookupError, no catch
+    results, stats, queues = _queue_bulk_lookups(
+        addresses=addresses, cache=cache, cache_namespace=cache_namespace,
+        asn_timeout=asn_timeout
+    )
+
+    scheduler = _BulkWhoisScheduler(
+        queues=queues, results=results, stats=stats,
+        rate_limiter=rate_limiter, retry_count=retry_count,
+        socket_timeout=socket_timeout, cache=cache,
+        cache_namespace=cache_namespace, inc_raw=inc_raw,
+        get_referral=get_referral, extra_blacklist=extra_blacklist,
+        ignore_referral_errors=ignore_referral_errors, field_list=field_list,
+        get_recursive=get_recursive, parser=parser
+    )
+
+    if ThreadPoolExecutor and max_workers and max_workers > 0:
+
+        scheduler.run_concurrent(max_workers)
+
+    else:
+
+        for rir in queues:
+
+            scheduler.run_queue(rir)
+
+    if inc_nir:
+
+        _bulk_lookup_nir(
+            results=results, stats=stats, inc_raw=inc_raw,
+            retry_count=retry_count, field_list=nir_field_list,
+            socket_timeout=socket_timeout, rate_limiter=rate_limiter,
+            cache=cache, cache_namespace=cache_namespace
+        )
+
+    stats['referral_failed'] = sorted(
+        '{0}:{1}'.format(*server) for server in scheduler.referral_failed
+    )
+
+    if compact:
+
+        _compact_results(results)
 
     return_tuple = namedtuple('return_tuple', ['results', 'stats'])
     return return_tuple(results, stats)
+
+
+def _lookup_address(session, address, whois=False, **kwargs):
+    """
+    The function for a single iter_lookups() lookup (a thread pool task).
+
+    Args:
+        session (:obj:`ipwhois.session.Session`): The session.
+        address (:obj:`str`): The IP address.
+        whois (:obj:`bool`): Whether to lookup via legacy whois rather than
+            RDAP. Defaults to False.
+        kwargs: Arguments to pass to IPWhois.lookup_rdap() or
+            IPWhois.lookup_whois().
+
+    Returns:
+        dict: The lookup results.
+    """
+
+    obj = session.ipwhois(address)
+
+    if whois:
+
+        return obj.lookup_whois(**kwargs)
+
+    return obj.lookup_rdap(**kwargs)
+
+
+def iter_lookups(addresses=None, whois=False, max_workers=4, session=None,
+                 stats=None, **kwargs):
+    """
+    The generator for looking up a stream of IP addresses with
+    IPWhois.lookup_rdap() (or lookup_whois()) in a thread pool, yielding each
+    result as it finishes. At most max_workers * 2 lookups are pending, and
+    addresses are only read from the iterable as lookups finish, so it may
+    be a generator of any length (e.g., the lines of a file).
+
+    Args:
+        addresses (:obj:`iterable` of :obj:`str`): IP addresses to lookup.
+            May be a generator. Surrounding whitespace and empty strings are
+            ignored.
+        whois (:obj:`bool`): Whether to lookup via legacy whois rather than
+            RDAP. Defaults to False.
+        max_workers (:obj:`int`): The number of concurrent lookups. Defaults
+            to 4.
+        session (:obj:`ipwhois.session.Session`): The session to share the
+            connections, rate limiter and caches across the lookups. Defaults
+            to None (a new Session).
+        stats (:obj:`dict`): If provided, updated with the lookup stats as
+            the results are yielded:
+
+            ::
+
+                {
+                    'ip_input_total' (int) - The total number of addresses
+                        read.
+                    'ip_lookup_total' (int) - The total number of lookups
+                        that succeeded.
+                    'ip_failed_total' (int) - The total number of lookups
+                        that failed.
+                    'errors' (dict) - Mapping of exception names to the
+                        number of lookups that failed with them.
+                    'lacnic' (dict) -
+                        {
+                            'total' (int) - The total number of successful
+                                lookups for the RIR.
+                        }
+                    'ripencc' (dict) - Same as 'lacnic' above
+                    'apnic' (dict) - Same as 'lacnic' above
+                    'afrinic' (dict) - Same as 'lacnic' above
+                    'arin' (dict) - Same as 'lacnic' above
+                }
+        kwargs: Arguments to pass to IPWhois.lookup_rdap() or
+            IPWhois.lookup_whois().
+
+    Yields:
+        tuple: (address, results, error). results is the lookup results
+            dictionary, None if the lookup failed with the exception error
+            (e.g., :obj:`ipwhois.exceptions.IPDefinedError`).
+
+    Raises:
+        ValueError: addresses argument must be an iterable of IPv4/v6 address
+            strings.
+    """
+
+    if addresses is None or isinstance(addresses, (str, bytes)):
+
+        raise ValueError('addresses argument must be an iterable of IPv4/v6 '
+                         'address strings.')
+
+    if session is None:
+
+        session = Session()
+
+    if stats is None:
+
+        stats = {}
+
+    stats.update({
+        'ip_input_total': 0,
+        'ip_lookup_total': 0,
+        'ip_failed_total': 0,
+        'errors': {},
+        'lacnic': {'total': 0},
+        'ripencc': {'total': 0},
+        'apnic': {'total': 0},
+        'afrinic': {'total': 0},
+        'arin': {'total': 0}
+    })
+
+    address_iter = (a.strip() for a in addresses if a and a.strip())
+
+    def record(address, results, error):
+
+        if error is None:
+
+            stats['ip_lookup_total'] += 1
+            if results.get('asn_registry') in stats:
+
+                stats[results['asn_registry']]['total'] += 1
+
+        else:
+
+            stats['ip_failed_total'] += 1
+            name = error.__class__.__name__
+            stats['errors'][name] = stats['errors'].get(name, 0) + 1
+
+        return address, results, error
+
+    if not ThreadPoolExecutor or not max_workers or max_workers < 2:
+
+        for address in address_iter:
+
+            stats['ip_input_total'] += 1
+            try:
+
+                results = _lookup_address(session, address, whois, **kwargs)
+
+            except Exception as e:
+
+                yield record(address, None, e)
+                continue
+
+            yield record(address, results, None)
+
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        pending = {}
+        while True:
+
+            # Backpressure, only read addresses as slots are freed.
+            for address in islice(address_iter,
+                                  max_workers * 2 - len(pending)):
+
+                stats['ip_input_total'] += 1
+                pending[executor.submit(_lookup_address, session, address,
+                                        whois, **kwargs)] = address
+
+            if not pending:
+
+                break
+
+            done = wait(list(pending), return_when=FIRST_COMPLETED)[0]
+
+            for future in done:
+
+                address = pending.pop(future)
+                error = future.exception()
+                yield record(address, None if error else future.result(),
+                             error)
@@ -22,9 +22,10 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
-from . import Net
+from .net import Net
 from .asn import IPASN
 from .nir import NIRWhois
+from .compact import compact_result
 import logging
 
 log = logging.getLogger(__name__)
@@ -42,21 +43,67 @@ class IPWhois:
             seconds. Defaults to 5.
         proxy_opener (:obj:`urllib.request.OpenerDirector`): The request for
             proxy support. Defaults to None.
+        http_pool (:obj:`ipwhois.pool.HTTPConnectionPool`): The keep-alive
+            connection pool for HTTP queries. Ignored if proxy_opener is
+            provided. Defaults to None.
+        cache (:obj:`ipwhois.cache.PrefixCache`): The cache for lookup
+            results, may be shared across IPWhois objects. Addresses within
+            a previously returned network are answered from the cache.
+            Defaults to None.
+        entity_cache (:obj:`ipwhois.cache.EntityCache`): The cache for
+            parsed RDAP entities, may be shared across IPWhois objects.
+            Defaults to None.
+        rate_limiter (:obj:`ipwhois.ratelimit.RateLimiter`): The rate limiter
+            for HTTP queries, may be shared across IPWhois objects. Defaults
+            to None.
+        asn_table (:obj:`ipwhois.asntable.ASNTable`): The offline IP to ASN
+            table, may be shared across IPWhois objects. If provided, ASN
+            lookups try it first ('local' asn_methods). Defaults to None.
+        session (:obj:`ipwhois.session.Session`): The shared lookup state,
+            see :obj:`ipwhois.session.Session`. If provided, its timeout,
+            opener, DNS resolver, rate limiter, caches and ASN table are used
+            instead of the arguments above. Defaults to None.
     """
 
-    def __init__(self, address, timeout=5, proxy_opener=None):
+    def __init__(self, address, timeout=5, proxy_opener=None, http_pool=None,
+                 cache=None, entity_cache=None, rate_limiter=None,
+                 asn_table=None, session=None):
 
         self.net = Net(
-            address=address, timeout=timeout, proxy_opener=proxy_opener
+            address=address, timeout=timeout, proxy_opener=proxy_opener,
+            http_pool=http_pool, rate_limiter=rate_limiter,
+            asn_table=asn_table, session=session
         )
         self.ipasn = IPASN(self.net)
 
+        if session is not None:
+
+            cache = session.cache
+            entity_cache = session.entity_cache
+
+        self.cache = cache
+        self.entity_cache = entity_cache
+
         self.address = self.net.address
         self.timeout = self.net.timeout
         self.address_str = self.net.address_str
         self.version = self.net.version
-        self.reversed = self.net.reversed
-        self.dns_zone = self.net.dns_zone
+
+    @property
+    def reversed(self):
+        """
+        str: The reversed IP address for the DNS ASN query.
+        """
+
+        return self.net.reversed
+
+    @property
+    def dns_zone(self):
+        """
+        str: The Cymru DNS zone for the ASN query.
+        """
+
+        return self.net.dns_zone
 
     def __repr__(self):
 
@@ -68,7 +115,8 @@ class IPWhois:
                      extra_blacklist=None, ignore_referral_errors=False,
                      field_list=None, extra_org_map=None,
                      inc_nir=True, nir_field_list=None, asn_methods=None,
-                     get_asn_description=True, get_recursive=True):
+                     get_asn_description=True, get_recursive=True,
+                     parser='regex', compact=False):
         """
         The function for retrieving and parsing whois information for an IP
         address via port 43 (WHOIS).
@@ -109,7 +157,8 @@ class IPWhois:
                 'nameservers', 'created', 'updated', 'contacts']
                 If None, defaults to all.
             asn_methods (:obj:`list`): ASN lookup types to attempt, in order.
-                If None, defaults to all ['dns', 'whois', 'http'].
+                If None, defaults to all ['dns', 'whois', 'http'], preceded
+                by 'local' if asn_table was provided.
             get_asn_description (:obj:`bool`): Whether to run an additional
                 query when pulling ASN information via dns, in order to get
                 the ASN description. Defaults to True.
@@ -117,6 +166,13 @@ class IPWhois:
                 recursive queries to get related objects. If False, passes
                 the '-r' flag to RIPE WHOIS servers. Has no effect for other
                 RIRs. Defaults to True.
+            parser (:obj:`str`): The whois field parsing engine, 'regex' or
+                'rpsl' (a single pass tokenizer, faster on large responses).
+                Both produce the same results. Defaults to 'regex'.
+            compact (:obj:`bool`): Whether to return the results as a
+                :obj:`ipwhois.compact.CompactResult` (slotted objects, for
+                keeping many results in memory) rather than a dict. Defaults
+                to False.
 
         Returns:
             dict: The IP whois lookup results
@@ -149,6 +205,23 @@ class IPWhois:
 
         from .whois import Whois
 
+        if self.cache is not None:
+
+            cache_namespace = (
+                'lookup_whois', inc_raw, get_referral,
+                tuple(extra_blacklist or ()), tuple(field_list or ()),
+                inc_nir, tuple(nir_field_list or ()), get_asn_description,
+                get_recursive, ignore_referral_errors,
+                tuple(asn_methods or ()),
+                tuple(sorted((extra_org_map or {}).items()))
+            )
+            results = self.cache.get_result(self.address_str,
+                                            namespace=cache_namespace)
+
+            if results is not None:
+
+                return compact_result(results) if compact else results
+
         # Create the return dictionary.
         results = {'nir': None}
 
@@ -172,6 +245,7 @@ class IPWhois:
             get_referral=get_referral, extra_blacklist=extra_blacklist,
             ignore_referral_errors=ignore_referral_errors, asn_data=asn_data,
             field_list=field_list, get_recursive=get_recursive,
+            parser=parser
         )
 
         # Add the WHOIS information to the return dictionary.
@@ -197,13 +271,18 @@ class IPWhois:
                 # Add the NIR information to the return dictionary.
                 results['nir'] = nir_data
 
-        return results
+        if self.cache is not None:
+
+            self.cache.set_result(results, namespace=cache_namespace)
+
+        return compact_result(results) if compact else results
 
     def lookup_rdap(self, inc_raw=False, retry_count=3, depth=0,
                     excluded_entities=None, bootstrap=False,
                     rate_limit_timeout=120, extra_org_map=None,
                     inc_nir=True, nir_field_list=None, asn_methods=None,
-                    get_asn_description=True, root_ent_check=True):
+                    get_asn_description=True, root_ent_check=True,
+                    max_workers=None, compact=False):
         """
         The function for retrieving and parsing whois information for an IP
         address via HTTP (RDAP).
@@ -247,13 +326,21 @@ class IPWhois:
                 'nameservers', 'created', 'updated', 'contacts']
                 If None, defaults to all.
             asn_methods (:obj:`list`): ASN lookup types to attempt, in order.
-                If None, defaults to all ['dns', 'whois', 'http'].
+                If None, defaults to all ['dns', 'whois', 'http'], preceded
+                by 'local' if asn_table was provided.
             get_asn_description (:obj:`bool`): Whether to run an additional
                 query when pulling ASN information via dns, in order to get
                 the ASN description. Defaults to True.
             root_ent_check (:obj:`bool`): If True, will perform
                 additional RDAP HTTP queries for missing entity data at the
                 root level. Defaults to True.
+            max_workers (:obj:`int`): If greater than 1, the entities at each
+                level are retrieved concurrently using a thread pool of this
+                size. Defaults to None (serial).
+            compact (:obj:`bool`): Whether to return the results as a
+                :obj:`ipwhois.compact.CompactResult` (slotted objects, for
+                keeping many results in memory) rather than a dict. Defaults
+                to False.
 
         Returns:
             dict: The IP RDAP lookup results
@@ -287,6 +374,21 @@ class IPWhois:
 
         from .rdap import RDAP
 
+        if self.cache is not None:
+
+            cache_namespace = (
+                'lookup_rdap', inc_raw, depth, tuple(excluded_entities or ()),
+                bootstrap, inc_nir, tuple(nir_field_list or ()),
+                get_asn_description, root_ent_check, tuple(asn_methods or ()),
+                tuple(sorted((extra_org_map or {}).items()))
+            )
+            results = self.cache.get_result(self.address_str,
+                                            namespace=cache_namespace)
+
+            if results is not None:
+
+                return compact_result(results) if compact else results
+
         # Create the return dictionary.
         results = {'nir': None}
 
@@ -313,7 +415,8 @@ class IPWhois:
             depth=depth, excluded_entities=excluded_entities,
             response=response, bootstrap=bootstrap,
             rate_limit_timeout=rate_limit_timeout,
-            root_ent_check=root_ent_check
+            root_ent_check=root_ent_check, entity_cache=self.entity_cache,
+            max_workers=max_workers
         )
 
         # Add the RDAP information to the return dictionary.
@@ -338,4 +441,8 @@ class IPWhois:
                 # Add the NIR information to the return dictionary.
                 results['nir'] = nir_data
 
-        return results
+        if self.cache is not None:
+
+            self.cache.set_result(results, namespace=cache_namespace)
+
+        return compact_result(results) if compact else results
@@ -24,21 +24,17 @@
 
 import sys
 import socket
-import dns.resolver
-import json
 from collections import namedtuple
 import logging
 from time import sleep
 
-# Import the dnspython rdtypes to fix the dynamic import problem when frozen.
-import dns.rdtypes.ANY.TXT  # @UnusedImport
-
 from .exceptions import (IPDefinedError, ASNLookupError, BlacklistError,
                          WhoisLookupError, HTTPLookupError, HostLookupError,
                          HTTPRateLimitError, WhoisRateLimitError)
 from .whois import RIR_WHOIS
 from .asn import ASN_ORIGIN_WHOIS
-from .utils import ipv4_is_defined, ipv6_is_defined
+from .utils import ipv4_is_defined, ipv6_is_defined, json_loads
+from .pool import KeepAliveHTTPHandler, KeepAliveHTTPSHandler
 
 if sys.version_info >= (3, 3):  # pragma: no cover
     from ipaddress import (ip_address,
@@ -92,6 +88,24 @@ ORG_MAP = {
 }
 
 
+def _import_dns():
+    """
+    The function for importing dnspython on first use. It is slow to import,
+    and only needed for DNS lookups.
+
+    Returns:
+        module: The dns package, with dns.resolver imported.
+    """
+
+    import dns.resolver
+
+    # Import the dnspython rdtypes to fix the dynamic import problem when
+    # frozen.
+    import dns.rdtypes.ANY.TXT  # @UnusedImport
+
+    return dns
+
+
 class Net:
     """
     The class for performing network queries.
@@ -103,13 +117,33 @@ class Net:
             seconds. Defaults to 5.
         proxy_opener (:obj:`urllib.request.OpenerDirector`): The request for
             proxy support. Defaults to None.
+        http_pool (:obj:`ipwhois.pool.HTTPConnectionPool`): The keep-alive
+            connection pool for HTTP queries, may be shared across Net
+            objects. Ignored if proxy_opener is provided. Defaults to None
+            (a new connection per query).
+        rate_limiter (:obj:`ipwhois.ratelimit.RateLimiter`): The rate limiter
+            consulted before each HTTP query, may be shared across Net
+            objects. Rate limit notices back off the registry instead of
+            sleeping for rate_limit_timeout. Defaults to None.
+        asn_table (:obj:`ipwhois.asntable.ASNTable`): The offline IP to ASN
+            table for local ASN lookups, may be shared across Net objects.
+            Defaults to None.
+        dns_resolver (:obj:`dns.resolver.Resolver`): The DNS resolver to
+            use, may be shared across Net objects. Defaults to None, which
+            creates a resolver (with timeout) on the first DNS query.
+        session (:obj:`ipwhois.session.Session`): The shared lookup state.
+            If provided, its timeout, opener, DNS resolver, rate limiter and
+            ASN table are used instead of the arguments above. Defaults to
+            None.
 
     Raises:
         IPDefinedError: The address provided is defined (does not need to be
             resolved).
     """
 
-    def __init__(self, address, timeout=5, proxy_opener=None):
+    def __init__(self, address, timeout=5, proxy_opener=None, http_pool=None,
+                 rate_limiter=None, asn_table=None, dns_resolver=None,
+                 session=None):
 
         # IPv4Address or IPv6Address
         if isinstance(address, IPv4Address) or isinstance(
@@ -122,22 +156,43 @@ class Net:
             # Use ipaddress package exception handling.
             self.address = ip_address(address)
 
+        # Shared state, replacing the arguments.
+        self.session = session
+
+        if session is not None:
+
+            timeout = session.timeout
+            proxy_opener = session.proxy_opener
+            http_pool = session.http_pool
+            rate_limiter = session.rate_limiter
+            asn_table = session.asn_table
+            dns_resolver = None
+
         # Default timeout for socket connections.
         self.timeout = timeout
 
-        self.dns_resolver = dns.resolver.Resolver()
-        self.dns_resolver.timeout = timeout
-        self.dns_resolver.lifetime = timeout
+        # The DNS resolver (reads the system resolver configuration) and the
+        # opener (reads the proxy environment variables) are created on first
+        # use, see the dns_resolver and opener properties.
+        self._dns_resolver = dns_resolver
+        self._opener = None
+        self.http_pool = http_pool
+
+        # Rate limiter, keyed by registry and proxy opener.
+        self.rate_limiter = rate_limiter
+        self.proxy_opener = proxy_opener
+
+        # Offline IP to ASN table.
+        self.asn_table = asn_table
 
         # Proxy opener.
         if isinstance(proxy_opener, OpenerDirector):
 
-            self.opener = proxy_opener
-
-        else:
+            self._opener = proxy_opener
 
-            handler = ProxyHandler()
-            self.opener = build_opener(handler)
+        # The reversed address for the DNS ASN query, see the reversed
+        # property.
+        self._reversed = None
 
         # IP address in string format for use in queries.
         self.address_str = self.address.__str__()
@@ -148,7 +203,7 @@ class Net:
         if self.version == 4:
 
             # Check if no ASN/whois resolution needs to occur.
-            is_defined = ipv4_is_defined(self.address_str)
+            is_defined = ipv4_is_defined(self.address)
 
             if is_defined[0]:
 
@@ -159,17 +214,10 @@ class Net:
                     )
                 )
 
-            # Reverse the IPv4Address for the DNS ASN query.
-            split = self.address_str.split('.')
-            split.reverse()
-            self.reversed = '.'.join(split)
-
-            self.dns_zone = IPV4_DNS_ZONE.format(self.reversed)
-
         else:
 
             # Check if no ASN/whois resolution needs to occur.
-            is_defined = ipv6_is_defined(self.address_str)
+            is_defined = ipv6_is_defined(self.address)
 
             if is_defined[0]:
 
@@ -180,6 +228,85 @@ class Net:
                     )
                 )
 
+    @property
+    def dns_resolver(self):
+        """
+        dns.resolver.Resolver: The DNS resolver: the session resolver, or
+            created on first use with the timeout unless provided.
+        """
+
+        if self._dns_resolver is None and self.session is not None:
+
+            self._dns_resolver = self.session.dns_resolver
+
+        elif self._dns_resolver is None:
+
+            dns = _import_dns()
+            dns_resolver = dns.resolver.Resolver()
+            dns_resolver.timeout = self.timeout
+            dns_resolver.lifetime = self.timeout
+            self._dns_resolver = dns_resolver
+
+        return self._dns_resolver
+
+    @dns_resolver.setter
+    def dns_resolver(self, value):
+
+        self._dns_resolver = value
+
+    @property
+    def opener(self):
+        """
+        OpenerDirector: The opener for HTTP queries: proxy_opener if
+            provided, the session opener, or created on first use (using
+            http_pool if provided).
+        """
+
+        if self._opener is None:
+
+            if self.session is not None:
+
+                self._opener = self.session.opener
+
+            elif self.http_pool is not None:
+
+                self._opener = build_opener(
+                    ProxyHandler(), KeepAliveHTTPHandler(self.http_pool),
+                    KeepAliveHTTPSHandler(self.http_pool)
+                )
+
+            else:
+
+                handler = ProxyHandler()
+                self._opener = build_opener(handler)
+
+        return self._opener
+
+    @opener.setter
+    def opener(self, value):
+
+        self._opener = value
+
+    @property
+    def reversed(self):
+        """
+        str: The reversed IP address for the DNS ASN query, computed on
+            first use.
+        """
+
+        if self._reversed is not None:
+
+            return self._reversed
+
+        if self.version == 4:
+
+            # Reverse the IPv4Address for the DNS ASN query.
+            split = self.address_str.split('.')
+            split.reverse()
+            self._reversed = '.'.join(split)
+
+        else:
+
             # Explode the IPv6Address to fill in any missing 0's.
             exploded = self.address.exploded
 
@@ -201,9 +328,21 @@ class Net:
             # Reverse the IPv6Address for the DNS ASN query.
             val = str(exploded).replace(':', '')
             val = val[::-1]
-            self.reversed = '.'.join(val)
+            self._reversed = '.'.join(val)
+
+        return self._reversed
+
+    @property
+    def dns_zone(self):
+        """
+        str: The Cymru DNS zone for the ASN query.
+        """
+
+        if self.version == 4:
 
-            self.dns_zone = IPV6_DNS_ZONE.format(self.reversed)
+            return IPV4_DNS_ZONE.format(self.reversed)
+
+        return IPV6_DNS_ZONE.format(self.reversed)
 
     def get_asn_dns(self):
         """
@@ -217,6 +356,8 @@ class Net:
             ASNLookupError: The ASN lookup failed.
         """
 
+        dns = _import_dns()
+
         try:
 
             log.debug('ASN query for {0}'.format(self.dns_zone))
@@ -239,6 +380,37 @@ class Net:
                 'ASN lookup failed for {0}.'.format(self.address_str)
             )
 
+    def get_asn_local(self):
+        """
+        The function for retrieving ASN information for an IP address from
+        the offline IP to ASN table (asn_table), in the Cymru DNS format.
+
+        Returns:
+            str: The raw ASN data.
+
+        Raises:
+            ASNLookupError: The ASN lookup failed.
+        """
+
+        if self.asn_table is None:
+
+            raise ASNLookupError(
+                'ASN lookup failed (no local ASN table) for {0}.'.format(
+                    self.address_str)
+            )
+
+        log.debug('ASN local query for {0}'.format(self.address_str))
+        data = self.asn_table.lookup(self.address)
+
+        if data is None:
+
+            raise ASNLookupError(
+                'ASN lookup failed (not in local ASN table) for {0}.'.format(
+                    self.address_str)
+            )
+
+        return data
+
     def get_asn_verbose_dns(self, asn=None):
         """
         The function for retrieving the information for an ASN from
@@ -261,6 +433,8 @@ class Net:
 
         zone = '{0}.asn.cymru.com.'.format(asn)
 
+        dns = _import_dns()
+
         try:
 
             log.debug('ASN verbose query for {0}'.format(zone))
@@ -660,6 +834,59 @@ class Net:
                 'WHOIS lookup failed for {0}.'.format(self.address_str)
             )
 
+    def _retry_rate_limited_http_json(self, url=None, retry_count=3,
+                                      rate_limit_timeout=120, headers=None,
+                                      retry_after=None):
+        """
+        The function for retrying a rate limited HTTP json query. With a rate
+        limiter, the registry is backed off and the retry waits for its token
+        bucket. Otherwise, waits rate_limit_timeout seconds.
+
+        Args:
+            url (:obj:`str`): The URL that was rate limited (required).
+            retry_count (:obj:`int`): The number of retries left. Defaults
+                to 3.
+            rate_limit_timeout (:obj:`int`): The number of seconds to wait
+                before retrying, without a rate limiter. Defaults to 120.
+            headers (:obj:`dict`): The HTTP headers. Defaults to None.
+            retry_after (:obj:`int`): The seconds the server requested to wait
+                (Retry-After header). Defaults to None.
+
+        Returns:
+            dict: The data in json format.
+
+        Raises:
+            HTTPLookupError: The HTTP lookup failed.
+            HTTPRateLimitError: The HTTP request rate limited and retries
+                were exhausted.
+        """
+
+        if self.rate_limiter is not None:
+
+            self.rate_limiter.penalize_url(url, self.proxy_opener,
+                                           retry_after)
+
+        if retry_count > 0:
+
+            if self.rate_limiter is None:
+
+                log.debug('Waiting {0} seconds...'.format(
+                    str(rate_limit_timeout)))
+
+                sleep(rate_limit_timeout)
+
+            return self.get_http_json(
+                url=url, retry_count=retry_count - 1,
+                rate_limit_timeout=rate_limit_timeout, headers=headers
+            )
+
+        else:
+
+            raise HTTPRateLimitError(
+                'HTTP lookup failed for {0}. Rate limit '
+                'exceeded, wait and try again (possibly a '
+                'temporary block).'.format(url))
+
     def get_http_json(self, url=None, retry_count=3, rate_limit_timeout=120,
                       headers=None):
         """
@@ -672,7 +899,8 @@ class Net:
                 encountered. Defaults to 3.
             rate_limit_timeout (:obj:`int`): The number of seconds to wait
                 before retrying when a rate limit notice is returned via
-                rdap+json or HTTP error 429. Defaults to 60.
+                rdap+json or HTTP error 429. Not used if the rate_limiter
+                argument was provided. Defaults to 60.
             headers (:obj:`dict`): The HTTP headers. The Accept header
                 defaults to 'application/rdap+json'.
 
@@ -694,11 +922,16 @@ class Net:
             log.debug('HTTP query for {0} at {1}'.format(
                 self.address_str, url))
             conn = Request(url, headers=headers)
+
+            if self.rate_limiter is not None:
+
+                self.rate_limiter.acquire_url(url, self.proxy_opener)
+
             data = self.opener.open(conn, timeout=self.timeout)
             try:
-                d = json.loads(data.readall().decode('utf-8', 'ignore'))
+                d = json_loads(data.readall())
             except AttributeError:  # pragma: no cover
-                d = json.loads(data.read().decode('utf-8', 'ignore'))
+                d = json_loads(data.read())
 
             try:
                 # Tests written but commented out. I do not want to send a
@@ -707,26 +940,20 @@ class Net:
                     if tmp['title'] == 'Rate Limit Notice':
                         log.debug('RDAP query rate limit exceeded.')
 
-                        if retry_count > 0:
-                            log.debug('Waiting {0} seconds...'.format(
-                                str(rate_limit_timeout)))
-
-                            sleep(rate_limit_timeout)
-                            return self.get_http_json(
-                                url=url, retry_count=retry_count-1,
-                                rate_limit_timeout=rate_limit_timeout,
-                                headers=headers
-                            )
-                        else:
-                            raise HTTPRateLimitError(
-                                'HTTP lookup failed for {0}. Rate limit '
-                                'exceeded, wait and try again (possibly a '
-                                'temporary block).'.format(url))
+                        return self._retry_rate_limited_http_json(
+                            url=url, retry_count=retry_count,
+                            rate_limit_timeout=rate_limit_timeout,
+                            headers=headers
+                        )
 
             except (KeyError, IndexError):  # pragma: no cover
 
                 pass
 
+            if self.rate_limiter is not None:
+
+                self.rate_limiter.reward_url(url, self.proxy_opener)
+
             return d
 
         except HTTPError as e:  # pragma: no cover
@@ -736,21 +963,19 @@ class Net:
 
                 log.debug('HTTP query rate limit exceeded.')
 
-                if retry_count > 0:
-                    log.debug('Waiting {0} seconds...'.format(
-                        str(rate_limit_timeout)))
-
-                    sleep(rate_limit_timeout)
-                    return self.get_http_json(
-                        url=url, retry_count=retry_count - 1,
-                        rate_limit_timeout=rate_limit_timeout,
-                        headers=headers
-                    )
-                else:
-                    raise HTTPRateLimitError(
-                        'HTTP lookup failed for {0}. Rate limit '
-                        'exceeded, wait and try again (possibly a '
-                        'temporary block).'.format(url))
+                try:
+
+                    retry_after = int(e.headers.get('Retry-After'))
+
+                except (AttributeError, TypeError, ValueError):
+
+                    retry_after = None
+
+                return self._retry_rate_limited_http_json(
+                    url=url, retry_count=retry_count,
+                    rate_limit_timeout=rate_limit_timeout, headers=headers,
+                    retry_after=retry_after
+                )
 
             else:
 
@@ -891,6 +1116,11 @@ class Net:
                                **{'method': request_type})
             except TypeError:  # pragma: no cover
                 conn = Request(url=url, data=enc_form_data, headers=headers)
+
+            if self.rate_limiter is not None:
+
+                self.rate_limiter.acquire_url(url, self.proxy_opener)
+
             data = self.opener.open(conn, timeout=self.timeout)
 
             try:
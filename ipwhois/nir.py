@@ -23,11 +23,10 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 from . import NetError
-from .utils import unique_everseen
+from .utils import (unique_everseen, compile_field_pattern)
 import logging
 import sys
 import re
-import copy
 from datetime import (datetime, timedelta)
 
 if sys.version_info >= (3, 3):  # pragma: no cover
@@ -43,7 +42,7 @@ else:  # pragma: no cover
 
 log = logging.getLogger(__name__)
 
-# Base NIR whois output dictionary.
+# Base NIR whois output dictionary (shallow copied per network).
 BASE_NET = {
     'cidr': None,
     'name': None,
@@ -230,10 +229,7 @@ class NIRWhois:
 
         for field, pattern in generate:
 
-            pattern = re.compile(
-                str(pattern),
-                re.DOTALL
-            )
+            pattern = compile_field_pattern(pattern)
 
             if net_start is not None:
 
@@ -330,7 +326,7 @@ class NIRWhois:
 
             try:
 
-                net = copy.deepcopy(BASE_NET)
+                net = BASE_NET.copy()
                 tmp = ip_network(match.group(2))
 
                 try:  # pragma: no cover
@@ -394,7 +390,7 @@ class NIRWhois:
 
             try:
 
-                net = copy.deepcopy(BASE_NET)
+                net = BASE_NET.copy()
                 net['range'] = match.group(2)
 
                 if match.group(3) and match.group(4):
@@ -474,8 +470,40 @@ class NIRWhois:
             is_contact=True
         )
 
+    def get_response(self, nir=None, retry_count=3):
+        """
+        The function for retrieving the raw NIR whois network page for the
+        IP address.
+
+        Args:
+            nir (:obj:`str`): The NIR to query ('jpnic' or 'krnic').
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+
+        Returns:
+            str: The raw NIR whois data.
+
+        Raises:
+            HTTPLookupError: The HTTP lookup failed.
+        """
+
+        form_data = None
+        if NIR_WHOIS[nir]['form_data_ip_field']:
+            form_data = {NIR_WHOIS[nir]['form_data_ip_field']:
+                         self._net.address_str}
+
+        # Retrieve the whois data.
+        return self._net.get_http_raw(
+            url=str(NIR_WHOIS[nir]['url']).format(self._net.address_str),
+            retry_count=retry_count,
+            headers=NIR_WHOIS[nir]['request_headers'],
+            request_type=NIR_WHOIS[nir]['request_type'],
+            form_data=form_data
+        )
+
     def lookup(self, nir=None, inc_raw=False, retry_count=3, response=None,
-               field_list=None, is_offline=False):
+               field_list=None, is_offline=False, contacts=None):
         """
         The function for retrieving and parsing NIR whois information for an IP
         address via HTTP (HTML scraping).
@@ -495,6 +523,10 @@ class NIRWhois:
             is_offline (:obj:`bool`): Whether to perform lookups offline. If
                 True, response and asn_data must be provided. Primarily used
                 for testing.
+            contacts (:obj:`dict`): Mapping of contact handles (KRNIC:
+                contact data) to parsed contacts, which may be shared across
+                lookups so each contact is only retrieved once. Retrieved
+                contacts are added. Defaults to None (per lookup).
 
         Returns:
             dict: The NIR whois results:
@@ -532,19 +564,7 @@ class NIRWhois:
             log.debug('Response not given, perform WHOIS lookup for {0}'
                       .format(self._net.address_str))
 
-            form_data = None
-            if NIR_WHOIS[nir]['form_data_ip_field']:
-                form_data = {NIR_WHOIS[nir]['form_data_ip_field']:
-                             self._net.address_str}
-
-            # Retrieve the whois data.
-            response = self._net.get_http_raw(
-                url=str(NIR_WHOIS[nir]['url']).format(self._net.address_str),
-                retry_count=retry_count,
-                headers=NIR_WHOIS[nir]['request_headers'],
-                request_type=NIR_WHOIS[nir]['request_type'],
-                form_data=form_data
-            )
+            response = self.get_response(nir=nir, retry_count=retry_count)
 
         # If inc_raw parameter is True, add the response to return dictionary.
         if inc_raw:
@@ -563,7 +583,7 @@ class NIRWhois:
 
         nets.extend(nets_response)
 
-        global_contacts = {}
+        global_contacts = {} if contacts is None else contacts
 
         # Iterate through all of the network sections and parse out the
         # appropriate fields for each.
@@ -0,0 +1,291 @@
+# Copyright (c) 2013-2024 Philip Hane
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import socket
+import threading
+import logging
+from time import time
+
+try:  # pragma: no cover
+    from http.client import (HTTPConnection,
+                             HTTPSConnection,
+                             HTTPException)
+    from urllib.request import (HTTPHandler,
+                                HTTPSHandler,
+                                URLError)
+    from urllib.response import addinfourl
+except ImportError:  # pragma: no cover
+    from httplib import (HTTPConnection,
+                         HTTPSConnection,
+                         HTTPException)
+    from urllib2 import (HTTPHandler,
+                         HTTPSHandler,
+                         URLError)
+    from urllib import addinfourl
+
+log = logging.getLogger(__name__)
+
+
+class HTTPConnectionPool:
+    """
+    The class for pooling keep-alive HTTP/HTTPS connections, keyed by scheme,
+    host and port. A single pool is thread safe and may be shared by any
+    number of :obj:`ipwhois.net.Net` objects via the http_pool argument.
+
+    Args:
+        maxsize (:obj:`int`): The maximum number of idle connections kept per
+            scheme/host. Defaults to 4.
+        idle_timeout (:obj:`int`): The number of seconds an idle connection
+            is kept before it is closed and discarded. Defaults to 30.
+    """
+
+    def __init__(self, maxsize=4, idle_timeout=30):
+
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+
+        # Mapping of (scheme, host) to lists of (connection, last used time).
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        The function for checking out an idle connection. Expired connections
+        are closed and discarded.
+
+        Args:
+            key (:obj:`tuple`): The (scheme, host) connection key.
+
+        Returns:
+            HTTPConnection: The most recently used idle connection, None if
+                no idle connection is available.
+        """
+
+        expired = []
+        conn = None
+        now = time()
+
+        with self._lock:
+
+            idle = self._idle.get(key, [])
+            while idle:
+
+                tmp_conn, last_used = idle.pop()
+
+                if now - last_used > self.idle_timeout:
+
+                    expired.append(tmp_conn)
+                    continue
+
+                conn = tmp_conn
+                break
+
+        for tmp_conn in expired:
+
+            tmp_conn.close()
+
+        return conn
+
+    def put(self, key, conn):
+        """
+        The function for returning a connection to the pool. The connection
+        is closed if the pool for key is full.
+
+        Args:
+            key (:obj:`tuple`): The (scheme, host) connection key.
+            conn (:obj:`HTTPConnection`): The connection to return.
+        """
+
+        with self._lock:
+
+            idle = self._idle.setdefault(key, [])
+
+            if len(idle) < self.maxsize:
+
+                idle.append((conn, time()))
+                return
+
+        conn.close()
+
+    def clear(self):
+        """
+        The function for closing and discarding all idle connections.
+        """
+
+        with self._lock:
+
+            idle, self._idle = self._idle, {}
+
+        for conns in idle.values():
+
+            for conn, last_used in conns:
+
+                conn.close()
+
+    def urlopen(self, req, conn_class, **kwargs):
+        """
+        The function for performing a urllib request over a pooled
+        connection. The response body is read in full so the connection can
+        be returned to the pool immediately.
+
+        Args:
+            req (:obj:`urllib.request.Request`): The request.
+            conn_class (:obj:`type`): HTTPConnection or HTTPSConnection.
+            **kwargs: Additional arguments for conn_class.
+
+        Returns:
+            addinfourl: The response.
+
+        Raises:
+            URLError: The request failed.
+        """
+
+        if hasattr(req, 'get_host'):  # pragma: no cover
+
+            # Python 2 urllib2.Request
+            host = req.get_host()
+            selector = req.get_selector()
+            key = (req.get_type(), host)
+
+        else:
+
+            host = req.host
+            selector = req.selector
+            key = (req.type, host)
+
+        if not host:  # pragma: no cover
+
+            raise URLError('no host given')
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update(dict((k, v) for k, v in req.headers.items()
+                            if k not in headers))
+        headers['Connection'] = 'keep-alive'
+        headers = dict((name.title(), val) for name, val in headers.items())
+
+        # A pooled connection may have been closed by the server while idle,
+        # retry once on a new connection in that case.
+        while True:
+
+            conn = self.get(key)
+            reused = conn is not None
+
+            if conn is None:
+
+                conn = conn_class(host, timeout=req.timeout, **kwargs)
+
+            else:
+
+                conn.timeout = req.timeout
+                if conn.sock is not None:
+
+                    conn.sock.settimeout(req.timeout)
+
+            try:
+
+                conn.request(req.get_method(), selector, req.data, headers)
+                r = conn.getresponse()
+                body = r.read()
+
+            except (socket.error, HTTPException) as e:
+
+                conn.close()
+
+                if reused:
+
+                    log.debug('Pooled connection to {0} failed, reconnecting: '
+                              '{1}'.format(host, e))
+                    continue
+
+                raise URLError(e)
+
+            break
+
+        if r.will_close:
+
+            conn.close()
+
+        else:
+
+            self.put(key, conn)
+
+        resp = addinfourl(io.BytesIO(body), r.msg, req.get_full_url(),
+                          r.status)
+        resp.msg = r.reason
+        return resp
+
+
+class KeepAliveHTTPHandler(HTTPHandler):
+    """
+    The urllib handler for HTTP requests via an
+    :obj:`ipwhois.pool.HTTPConnectionPool`. Requests sent via a proxy
+    bypass the pool.
+
+    Args:
+        pool (:obj:`ipwhois.pool.HTTPConnectionPool`): The connection pool.
+    """
+
+    def __init__(self, pool, *args, **kwargs):
+
+        HTTPHandler.__init__(self, *args, **kwargs)
+        self.pool = pool
+
+    def http_open(self, req):
+
+        if req.has_proxy():  # pragma: no cover
+
+            return HTTPHandler.http_open(self, req)
+
+        return self.pool.urlopen(req, HTTPConnection)
+
+
+class KeepAliveHTTPSHandler(HTTPSHandler):
+    """
+    The urllib handler for HTTPS requests via an
+    :obj:`ipwhois.pool.HTTPConnectionPool`. Requests sent via a proxy
+    bypass the pool.
+
+    Args:
+        pool (:obj:`ipwhois.pool.HTTPConnectionPool`): The connection pool.
+    """
+
+    def __init__(self, pool, *args, **kwargs):
+
+        HTTPSHandler.__init__(self, *args, **kwargs)
+        self.pool = pool
+
+    def https_open(self, req):
+
+        if req.has_proxy():  # pragma: no cover
+
+            return HTTPSHandler.https_open(self, req)
+
+        kwargs = {}
+        context = getattr(self, '_context', None)
+        if context is not None:  # pragma: no cover
+
+            kwargs['context'] = context
+
+        return self.pool.urlopen(req, HTTPSConnection, **kwargs)
@@ -0,0 +1,390 @@
+# Copyright (c) 2013-2024 Philip Hane
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import threading
+import logging
+from time import (time, sleep)
+
+from .net import (CYMRU_WHOIS, ARIN)
+from .rdap import RIR_RDAP
+from .whois import RIR_WHOIS
+from .nir import NIR_WHOIS
+
+try:  # pragma: no cover
+    from urllib.parse import urlparse
+except ImportError:  # pragma: no cover
+    from urlparse import urlparse
+
+log = logging.getLogger(__name__)
+
+# The default (rate, capacity) token buckets per registry. rate is the number
+# of queries per second, and capacity the maximum burst. LACNIC is limited to
+# 9 queries per minute. Keys not matching a registry fall under 'other'.
+RATE_LIMITS = {
+    'arin': (10, 10),
+    'ripencc': (10, 10),
+    'apnic': (10, 10),
+    'lacnic': (9 / 60., 9),
+    'afrinic': (10, 10),
+    'jpnic': (1, 5),
+    'krnic': (1, 5),
+    'other': (10, 10)
+}
+
+# Mapping of hosts to registry keys, for selecting a limit by URL or whois
+# server.
+HOST_REGISTRY = {
+    urlparse(ARIN).hostname: 'arin',
+    CYMRU_WHOIS: 'cymru'
+}
+
+for _rir, _val in RIR_RDAP.items():
+
+    HOST_REGISTRY[urlparse(_val['ip_url']).hostname] = _rir
+
+for _rir, _val in RIR_WHOIS.items():
+
+    HOST_REGISTRY[_val['server']] = _rir
+
+for _nir, _val in NIR_WHOIS.items():
+
+    HOST_REGISTRY[urlparse(_val['url']).hostname] = _nir
+
+
+def get_registry_key(url=None, server=None):
+    """
+    The function for mapping a URL or whois server to a registry key.
+
+    Args:
+        url (:obj:`str`): The URL to map.
+        server (:obj:`str`): The server (host) to map, if url is not
+            provided.
+
+    Returns:
+        str: The registry key, 'other' if not known.
+    """
+
+    if url is not None:
+
+        server = urlparse(url).hostname
+
+    return HOST_REGISTRY.get(server, 'other')
+
+
+class TokenBucket:
+    """
+    The class for a thread safe token bucket with adaptive backoff. Each query
+    takes a token, and tokens are refilled at rate per second up to capacity.
+    Rate limit notices halve the rate, and each successful query raises it
+    again, up to max_rate.
+
+    Args:
+        rate (:obj:`float`): The number of tokens added per second.
+        capacity (:obj:`int`): The maximum number of tokens (burst).
+        max_rate (:obj:`float`): The maximum rate to recover to after
+            successful queries. Set higher than rate to probe for the real
+            limit. Defaults to None (rate).
+        min_rate (:obj:`float`): The minimum rate to back off to. Defaults to
+            None (rate / 8).
+    """
+
+    def __init__(self, rate, capacity, max_rate=None, min_rate=None):
+
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.max_rate = float(max_rate or rate)
+        self.min_rate = float(min_rate or rate / 8.)
+
+        # Additive increase per successful query.
+        self.increase = self.rate / 20.
+
+        self.tokens = self.capacity
+        self.updated = time()
+        self.blocked_until = 0
+
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """
+        The function for adding the tokens accrued since the last update. The
+        lock must be held.
+
+        Args:
+            now (:obj:`float`): The current time.
+        """
+
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _wait_time(self, now):
+        """
+        The function for calculating the seconds until a token is available.
+        The lock must be held.
+
+        Args:
+            now (:obj:`float`): The current time.
+
+        Returns:
+            float: The seconds to wait, 0 if a token is available.
+        """
+
+        self._refill(now)
+        wait = max(0, self.blocked_until - now)
+
+        if self.tokens < 1:
+
+            wait = max(wait, (1 - self.tokens) / self.rate)
+
+        return wait
+
+    def wait_time(self):
+        """
+        The function for calculating the seconds until a token is available,
+        without taking it.
+
+        Returns:
+            float: The seconds to wait, 0 if a token is available.
+        """
+
+        with self._lock:
+
+            return self._wait_time(time())
+
+    def acquire(self, blocking=True):
+        """
+        The function for taking a token.
+
+        Args:
+            blocking (:obj:`bool`): Whether to sleep until a token is
+                available. Defaults to True.
+
+        Returns:
+            bool: True if a token was taken, False if not blocking and none
+                was available.
+        """
+
+        while True:
+
+            with self._lock:
+
+                wait = self._wait_time(time())
+
+                if wait <= 0:
+
+                    self.tokens -= 1
+                    return True
+
+            if not blocking:
+
+                return False
+
+            sleep(wait)
+
+    def penalize(self, retry_after=None):
+        """
+        The function for backing off after a rate limit notice. Halves the
+        rate and empties the bucket.
+
+        Args:
+            retry_after (:obj:`int`): The seconds the server requested to wait
+                (e.g., the Retry-After header). Defaults to None.
+        """
+
+        with self._lock:
+
+            now = time()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2.)
+            self.tokens = min(self.tokens, 0)
+
+            if retry_after:
+
+                self.blocked_until = max(self.blocked_until,
+                                         now + retry_after)
+
+    def reward(self):
+        """
+        The function for recovering the rate after a successful query.
+        """
+
+        with self._lock:
+
+            self._refill(time())
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+class RateLimiter:
+    """
+    The class for rate limiting queries with a token bucket per registry and
+    proxy opener. May be shared across threads, and Net/IPWhois objects.
+
+    Args:
+        limits (:obj:`dict`): Mapping of RATE_LIMITS keys to (rate, capacity)
+            or (rate, capacity, max_rate) tuples, overriding the defaults.
+            Defaults to None.
+    """
+
+    def __init__(self, limits=None):
+
+        self.limits = RATE_LIMITS.copy()
+
+        if limits:
+
+            self.limits.update(limits)
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get_bucket(self, registry, opener=None):
+        """
+        The function for retrieving (or creating) the token bucket for a
+        registry and proxy opener.
+
+        Args:
+            registry (:obj:`str`): The registry key.
+            opener (:obj:`urllib.request.OpenerDirector`): The proxy opener,
+                each has its own buckets. Defaults to None.
+
+        Returns:
+            TokenBucket: The token bucket.
+        """
+
+        key = (registry, opener)
+
+        try:
+
+            return self._buckets[key]
+
+        except KeyError:
+
+            with self._lock:
+
+                if key not in self._buckets:
+
+                    self._buckets[key] = TokenBucket(*self.limits.get(
+                        registry, self.limits['other']))
+
+                return self._buckets[key]
+
+    def wait_time(self, registry, opener=None):
+        """
+        The function for calculating the seconds until a query to a registry
+        is allowed.
+
+        Args:
+            registry (:obj:`str`): The registry key.
+            opener (:obj:`urllib.request.OpenerDirector`): The proxy opener.
+                Defaults to None.
+
+        Returns:
+            float: The seconds to wait, 0 if a query is allowed now.
+        """
+
+        return self.get_bucket(registry, opener).wait_time()
+
+    def acquire(self, registry, opener=None, blocking=True):
+        """
+        The function for taking a token before a query to a registry.
+
+        Args:
+            registry (:obj:`str`): The registry key.
+            opener (:obj:`urllib.request.OpenerDirector`): The proxy opener.
+                Defaults to None.
+            blocking (:obj:`bool`): Whether to sleep until allowed. Defaults
+                to True.
+
+        Returns:
+            bool: True if allowed, False if not blocking and not allowed.
+        """
+
+        return self.get_bucket(registry, opener).acquire(blocking)
+
+    def penalize(self, registry, opener=None, retry_after=None):
+        """
+        The function for backing off a registry after a rate limit notice.
+
+        Args:
+            registry (:obj:`str`): The registry key.
+            opener (:obj:`urllib.request.OpenerDirector`): The proxy opener.
+                Defaults to None.
+            retry_after (:obj:`int`): The seconds the server requested to
+                wait. Defaults to None.
+        """
+
+        log.debug('Rate limit backoff for {0}'.format(registry))
+        self.get_bucket(registry, opener).penalize(retry_after)
+
+    def reward(self, registry, opener=None):
+        """
+        The function for recovering a registry rate after a successful query.
+
+        Args:
+            registry (:obj:`str`): The registry key.
+            opener (:obj:`urllib.request.OpenerDirector`): The proxy opener.
+                Defaults to None.
+        """
+
+        self.get_bucket(registry, opener).reward()
+
+    def acquire_url(self, url, opener=None):
+        """
+        The function for taking a token before an HTTP query, mapping the
+        URL to its registry. Blocks until allowed.
+
+        Args:
+            url (:obj:`str`): The URL to be queried.
+            opener (:obj:`urllib.request.OpenerDirector`): The proxy opener.
+                Defaults to None.
+        """
+
+        self.acquire(get_registry_key(url=url), opener)
+
+    def penalize_url(self, url, opener=None, retry_after=None):
+        """
+        The function for backing off the registry of a URL after a rate limit
+        notice.
+
+        Args:
+            url (:obj:`str`): The URL that was rate limited.
+            opener (:obj:`urllib.request.OpenerDirector`): The proxy opener.
+                Defaults to None.
+            retry_after (:obj:`int`): The seconds the server requested to
+                wait. Defaults to None.
+        """
+
+        self.penalize(get_registry_key(url=url), opener, retry_after)
+
+    def reward_url(self, url, opener=None):
+        """
+        The function for recovering the registry rate of a URL after a
+        successful query.
+
+        Args:
+            url (:obj:`str`): The URL that was queried.
+            opener (:obj:`urllib.request.OpenerDirector`): The proxy opener.
+                Defaults to None.
+        """
+
+        self.reward(get_registry_key(url=url), opener)
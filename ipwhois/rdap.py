@@ -22,18 +22,36 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
-from . import (Net, NetError, InvalidEntityContactObject, InvalidNetworkObject,
-               InvalidEntityObject, HTTPLookupError)
-from .utils import ipv4_lstrip_zeros, calculate_cidr, unique_everseen
-from .net import ip_address
+from .exceptions import (NetError, InvalidEntityContactObject,
+                         InvalidNetworkObject, InvalidEntityObject,
+                         HTTPLookupError)
+from .utils import (ipv4_lstrip_zeros, calculate_cidr, unique_everseen,
+                    json_loads)
+from .net import (Net, ip_address)
 import logging
 import json
-from collections import namedtuple
+from collections import (namedtuple, deque)
+from itertools import islice
+
+try:  # pragma: no cover
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # pragma: no cover
+    ThreadPoolExecutor = None
+
+# ProcessPoolExecutor, for parse_rdap_batch(), is only imported on first
+# access (Python 3.7+).
+try:  # pragma: no cover
+    import concurrent.futures as futures
+except ImportError:  # pragma: no cover
+    futures = None
 
 log = logging.getLogger(__name__)
 
 BOOTSTRAP_URL = 'https://rdap-bootstrap.arin.net/bootstrap'
 
+# The number of responses sent to each parse_rdap_batch() process at once.
+PARSE_BATCH_CHUNK_SIZE = 256
+
 RIR_RDAP = {
     'arin': {
         'ip_url': 'https://rdap.arin.net/registry/ip/{0}',
@@ -58,6 +76,38 @@ RIR_RDAP = {
 }
 
 
+# Common vcard type parameter labels (RFC 6350), shared across results
+# rather than a copy per contact.
+VCARD_TYPES = dict((label, label) for label in (
+    'work', 'home', 'voice', 'fax', 'cell', 'text', 'video', 'pager',
+    'textphone', 'internet', 'pref'
+))
+
+
+def _intern_vcard_type(value_type):
+    """
+    The function for sharing the common labels of a vcard type parameter.
+
+    Args:
+        value_type (:obj:`str` or :obj:`list`): The type parameter.
+
+    Returns:
+        str or list: The type parameter, with common labels shared. Lists
+            are copied.
+    """
+
+    if isinstance(value_type, list):
+
+        return [VCARD_TYPES.get(label, label) if isinstance(label, str)
+                else label for label in value_type]
+
+    if isinstance(value_type, str):
+
+        return VCARD_TYPES.get(value_type, value_type)
+
+    return value_type
+
+
 class _RDAPContact:
     """
     The class for parsing RDAP entity contact information objects:
@@ -110,43 +160,48 @@ class _RDAPContact:
 
         self.vars['kind'] = val[3].strip()
 
-    def _parse_address(self, val):
+    def _parse_typed(self, key, val, value):
         """
-        The function for parsing the vcard address.
+        The function for adding a typed vcard value (address, phone or
+        email) to the vars list for key.
 
         Args:
+            key (:obj:`str`): The vars key.
             val (:obj:`list`): The value to parse.
+            value (:obj:`str`): The parsed value.
         """
 
-        ret = {
-            'type': None,
-            'value': None
-        }
+        params = val[1]
+        value_type = None
+        if isinstance(params, dict):
 
-        try:
+            value_type = _intern_vcard_type(params.get('type'))
 
-            ret['type'] = val[1]['type']
-
-        except (KeyError, ValueError, TypeError):
+        values = self.vars[key]
+        if values is None:
 
-                pass
+            values = self.vars[key] = []
 
-        try:
+        values.append({'type': value_type, 'value': value})
 
-            ret['value'] = val[1]['label']
+    def _parse_address(self, val):
+        """
+        The function for parsing the vcard address.
 
-        except (KeyError, ValueError, TypeError):
+        Args:
+            val (:obj:`list`): The value to parse.
+        """
 
-            ret['value'] = '\n'.join(val[3]).strip()
+        params = val[1]
+        if isinstance(params, dict) and 'label' in params:
 
-        try:
+            value = params['label']
 
-            self.vars['address'].append(ret)
+        else:
 
-        except AttributeError:
+            value = '\n'.join(val[3]).strip()
 
-            self.vars['address'] = []
-            self.vars['address'].append(ret)
+        self._parse_typed('address', val, value)
 
     def _parse_phone(self, val):
         """
@@ -156,29 +211,7 @@ class _RDAPContact:
             val (:obj:`list`): The value to parse.
         """
 
-        ret = {
-            'type': None,
-            'value': None
-        }
-
-        try:
-
-            ret['type'] = val[1]['type']
-
-        except (IndexError, KeyError, ValueError, TypeError):
-
-                pass
-
-        ret['value'] = val[3].strip()
-
-        try:
-
-            self.vars['phone'].append(ret)
-
-        except AttributeError:
-
-            self.vars['phone'] = []
-            self.vars['phone'].append(ret)
+        self._parse_typed('phone', val, val[3].strip())
 
     def _parse_email(self, val):
         """
@@ -188,29 +221,7 @@ class _RDAPContact:
             val (:obj:`list`): The value to parse.
         """
 
-        ret = {
-            'type': None,
-            'value': None
-        }
-
-        try:
-
-            ret['type'] = val[1]['type']
-
-        except (KeyError, ValueError, TypeError):
-
-                pass
-
-        ret['value'] = val[3].strip()
-
-        try:
-
-            self.vars['email'].append(ret)
-
-        except AttributeError:
-
-            self.vars['email'] = []
-            self.vars['email'].append(ret)
+        self._parse_typed('email', val, val[3].strip())
 
     def _parse_role(self, val):
         """
@@ -232,27 +243,38 @@ class _RDAPContact:
 
         self.vars['title'] = val[3].strip()
 
+    # The vcard property parsers, by property name.
+    PARSERS = {
+        'fn': _parse_name,
+        'kind': _parse_kind,
+        'adr': _parse_address,
+        'tel': _parse_phone,
+        'email': _parse_email,
+        'role': _parse_role,
+        'title': _parse_title
+    }
+
     def parse(self):
         """
         The function for parsing the vcard to the vars dictionary.
         """
 
-        keys = {
-            'fn': self._parse_name,
-            'kind': self._parse_kind,
-            'adr': self._parse_address,
-            'tel': self._parse_phone,
-            'email': self._parse_email,
-            'role': self._parse_role,
-            'title': self._parse_title
-        }
+        parsers = self.PARSERS
 
         for val in self.vcard:
 
+            # Properties are lists: [name, parameters, value type, value].
+            if not isinstance(val, list) or not val:
+
+                continue
+
             try:
 
-                parser = keys.get(val[0])
-                parser(val)
+                parser = parsers.get(val[0])
+
+                if parser is not None:
+
+                    parser(self, val)
 
             except (KeyError, ValueError, TypeError):
 
@@ -689,17 +711,128 @@ class RDAP:
             raise NetError('The provided net parameter is not an instance of '
                            'ipwhois.net.Net')
 
-    def _get_entity(self, entity=None, roles=None, inc_raw=False, retry_count=3,
-                    asn_data=None, bootstrap=False, rate_limit_timeout=120):
+    def _get_entity_url(self, entity=None, asn_data=None, bootstrap=False):
         """
-        The function for retrieving and parsing information for an entity via
-        RDAP (HTTP).
+        The function for generating the RDAP (HTTP) URL for an entity.
 
         Args:
             entity (:obj:`str`): The entity name to lookup.
+            asn_data (:obj:`dict`): Result from
+                :obj:`ipwhois.asn.IPASN.lookup`. Optional if the bootstrap
+                parameter is True.
+            bootstrap (:obj:`bool`): If True, generates the ARIN bootstrap
+                URL rather than the URL based on ASN data. Defaults to False.
+
+        Returns:
+            str: The entity URL.
+        """
+
+        if bootstrap:
+
+            return '{0}/entity/{1}'.format(BOOTSTRAP_URL, entity)
+
+        entity_url = RIR_RDAP[asn_data['asn_registry']]['entity_url']
+        return str(entity_url).format(entity)
+
+    def _parse_entity(self, entity=None, response=None, roles=None,
+                      inc_raw=False, entity_vars=None):
+        """
+        The function for parsing an RDAP entity query response. The roles
+        mapping is updated with any sub-entity roles found.
+
+        Args:
+            entity (:obj:`str`): The entity name that was queried.
+            response (:obj:`dict`): The JSON response from the entity query.
             roles (:obj:`dict`): The mapping of entity handles to roles.
             inc_raw (:obj:`bool`, optional): Whether to include the raw
                 results in the returned dictionary. Defaults to False.
+            entity_vars (:obj:`dict`): The ipwhois.rdap._RDAPEntity vars
+                previously parsed from response (e.g., cached). If provided,
+                response is not parsed again. Defaults to None.
+
+        Returns:
+            dict: Consists of the fields listed in the
+                ipwhois.rdap._RDAPEntity dict. Empty if the response is not a
+                valid entity object.
+        """
+
+        if entity_vars is None:
+
+            try:
+
+                # Parse the entity
+                result_ent = _RDAPEntity(response)
+                result_ent.parse()
+
+            except InvalidEntityObject:
+
+                return {}
+
+            entity_vars = result_ent.vars
+
+        result = entity_vars
+
+        result['roles'] = None
+        try:
+
+            result['roles'] = roles[entity]
+
+        except KeyError:  # pragma: no cover
+
+            pass
+
+        try:
+
+            for tmp in response['entities']:
+
+                if tmp['handle'] not in roles:
+                    roles[tmp['handle']] = tmp['roles']
+
+        except (IndexError, KeyError):
+
+            pass
+
+        if inc_raw:
+            result['raw'] = response
+
+        return result
+
+    def _cache_entity(self, entity_cache, registry, entity, result,
+                      response):
+        """
+        The function for storing a parsed entity in an entity cache.
+
+        Args:
+            entity_cache (:obj:`ipwhois.cache.EntityCache`): The cache.
+            registry (:obj:`str`): The registry (asn_registry, or
+                'bootstrap').
+            entity (:obj:`str`): The entity name that was queried.
+            result (:obj:`dict`): The result from _parse_entity(), empty if
+                the response is not a valid entity object.
+            response (:obj:`dict`): The JSON response from the entity query.
+        """
+
+        if result:
+
+            # The raw response is stored separately.
+            entity_vars = result.copy()
+            entity_vars['raw'] = None
+            entity_cache.set(registry, entity, entity_vars, response)
+
+        else:
+
+            entity_cache.set_failed(registry, entity)
+
+    def _fetch_entity(self, entity=None, retry_count=3, asn_data=None,
+                      bootstrap=False, rate_limit_timeout=120,
+                      entity_cache=None):
+        """
+        The function for retrieving the response for an entity via RDAP
+        (HTTP), or from an entity cache. This does not parse the response,
+        and is safe to run concurrently.
+
+        Args:
+            entity (:obj:`str`): The entity name to lookup.
             retry_count (:obj:`int`): The number of times to retry in case
                 socket errors, timeouts, connection resets, etc. are
                 encountered. Defaults to 3.
@@ -712,25 +845,32 @@ class RDAP:
             rate_limit_timeout (:obj:`int`): The number of seconds to wait
                 before retrying when a rate limit notice is returned via
                 rdap+json. Defaults to 120.
+            entity_cache (:obj:`ipwhois.cache.EntityCache`): If provided,
+                cached entities are not retrieved, and failed lookups are
+                cached. Defaults to None.
 
         Returns:
             namedtuple:
 
-            :result (dict): Consists of the fields listed in the
-                ipwhois.rdap._RDAPEntity dict. The raw result is included for
-                each object if the inc_raw parameter is True.
-            :roles (dict): The mapping of entity handles to roles.
+            :vars (dict): The ipwhois.rdap._RDAPEntity vars, only set if
+                retrieved from entity_cache.
+            :response (dict): The entity JSON response, None if the lookup
+                failed.
         """
 
-        result = {}
+        return_tuple = namedtuple('return_tuple', ['vars', 'response'])
 
-        if bootstrap:
-            entity_url = '{0}/entity/{1}'.format(
-                BOOTSTRAP_URL, entity)
-        else:
-            tmp_reg = asn_data['asn_registry']
-            entity_url = RIR_RDAP[tmp_reg]['entity_url']
-            entity_url = str(entity_url).format(entity)
+        registry = 'bootstrap' if bootstrap else asn_data['asn_registry']
+        if entity_cache is not None:
+
+            cached = entity_cache.get(registry, entity)
+
+            if cached is not None:
+
+                return return_tuple(cached.vars, cached.response)
+
+        entity_url = self._get_entity_url(entity=entity, asn_data=asn_data,
+                                          bootstrap=bootstrap)
 
         try:
 
@@ -740,44 +880,113 @@ class RDAP:
                 rate_limit_timeout=rate_limit_timeout
             )
 
-            # Parse the entity
-            result_ent = _RDAPEntity(response)
-            result_ent.parse()
-            result = result_ent.vars
+        except HTTPLookupError:
 
-            result['roles'] = None
-            try:
+            if entity_cache is not None:
 
-                result['roles'] = roles[entity]
+                entity_cache.set_failed(registry, entity)
 
-            except KeyError:  # pragma: no cover
+            response = None
 
-                pass
+        return return_tuple(None, response)
 
-            try:
+    def _parse_fetched_entity(self, entity=None, fetched=None, roles=None,
+                              inc_raw=False, registry=None,
+                              entity_cache=None):
+        """
+        The function for parsing an entity returned by _fetch_entity(),
+        storing newly retrieved entities in the entity cache. The roles
+        mapping is updated with any sub-entity roles found.
 
-                for tmp in response['entities']:
+        Args:
+            entity (:obj:`str`): The entity name that was queried.
+            fetched (:obj:`tuple`): (vars, response) from _fetch_entity().
+            roles (:obj:`dict`): The mapping of entity handles to roles.
+            inc_raw (:obj:`bool`, optional): Whether to include the raw
+                results in the returned dictionary. Defaults to False.
+            registry (:obj:`str`): The registry (asn_registry, or
+                'bootstrap').
+            entity_cache (:obj:`ipwhois.cache.EntityCache`): The entity cache.
+                Defaults to None.
 
-                    if tmp['handle'] not in roles:
-                        roles[tmp['handle']] = tmp['roles']
+        Returns:
+            dict: Consists of the fields listed in the
+                ipwhois.rdap._RDAPEntity dict. Empty if the lookup failed.
+        """
 
-            except (IndexError, KeyError):
+        entity_vars, response = fetched
 
-                pass
+        if response is None:
 
-            if inc_raw:
-                result['raw'] = response
+            return {}
 
-        except (HTTPLookupError, InvalidEntityObject):
+        result = self._parse_entity(entity=entity, response=response,
+                                    roles=roles, inc_raw=inc_raw,
+                                    entity_vars=entity_vars)
 
-            pass
+        if entity_cache is not None and entity_vars is None:
+
+            self._cache_entity(entity_cache, registry, entity, result,
+                               response)
+
+        return result
+
+    def _get_entity(self, entity=None, roles=None, inc_raw=False, retry_count=3,
+                    asn_data=None, bootstrap=False, rate_limit_timeout=120,
+                    entity_cache=None):
+        """
+        The function for retrieving and parsing information for an entity via
+        RDAP (HTTP).
+
+        Args:
+            entity (:obj:`str`): The entity name to lookup.
+            roles (:obj:`dict`): The mapping of entity handles to roles.
+            inc_raw (:obj:`bool`, optional): Whether to include the raw
+                results in the returned dictionary. Defaults to False.
+            retry_count (:obj:`int`): The number of times to retry in case
+                socket errors, timeouts, connection resets, etc. are
+                encountered. Defaults to 3.
+            asn_data (:obj:`dict`): Result from
+                :obj:`ipwhois.asn.IPASN.lookup`. Optional if the bootstrap
+                parameter is True.
+            bootstrap (:obj:`bool`): If True, performs lookups via ARIN
+                bootstrap rather than lookups based on ASN data. Defaults to
+                False.
+            rate_limit_timeout (:obj:`int`): The number of seconds to wait
+                before retrying when a rate limit notice is returned via
+                rdap+json. Defaults to 120.
+            entity_cache (:obj:`ipwhois.cache.EntityCache`): If provided,
+                parsed entities are retrieved from and stored in this cache.
+                Defaults to None.
+
+        Returns:
+            namedtuple:
+
+            :result (dict): Consists of the fields listed in the
+                ipwhois.rdap._RDAPEntity dict. The raw result is included for
+                each object if the inc_raw parameter is True.
+            :roles (dict): The mapping of entity handles to roles.
+        """
+
+        fetched = self._fetch_entity(
+            entity=entity, retry_count=retry_count, asn_data=asn_data,
+            bootstrap=bootstrap, rate_limit_timeout=rate_limit_timeout,
+            entity_cache=entity_cache
+        )
+
+        result = self._parse_fetched_entity(
+            entity=entity, fetched=fetched, roles=roles, inc_raw=inc_raw,
+            registry='bootstrap' if bootstrap else asn_data['asn_registry'],
+            entity_cache=entity_cache
+        )
 
         return_tuple = namedtuple('return_tuple', ['result', 'roles'])
         return return_tuple(result, roles)
 
     def lookup(self, inc_raw=False, retry_count=3, asn_data=None, depth=0,
                excluded_entities=None, response=None, bootstrap=False,
-               rate_limit_timeout=120, root_ent_check=True):
+               rate_limit_timeout=120, root_ent_check=True, cache=None,
+               entity_cache=None, max_workers=None):
         """
         The function for retrieving and parsing information for an IP
         address via RDAP (HTTP).
@@ -806,6 +1015,18 @@ class RDAP:
             root_ent_check (:obj:`bool`): If True, will perform
                 additional RDAP HTTP queries for missing entity data at the
                 root level. Defaults to True.
+            cache (:obj:`ipwhois.cache.PrefixCache`): If provided, results
+                for an address within a previously returned network are
+                answered from the cache, and new results are cached. Not
+                used when response is provided. Defaults to None.
+            entity_cache (:obj:`ipwhois.cache.EntityCache`): If provided,
+                parsed entities are retrieved from and stored in this cache,
+                which may be shared across lookups. Defaults to None, which
+                uses the session entity cache of the Net object, if any.
+            max_workers (:obj:`int`): If greater than 1, the entities at each
+                level (root_ent_check, then each depth) are retrieved
+                concurrently using a thread pool of this size. Results are
+                the same as serial retrieval. Defaults to None (serial).
 
         Returns:
             dict: The IP RDAP lookup results
@@ -831,6 +1052,23 @@ class RDAP:
 
             excluded_entities = []
 
+        if entity_cache is None and self._net.session is not None:
+
+            entity_cache = self._net.session.entity_cache
+
+        use_cache = cache is not None and response is None
+        if use_cache:
+
+            cache_namespace = ('rdap', inc_raw, depth,
+                               tuple(excluded_entities), bootstrap,
+                               root_ent_check)
+            results = cache.get_result(self._net.address_str,
+                                       namespace=cache_namespace)
+
+            if results is not None:
+
+                return results
+
         # Create the return dictionary.
         results = {
             'query': self._net.address_str,
@@ -873,28 +1111,81 @@ class RDAP:
         results['objects'] = {}
         roles = {}
 
-        # Iterate through and parse the root level entities.
-        log.debug('Parsing RDAP root level entities')
+        # Entities are retrieved (serially, or concurrently if max_workers
+        # is set), then parsed in order so results are deterministic.
+        fetch_kwargs = {
+            'retry_count': retry_count,
+            'asn_data': asn_data,
+            'bootstrap': bootstrap,
+            'rate_limit_timeout': rate_limit_timeout,
+            'entity_cache': entity_cache
+        }
+        parse_kwargs = {
+            'roles': roles,
+            'inc_raw': inc_raw,
+            'registry': 'bootstrap' if bootstrap else asn_data['asn_registry'],
+            'entity_cache': entity_cache
+        }
+
+        executor = None
+        if max_workers and max_workers > 1 and ThreadPoolExecutor:
+
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        def fetch_entities(entities):
+
+            if executor is None:
+
+                return [self._fetch_entity(entity=ent, **fetch_kwargs)
+                        for ent in entities]
+
+            return list(executor.map(
+                lambda ent: self._fetch_entity(entity=ent, **fetch_kwargs),
+                entities
+            ))
+
         try:
 
-            for ent in response['entities']:
+            # Iterate through and parse the root level entities.
+            log.debug('Parsing RDAP root level entities')
+            try:
+
+                root_ents = [ent for ent in response['entities'] if
+                             ent['handle'] not in [results['entities'],
+                                                   excluded_entities]]
 
-                if ent['handle'] not in [results['entities'],
-                                         excluded_entities]:
+            except KeyError:
 
-                    if 'vcardArray' not in ent and root_ent_check:
-                        entity_object, roles = self._get_entity(
-                            entity=ent['handle'],
-                            roles=roles,
-                            inc_raw=inc_raw,
-                            retry_count=retry_count,
-                            asn_data=asn_data,
-                            bootstrap=bootstrap,
-                            rate_limit_timeout=rate_limit_timeout
+                root_ents = []
+
+            # The root level entities missing vcard data, each only retrieved
+            # once.
+            fetch = []
+            for ent in root_ents:
+
+                if ('vcardArray' not in ent and root_ent_check and
+                        ent['handle'] not in fetch):
+
+                    fetch.append(ent['handle'])
+
+            fetched = dict(zip(fetch, fetch_entities(fetch)))
+
+            try:
+
+                for ent in root_ents:
+
+                    if ent['handle'] in fetched:
+
+                        results['objects'][ent['handle']] = (
+                            self._parse_fetched_entity(
+                                entity=ent['handle'],
+                                fetched=fetched[ent['handle']],
+                                **parse_kwargs
+                            )
                         )
-                        results['objects'][ent['handle']] = entity_object
 
                     else:
+
                         result_ent = _RDAPEntity(ent)
                         result_ent.parse()
 
@@ -912,51 +1203,234 @@ class RDAP:
 
                         pass
 
-        except KeyError:
+            except KeyError:
 
-            pass
+                pass
 
-        # Iterate through to the defined depth, retrieving and parsing all
-        # unique entities.
-        temp_objects = results['objects']
+            # Iterate through to the defined depth, retrieving and parsing all
+            # unique entities.
+            temp_objects = results['objects']
 
-        if depth > 0 and len(temp_objects) > 0:
+            if depth > 0 and len(temp_objects) > 0:
 
-            log.debug('Parsing RDAP sub-entities to depth: {0}'.format(str(
-                depth)))
+                log.debug('Parsing RDAP sub-entities to depth: {0}'.format(
+                    str(depth)))
 
-        while depth > 0 and len(temp_objects) > 0:
+            while depth > 0 and len(temp_objects) > 0:
 
-            new_objects = {}
-            for obj in temp_objects.values():
+                # The unique entities for this level.
+                level = []
+                for obj in temp_objects.values():
 
-                try:
+                    try:
 
-                    for ent in obj['entities']:
+                        for ent in obj['entities']:
 
-                        if ent not in (list(results['objects'].keys()) +
-                                       list(new_objects.keys()) +
-                                       excluded_entities):
+                            if ent not in (list(results['objects'].keys()) +
+                                           level + excluded_entities):
 
-                            entity_object, roles = self._get_entity(
-                                entity=ent,
-                                roles=roles,
-                                inc_raw=inc_raw,
-                                retry_count=retry_count,
-                                asn_data=asn_data,
-                                bootstrap=bootstrap,
-                                rate_limit_timeout=rate_limit_timeout
-                            )
-                            new_objects[ent] = entity_object
+                                level.append(ent)
+
+                    except (KeyError, TypeError):
+
+                        pass
 
-                except (KeyError, TypeError):
+                new_objects = {}
+                for ent, ent_fetched in zip(level, fetch_entities(level)):
 
-                    pass
+                    new_objects[ent] = self._parse_fetched_entity(
+                        entity=ent, fetched=ent_fetched, **parse_kwargs
+                    )
 
-            # Update the result objects, and set the new temp object list to
-            # iterate for the next depth of entities.
-            results['objects'].update(new_objects)
-            temp_objects = new_objects
-            depth -= 1
+                # Update the result objects, and set the new temp object list
+                # to iterate for the next depth of entities.
+                results['objects'].update(new_objects)
+                temp_objects = new_objects
+                depth -= 1
+
+        finally:
+
+            if executor is not None:
+
+                executor.shutdown()
+
+        if use_cache:
+
+            cache.set_result(results, namespace=cache_namespace)
 
         return results
+
+
+def parse_rdap(response, query=None, inc_raw=False):
+    """
+    The function for parsing an RDAP IP address response without network
+    access, e.g., for re-parsing stored raw results (inc_raw). Root level
+    entities are parsed as included in the response, as with
+    RDAP.lookup(root_ent_check=False, depth=0).
+
+    Args:
+        response (:obj:`dict`): The RDAP IP address response, or its JSON
+            (:obj:`str` or :obj:`bytes`).
+        query (:obj:`str`): The IP address queried, for the query key.
+            Defaults to None.
+        inc_raw (:obj:`bool`, optional): Whether to include the raw
+            results in the returned dictionary. Defaults to False.
+
+    Returns:
+        dict: The IP RDAP lookup results, as with RDAP.lookup().
+
+    Raises:
+        InvalidNetworkObject: json_result is not a valid network object.
+        ValueError: response is not valid JSON.
+    """
+
+    if not isinstance(response, dict):
+
+        response = json_loads(response)
+
+    results = {
+        'query': query,
+        'network': None,
+        'entities': [],
+        'objects': {},
+        'raw': response if inc_raw else None
+    }
+
+    result_net = _RDAPNetwork(response)
+    result_net.parse()
+    results['network'] = result_net.vars
+
+    try:
+
+        root_ents = [(ent['handle'], ent) for ent in response['entities']]
+
+    except KeyError:
+
+        root_ents = []
+
+    for handle, ent in root_ents:
+
+        result_ent = _RDAPEntity(ent)
+        result_ent.parse()
+
+        results['objects'][handle] = result_ent.vars
+        results['entities'].append(handle)
+
+    return results
+
+
+def _parse_rdap_item(item, inc_raw=False):
+    """
+    The function for parsing a parse_rdap_batch() item, catching errors.
+
+    Args:
+        item (:obj:`dict` or :obj:`tuple`): The response, or (query,
+            response).
+        inc_raw (:obj:`bool`, optional): Whether to include the raw
+            results in the returned dictionary. Defaults to False.
+
+    Returns:
+        tuple: (results, error).
+    """
+
+    query = None
+    if isinstance(item, tuple):
+
+        query, item = item
+
+    try:
+
+        return parse_rdap(item, query=query, inc_raw=inc_raw), None
+
+    except Exception as e:
+
+        return None, e
+
+
+def _parse_rdap_chunk(chunk, inc_raw=False):
+    """
+    The function for parsing a chunk of parse_rdap_batch() items in a
+    process.
+
+    Args:
+        chunk (:obj:`list`): The items to parse.
+        inc_raw (:obj:`bool`, optional): Whether to include the raw
+            results in the returned dictionaries. Defaults to False.
+
+    Returns:
+        list: The (results, error) tuples, in order.
+    """
+
+    return [_parse_rdap_item(item, inc_raw) for item in chunk]
+
+
+def parse_rdap_batch(responses, inc_raw=False, processes=None,
+                     chunk_size=PARSE_BATCH_CHUNK_SIZE):
+    """
+    The generator for parsing many RDAP IP address responses with
+    parse_rdap(), without network access, optionally across a process
+    pool. Responses are sent to the processes in chunks, at most
+    processes * 2 chunks are pending, and results are yielded in the input
+    order.
+
+    Args:
+        responses (:obj:`iterable`): The RDAP IP address responses, as
+            dictionaries or JSON (:obj:`str` or :obj:`bytes`), or (query,
+            response) tuples to set the query key. May be a generator (e.g.,
+            the lines of a file).
+        inc_raw (:obj:`bool`, optional): Whether to include the raw
+            results in the returned dictionaries. Defaults to False.
+        processes (:obj:`int`): If greater than 1, the number of processes
+            to parse with. Defaults to None (parse in this process).
+        chunk_size (:obj:`int`): The number of responses sent to a process
+            at once. Defaults to PARSE_BATCH_CHUNK_SIZE.
+
+    Yields:
+        tuple: (results, error). results is the parse_rdap() results
+            dictionary, None if parsing failed with the exception error
+            (e.g., :obj:`ipwhois.exceptions.InvalidNetworkObject`).
+    """
+
+    items = iter(responses)
+
+    if not processes or processes < 2 or futures is None:
+
+        for item in items:
+
+            yield _parse_rdap_item(item, inc_raw)
+
+        return
+
+    executor = futures.ProcessPoolExecutor(max_workers=processes)
+    with executor:
+
+        pending = deque()
+        try:
+
+            while True:
+
+                # Backpressure, only read responses as chunks are yielded.
+                while len(pending) < processes * 2:
+
+                    chunk = list(islice(items, chunk_size))
+                    if not chunk:
+
+                        break
+
+                    pending.append(executor.submit(_parse_rdap_chunk, chunk,
+                                                   inc_raw))
+
+                if not pending:
+
+                    break
+
+                for ret in pending.popleft().result():
+
+                    yield ret
+
+        finally:
+
+            # The generator was closed early.
+            for future in pending:
+
+                future.cancel()
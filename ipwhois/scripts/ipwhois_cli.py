@@ -25,9 +25,16 @@
 # CLI python script interface for ipwhois.IPWhois lookups.
 
 import argparse
+import io
 import json
+import sys
+from itertools import islice
 from os import path
-from ipwhois import IPWhois
+from ipwhois import (IPWhois, Session)
+from ipwhois.experimental import (bulk_lookup_rdap, bulk_lookup_whois,
+                                  iter_lookups)
+from ipwhois.ratelimit import RateLimiter
+from ipwhois.utils import (json_dumps, unique_everseen)
 from ipwhois.hr import (HR_ASN, HR_RDAP, HR_RDAP_COMMON, HR_WHOIS,
                         HR_WHOIS_NIR)
 
@@ -281,15 +288,50 @@ group.add_argument(
          '\'contact_tech\']'
 )
 
+# Bulk (--input_file)
+group = parser.add_argument_group('Bulk settings (--input_file)')
+group.add_argument(
+    '--concurrency',
+    type=int,
+    default=4,
+    metavar='CONCURRENCY',
+    help='The number of concurrent lookups. If --bulk, the number of RIR '
+         'queues looked up concurrently (RDAP), or the number of concurrent '
+         'lookups per RIR whois server (--whois).'
+)
+group.add_argument(
+    '--bulk',
+    action='store_true',
+    help='Lookup batches of --bulk_size addresses with the experimental bulk '
+         'lookups (bulk_lookup_rdap(), or bulk_lookup_whois() if --whois), '
+         'which use bulk ASN lookups and de-duplicate addresses.'
+)
+group.add_argument(
+    '--bulk_size',
+    type=int,
+    default=1000,
+    metavar='BULK_SIZE',
+    help='If --bulk, the number of addresses to read and lookup at a time.'
+)
+
 # Input (required)
 group = parser.add_argument_group('Input (Required)')
-group.add_argument(
+input_group = group.add_mutually_exclusive_group(required=True)
+input_group.add_argument(
     '--addr',
     type=str,
     nargs=1,
     metavar='"IP"',
-    help='An IPv4 or IPv6 address as a string.',
-    required=True
+    help='An IPv4 or IPv6 address as a string.'
+)
+input_group.add_argument(
+    '--input_file',
+    type=str,
+    nargs=1,
+    metavar='"INPUT_FILE"',
+    help='A file of IPv4 or IPv6 addresses, one per line, or - for stdin. '
+         'Results are written to stdout as NDJSON (one JSON object per line) '
+         'as each lookup finishes, then the stats to stderr.'
 )
 
 # Get the args
@@ -339,6 +381,42 @@ def generate_output(line='0', short=None, name=None, value=None,
     return output
 
 
+def get_proxy_opener(proxy_http=None, proxy_https=None):
+    """
+    The function for building the proxy opener for lookups.
+
+    Args:
+        proxy_http (:obj:`str`): The proxy HTTP address or None.
+        proxy_https (:obj:`str`): The proxy HTTPS address or None.
+
+    Returns:
+        urllib.request.OpenerDirector: The proxy opener, None if no proxies
+            are provided.
+    """
+
+    handler_dict = None
+    if proxy_http is not None:
+
+        handler_dict = {'http': proxy_http}
+
+    if proxy_https is not None:
+
+        if handler_dict is None:
+
+            handler_dict = {'https': proxy_https}
+
+        else:
+
+            handler_dict['https'] = proxy_https
+
+    if handler_dict is None:
+
+        return None
+
+    handler = ProxyHandler(handler_dict)
+    return build_opener(handler)
+
+
 class IPWhoisCLI:
     """
     The CLI wrapper class for outputting formatted IPWhois results.
@@ -364,29 +442,7 @@ class IPWhoisCLI:
 
         self.addr = addr
         self.timeout = timeout
-
-        handler_dict = None
-        if proxy_http is not None:
-
-            handler_dict = {'http': proxy_http}
-
-        if proxy_https is not None:
-
-            if handler_dict is None:
-
-                handler_dict = {'https': proxy_https}
-
-            else:
-
-                handler_dict['https'] = proxy_https
-
-        if handler_dict is None:
-
-            self.opener = None
-        else:
-
-            handler = ProxyHandler(handler_dict)
-            self.opener = build_opener(handler)
+        self.opener = get_proxy_opener(proxy_http, proxy_https)
 
         self.obj = IPWhois(address=self.addr,
                            timeout=self.timeout,
@@ -1029,7 +1085,7 @@ class IPWhoisCLI:
 
         if script_args.json:
 
-            output = json.dumps(ret)
+            output = json_dumps(ret)
 
         else:
 
@@ -1379,7 +1435,7 @@ class IPWhoisCLI:
 
         if script_args.json:
 
-            output = json.dumps(ret)
+            output = json_dumps(ret)
 
         else:
 
@@ -1416,7 +1472,242 @@ class IPWhoisCLI:
         return output
 
 
-if script_args.addr:
+def get_lookup_kwargs():
+    """
+    The function for the IPWhois.lookup_rdap() or lookup_whois() (if
+    --whois) arguments from the CLI arguments.
+
+    Returns:
+        dict: The lookup arguments.
+    """
+
+    kwargs = {
+        'inc_raw': script_args.inc_raw,
+        'retry_count': script_args.retry_count,
+        'extra_org_map': script_args.extra_org_map,
+        'inc_nir': (not script_args.exclude_nir),
+        'nir_field_list': script_args.nir_field_list.split(',') if (
+            script_args.nir_field_list and
+            len(script_args.nir_field_list) > 0) else None,
+        'asn_methods': script_args.asn_methods.split(',') if (
+            script_args.asn_methods and
+            len(script_args.asn_methods) > 0) else None,
+        'get_asn_description': (not script_args.skip_asn_description)
+    }
+
+    if script_args.whois:
+
+        kwargs.update({
+            'get_referral': script_args.get_referral,
+            'extra_blacklist': script_args.extra_blacklist.split(',') if (
+                script_args.extra_blacklist and
+                len(script_args.extra_blacklist) > 0) else None,
+            'ignore_referral_errors': script_args.ignore_referral_errors,
+            'field_list': script_args.field_list.split(',') if (
+                script_args.field_list and
+                len(script_args.field_list) > 0) else None
+        })
+
+    else:
+
+        kwargs.update({
+            'depth': script_args.depth,
+            'excluded_entities': script_args.excluded_entities.split(',') if (
+                script_args.excluded_entities and
+                len(script_args.excluded_entities) > 0) else None,
+            'bootstrap': script_args.bootstrap,
+            'rate_limit_timeout': script_args.rate_limit_timeout
+        })
+
+    return kwargs
+
+
+def merge_stats(total, stats):
+    """
+    The function for adding bulk lookup stats to the totals of a run.
+
+    Args:
+        total (:obj:`dict`): The stats totals, updated.
+        stats (:obj:`dict`): The stats to add.
+    """
+
+    for key, value in stats.items():
+
+        if isinstance(value, dict):
+
+            merge_stats(total.setdefault(key, {}), value)
+
+        elif isinstance(value, list):
+
+            total.setdefault(key, []).extend(value)
+
+        else:
+
+            total[key] = total.get(key, 0) + value
+
+
+def iter_input(input_file):
+    """
+    The generator for reading the addresses of --input_file, line by line.
+
+    Args:
+        input_file (:obj:`str`): The file path, or - for stdin.
+
+    Yields:
+        str: The addresses.
+    """
+
+    f = sys.stdin if input_file == '-' else io.open(input_file, 'r')
+
+    try:
+
+        for line in f:
+
+            line = line.strip()
+            if line:
+
+                yield line
+
+    finally:
+
+        if f is not sys.stdin:
+
+            f.close()
+
+
+def write_record(record):
+    """
+    The function for writing a NDJSON record to stdout.
+
+    Args:
+        record (:obj:`dict`): The lookup results, or error.
+    """
+
+    sys.stdout.write(json_dumps(record) + '\n')
+    sys.stdout.flush()
+
+
+def run_input_file(input_file):
+    """
+    The function for looking up the addresses of --input_file, writing each
+    result to stdout as NDJSON, then the stats to stderr.
+
+    Args:
+        input_file (:obj:`str`): The file path, or - for stdin.
+    """
+
+    kwargs = get_lookup_kwargs()
+    opener = get_proxy_opener(
+        script_args.proxy_http if (
+            script_args.proxy_http and len(script_args.proxy_http) > 0
+        ) else None,
+        script_args.proxy_https if (
+            script_args.proxy_https and len(script_args.proxy_https) > 0
+        ) else None
+    )
+    addresses = iter_input(input_file)
+
+    if script_args.bulk:
+
+        if script_args.whois:
+
+            bulk_lookup = bulk_lookup_whois
+            kwargs.pop('extra_org_map')
+            kwargs.pop('asn_methods')
+            kwargs.pop('get_asn_description')
+
+        else:
+
+            bulk_lookup = bulk_lookup_rdap
+            kwargs = dict((k, v) for k, v in kwargs.items() if k in (
+                'inc_raw', 'retry_count', 'depth', 'excluded_entities',
+                'rate_limit_timeout', 'inc_nir', 'nir_field_list'))
+            kwargs['proxy_openers'] = [opener] if opener else None
+
+        total = {}
+        while True:
+
+            batch = list(islice(addresses, script_args.bulk_size))
+
+            if not batch:
+
+                break
+
+            try:
+
+                results, stats = bulk_lookup(
+                    addresses=batch, socket_timeout=script_args.timeout,
+                    max_workers=script_args.concurrency, **kwargs
+                )
+
+            except Exception as e:
+
+                # The batch failed (e.g., ASNLookupError), continue with the
+                # next one.
+                unique = list(unique_everseen(batch))
+                for address in unique:
+
+                    write_record({'query': address, 'error': '{0}: {1}'.format(
+                        e.__class__.__name__, e)})
+
+                merge_stats(total, {
+                    'ip_input_total': len(batch),
+                    'ip_unique_total': len(unique),
+                    'ip_failed_total': len(unique),
+                    'errors': {e.__class__.__name__: len(unique)}
+                })
+                continue
+
+            for address in unique_everseen(batch):
+
+                if address in results:
+
+                    write_record(results[address])
+
+                else:
+
+                    write_record({'query': address, 'error': (
+                        'Unallocated or ASN lookup failed.' if
+                        address in stats['unallocated_addresses'] else
+                        'Lookup failed.'
+                    )})
+
+            merge_stats(total, stats)
+
+    else:
+
+        session = Session(timeout=script_args.timeout, proxy_opener=opener,
+                          rate_limiter=RateLimiter())
+        total = {}
+        try:
+
+            for address, results, error in iter_lookups(
+                addresses=addresses, whois=script_args.whois,
+                max_workers=script_args.concurrency, session=session,
+                stats=total, **kwargs
+            ):
+
+                if error is None:
+
+                    write_record(results)
+
+                else:
+
+                    write_record({'query': address, 'error': '{0}: {1}'.format(
+                        error.__class__.__name__, error)})
+
+        finally:
+
+            session.close()
+
+    sys.stderr.write(json_dumps(total) + '\n')
+
+
+if script_args.input_file:
+
+    run_input_file(script_args.input_file[0])
+
+elif script_args.addr:
 
     results = IPWhoisCLI(
         addr=script_args.addr[0],
@@ -1435,25 +1726,7 @@ if script_args.addr:
             hr=script_args.hr,
             show_name=script_args.show_name,
             colorize=script_args.colorize,
-            inc_raw=script_args.inc_raw,
-            retry_count=script_args.retry_count,
-            get_referral=script_args.get_referral,
-            extra_blacklist=script_args.extra_blacklist.split(',') if (
-                script_args.extra_blacklist and
-                len(script_args.extra_blacklist) > 0) else None,
-            ignore_referral_errors=script_args.ignore_referral_errors,
-            field_list=script_args.field_list.split(',') if (
-                script_args.field_list and
-                len(script_args.field_list) > 0) else None,
-            extra_org_map=script_args.extra_org_map,
-            inc_nir=(not script_args.exclude_nir),
-            nir_field_list=script_args.nir_field_list.split(',') if (
-                script_args.nir_field_list and
-                len(script_args.nir_field_list) > 0) else None,
-            asn_methods=script_args.asn_methods.split(',') if (
-                script_args.asn_methods and
-                len(script_args.asn_methods) > 0) else None,
-            get_asn_description=(not script_args.skip_asn_description)
+            **get_lookup_kwargs()
         ))
 
     else:
@@ -1462,21 +1735,5 @@ if script_args.addr:
             hr=script_args.hr,
             show_name=script_args.show_name,
             colorize=script_args.colorize,
-            inc_raw=script_args.inc_raw,
-            retry_count=script_args.retry_count,
-            depth=script_args.depth,
-            excluded_entities=script_args.excluded_entities.split(',') if (
-                script_args.excluded_entities and
-                len(script_args.excluded_entities) > 0) else None,
-            bootstrap=script_args.bootstrap,
-            rate_limit_timeout=script_args.rate_limit_timeout,
-            extra_org_map=script_args.extra_org_map,
-            inc_nir=(not script_args.exclude_nir),
-            nir_field_list=script_args.nir_field_list.split(',') if (
-                script_args.nir_field_list and
-                len(script_args.nir_field_list) > 0) else None,
-            asn_methods=script_args.asn_methods.split(',') if (
-                script_args.asn_methods and
-                len(script_args.asn_methods) > 0) else None,
-            get_asn_description=(not script_args.skip_asn_description)
+            **get_lookup_kwargs()
         ))
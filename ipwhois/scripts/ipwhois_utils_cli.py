@@ -179,7 +179,7 @@ elif script_args.get_country:
 
     try:
 
-        countries = get_countries()
+        countries = get_countries(frozen=True)
         result = countries[script_args.get_country[0].upper()]
 
         print('{0}Match found for country code ({1}){2}:\n{3}'.format(
@@ -0,0 +1,197 @@
+# Copyright (c) 2013-2024 Philip Hane
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import threading
+import logging
+
+from .cache import EntityCache
+from .net import (Net, _import_dns)
+from .ipwhois import IPWhois
+from .pool import (HTTPConnectionPool, KeepAliveHTTPHandler,
+                   KeepAliveHTTPSHandler)
+
+try:  # pragma: no cover
+    from urllib.request import (OpenerDirector,
+                                ProxyHandler,
+                                build_opener)
+except ImportError:  # pragma: no cover
+    from urllib2 import (OpenerDirector,
+                         ProxyHandler,
+                         build_opener)
+
+log = logging.getLogger(__name__)
+
+
+class Session:
+    """
+    The class for sharing lookup state across many addresses: the DNS
+    resolver, HTTP opener and connection pool, socket timeout, rate limiter,
+    caches and offline ASN table. Create one per long running worker, and
+    pass it to :obj:`ipwhois.net.Net` or :obj:`ipwhois.ipwhois.IPWhois`
+    (or use :obj:`ipwhois.session.Session.ipwhois`). IPASN, RDAP, Whois,
+    NIRWhois and ASNOrigin use the session of the Net object they are given.
+    Thread safe.
+
+    Args:
+        timeout (:obj:`int`): The default timeout for socket connections in
+            seconds. Defaults to 5.
+        proxy_opener (:obj:`urllib.request.OpenerDirector`): The request for
+            proxy support. Defaults to None.
+        http_pool (:obj:`ipwhois.pool.HTTPConnectionPool`): The keep-alive
+            connection pool for HTTP queries. Ignored if proxy_opener is
+            provided. Defaults to None, which creates a pool.
+        dns_resolver (:obj:`dns.resolver.Resolver`): The DNS resolver.
+            Defaults to None, which creates a resolver (with timeout) on the
+            first DNS query.
+        rate_limiter (:obj:`ipwhois.ratelimit.RateLimiter`): The rate limiter
+            for HTTP queries. Defaults to None.
+        cache (:obj:`ipwhois.cache.PrefixCache`): The cache for IPWhois
+            lookup results. Defaults to None.
+        entity_cache (:obj:`ipwhois.cache.EntityCache`): The cache for
+            parsed RDAP entities. Defaults to None, which creates an
+            EntityCache. Set to False to disable.
+        asn_table (:obj:`ipwhois.asntable.ASNTable`): The offline IP to ASN
+            table. Defaults to None.
+    """
+
+    def __init__(self, timeout=5, proxy_opener=None, http_pool=None,
+                 dns_resolver=None, rate_limiter=None, cache=None,
+                 entity_cache=None, asn_table=None):
+
+        self.timeout = timeout
+        self.proxy_opener = proxy_opener
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.asn_table = asn_table
+
+        if http_pool is None:
+
+            http_pool = HTTPConnectionPool()
+
+        self.http_pool = http_pool
+
+        if entity_cache is None:
+
+            entity_cache = EntityCache()
+
+        elif entity_cache is False:
+
+            entity_cache = None
+
+        self.entity_cache = entity_cache
+
+        self._dns_resolver = dns_resolver
+        self._opener = None
+
+        if isinstance(proxy_opener, OpenerDirector):
+
+            self._opener = proxy_opener
+
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+
+        return 'Session({0}, {1})'.format(str(self.timeout),
+                                          repr(self.proxy_opener))
+
+    @property
+    def dns_resolver(self):
+        """
+        dns.resolver.Resolver: The shared DNS resolver, created on first use
+            with the timeout unless provided.
+        """
+
+        with self._lock:
+
+            if self._dns_resolver is None:
+
+                dns = _import_dns()
+                dns_resolver = dns.resolver.Resolver()
+                dns_resolver.timeout = self.timeout
+                dns_resolver.lifetime = self.timeout
+                self._dns_resolver = dns_resolver
+
+        return self._dns_resolver
+
+    @property
+    def opener(self):
+        """
+        OpenerDirector: The shared opener for HTTP queries: proxy_opener if
+            provided, otherwise created on first use with http_pool.
+        """
+
+        with self._lock:
+
+            if self._opener is None:
+
+                self._opener = build_opener(
+                    ProxyHandler(), KeepAliveHTTPHandler(self.http_pool),
+                    KeepAliveHTTPSHandler(self.http_pool)
+                )
+
+        return self._opener
+
+    def net(self, address):
+        """
+        The function for creating a Net object using this session.
+
+        Args:
+            address (:obj:`str`/:obj:`int`/:obj:`IPv4Address`/
+                :obj:`IPv6Address`): An IPv4 or IPv6 address
+
+        Returns:
+            ipwhois.net.Net: The Net object.
+
+        Raises:
+            IPDefinedError: The address provided is defined (does not need to
+                be resolved).
+        """
+
+        return Net(address, session=self)
+
+    def ipwhois(self, address):
+        """
+        The function for creating an IPWhois object using this session.
+
+        Args:
+            address (:obj:`str`/:obj:`int`/:obj:`IPv4Address`/
+                :obj:`IPv6Address`): An IPv4 or IPv6 address
+
+        Returns:
+            ipwhois.ipwhois.IPWhois: The IPWhois object.
+
+        Raises:
+            IPDefinedError: The address provided is defined (does not need to
+                be resolved).
+        """
+
+        return IPWhois(address, session=self)
+
+    def close(self):
+        """
+        The function for closing the idle pooled HTTP connections. The
+        session may still be used afterwards.
+        """
+
+        self.http_pool.clear()
@@ -0,0 +1,28 @@
+import os
+import unittest
+from ipwhois.tests import TestCommon
+
+# The benchmarks only log timings, and take minutes, so they are skipped
+# unless the IPWHOIS_BENCHMARK environment variable is set. Set it to 'full'
+# for the larger sizes.
+BENCHMARK = os.environ.get('IPWHOIS_BENCHMARK', '')
+
+
+def scale(default, full):
+    """
+    The function to select a benchmark size.
+
+    Args:
+        default (:obj:`object`): The size for IPWHOIS_BENCHMARK=1.
+        full (:obj:`object`): The size for IPWHOIS_BENCHMARK=full.
+
+    Returns:
+        object: The size.
+    """
+
+    return full if BENCHMARK == 'full' else default
+
+
+@unittest.skipUnless(BENCHMARK, 'set IPWHOIS_BENCHMARK to run benchmarks')
+class TestBenchmark(TestCommon):
+    pass
@@ -0,0 +1,132 @@
+import json
+import io
+import sys
+import time
+import threading
+import unittest
+from os import path
+import logging
+from ipwhois.tests.benchmark import (TestBenchmark, scale)
+from ipwhois.net import Net
+from ipwhois.rdap import RDAP
+
+if sys.version_info >= (3, 6):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+    from ipwhois.aio import AsyncNet, AsyncRDAP, build_semaphores
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# Simulated round trip time for each mock RDAP response, in seconds.
+LATENCY = 0.05
+QUERIES = scale(50, 500)
+
+
+@unittest.skipIf(sys.version_info < (3, 6), 'asyncio support requires 3.6+')
+class TestAsyncBenchmark(TestBenchmark):
+
+    def setUp(self):
+
+        data_dir = path.dirname(path.dirname(__file__))
+
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        self.address = '74.125.225.229'
+        self.asn_data = data[self.address]['asn_data']
+        body = json.dumps(data[self.address]['response']).encode()
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+
+                time.sleep(LATENCY)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/rdap+json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+
+                pass
+
+        class Server(ThreadingMixIn, HTTPServer):
+
+            daemon_threads = True
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{0}/ip/{1}'.format(
+            self.server.server_address[1], self.address)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_rdap_throughput(self):
+
+        net = Net(self.address)
+        start = time.time()
+        for i in range(QUERIES):
+
+            RDAP(net).lookup(response=net.get_http_json(self.url),
+                             asn_data=self.asn_data)
+
+        sync_elapsed = time.time() - start
+        log.info('Sync RDAP: {0} lookups in {1:.2f}s ({2:.1f}/s)'.format(
+            QUERIES, sync_elapsed, QUERIES / sync_elapsed))
+
+        async def lookup(async_net):
+
+            response = await async_net.get_http_json(self.url)
+            return await AsyncRDAP(async_net).lookup(response=response,
+                                                     asn_data=self.asn_data)
+
+        async def bench(concurrency):
+
+            asyncio.get_event_loop().set_default_executor(
+                ThreadPoolExecutor(max_workers=concurrency))
+            async_net = AsyncNet(
+                self.address,
+                semaphores=build_semaphores({'other': concurrency})
+            )
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded():
+
+                async with semaphore:
+
+                    return await lookup(async_net)
+
+            return await asyncio.gather(*[bounded() for i in range(QUERIES)])
+
+        for concurrency in (1, 10, 50):
+
+            loop = asyncio.new_event_loop()
+            start = time.time()
+            try:
+
+                results = loop.run_until_complete(bench(concurrency))
+
+            finally:
+
+                loop.close()
+
+            elapsed = time.time() - start
+            self.assertEqual(len(results), QUERIES)
+            log.info('Async RDAP (concurrency {0}): {1} lookups in {2:.2f}s '
+                     '({3:.1f}/s)'.format(concurrency, QUERIES, elapsed,
+                                          QUERIES / elapsed))
+
+            if concurrency == 50:
+
+                self.assertLess(elapsed, sync_elapsed)
@@ -0,0 +1,98 @@
+import io
+import time
+import random
+import shutil
+import tempfile
+from os import path
+import logging
+from ipwhois.tests.benchmark import (TestBenchmark, scale)
+from ipwhois.asntable import (ASNTable, build_asn_table)
+from ipwhois.asn import IPASN
+from ipwhois.net import Net
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# The number of routed /24 prefixes (a full IPv4 table is ~1M prefixes).
+PREFIXES = scale(100000, 1000000)
+
+# The number of lookups.
+LOOKUPS = scale(10000, 100000)
+
+
+class TestASNTableBenchmark(TestBenchmark):
+
+    def setUp(self):
+
+        self.tmp_dir = tempfile.mkdtemp()
+
+        pfx2as_file = path.join(self.tmp_dir, 'pfx2as.txt')
+        with io.open(pfx2as_file, 'w') as data_file:
+
+            for i in range(PREFIXES):
+
+                data_file.write(u'{0}.{1}.{2}.0\t24\t{3}\n'.format(
+                    16 + i // 65536, (i // 256) % 256, i % 256, i % 60000
+                ))
+
+        delegated_file = path.join(self.tmp_dir, 'delegated.txt')
+        with io.open(delegated_file, 'w') as data_file:
+
+            for i in range(16, 32):
+
+                data_file.write(
+                    u'arin|US|ipv4|{0}.0.0.0|16777216|20000101|'
+                    u'allocated\n'.format(i)
+                )
+
+        self.table_file = path.join(self.tmp_dir, 'asn.table')
+
+        start = time.time()
+        build_asn_table(self.table_file, [pfx2as_file], [delegated_file])
+        log.info('Built {0} prefix table in {1:.1f}s'.format(
+            PREFIXES, time.time() - start))
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lookup(self):
+
+        start = time.time()
+        table = ASNTable(self.table_file)
+        log.info('Opened table in {0:.1f}ms'.format(
+            (time.time() - start) * 1000))
+
+        random.seed(0)
+        addresses = []
+        for i in range(LOOKUPS):
+
+            prefix = random.randint(0, PREFIXES - 1)
+            addresses.append('{0}.{1}.{2}.{3}'.format(
+                16 + prefix // 65536, (prefix // 256) % 256, prefix % 256,
+                random.randint(1, 254)
+            ))
+
+        start = time.time()
+        for address in addresses:
+
+            table.lookup(address)
+
+        log.info('ASNTable.lookup(): {0:.1f}us per address'.format(
+            (time.time() - start) * 1e6 / LOOKUPS))
+
+        # The full IPASN path, as used by IPWhois (Net creation excluded).
+        nets = [Net(address, asn_table=table) for address in
+                addresses[:10000]]
+
+        start = time.time()
+        for net in nets:
+
+            IPASN(net).lookup(asn_methods=['local'])
+
+        log.info('IPASN.lookup(local): {0:.1f}us per address'.format(
+            (time.time() - start) * 1e6 / len(nets)))
+
+        table.close()
@@ -0,0 +1,81 @@
+import time
+import logging
+from ipwhois.tests.benchmark import (TestBenchmark, scale)
+from ipwhois import experimental
+from ipwhois.ratelimit import RateLimiter
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# The number of addresses per bulk lookup.
+SIZES = scale([1000, 10000], [10000, 100000, 1000000])
+
+RIRS = ['arin', 'ripencc', 'apnic', 'lacnic', 'afrinic']
+
+
+class Net:
+
+    # Stands in for ipwhois.net.Net, so only scheduling is measured.
+    def __init__(self, address, **kwargs):
+
+        self.address_str = address
+
+
+class RDAP:
+
+    # Stands in for ipwhois.rdap.RDAP, with an instant lookup.
+    def __init__(self, net):
+
+        self._net = net
+
+    def lookup(self, **kwargs):
+
+        return {'network': None, 'entities': [], 'objects': {}}
+
+
+def iter_bulk_asn_whois(addresses, **kwargs):
+
+    for i, ip in enumerate(addresses):
+
+        yield ip, {'asn_registry': RIRS[i % 5], 'asn': '15169'}
+
+
+class TestBulkLookupRDAPBenchmark(TestBenchmark):
+
+    def setUp(self):
+
+        self.originals = (experimental.Net, experimental.RDAP,
+                          experimental.iter_bulk_asn_whois)
+        experimental.Net = Net
+        experimental.RDAP = RDAP
+        experimental.iter_bulk_asn_whois = iter_bulk_asn_whois
+
+    def tearDown(self):
+
+        (experimental.Net, experimental.RDAP,
+         experimental.iter_bulk_asn_whois) = self.originals
+
+    def test_scheduling(self):
+
+        for size in SIZES:
+
+            addresses = ['{0}.{1}.{2}.{3}'.format(
+                1 + i // 16777216, (i // 65536) % 256, (i // 256) % 256,
+                i % 256) for i in range(size)]
+
+            # No rate limiting, only the scheduling overhead is measured.
+            limiter = RateLimiter(limits=dict(
+                (rir, (1e9, 1e9)) for rir in RIRS
+            ))
+
+            start = time.time()
+            results, stats = experimental.bulk_lookup_rdap(
+                addresses=addresses, rate_limiter=limiter
+            )
+            elapsed = time.time() - start
+
+            log.info('{0} addresses scheduled in {1:.3f}s ({2:.2f}us per '
+                     'address)'.format(size, elapsed, elapsed / size * 1e6))
+            self.assertEqual(len(results), size)
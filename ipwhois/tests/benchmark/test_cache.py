@@ -0,0 +1,45 @@
+import random
+import time
+import logging
+from ipwhois.tests.benchmark import (TestBenchmark, scale)
+from ipwhois.cache import PrefixCache
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+PREFIXES = 5000
+QUERIES = scale(10000, 100000)
+
+
+class TestPrefixCacheBenchmark(TestBenchmark):
+
+    def test_get(self):
+
+        rand = random.Random(1)
+        cache = PrefixCache(maxsize=PREFIXES)
+
+        start = time.time()
+        for i in range(PREFIXES):
+
+            cache.set(['{0}.{1}.0.0/16'.format(11 + i // 256, i % 256)],
+                      {'query': None, 'network': {'cidr': None}})
+
+        log.info('Cached {0} prefixes in {1:.3f}s'.format(
+            PREFIXES, time.time() - start))
+
+        addresses = ['{0}.{1}.{2}.{3}'.format(
+            rand.randint(11, 11 + PREFIXES // 256), rand.randint(0, 255),
+            rand.randint(0, 255), rand.randint(1, 254)
+        ) for i in range(QUERIES)]
+
+        start = time.time()
+        for address in addresses:
+
+            cache.get(address)
+
+        elapsed = time.time() - start
+        log.info('{0} lookups in {1:.3f}s ({2:.0f}/s), {3}'.format(
+            QUERIES, elapsed, QUERIES / elapsed, cache.stats))
+        self.assertEqual(cache.stats['hits'] + cache.stats['misses'], QUERIES)
@@ -0,0 +1,57 @@
+import io
+import json
+import copy
+import tracemalloc
+from os import path
+import logging
+from ipwhois.tests.benchmark import (TestBenchmark, scale)
+from ipwhois.compact import compact_result
+from ipwhois.net import Net
+from ipwhois.rdap import RDAP
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# The number of results to keep.
+RESULTS = scale(2000, 20000)
+
+
+class TestCompactBenchmark(TestBenchmark):
+
+    def test_memory(self):
+
+        data_dir = path.dirname(path.dirname(__file__))
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        lookups = []
+        for key, val in data.items():
+
+            results = RDAP(Net(key)).lookup(
+                response=copy.deepcopy(val['response']),
+                asn_data=val['asn_data']
+            )
+            results.update(val['asn_data'])
+            lookups.append(results)
+
+        # Independent copies, as with results from separate lookups.
+        tracemalloc.start()
+        kept = [copy.deepcopy(lookups[i % len(lookups)])
+                for i in range(RESULTS)]
+        dict_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        strings = {}
+        compact = [compact_result(results, strings) for results in kept]
+        compact_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        log.info('{0} results: dict {1:.1f}MB, compact {2:.1f}MB '
+                 '({3:.0f}%)'.format(RESULTS, dict_size / 1e6,
+                                     compact_size / 1e6,
+                                     compact_size * 100.0 / dict_size))
+        self.assertEqual(len(compact), RESULTS)
+        self.assertLess(compact_size, dict_size)
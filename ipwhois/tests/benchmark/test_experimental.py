@@ -0,0 +1,59 @@
+import time
+import threading
+import logging
+from collections import OrderedDict
+try:  # pragma: no cover
+    import socketserver
+except ImportError:  # pragma: no cover
+    import SocketServer as socketserver
+from ipwhois.tests.benchmark import (TestBenchmark, scale)
+from ipwhois.tests.test_experimental import BulkHandler
+from ipwhois import experimental
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# The number of addresses in the bulk ASN query.
+ADDRESSES = scale(10000, 100000)
+
+
+class TestStreamBulkASNWhoisBenchmark(TestBenchmark):
+
+    def setUp(self):
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0),
+                                                      BulkHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_stream_bulk_asn_whois(self):
+
+        addresses = ('10.{0}.{1}.{2}'.format(i // 65536, (i // 256) % 256,
+                                             i % 256)
+                     for i in range(ADDRESSES))
+        pending = OrderedDict()
+
+        start = time.time()
+        first = None
+        count = 0
+        for line in experimental._stream_bulk_asn_whois(
+                addresses, pending, timeout=30,
+                server='127.0.0.1', port=self.server.server_address[1]):
+
+            if first is None:
+
+                first = time.time() - start
+
+            count += 1
+
+        log.info('Streamed {0} lines, first after {1:.4f}s, all in '
+                 '{2:.3f}s'.format(count, first, time.time() - start))
+        self.assertEqual(count, ADDRESSES + 1)
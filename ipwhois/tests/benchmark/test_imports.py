@@ -0,0 +1,32 @@
+import sys
+import unittest
+from os import path
+import logging
+from ipwhois.tests.benchmark import TestBenchmark
+from ipwhois.tests.test_imports import (import_times, SCRIPTS_DIR)
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# The number of runs of each import, the fastest is logged.
+RUNS = 5
+
+
+@unittest.skipIf(sys.version_info < (3, 7), 'requires -X importtime')
+class TestImportsBenchmark(TestBenchmark):
+
+    def test_import_time(self):
+
+        # The cold-start import time (all modules, including the
+        # interpreter startup).
+        for args in (['-c', 'import ipwhois'],
+                     ['-c', 'import ipwhois.utils'],
+                     ['-c', 'from ipwhois import IPWhois'],
+                     [path.join(SCRIPTS_DIR, 'ipwhois_cli.py'), '-h'],
+                     [path.join(SCRIPTS_DIR, 'ipwhois_utils_cli.py'), '-h']):
+
+            total = min(sum(import_times(args).values())
+                        for i in range(RUNS))
+            log.info('{0}: {1:.1f}ms'.format(' '.join(args), total / 1000.0))
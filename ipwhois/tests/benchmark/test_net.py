@@ -0,0 +1,41 @@
+import time
+import logging
+from ipwhois.tests.benchmark import (TestBenchmark, scale)
+from ipwhois.net import Net
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# The number of Net objects to construct.
+ADDRESSES = scale(10000, 100000)
+
+
+class TestNetBenchmark(TestBenchmark):
+
+    def test_init(self):
+
+        addresses = ['74.{0}.{1}.{2}'.format(i // 65536, (i // 256) % 256,
+                                             i % 256)
+                     for i in range(ADDRESSES)]
+
+        start = time.time()
+        for address in addresses:
+
+            Net(address)
+
+        lazy = time.time() - start
+
+        # The previous eager construction: resolver, opener and DNS zone.
+        start = time.time()
+        for address in addresses[:10000]:
+
+            net = Net(address)
+            net.dns_resolver, net.opener, net.dns_zone
+
+        eager = (time.time() - start) * ADDRESSES / 10000
+
+        log.info('Net() for {0} addresses: {1:.2f}s lazy, {2:.2f}s with the '
+                 'resolver, opener and DNS zone built (estimated from 10000)'
+                 ''.format(ADDRESSES, lazy, eager))
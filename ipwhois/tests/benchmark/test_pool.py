@@ -0,0 +1,57 @@
+import time
+import threading
+import logging
+from ipwhois.tests.benchmark import (TestBenchmark, scale)
+from ipwhois.tests.test_pool import Handler, Server
+from ipwhois.net import Net
+from ipwhois.pool import HTTPConnectionPool
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# The number of entity queries, roughly a depth=2 lookup for a few addresses.
+QUERIES = scale(200, 2000)
+
+
+class TestHTTPConnectionPoolBenchmark(TestBenchmark):
+
+    def setUp(self):
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{0}/entity/{{0}}'.format(
+            self.server.server_address[1])
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _run(self, http_pool=None):
+
+        self.server.connections = 0
+        start = time.time()
+        for i in range(QUERIES):
+
+            net = Net('74.125.225.229', http_pool=http_pool)
+            net.get_http_json(url=self.url.format(i))
+
+        return time.time() - start, self.server.connections
+
+    def test_entity_queries(self):
+
+        elapsed, connections = self._run()
+        log.info('No pool: {0} queries, {1} connections in {2:.3f}s'.format(
+            QUERIES, connections, elapsed))
+        self.assertEqual(connections, QUERIES)
+
+        pool = HTTPConnectionPool()
+        elapsed, connections = self._run(http_pool=pool)
+        log.info('Pool: {0} queries, {1} connections in {2:.3f}s'.format(
+            QUERIES, connections, elapsed))
+        self.assertEqual(connections, 1)
+        pool.clear()
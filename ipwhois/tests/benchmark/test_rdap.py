@@ -0,0 +1,136 @@
+import os
+import json
+import io
+import copy
+import time
+from os import path
+import logging
+from ipwhois.tests.benchmark import (TestBenchmark, scale)
+from ipwhois.net import Net
+from ipwhois.rdap import (RDAP, parse_rdap_batch, _RDAPEntity, _RDAPContact)
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# Simulated round trip time for each entity query, in seconds.
+LATENCY = 0.02
+
+# The number of stored (JSON) responses to parse.
+PARSE_RECORDS = scale(2000, 20000)
+
+# The number of entities (with vcards) to parse.
+PARSE_ENTITIES = scale(10000, 100000)
+
+
+class TestRDAPBenchmark(TestBenchmark):
+
+    def test_lookup_max_workers(self):
+
+        data_dir = path.dirname(path.dirname(__file__))
+
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        with io.open(str(data_dir) + '/entity.json', 'r') as data_file:
+            entity = json.load(data_file)
+
+        queries = []
+
+        def get_http_json(url=None, **kwargs):
+
+            # Each entity references three sub-entities.
+            handle = url.split('/')[-1]
+            queries.append(handle)
+            time.sleep(LATENCY)
+
+            response = copy.deepcopy(entity)
+            response['handle'] = handle
+            response['entities'] = [
+                {'handle': '{0}-{1}'.format(handle, i), 'roles': ['abuse']}
+                for i in range(3)
+            ]
+            return response
+
+        key = '2001:43f8:7b0::'
+        response = data[key]['response']
+        for ent in response['entities']:
+
+            ent.pop('vcardArray', None)
+
+        net = Net(key)
+        net.get_http_json = get_http_json
+
+        for max_workers in (None, 4, 16):
+
+            del queries[:]
+            start = time.time()
+            RDAP(net).lookup(response=copy.deepcopy(response),
+                             asn_data=data[key]['asn_data'], depth=2,
+                             max_workers=max_workers)
+            log.info('max_workers={0}: {1} entities in {2:.3f}s'.format(
+                max_workers, len(queries), time.time() - start))
+
+    def test_parse_rdap_batch(self):
+
+        data_dir = path.dirname(path.dirname(__file__))
+
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        # Stored raw responses, e.g., the lines of an NDJSON archive.
+        responses = [(key, json.dumps(val['response']))
+                     for key, val in data.items()]
+        responses = [responses[i % len(responses)]
+                     for i in range(PARSE_RECORDS)]
+
+        cpus = os.cpu_count() or 1
+        for processes in (None, 2, cpus) if cpus > 2 else (None, 2):
+
+            start = time.time()
+            total = sum(1 for results, error in parse_rdap_batch(
+                responses, processes=processes) if error is None)
+            rate = total / (time.time() - start)
+
+            log.info('processes={0}: {1:.0f} records/s, {2:.0f} records/s '
+                     'per core ({3} cores)'.format(
+                         processes, rate, rate / min(processes or 1, cpus),
+                         cpus))
+            self.assertEqual(total, PARSE_RECORDS)
+
+    def test_parse_entities(self):
+
+        data_dir = path.dirname(path.dirname(__file__))
+
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        with io.open(str(data_dir) + '/entity.json', 'r') as data_file:
+            entities = [json.load(data_file)]
+
+        for val in data.values():
+
+            entities.extend(ent for ent in val['response'].get('entities', [])
+                            if 'vcardArray' in ent)
+
+        entities = [entities[i % len(entities)]
+                    for i in range(PARSE_ENTITIES)]
+
+        start = time.time()
+        for ent in entities:
+
+            _RDAPContact(ent['vcardArray'][1]).parse()
+
+        contact = time.time() - start
+
+        start = time.time()
+        for ent in entities:
+
+            _RDAPEntity(ent).parse()
+
+        entity = time.time() - start
+
+        log.info('{0} entities: {1:.0f} contacts/s, {2:.0f} entities/s'.format(
+            PARSE_ENTITIES, PARSE_ENTITIES / contact,
+            PARSE_ENTITIES / entity))
@@ -0,0 +1,214 @@
+import io
+import json
+import time
+import random
+import shutil
+import tempfile
+import tracemalloc
+from os import path
+import logging
+from ipwhois.tests.benchmark import (TestBenchmark, scale)
+from ipwhois.utils import (ipv4_is_defined, ipv4_is_defined_batch,
+                           ipv6_is_defined_batch, JSON_BACKENDS, json_loads,
+                           json_dumps, unique_addresses, get_countries,
+                           get_country, _load_countries)
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# The number of addresses to classify.
+ADDRESSES = scale(100000, 1000000)
+
+# The number of country code lookups.
+COUNTRY_LOOKUPS = scale(100000, 1000000)
+
+# The number of times to decode/encode each RDAP response.
+JSON_ROUNDS = scale(20, 200)
+
+# The number of log lines, and unique source addresses, for
+# unique_addresses().
+LOG_LINES = scale(10000, 100000)
+LOG_SOURCES = scale(500, 5000)
+
+
+class TestIsDefinedBenchmark(TestBenchmark):
+
+    def _log(self, name, start, total):
+
+        log.info('{0}: {1:.2f}us per address'.format(
+            name, (time.time() - start) * 1e6 / total))
+
+    def test_is_defined(self):
+
+        random.seed(0)
+        ints = [random.randint(0, 2**32 - 1) for i in range(ADDRESSES)]
+        strings = ['{0}.{1}.{2}.{3}'.format(
+            i >> 24, (i >> 16) & 255, (i >> 8) & 255, i & 255
+        ) for i in ints]
+
+        start = time.time()
+        for address in strings[:100000]:
+
+            ipv4_is_defined(address)
+
+        self._log('ipv4_is_defined(str)', start, 100000)
+
+        start = time.time()
+        ipv4_is_defined_batch(strings)
+        self._log('ipv4_is_defined_batch(str)', start, ADDRESSES)
+
+        start = time.time()
+        ipv4_is_defined_batch(ints)
+        self._log('ipv4_is_defined_batch(int)', start, ADDRESSES)
+
+        ints = [random.randint(0, 2**128 - 1) for i in range(ADDRESSES)]
+
+        start = time.time()
+        ipv6_is_defined_batch(ints)
+        self._log('ipv6_is_defined_batch(int)', start, ADDRESSES)
+
+
+class TestJSONBenchmark(TestBenchmark):
+
+    def test_json(self):
+
+        data_dir = path.dirname(path.dirname(__file__))
+
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        # The RDAP responses, as received.
+        responses = [json.dumps(val['response']).encode('utf-8')
+                     for val in data.values()]
+        total = len(responses) * JSON_ROUNDS
+
+        log.info('{0} RDAP responses, {1} bytes on average'.format(
+            len(responses), sum(len(r) for r in responses) // len(responses)))
+
+        for backend in JSON_BACKENDS:
+
+            start = time.time()
+            for i in range(JSON_ROUNDS):
+
+                for response in responses:
+
+                    json_loads(response, backend=backend)
+
+            loads = (time.time() - start) * 1e6 / total
+
+            decoded = [json_loads(r) for r in responses]
+            start = time.time()
+            for i in range(JSON_ROUNDS):
+
+                for response in decoded:
+
+                    json_dumps(response, backend=backend)
+
+            dumps = (time.time() - start) * 1e6 / total
+
+            log.info('{0}: json_loads() {1:.1f}us, json_dumps() {2:.1f}us per '
+                     'response'.format(backend, loads, dumps))
+
+        # The previous decode, as in Net.get_http_json().
+        start = time.time()
+        for i in range(JSON_ROUNDS):
+
+            for response in responses:
+
+                json.loads(response.decode('utf-8', 'ignore'))
+
+        log.info('json.loads(decode()): {0:.1f}us per response'.format(
+            (time.time() - start) * 1e6 / total))
+
+
+class TestUniqueAddressesBenchmark(TestBenchmark):
+
+    def test_unique_addresses(self):
+
+        random.seed(0)
+        tmp_dir = tempfile.mkdtemp()
+        try:
+
+            fp = path.join(tmp_dir, 'firewall.log')
+            with io.open(fp, 'w') as f:
+
+                sources = ['10.{0}.{1}.{2}'.format(
+                    random.randint(0, 3), random.randint(0, 255),
+                    random.randint(1, 254)) for i in range(LOG_SOURCES)]
+
+                for i in range(LOG_LINES):
+
+                    f.write(u'2024-10-15T00:00:{0:02d} DROP SRC={1}:{2} '
+                            u'DST=192.0.2.{3}:443\n'.format(
+                                i % 60, random.choice(sources),
+                                random.randint(1024, 1100), i % 254 + 1))
+
+            log.info('{0} lines, {1:.1f}MB'.format(
+                LOG_LINES, path.getsize(fp) / 1e6))
+
+            # Reading the whole file, as previously.
+            def read_all():
+
+                with io.open(fp, 'r') as f:
+
+                    return unique_addresses(data=f.read())
+
+            expected = None
+            for name, run in (
+                ('read whole file', read_all),
+                ('chunked', lambda: unique_addresses(file_path=fp)),
+                ('chunked, 4 processes', lambda: unique_addresses(
+                    file_path=fp, processes=4))
+            ):
+
+                start = time.time()
+                result = run()
+                elapsed = time.time() - start
+
+                # Separately, tracing slows allocations.
+                tracemalloc.start()
+                run()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                log.info('{0}: {1:.2f}s, {2:.1f}MB peak'.format(
+                    name, elapsed, peak / 1e6))
+
+                expected = expected or result
+                self.assertEqual(result, expected)
+
+        finally:
+
+            shutil.rmtree(tmp_dir)
+
+
+class TestCountriesBenchmark(TestBenchmark):
+
+    def test_get_country(self):
+
+        codes = list(get_countries().keys())
+        codes = [codes[i % len(codes)] for i in range(COUNTRY_LOOKUPS)]
+
+        # The previous get_countries() parsed the CSV file on every call.
+        parses = 1000
+        start = time.time()
+        for i in range(parses):
+
+            _load_countries()[codes[i]]
+
+        parse = (time.time() - start) / parses
+
+        start = time.time()
+        for code in codes:
+
+            get_country(code)
+
+        lookup = (time.time() - start) / COUNTRY_LOOKUPS
+
+        log.info('{0} country lookups: {1:.2f}s parsing each call '
+                 '(estimated), {2:.2f}s get_country() ({3:.2f}us per '
+                 'lookup)'.format(COUNTRY_LOOKUPS, parse * COUNTRY_LOOKUPS,
+                                  lookup * COUNTRY_LOOKUPS, lookup * 1e6))
+        self.assertLess(lookup, parse)
@@ -0,0 +1,158 @@
+import io
+import re
+import copy
+import time
+import json
+import logging
+from os import path
+from ipwhois.tests.benchmark import (TestBenchmark, scale)
+from ipwhois import whois
+from ipwhois.net import Net
+from ipwhois.nir import NIRWhois
+from ipwhois.whois import (Whois, RIR_WHOIS, BASE_NET)
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+# The number of passes over the whois.json responses.
+PASSES = scale(20, 200)
+
+# The default fields, excluding emails. The emails regex backtracks heavily
+# on some responses, which would hide the compile cost measured here.
+FIELD_LIST = ['name', 'handle', 'description', 'country', 'state', 'city',
+              'address', 'postal_code', 'created', 'updated']
+
+
+def compile_every_time(pattern, flags=re.DOTALL):
+
+    # The previous behavior, compiling for every field of every network
+    # (only partly saved by the re module cache).
+    return re.compile(str(pattern), flags)
+
+
+class TestWhoisParseBenchmark(TestBenchmark):
+
+    def _run(self, data):
+
+        obj = Whois(Net('74.125.225.229'))
+
+        start = time.time()
+        for i in range(PASSES):
+
+            for val in data.values():
+
+                rir = val['asn_data']['asn_registry']
+                nets = getattr(obj, 'get_nets_{0}'.format(rir),
+                               obj.get_nets_other)(val['response'])
+
+                for index, net in enumerate(nets):
+
+                    section_end = None
+                    if index + 1 < len(nets):
+
+                        section_end = nets[index + 1]['start']
+
+                    obj.parse_fields(
+                        val['response'], RIR_WHOIS[rir]['fields'],
+                        section_end, net['end'],
+                        RIR_WHOIS[rir].get('dt_format'), FIELD_LIST
+                    )
+
+        return (time.time() - start) / (PASSES * len(data))
+
+    def test_parse_fields(self):
+
+        data_dir = path.dirname(path.dirname(__file__))
+
+        with io.open(str(data_dir) + '/whois.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        original = whois.compile_field_pattern
+        whois.compile_field_pattern = compile_every_time
+
+        try:
+
+            before = self._run(data)
+
+        finally:
+
+            whois.compile_field_pattern = original
+
+        after = self._run(data)
+
+        log.info('Per response parse: {0:.1f}us compiling every field, '
+                 '{1:.1f}us memoized'.format(before * 1e6, after * 1e6))
+
+    def test_parse_fields_rpsl(self):
+
+        data_dir = path.dirname(path.dirname(__file__))
+
+        with io.open(str(data_dir) + '/whois.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        obj = Whois(Net('74.125.225.229'))
+
+        # Few passes, the regex engine takes seconds on some responses.
+        passes = 3
+        for parser in ('regex', 'rpsl'):
+
+            start = time.time()
+            for i in range(passes):
+
+                for val in data.values():
+
+                    obj.lookup(response=val['response'],
+                               asn_data=val['asn_data'], is_offline=True,
+                               parser=parser)
+
+            log.info('Per response lookup ({0}): {1:.1f}us'.format(
+                parser, (time.time() - start) * 1e6 / (passes * len(data))
+            ))
+
+    def test_get_nets(self):
+
+        data_dir = path.dirname(path.dirname(__file__))
+
+        with io.open(str(data_dir) + '/whois.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        with io.open(str(data_dir) + '/jpnic.json', 'r') as data_file:
+            jpnic = json.load(data_file)
+
+        obj = Whois(Net('74.125.225.229'))
+        nir = NIRWhois(Net('133.1.2.5'))
+
+        start = time.time()
+        count = 0
+        for i in range(PASSES):
+
+            for val in data.values():
+
+                rir = val['asn_data']['asn_registry']
+                count += len(getattr(obj, 'get_nets_{0}'.format(rir),
+                                     obj.get_nets_other)(val['response']))
+
+            for val in jpnic.values():
+
+                count += len(nir.get_nets_jpnic(val['response']))
+
+        elapsed = time.time() - start
+        log.info('get_nets: {0:.1f}us per network ({1} networks)'.format(
+            elapsed * 1e6 / count, count // PASSES))
+
+        # The network record construction, previously a deepcopy.
+        records = []
+        for construct in (lambda: copy.deepcopy(BASE_NET), BASE_NET.copy):
+
+            start = time.time()
+            for i in range(count):
+
+                construct()
+
+            records.append((time.time() - start) * 1e6 / count)
+
+        log.info('Network record: {0:.2f}us deepcopy, {1:.2f}us copy'.format(
+            *records))
+        self.assertLess(records[1], records[0])
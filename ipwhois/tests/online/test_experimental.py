@@ -69,6 +69,7 @@ class TestExperimental(TestCommon):
 
         expected_stats = {'ip_input_total': 12, 'ip_unique_total': 12,
                           'ip_lookup_total': 12, 'ip_failed_total': 0,
+                          'ip_cached_total': 0,
                           'lacnic': {'failed': [], 'rate_limited': [], 'total': 2},
                           'ripencc': {'failed': [], 'rate_limited': [], 'total': 2},
                           'apnic': {'failed': [], 'rate_limited': [], 'total': 4},
@@ -0,0 +1,214 @@
+import json
+import io
+import sys
+import copy
+from os import path
+import logging
+import unittest
+from ipwhois.tests import TestCommon
+from ipwhois.exceptions import NetError, WhoisLookupError, BlacklistError
+from ipwhois.net import Net
+from ipwhois.rdap import RDAP
+from ipwhois.whois import Whois
+from ipwhois.nir import NIRWhois
+from ipwhois.cache import EntityCache
+
+if sys.version_info >= (3, 6):
+    import asyncio
+    from ipwhois.aio import (AsyncNet, AsyncRDAP, AsyncWhois, AsyncNIRWhois,
+                             AsyncIPASN, build_semaphores, get_registry_key)
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+
+def run(coro):
+
+    loop = asyncio.new_event_loop()
+    try:
+
+        return loop.run_until_complete(coro)
+
+    finally:
+
+        loop.close()
+
+
+@unittest.skipIf(sys.version_info < (3, 6), 'asyncio support requires 3.6+')
+class TestAsync(TestCommon):
+
+    def setUp(self):
+
+        self.data_dir = path.dirname(__file__)
+
+    def test_AsyncNet(self):
+
+        self.assertRaises(NetError, AsyncRDAP, 'a')
+        self.assertRaises(NetError, AsyncWhois, 'a')
+        self.assertRaises(NetError, AsyncNIRWhois, 'a')
+        self.assertRaises(NetError, AsyncIPASN, 'a')
+
+    def test_get_registry_key(self):
+
+        self.assertEqual(get_registry_key(
+            url='https://rdap.db.ripe.net/ip/1.2.3.4'), 'ripencc')
+        self.assertEqual(get_registry_key(server='whois.lacnic.net'),
+                         'lacnic')
+        self.assertEqual(get_registry_key(url='http://example.com/'),
+                         'other')
+
+    def test_build_semaphores(self):
+
+        async def build():
+
+            return build_semaphores({'arin': 2})
+
+        semaphores = run(build())
+        self.assertIn('other', semaphores)
+        self.assertEqual(semaphores['arin']._value, 2)
+
+    def test_rdap_lookup(self):
+
+        with io.open(str(self.data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        for key, val in data.items():
+
+            log.debug('Testing: {0}'.format(key))
+            expected = RDAP(Net(key)).lookup(
+                response=copy.deepcopy(val['response']),
+                asn_data=val['asn_data'], depth=0, inc_raw=True
+            )
+            result = run(AsyncRDAP(AsyncNet(key)).lookup(
+                response=copy.deepcopy(val['response']),
+                asn_data=val['asn_data'], depth=0, inc_raw=True
+            ))
+
+            self.assertEqual(result, expected)
+
+    def test_rdap_lookup_depth(self):
+
+        with io.open(str(self.data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        with io.open(str(self.data_dir) + '/entity.json', 'r') as data_file:
+            entity = json.load(data_file)
+
+        def get_http_json(url=None, **kwargs):
+
+            return copy.deepcopy(entity)
+
+        async def get_http_json_async(url=None, **kwargs):
+
+            return get_http_json(url)
+
+        for key, val in data.items():
+
+            log.debug('Testing: {0}'.format(key))
+            net = Net(key)
+            net.get_http_json = get_http_json
+            expected = RDAP(net).lookup(
+                response=copy.deepcopy(val['response']),
+                asn_data=val['asn_data'], depth=2, root_ent_check=True
+            )
+
+            async_net = AsyncNet(key)
+            async_net.get_http_json = get_http_json_async
+            result = run(AsyncRDAP(async_net).lookup(
+                response=copy.deepcopy(val['response']),
+                asn_data=val['asn_data'], depth=2, root_ent_check=True
+            ))
+
+            self.assertEqual(result, expected)
+
+            entity_cache = EntityCache()
+            for i in range(2):
+
+                result = run(AsyncRDAP(async_net).lookup(
+                    response=copy.deepcopy(val['response']),
+                    asn_data=val['asn_data'], depth=2, root_ent_check=True,
+                    entity_cache=entity_cache
+                ))
+
+                self.assertEqual(result, expected)
+
+    def test_whois_lookup(self):
+
+        with io.open(str(self.data_dir) + '/whois.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        for key, val in data.items():
+
+            log.debug('Testing: {0}'.format(key))
+            expected = Whois(Net(key)).lookup(
+                response=val['response'], asn_data=val['asn_data'],
+                is_offline=True, inc_raw=True
+            )
+            result = run(AsyncWhois(AsyncNet(key)).lookup(
+                response=val['response'], asn_data=val['asn_data'],
+                is_offline=True, inc_raw=True
+            ))
+
+            self.assertEqual(result, expected)
+
+    def test_nir_lookup(self):
+
+        with io.open(str(self.data_dir) + '/jpnic.json', 'r') as data_jpnic:
+            data = json.load(data_jpnic)
+
+        with io.open(str(self.data_dir) + '/krnic.json', 'r') as data_krnic:
+            data.update(json.load(data_krnic))
+
+        for key, val in data.items():
+
+            log.debug('Testing: {0}'.format(key))
+            expected = NIRWhois(Net(key)).lookup(
+                nir=val['nir'], response=val['response'], is_offline=True
+            )
+            result = run(AsyncNIRWhois(AsyncNet(key)).lookup(
+                nir=val['nir'], response=val['response'], is_offline=True
+            ))
+
+            self.assertEqual(result, expected)
+
+            self.assertRaises(KeyError, run, AsyncNIRWhois(
+                AsyncNet(key)).lookup(nir=val['nir'], response=None,
+                                      is_offline=True))
+
+    def test_get_whois(self):
+
+        async def handle(reader, writer):
+
+            query = await reader.readline()
+            writer.write(b'query: ' + query)
+            await writer.drain()
+            writer.close()
+
+        async def query():
+
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            net = AsyncNet('74.125.225.229', timeout=1)
+
+            try:
+
+                return await net.get_whois(
+                    asn_registry='', server='127.0.0.1', port=port
+                )
+
+            finally:
+
+                server.close()
+                await server.wait_closed()
+
+        self.assertEqual(run(query()), 'query: 74.125.225.229\r\n')
+
+        net = AsyncNet('74.125.225.229', timeout=1)
+        self.assertRaises(BlacklistError, run, net.get_whois(
+            server='root.rwhois.net', extra_blacklist=['example.com']))
+
+        # Nothing listening on port 1.
+        self.assertRaises(WhoisLookupError, run, net.get_whois(
+            asn_registry='', server='127.0.0.1', port=1, retry_count=0))
@@ -0,0 +1,176 @@
+import io
+import sys
+import gzip
+import shutil
+import tempfile
+from os import path
+import logging
+from ipwhois.tests import TestCommon
+from ipwhois.asntable import (ASNTable, build_asn_table, flatten_intervals,
+                              parse_pfx2as, parse_delegated)
+from ipwhois.asn import IPASN
+from ipwhois.exceptions import ASNRegistryError
+from ipwhois.net import Net
+
+if sys.version_info >= (3, 3):  # pragma: no cover
+    from ipaddress import ip_address
+else:  # pragma: no cover
+    from ipaddr import IPAddress as ip_address
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+PFX2AS = (
+    '# comment\n'
+    '74.125.0.0\t16\t15169\n'
+    '74.125.225.0\t24\t15169_36040\n'
+    '2001:4860::\t32\t15169\n'
+    '8.8.8.0/24 15169,36040\n'
+    '9.9.9.0\t24\n'
+    '1.0.0.0\t24\t13335\n'
+    '1.0.1.0\t33\t13335\n'
+)
+
+DELEGATED = (
+    '2|arin|20240101|3|19700101|20240101|-0500\n'
+    'arin|*|ipv4|*|3|summary\n'
+    'arin|US|ipv4|74.125.0.0|65536|20070213|allocated|abc\n'
+    'arin|US|ipv4|8.8.8.0|256|19921201|assigned\n'
+    'arin||ipv4|9.0.0.0|256||available\n'
+    'arin|US|ipv6|2001:4860::|32|20050314|allocated\n'
+    'ripencc|US|ipv4|bad|256|20000101|allocated\n'
+)
+
+
+class TestASNTable(TestCommon):
+
+    def setUp(self):
+
+        self.tmp_dir = tempfile.mkdtemp()
+
+        pfx2as_file = path.join(self.tmp_dir, 'pfx2as.txt')
+        with io.open(pfx2as_file, 'w') as data_file:
+
+            data_file.write(PFX2AS)
+
+        delegated_file = path.join(self.tmp_dir, 'delegated.gz')
+        with gzip.open(delegated_file, 'wb') as data_file:
+
+            data_file.write(DELEGATED.encode('utf-8'))
+
+        self.table_file = path.join(self.tmp_dir, 'asn.table')
+        self.counts = build_asn_table(self.table_file, [pfx2as_file],
+                                      [delegated_file])
+        self.table = ASNTable(self.table_file)
+
+    def tearDown(self):
+
+        self.table.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_parse_pfx2as(self):
+
+        self.assertEqual(
+            list(parse_pfx2as(PFX2AS.split('\n'))),
+            [(4, int(ip_address('74.125.0.0')),
+              int(ip_address('74.125.255.255')), 16, '15169'),
+             (4, int(ip_address('74.125.225.0')),
+              int(ip_address('74.125.225.255')), 24, '15169 36040'),
+             (6, int(ip_address('2001:4860::')),
+              int(ip_address('2001:4860:ffff:ffff:ffff:ffff:ffff:ffff')), 32,
+              '15169'),
+             (4, int(ip_address('8.8.8.0')), int(ip_address('8.8.8.255')),
+              24, '15169 36040'),
+             (4, int(ip_address('1.0.0.0')), int(ip_address('1.0.0.255')),
+              24, '13335')]
+        )
+
+    def test_parse_delegated(self):
+
+        self.assertEqual(
+            list(parse_delegated(DELEGATED.split('\n'))),
+            [(4, 1249705984, 1249771519, 'arin', 'US', '2007-02-13'),
+             (4, 134744064, 134744319, 'arin', 'US', '1992-12-01'),
+             (6, int(ip_address('2001:4860::')),
+              int(ip_address('2001:4860:ffff:ffff:ffff:ffff:ffff:ffff')),
+              'arin', 'US', '2005-03-14')]
+        )
+
+    def test_flatten_intervals(self):
+
+        self.assertEqual(flatten_intervals([]), [])
+
+        # Nested, adjacent and identical intervals.
+        self.assertEqual(
+            flatten_intervals([(0, 99, 1, 8), (10, 19, 2, 16),
+                               (20, 29, 1, 8), (40, 49, 3, 16),
+                               (40, 49, 4, 16), (45, 45, 5, 24),
+                               (200, 299, 6, 8), (250, 350, 7, 16)]),
+            [(0, 9, 1, 8), (10, 19, 2, 16), (20, 39, 1, 8), (40, 44, 4, 16),
+             (45, 45, 5, 24), (46, 49, 4, 16), (50, 99, 1, 8),
+             (200, 249, 6, 8), (250, 299, 7, 16)]
+        )
+
+    def test_build_asn_table(self):
+
+        self.assertEqual(self.counts, {'prefix': {4: 5, 6: 1},
+                                       'allocation': {4: 2, 6: 1}})
+        self.assertEqual(len(self.table), 9)
+
+        bad_file = path.join(self.tmp_dir, 'bad.table')
+        with io.open(bad_file, 'wb') as data_file:
+
+            data_file.write(b'bad')
+
+        self.assertRaises(ValueError, ASNTable, bad_file)
+
+    def test_lookup(self):
+
+        self.assertEqual(self.table.lookup('74.125.225.229'),
+                         '15169 36040 | 74.125.225.0/24 | US | arin | '
+                         '2007-02-13')
+        self.assertEqual(self.table.lookup('74.125.226.1'),
+                         '15169 | 74.125.0.0/16 | US | arin | 2007-02-13')
+        self.assertEqual(self.table.lookup('74.125.255.255'),
+                         '15169 | 74.125.0.0/16 | US | arin | 2007-02-13')
+        self.assertEqual(self.table.lookup('2001:4860:4860::8888'),
+                         '15169 | 2001:4860::/32 | US | arin | 2005-03-14')
+
+        # Routed, but not allocated.
+        self.assertEqual(self.table.lookup('1.0.0.1'),
+                         '13335 | 1.0.0.0/24 |  |  | ')
+
+        self.assertIsNone(self.table.lookup('74.126.0.0'))
+        self.assertIsNone(self.table.lookup('0.0.0.1'))
+        self.assertIsNone(self.table.lookup('2001:4861::1'))
+
+    def test_lookup_ipasn(self):
+
+        net = Net('74.125.225.229', asn_table=self.table)
+        ipasn = IPASN(net)
+
+        self.assertEqual(ipasn.lookup(), {
+            'asn': '15169 36040',
+            'asn_cidr': '74.125.225.0/24',
+            'asn_country_code': 'US',
+            'asn_registry': 'arin',
+            'asn_date': '2007-02-13',
+            'asn_description': None
+        })
+
+        self.assertEqual(
+            ipasn.lookup(asn_methods=['local'], inc_raw=True)['raw'],
+            self.table.lookup('74.125.225.229')
+        )
+
+        # Not in an allocation.
+        net = Net('1.0.0.1', asn_table=self.table)
+        self.assertRaises(ASNRegistryError, IPASN(net).lookup,
+                          asn_methods=['local'])
+
+        # No table.
+        net = Net('74.125.225.229')
+        self.assertRaises(ASNRegistryError, IPASN(net).lookup,
+                          asn_methods=['local'])
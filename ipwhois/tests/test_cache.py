@@ -0,0 +1,284 @@
+import json
+import io
+import copy
+import shutil
+import tempfile
+from os import path
+import logging
+from ipwhois.tests import TestCommon
+from ipwhois.cache import (PrefixCache, EntityCache, get_result_networks)
+from ipwhois.exceptions import HTTPLookupError
+from ipwhois.ipwhois import IPWhois
+from ipwhois.net import Net
+from ipwhois.rdap import RDAP
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+
+class TestPrefixCache(TestCommon):
+
+    def test_get(self):
+
+        cache = PrefixCache()
+        cache.set(['74.125.0.0/16'], 'a')
+        cache.set(['74.125.225.0/24'], 'b')
+        cache.set(['2001:4860::/32'], 'c')
+        cache.set(['74.125.225.0/24'], 'd', namespace='other')
+
+        self.assertEqual(cache.get('74.125.225.229'), 'b')
+        self.assertEqual(cache.get('74.125.1.1'), 'a')
+        self.assertEqual(cache.get('2001:4860:4860::8888'), 'c')
+        self.assertEqual(cache.get('74.125.225.229', namespace='other'), 'd')
+        self.assertIsNone(cache.get('74.126.0.1'))
+        self.assertIsNone(cache.get('2001:4861::1'))
+        self.assertIsNone(cache.get('74.125.1.1', namespace='other'))
+
+        self.assertEqual(cache.stats, {'hits': 4, 'misses': 3,
+                                       'evictions': 0, 'size': 4})
+
+        cache.clear()
+        self.assertIsNone(cache.get('74.125.225.229'))
+        self.assertEqual(len(cache), 0)
+
+    def test_copy(self):
+
+        cache = PrefixCache()
+        value = {'a': [1]}
+        cache.set(['74.125.0.0/16'], value)
+        value['a'].append(2)
+        cache.get('74.125.0.1')['a'].append(3)
+        self.assertEqual(cache.get('74.125.0.1'), {'a': [1]})
+
+    def test_ttl(self):
+
+        cache = PrefixCache(ttl=-1)
+        cache.set(['74.125.0.0/16'], 'a')
+        self.assertIsNone(cache.get('74.125.0.1'))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache._tries[(None, 4)], [None, None, None])
+
+    def test_lru(self):
+
+        cache = PrefixCache(maxsize=2)
+        cache.set(['10.0.0.0/8'], 'a')
+        cache.set(['11.0.0.0/8'], 'b')
+        self.assertEqual(cache.get('10.0.0.1'), 'a')
+        cache.set(['12.0.0.0/8'], 'c')
+
+        self.assertEqual(cache.get('10.0.0.1'), 'a')
+        self.assertIsNone(cache.get('11.0.0.1'))
+        self.assertEqual(cache.get('12.0.0.1'), 'c')
+        self.assertEqual(cache.stats['evictions'], 1)
+
+    def test_get_result_networks(self):
+
+        self.assertEqual([str(n) for n in get_result_networks({
+            'query': '74.125.225.229',
+            'network': {'cidr': '74.125.0.0/16, 75.0.0.0/8'}
+        })], ['74.125.0.0/16'])
+
+        # The ASN cidr is more specific.
+        self.assertEqual([str(n) for n in get_result_networks({
+            'query': '74.125.225.229',
+            'asn_cidr': '74.125.225.0/24',
+            'network': {'cidr': '74.125.0.0/16'}
+        })], ['74.125.225.0/24'])
+
+        # The most specific WHOIS net.
+        self.assertEqual([str(n) for n in get_result_networks({
+            'query': '74.125.225.229',
+            'asn_cidr': '74.0.0.0/8',
+            'nets': [{'cidr': '74.0.0.0/8'}, {'cidr': '74.125.0.0/16'}]
+        })], ['74.125.0.0/16'])
+
+        self.assertEqual(get_result_networks({
+            'query': '74.125.225.229',
+            'asn_cidr': '10.0.0.0/8',
+            'network': {'cidr': '74.125.0.0/16'}
+        }), [])
+        self.assertEqual(get_result_networks({
+            'query': '74.125.225.229',
+            'network': {'cidr': None}
+        }), [])
+        self.assertEqual(get_result_networks({}), [])
+
+    def test_rdap_lookup(self):
+
+        data_dir = path.dirname(__file__)
+
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        cache = PrefixCache()
+        for key, val in data.items():
+
+            log.debug('Testing: {0}'.format(key))
+            result = RDAP(Net(key)).lookup(response=val['response'],
+                                           asn_data=val['asn_data'], depth=0)
+            networks = get_result_networks(result)
+            self.assertTrue(len(networks) > 0)
+
+            namespace = ('rdap', False, 0, (), False, True)
+            cache.set_result(result, namespace=namespace)
+
+            # Answered from the cache for another address in the network,
+            # no network lookup is performed.
+            other = str(networks[0].network_address + (
+                networks[0].num_addresses - 1))
+            cached = RDAP(Net(other)).lookup(asn_data=val['asn_data'],
+                                             cache=cache)
+            self.assertEqual(cached['query'], other)
+            cached['query'] = key
+            self.assertEqual(cached, result)
+
+    def test_ipwhois(self):
+
+        cache = PrefixCache()
+        cache.set(['74.125.225.0/24'], {'query': '74.125.225.1', 'nir': None},
+                  namespace=('lookup_rdap', False, 0, (), False, True, (),
+                             True, True, (), ()))
+
+        obj = IPWhois('74.125.225.229', cache=cache)
+        self.assertEqual(obj.lookup_rdap(), {'query': '74.125.225.229',
+                                             'nir': None})
+        self.assertEqual(cache.stats['hits'], 1)
+
+        # Arguments changing the results are part of the namespace.
+        cache.set(['74.125.225.0/24'], {'query': '74.125.225.1', 'nir': None,
+                                        'asn': '15169'},
+                  namespace=('lookup_rdap', False, 0, (), False, True, (),
+                             True, True, ('whois',), (('ORG', 'arin'),)))
+        self.assertEqual(obj.lookup_rdap(asn_methods=['whois'],
+                                         extra_org_map={'ORG': 'arin'}),
+                         {'query': '74.125.225.229', 'nir': None,
+                          'asn': '15169'})
+
+        cache.set(['74.125.225.0/24'], {'query': '74.125.225.1', 'nir': None,
+                                        'nets': []},
+                  namespace=('lookup_whois', False, False, (), (), True, (),
+                             True, True, True, (), ()))
+        self.assertEqual(obj.lookup_whois(ignore_referral_errors=True),
+                         {'query': '74.125.225.229', 'nir': None, 'nets': []})
+        self.assertEqual(cache.stats['hits'], 3)
+
+    def test_get_result_nir(self):
+
+        cache = PrefixCache()
+        cache.set(['2.2.2.0/24'], {'query': '2.2.2.1',
+                                   'nir': {'query': '2.2.2.1', 'nets': []}})
+
+        self.assertEqual(cache.get_result('2.2.2.9'), {
+            'query': '2.2.2.9', 'nir': {'query': '2.2.2.9', 'nets': []}
+        })
+
+
+class TestEntityCache(TestCommon):
+
+    def test_get(self):
+
+        cache = EntityCache(maxsize=2)
+        self.assertIsNone(cache.get('arin', 'A'))
+
+        cache.set('arin', 'A', {'handle': 'A'}, {'handle': 'A'})
+        cache.set_failed('arin', 'B')
+        self.assertEqual(tuple(cache.get('arin', 'A')),
+                         ({'handle': 'A'}, {'handle': 'A'}))
+        self.assertEqual(tuple(cache.get('arin', 'B')), (None, None))
+        self.assertIsNone(cache.get('ripencc', 'A'))
+
+        # Evicts A, the least recently used.
+        cache.set('arin', 'C', {}, {})
+        self.assertIsNone(cache.get('arin', 'A'))
+        self.assertEqual(cache.stats, {'hits': 2, 'misses': 3,
+                                       'evictions': 1, 'size': 2})
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_ttl(self):
+
+        cache = EntityCache(ttl=-1, negative_ttl=-1)
+        cache.set('arin', 'A', {}, {})
+        cache.set_failed('arin', 'B')
+        self.assertIsNone(cache.get('arin', 'A'))
+        self.assertIsNone(cache.get('arin', 'B'))
+
+    def test_path(self):
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+
+            cache = EntityCache(path=path.join(tmp_dir, 'entities'))
+            cache.set('arin', 'A/1', {'handle': 'A/1'}, {'handle': 'A/1'})
+            cache.set_failed('arin', 'B')
+
+            cache = EntityCache(path=path.join(tmp_dir, 'entities'))
+            self.assertEqual(tuple(cache.get('arin', 'A/1')),
+                             ({'handle': 'A/1'}, {'handle': 'A/1'}))
+            self.assertIsNone(cache.get('arin', 'B'))
+
+        finally:
+
+            shutil.rmtree(tmp_dir)
+
+    def test_rdap_lookup(self):
+
+        data_dir = path.dirname(__file__)
+
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        with io.open(str(data_dir) + '/entity.json', 'r') as data_file:
+            entity = json.load(data_file)
+
+        queries = []
+
+        def get_http_json(url=None, **kwargs):
+
+            queries.append(url)
+            if 'fail' in url:
+
+                raise HTTPLookupError('HTTP lookup failed for {0}.'.format(
+                    url))
+
+            return copy.deepcopy(entity)
+
+        cache = EntityCache()
+        for key, val in data.items():
+
+            log.debug('Testing: {0}'.format(key))
+            net = Net(key)
+            net.get_http_json = get_http_json
+            expected = RDAP(net).lookup(
+                response=copy.deepcopy(val['response']),
+                asn_data=val['asn_data'], depth=1, inc_raw=True
+            )
+
+            del queries[:]
+            for i in range(2):
+
+                result = RDAP(net).lookup(
+                    response=copy.deepcopy(val['response']),
+                    asn_data=val['asn_data'], depth=1, inc_raw=True,
+                    entity_cache=cache
+                )
+                self.assertEqual(result, expected)
+
+            # Each entity is only queried once.
+            self.assertEqual(len(queries), len(set(queries)))
+
+        net = Net('74.125.225.229')
+        net.get_http_json = get_http_json
+        del queries[:]
+        for i in range(2):
+
+            result = RDAP(net)._get_entity(
+                entity='fail', roles={}, asn_data={'asn_registry': 'arin'},
+                entity_cache=cache
+            )
+            self.assertEqual(result.result, {})
+
+        self.assertEqual(len(queries), 1)
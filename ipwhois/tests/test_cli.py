@@ -0,0 +1,156 @@
+import io
+import sys
+import json
+import runpy
+import shutil
+import tempfile
+from os import path
+import logging
+from ipwhois.tests import TestCommon
+from ipwhois import experimental
+from ipwhois.exceptions import (ASNLookupError, IPDefinedError)
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+CLI_PATH = path.join(path.dirname(path.dirname(__file__)), 'scripts',
+                     'ipwhois_cli.py')
+
+
+def bulk_lookup_rdap(addresses=None, **kwargs):
+
+    # The second batch fails.
+    if '10.0.0.3' in addresses:
+
+        raise ASNLookupError('ASN lookup failed.')
+
+    results = dict((address, {'query': address, 'asn_registry': 'arin'})
+                   for address in addresses if address != '10.0.0.2')
+    return results, {
+        'ip_input_total': len(addresses),
+        'ip_lookup_total': len(results),
+        'arin': {'total': len(results)},
+        'unallocated_addresses': ['10.0.0.2']
+    }
+
+
+def iter_lookups(addresses=None, stats=None, **kwargs):
+
+    stats.update({'ip_input_total': 0, 'ip_failed_total': 0})
+    for address in addresses:
+
+        stats['ip_input_total'] += 1
+        if address == '10.0.0.2':
+
+            stats['ip_failed_total'] += 1
+            yield address, None, IPDefinedError('Private-Use Networks.')
+
+        else:
+
+            yield address, {'query': address}, None
+
+
+class TestCLI(TestCommon):
+
+    def setUp(self):
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.input_file = path.join(self.tmp_dir, 'addresses.txt')
+        with io.open(self.input_file, 'w') as f:
+
+            f.write(u'10.0.0.1\n10.0.0.2\n\n 10.0.0.1 \n10.0.0.3\n10.0.0.4\n')
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tmp_dir)
+
+    def run_cli(self, args):
+
+        # Lookups are replaced before the script imports them.
+        originals = (sys.argv, sys.stdout, sys.stderr,
+                     experimental.bulk_lookup_rdap, experimental.iter_lookups)
+        sys.argv = [CLI_PATH] + args
+        sys.stdout = io.StringIO()
+        sys.stderr = io.StringIO()
+        experimental.bulk_lookup_rdap = bulk_lookup_rdap
+        experimental.iter_lookups = iter_lookups
+
+        try:
+
+            script = runpy.run_path(CLI_PATH)
+            stdout = sys.stdout.getvalue()
+            stderr = sys.stderr.getvalue()
+
+        finally:
+
+            (sys.argv, sys.stdout, sys.stderr, experimental.bulk_lookup_rdap,
+             experimental.iter_lookups) = originals
+
+        return (script, [json.loads(line) for line in stdout.splitlines()],
+                json.loads(stderr))
+
+    def test_input_file(self):
+
+        script, records, stats = self.run_cli(['--input_file',
+                                               self.input_file])
+
+        self.assertEqual([record['query'] for record in records],
+                         ['10.0.0.1', '10.0.0.2', '10.0.0.1', '10.0.0.3',
+                          '10.0.0.4'])
+        self.assertEqual(records[1]['error'],
+                         'IPDefinedError: Private-Use Networks.')
+        self.assertEqual(stats, {'ip_input_total': 5, 'ip_failed_total': 1})
+
+        # Stdin.
+        stdin = sys.stdin
+        sys.stdin = io.StringIO(u'10.0.0.1\n\n10.0.0.2\n')
+        try:
+
+            self.assertEqual(list(script['iter_input']('-')),
+                             ['10.0.0.1', '10.0.0.2'])
+
+        finally:
+
+            sys.stdin = stdin
+
+    def test_input_file_bulk(self):
+
+        script, records, stats = self.run_cli([
+            '--input_file', self.input_file, '--bulk', '--bulk_size', '3'
+        ])
+
+        # A failed batch is written with the error, and the next batches
+        # are still looked up.
+        self.assertEqual(records, [
+            {'query': '10.0.0.1', 'asn_registry': 'arin'},
+            {'query': '10.0.0.2',
+             'error': 'Unallocated or ASN lookup failed.'},
+            {'query': '10.0.0.3',
+             'error': 'ASNLookupError: ASN lookup failed.'},
+            {'query': '10.0.0.4',
+             'error': 'ASNLookupError: ASN lookup failed.'}
+        ])
+        self.assertEqual(stats, {
+            'ip_input_total': 5,
+            'ip_unique_total': 2,
+            'ip_lookup_total': 1,
+            'ip_failed_total': 2,
+            'errors': {'ASNLookupError': 2},
+            'arin': {'total': 1},
+            'unallocated_addresses': ['10.0.0.2']
+        })
+
+    def test_merge_stats(self):
+
+        script = self.run_cli(['--input_file', self.input_file])[0]
+
+        total = {}
+        for stats in ({'a': 1, 'b': {'c': 2}, 'd': ['e']},
+                      {'a': 2, 'b': {'c': 1, 'f': 1}, 'd': ['g']}):
+
+            script['merge_stats'](total, stats)
+
+        self.assertEqual(total, {'a': 3, 'b': {'c': 3, 'f': 1},
+                                 'd': ['e', 'g']})
@@ -0,0 +1,143 @@
+import json
+import io
+import copy
+from os import path
+import logging
+from ipwhois.tests import TestCommon
+from ipwhois.cache import PrefixCache
+from ipwhois.compact import (CompactResult, CompactNetwork, CompactEntity,
+                             CompactEvent, CompactWhoisNet, CompactNIRResult,
+                             compact_result)
+from ipwhois.ipwhois import IPWhois
+from ipwhois.net import Net
+from ipwhois.nir import NIRWhois
+from ipwhois.rdap import RDAP
+from ipwhois.whois import Whois
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+
+class TestCompact(TestCommon):
+
+    def setUp(self):
+
+        self.data_dir = path.dirname(__file__)
+
+    def test_rdap(self):
+
+        with io.open(str(self.data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        strings = {}
+        for key, val in data.items():
+
+            log.debug('Testing: {0}'.format(key))
+            results = RDAP(Net(key)).lookup(
+                response=copy.deepcopy(val['response']),
+                asn_data=val['asn_data'], inc_raw=True
+            )
+            results.update(val['asn_data'])
+            results['nir'] = None
+
+            result = compact_result(results, strings)
+            self.assertIsInstance(result, CompactResult)
+            self.assertIsInstance(result.network, CompactNetwork)
+            self.assertEqual(result.to_dict(), results)
+            self.assertEqual(result, results)
+
+            # Dict style access.
+            self.assertEqual(result['network']['cidr'],
+                             results['network']['cidr'])
+            self.assertEqual(result.network.cidr, results['network']['cidr'])
+            self.assertEqual(sorted(result.keys()), sorted(results.keys()))
+            self.assertIsInstance(result.entities, tuple)
+            self.assertIs(result.network.raw, results['network']['raw'])
+
+            for handle, obj in result.objects.items():
+
+                self.assertIsInstance(obj, CompactEntity)
+                for event in obj.events or ():
+
+                    self.assertIsInstance(event, CompactEvent)
+
+        # Strings are shared across results.
+        results = compact_result({'asn_registry': 'a' * 100}, strings)
+        self.assertIs(compact_result({'asn_registry': 'a' * 100},
+                                     strings).asn_registry,
+                      results.asn_registry)
+
+    def test_whois(self):
+
+        with io.open(str(self.data_dir) + '/whois.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        for key, val in data.items():
+
+            log.debug('Testing: {0}'.format(key))
+            results = Whois(Net(key)).lookup(
+                response=val['response'], asn_data=val['asn_data'],
+                is_offline=True, inc_raw=True
+            )
+
+            result = compact_result(results)
+            self.assertEqual(result.to_dict(), results)
+            self.assertTrue(all(isinstance(net, CompactWhoisNet)
+                                for net in result.nets))
+
+        with io.open(str(self.data_dir) + '/jpnic.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        for key, val in data.items():
+
+            results = {'query': key, 'nir': NIRWhois(Net(key)).lookup(
+                nir=val['nir'], response=val['response'], is_offline=True
+            )}
+
+            result = compact_result(results)
+            self.assertIsInstance(result.nir, CompactNIRResult)
+            self.assertEqual(result.to_dict(), results)
+
+    def test_access(self):
+
+        result = compact_result({'query': '74.125.225.229', 'other': [1]})
+
+        self.assertEqual(result['other'], (1,))
+        self.assertEqual(result.extra, {'other': (1,)})
+        self.assertEqual(result.to_dict(), {'query': '74.125.225.229',
+                                            'other': [1]})
+        self.assertTrue('query' in result)
+        self.assertFalse('network' in result)
+        self.assertRaises(KeyError, result.__getitem__, 'network')
+        self.assertRaises(KeyError, result.__getitem__, 'a')
+        self.assertIsNone(result.get('network'))
+        self.assertNotEqual(result, {})
+        self.assertTrue(repr(result).startswith('CompactResult('))
+
+        # Slotted, without an instance dict.
+        self.assertFalse(hasattr(result, '__dict__'))
+
+    def test_ipwhois(self):
+
+        with io.open(str(self.data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        key, val = list(data.items())[0]
+        results = RDAP(Net(key)).lookup(
+            response=copy.deepcopy(val['response']),
+            asn_data=val['asn_data']
+        )
+        results.update(val['asn_data'])
+
+        # Answered from the cache, without lookups.
+        cache = PrefixCache()
+        cache.set([results['network']['cidr'].split(',')[0]], results,
+                  namespace=('lookup_rdap', False, 0, (), False, True, (),
+                             True, True, (), ()))
+
+        obj = IPWhois(key, cache=cache)
+        result = obj.lookup_rdap(compact=True)
+        self.assertIsInstance(result, CompactResult)
+        self.assertEqual(result, obj.lookup_rdap())
@@ -1,12 +1,40 @@
+import io
+import json
+import socket
+from os import path
 import logging
+import threading
+from collections import OrderedDict
+try:  # pragma: no cover
+    import socketserver
+except ImportError:  # pragma: no cover
+    import SocketServer as socketserver
 from ipwhois.tests import TestCommon
-from ipwhois.experimental import (get_bulk_asn_whois, bulk_lookup_rdap)
+from ipwhois import experimental
+from ipwhois.exceptions import (ASNLookupError, HTTPLookupError,
+                                HTTPRateLimitError, WhoisLookupError,
+                                WhoisRateLimitError, IPDefinedError)
+from ipwhois.cache import PrefixCache
+from ipwhois.compact import CompactResult
+from ipwhois.net import Net
+from ipwhois.rdap import RDAP
+from ipwhois.whois import Whois
+from ipwhois.ratelimit import RateLimiter
+from ipwhois.session import Session
+from ipwhois.experimental import (get_bulk_asn_whois, iter_bulk_asn_whois,
+                                  bulk_lookup_rdap, bulk_lookup_whois,
+                                  iter_lookups)
 
 LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
               '[%(funcName)s()] %(message)s')
 logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
 log = logging.getLogger(__name__)
 
+BULK_ADDRESSES = ['74.125.225.229', '2001:4860:4860::8888', '62.239.237.1',
+                  '2a00:2381:ffff::1']
+BULK_LINE = ('15169   | {0} | 74.125.225.0/24     | US | arin     | '
+             '2007-03-13 | GOOGLE, US')
+
 
 class TestExperimental(TestCommon):
 
@@ -21,3 +49,523 @@ class TestExperimental(TestCommon):
         self.assertRaises(ValueError, bulk_lookup_rdap, **dict(
             addresses='1.2.3.4'
         ))
+
+    def test_bulk_lookup_whois(self):
+
+        self.assertRaises(ValueError, bulk_lookup_whois, **dict(
+            addresses='1.2.3.4'
+        ))
+        self.assertRaises(ValueError, bulk_lookup_whois, **dict(
+            addresses=['1.2.3.4'], parser='a'
+        ))
+
+    def test_iter_bulk_asn_whois(self):
+
+        self.assertRaises(ValueError, next, iter_bulk_asn_whois(
+            addresses='1.2.3.4'
+        ))
+
+        # Fail the first query part way through, the retry should only send
+        # the addresses that were not answered.
+        sent = []
+
+        def stream(address_iter, pending, **kwargs):
+
+            addresses = list(address_iter)
+            sent.append(addresses)
+            for address in addresses:
+
+                pending[address] = None
+
+            yield 'Bulk mode; whois.cymru.com [2024-10-15 05:46:42 +0000]'
+            for address in addresses:
+
+                if len(sent) == 1 and address == '62.239.237.1':
+
+                    raise socket.error('Connection reset')
+
+                yield BULK_LINE.format(address)
+
+        original = experimental._stream_bulk_asn_whois
+        experimental._stream_bulk_asn_whois = stream
+        try:
+
+            results = list(iter_bulk_asn_whois(
+                addresses=(ip for ip in BULK_ADDRESSES)
+            ))
+
+            self.assertEqual([r[0] for r in results], BULK_ADDRESSES)
+            self.assertEqual(results[0][1]['asn'], '15169')
+            self.assertEqual(sent[1], BULK_ADDRESSES[2:])
+
+            del sent[:]
+            self.assertRaises(ASNLookupError, list, iter_bulk_asn_whois(
+                addresses=BULK_ADDRESSES, retry_count=0
+            ))
+
+        finally:
+
+            experimental._stream_bulk_asn_whois = original
+
+
+class BulkHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+
+        for line in self.rfile:
+
+            line = line.decode().strip()
+            if line.endswith('begin'):
+
+                self.wfile.write(
+                    b'Bulk mode; whois.cymru.com '
+                    b'[2024-10-15 05:46:42 +0000]\n'
+                )
+
+            elif line == 'end':
+
+                break
+
+            else:
+
+                # Answer each address as it is received.
+                self.wfile.write(BULK_LINE.format(line).encode() + b'\n')
+
+
+class TestStreamBulkASNWhois(TestCommon):
+
+    def setUp(self):
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0),
+                                                      BulkHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_stream_bulk_asn_whois(self):
+
+        addresses = ['10.0.{0}.{1}'.format(i // 256, i % 256)
+                     for i in range(5000)]
+        pending = OrderedDict()
+
+        lines = list(experimental._stream_bulk_asn_whois(
+            iter(addresses), pending, timeout=5, chunk_size=100,
+            server='127.0.0.1', port=self.server.server_address[1]
+        ))
+
+        self.assertTrue(lines[0].startswith('Bulk mode'))
+        self.assertEqual([line.split('|')[1].strip() for line in lines[1:]],
+                         addresses)
+        self.assertEqual(list(pending), addresses)
+
+
+class TestBulkRDAPScheduler(TestCommon):
+
+    def setUp(self):
+
+        rirs = ['arin', 'ripencc', 'apnic', 'lacnic', 'afrinic']
+        self.addresses = ['74.125.{0}.{1}'.format(i // 250, i % 250)
+                          for i in range(50)]
+        self.asn_data = dict(
+            (ip, {'asn_registry': rirs[i % 5], 'asn': '15169',
+                  'asn_cidr': '74.125.0.0/16'})
+            for i, ip in enumerate(self.addresses)
+        )
+        self.attempts = {}
+
+        def iter_bulk(addresses, **kwargs):
+
+            for ip in addresses:
+
+                yield ip, dict(self.asn_data[ip])
+
+        def lookup(rdap, **kwargs):
+
+            ip = rdap._net.address_str
+            self.attempts[ip] = self.attempts.get(ip, 0) + 1
+
+            # Fails once, rate limited once, and always fails.
+            if ip == self.addresses[1] and self.attempts[ip] == 1:
+
+                raise HTTPLookupError('failed')
+
+            if ip == self.addresses[2] and self.attempts[ip] == 1:
+
+                raise HTTPRateLimitError('rate limited')
+
+            if ip == self.addresses[3]:
+
+                raise HTTPLookupError('failed')
+
+            return {'network': {'handle': ip}}
+
+        self.originals = (experimental.iter_bulk_asn_whois, RDAP.lookup)
+        experimental.iter_bulk_asn_whois = iter_bulk
+        RDAP.lookup = lookup
+
+    def tearDown(self):
+
+        experimental.iter_bulk_asn_whois, RDAP.lookup = self.originals
+
+    def _check(self, results, stats):
+
+        self.assertEqual(len(results), 49)
+        self.assertEqual(results[self.addresses[0]]['network']['handle'],
+                         self.addresses[0])
+        self.assertEqual(stats['ip_lookup_total'], 50)
+        self.assertEqual(stats['ip_failed_total'], 1)
+        self.assertEqual(stats['lacnic']['failed'], [self.addresses[3]])
+        self.assertEqual(stats['apnic']['rate_limited'], [self.addresses[2]])
+        self.assertEqual(stats['arin']['total'], 10)
+        self.assertEqual(self.attempts[self.addresses[1]], 2)
+        self.assertEqual(self.attempts[self.addresses[3]], 3)
+
+    def test_bulk_lookup_rdap(self):
+
+        limiter = RateLimiter(limits=dict(
+            (rir, (1000, 1000)) for rir in ['arin', 'ripencc', 'apnic',
+                                            'lacnic', 'afrinic']
+        ))
+
+        results, stats = bulk_lookup_rdap(addresses=self.addresses,
+                                          rate_limiter=limiter)
+        self._check(results, stats)
+
+        self.attempts = {}
+        results, stats = bulk_lookup_rdap(addresses=self.addresses,
+                                          rate_limiter=limiter, max_workers=5)
+        self._check(results, stats)
+
+    def test_bulk_lookup_rdap_error(self):
+
+        cleared = []
+        original = experimental.HTTPConnectionPool
+
+        class HTTPConnectionPool(original):
+
+            def clear(self):
+
+                cleared.append(self)
+                original.clear(self)
+
+        def iter_bulk(addresses, **kwargs):
+
+            raise ASNLookupError('failed')
+
+        experimental.HTTPConnectionPool = HTTPConnectionPool
+        experimental.iter_bulk_asn_whois = iter_bulk
+
+        try:
+
+            # The created connection pool is cleared on errors.
+            self.assertRaises(ASNLookupError, bulk_lookup_rdap,
+                              addresses=self.addresses)
+            self.assertEqual(len(cleared), 1)
+
+        finally:
+
+            experimental.HTTPConnectionPool = original
+
+
+class TestBulkWhoisScheduler(TestCommon):
+
+    def setUp(self):
+
+        rirs = ['arin', 'ripencc', 'apnic', 'lacnic', 'afrinic']
+        self.addresses = ['74.125.{0}.{1}'.format(i // 250, i % 250)
+                          for i in range(50)]
+        self.asn_data = dict(
+            (ip, {'asn_registry': rirs[i % 5], 'asn': '15169',
+                  'asn_cidr': '{0}/32'.format(ip)})
+            for i, ip in enumerate(self.addresses)
+        )
+        self.attempts = {}
+        self.referrals = []
+
+        def iter_bulk(addresses, **kwargs):
+
+            for ip in addresses:
+
+                yield ip, dict(self.asn_data[ip])
+
+        def lookup(whois, **kwargs):
+
+            ip = whois._net.address_str
+            self.attempts[ip] = self.attempts.get(ip, 0) + 1
+
+            # Fails once, rate limited once, and always fails.
+            if ip == self.addresses[1] and self.attempts[ip] == 1:
+
+                raise WhoisLookupError('failed')
+
+            if ip == self.addresses[2] and self.attempts[ip] == 1:
+
+                raise WhoisRateLimitError('rate limited')
+
+            if ip == self.addresses[3]:
+
+                raise WhoisLookupError('failed')
+
+            # Every 5th IP refers to a failing server, the rest to a working
+            # one.
+            server = 'rwhois.{0}.net'.format(
+                'down' if self.addresses.index(ip) % 5 == 4 else 'up')
+
+            return {
+                'query': ip,
+                'nets': [{'cidr': self.asn_data[ip]['asn_cidr']}],
+                'raw': 'ReferralServer:  rwhois://{0}:4321\n'.format(server),
+                'referral': None,
+                'raw_referral': None
+            }
+
+        def get_whois(net, server=None, port=43, **kwargs):
+
+            self.referrals.append(server)
+            if server == 'rwhois.down.net':
+
+                raise WhoisLookupError('failed')
+
+            return 'network:Org-Name:Example {0}\n'.format(net.address_str)
+
+        self.originals = (experimental.iter_bulk_asn_whois, Whois.lookup,
+                          Net.get_whois)
+        experimental.iter_bulk_asn_whois = iter_bulk
+        Whois.lookup = lookup
+        Net.get_whois = get_whois
+
+        self.limiter = RateLimiter(limits=dict(
+            (rir, (1000, 1000)) for rir in ['arin', 'ripencc', 'apnic',
+                                            'lacnic', 'afrinic', 'other']
+        ))
+
+    def tearDown(self):
+
+        (experimental.iter_bulk_asn_whois, Whois.lookup,
+         Net.get_whois) = self.originals
+
+    def test_bulk_lookup_whois(self):
+
+        for max_workers in (0, 4):
+
+            self.attempts = {}
+            results, stats = bulk_lookup_whois(
+                addresses=self.addresses, rate_limiter=self.limiter,
+                max_workers=max_workers
+            )
+
+            self.assertEqual(len(results), 49)
+            self.assertEqual(results[self.addresses[0]]['asn'], '15169')
+            self.assertIsNone(results[self.addresses[0]]['raw'])
+            self.assertIsNone(results[self.addresses[0]]['referral'])
+            self.assertEqual(stats['ip_lookup_total'], 50)
+            self.assertEqual(stats['ip_failed_total'], 1)
+            self.assertEqual(stats['lacnic']['failed'], [self.addresses[3]])
+            self.assertEqual(stats['apnic']['rate_limited'],
+                             [self.addresses[2]])
+            self.assertEqual(stats['arin']['total'], 10)
+            self.assertEqual(stats['referral_failed'], [])
+            self.assertEqual(self.attempts[self.addresses[1]], 2)
+            self.assertEqual(self.attempts[self.addresses[3]], 3)
+
+    def test_referral(self):
+
+        results, stats = bulk_lookup_whois(
+            addresses=self.addresses, rate_limiter=self.limiter,
+            get_referral=True, ignore_referral_errors=True, inc_raw=True
+        )
+
+        self.assertEqual(len(results), 49)
+        self.assertEqual(results[self.addresses[0]]['referral'],
+                         {'description': 'Example 74.125.0.0'})
+        self.assertTrue(results[self.addresses[0]]['raw_referral'])
+        self.assertIsNone(results[self.addresses[4]]['referral'])
+        self.assertEqual(stats['referral_failed'], ['rwhois.down.net:4321'])
+
+        # The failed referral server is only queried once.
+        self.assertEqual(self.referrals.count('rwhois.down.net'), 1)
+
+        # Without ignore_referral_errors, the addresses are failed.
+        self.attempts = {}
+        results, stats = bulk_lookup_whois(
+            addresses=self.addresses, rate_limiter=self.limiter,
+            get_referral=True, retry_count=1, max_workers=1
+        )
+
+        self.assertEqual(len(results), 38)
+        self.assertEqual(stats['ip_failed_total'], 12)
+        self.assertEqual(stats['afrinic']['failed'], self.addresses[4::5])
+
+    def test_cache(self):
+
+        cache = PrefixCache()
+        for i in range(2):
+
+            self.attempts = {}
+            results, stats = bulk_lookup_whois(
+                addresses=self.addresses[5:10], rate_limiter=self.limiter,
+                cache=cache
+            )
+
+            self.assertEqual(len(results), 5)
+
+        self.assertEqual(stats['ip_cached_total'], 5)
+        self.assertEqual(self.attempts, {})
+
+        # Compact results match the results dictionaries.
+        compact, stats = bulk_lookup_whois(
+            addresses=self.addresses[5:10], rate_limiter=self.limiter,
+            cache=cache, compact=True
+        )
+
+        for ip in results:
+
+            self.assertIsInstance(compact[ip], CompactResult)
+            self.assertEqual(compact[ip].to_dict(), results[ip])
+
+
+class TestBulkNIR(TestCommon):
+
+    def setUp(self):
+
+        data_dir = path.dirname(__file__)
+
+        with io.open(str(data_dir) + '/jpnic.json', 'r') as data_file:
+            self.response = json.load(data_file)['133.1.2.5']['response']
+
+        self.addresses = ['133.1.2.{0}'.format(i) for i in range(1, 21)]
+        self.requests = []
+
+        def iter_bulk(addresses, **kwargs):
+
+            for ip in addresses:
+
+                yield ip, {'asn_registry': 'apnic', 'asn': '4730',
+                           'asn_cidr': '133.1.0.0/16',
+                           'asn_country_code': 'JP'}
+
+        def lookup(rdap, **kwargs):
+
+            return {'network': {'handle': rdap._net.address_str}}
+
+        def get_http_raw(net, url=None, **kwargs):
+
+            self.requests.append(url)
+            if net.address_str == self.addresses[1]:
+
+                raise HTTPLookupError('failed')
+
+            if net.address_str in url:
+
+                return self.response
+
+            return '[Last, First]     Example, Contact\n'
+
+        self.originals = (experimental.iter_bulk_asn_whois, RDAP.lookup,
+                          Net.get_http_raw)
+        experimental.iter_bulk_asn_whois = iter_bulk
+        RDAP.lookup = lookup
+        Net.get_http_raw = get_http_raw
+
+    def tearDown(self):
+
+        (experimental.iter_bulk_asn_whois, RDAP.lookup,
+         Net.get_http_raw) = self.originals
+
+    def test_bulk_lookup_rdap(self):
+
+        limiter = RateLimiter(limits={'jpnic': (1000, 1000),
+                                      'apnic': (1000, 1000)})
+
+        results, stats = bulk_lookup_rdap(addresses=self.addresses,
+                                          rate_limiter=limiter)
+
+        self.assertEqual(len(results), 20)
+        self.assertIsNone(results[self.addresses[1]]['nir'])
+        self.assertEqual(stats['jpnic'], {'failed': [self.addresses[1]],
+                                          'total': 20})
+
+        nir = results[self.addresses[0]]['nir']
+        self.assertEqual(nir['query'], self.addresses[0])
+        self.assertEqual(nir['nets'][0]['contacts']['admin']['name'],
+                         'Example, Contact')
+
+        # Each network page is queried, the shared contact handle once.
+        self.assertEqual(len(self.requests), 21)
+        self.assertEqual(len([url for url in self.requests
+                              if 'MY22537JP' in url]), 1)
+
+        del self.requests[:]
+        results, stats = bulk_lookup_rdap(addresses=self.addresses,
+                                          rate_limiter=limiter,
+                                          inc_nir=False)
+
+        self.assertIsNone(results[self.addresses[0]]['nir'])
+        self.assertEqual(stats['jpnic']['total'], 0)
+        self.assertEqual(self.requests, [])
+
+
+class TestIterLookups(TestCommon):
+
+    def setUp(self):
+
+        # Answered from the cache, without lookups.
+        self.cache = PrefixCache()
+        self.cache.set(['74.125.0.0/16'], {
+            'query': None, 'asn_registry': 'arin',
+            'network': {'cidr': '74.125.0.0/16'}
+        }, namespace=('lookup_rdap', False, 0, (), False, True, (), True,
+                      True, (), ()))
+
+        self.addresses = ['74.125.{0}.1'.format(i) for i in range(20)]
+
+    def test_iter_lookups(self):
+
+        self.assertRaises(ValueError, list, iter_lookups('74.125.0.1'))
+
+        for max_workers in (1, 4):
+
+            stats = {}
+            addresses = iter(self.addresses + ['', ' 74.125.0.2\n',
+                                               '10.0.0.1', 'a'])
+            results = {}
+            for address, result, error in iter_lookups(
+                    addresses, max_workers=max_workers,
+                    session=Session(cache=self.cache), stats=stats):
+
+                results[address] = result or error
+
+            self.assertEqual(len(results), 23)
+            self.assertEqual(results['74.125.0.2']['query'], '74.125.0.2')
+            self.assertIsInstance(results['10.0.0.1'], IPDefinedError)
+            self.assertIsInstance(results['a'], ValueError)
+            self.assertEqual(stats['ip_input_total'], 23)
+            self.assertEqual(stats['ip_lookup_total'], 21)
+            self.assertEqual(stats['ip_failed_total'], 2)
+            self.assertEqual(stats['errors'], {'IPDefinedError': 1,
+                                               'ValueError': 1})
+            self.assertEqual(stats['arin']['total'], 21)
+
+    def test_backpressure(self):
+
+        read = []
+
+        def addresses():
+
+            for address in self.addresses:
+
+                read.append(address)
+                yield address
+
+        lookups = iter_lookups(addresses(), max_workers=2,
+                               session=Session(cache=self.cache))
+
+        # Only max_workers * 2 addresses are read ahead.
+        next(lookups)
+        self.assertEqual(len(read), 4)
+        self.assertEqual(len(list(lookups)), 19)
@@ -0,0 +1,93 @@
+import os
+import sys
+import subprocess
+import unittest
+from os import path
+import logging
+import ipwhois
+from ipwhois.tests import TestCommon
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+ROOT_DIR = path.dirname(path.dirname(path.dirname(path.abspath(__file__))))
+SCRIPTS_DIR = path.join(ROOT_DIR, 'ipwhois', 'scripts')
+
+# Modules which must not be loaded on a cold start.
+HEAVY_MODULES = ('dns.resolver', 'defusedxml.minidom', 'orjson', 'ujson',
+                 'concurrent.futures.process')
+
+
+def import_times(args):
+    """
+    Run python -X importtime, returning the import times.
+
+    Args:
+        args (:obj:`list`): The arguments after the interpreter options.
+
+    Returns:
+        dict: The self import time (microseconds), by module.
+    """
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT_DIR
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime'] + args, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    stderr = process.communicate()[1].decode('utf-8', 'ignore')
+
+    ret = {}
+    for line in stderr.splitlines():
+
+        if not line.startswith('import time:') or 'cumulative' in line:
+
+            continue
+
+        self_time, cumulative, module = line[12:].split('|')
+        ret[module.strip()] = int(self_time)
+
+    return ret
+
+
+@unittest.skipIf(sys.version_info < (3, 7), 'requires -X importtime')
+class TestImports(TestCommon):
+
+    def test_package(self):
+
+        for statement in ('import ipwhois', 'import ipwhois.utils'):
+
+            times = import_times(['-c', statement])
+            self.assertNotIn('ipwhois.net', times)
+            self.assertNotIn('urllib.request', times)
+            for module in HEAVY_MODULES:
+
+                self.assertNotIn(module, times)
+
+        times = import_times(['-c', 'from ipwhois import IPWhois'])
+        self.assertIn('ipwhois.net', times)
+        self.assertNotIn('dns.resolver', times)
+
+    def test_scripts(self):
+
+        for script in ('ipwhois_cli.py', 'ipwhois_utils_cli.py'):
+
+            times = import_times([path.join(SCRIPTS_DIR, script), '-h'])
+            self.assertIn('ipwhois', times)
+            for module in HEAVY_MODULES:
+
+                self.assertNotIn(module, times)
+
+    def test_lazy_attributes(self):
+
+        from ipwhois.net import Net
+        from ipwhois.ipwhois import IPWhois
+        from ipwhois.session import Session
+
+        self.assertIs(ipwhois.Net, Net)
+        self.assertIs(ipwhois.IPWhois, IPWhois)
+        self.assertIs(ipwhois.Session, Session)
+        self.assertTrue({'Net', 'IPWhois', 'Session'} <= set(dir(ipwhois)))
+        self.assertRaises(AttributeError, getattr, ipwhois, 'NotAClass')
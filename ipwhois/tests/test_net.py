@@ -55,3 +55,34 @@ class TestNet(TestCommon):
         opener = build_opener(handler)
         result = Net(address='74.125.225.229', proxy_opener=opener)
         self.assertIsInstance(result.opener, OpenerDirector)
+        self.assertIs(result.opener, opener)
+
+    def test_lazy_init(self):
+        import dns.resolver
+
+        result = Net('74.125.225.229', timeout=3)
+
+        # Nothing is built until first use.
+        self.assertIsNone(result._dns_resolver)
+        self.assertIsNone(result._opener)
+        self.assertIsNone(result._reversed)
+
+        self.assertEqual(result.dns_resolver.timeout, 3)
+        self.assertIs(result.dns_resolver, result.dns_resolver)
+        self.assertIs(result.opener, result.opener)
+        self.assertEqual(result.reversed, '229.225.125.74')
+        self.assertEqual(result.dns_zone,
+                         '229.225.125.74.origin.asn.cymru.com.')
+
+        result = Net('2001:4860:4860::8888')
+        self.assertEqual(result.dns_zone,
+                         '8.8.8.8.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.6.8.4.0.6.'
+                         '8.4.1.0.0.2.origin6.asn.cymru.com.')
+
+        result = Net('2001:4860::')
+        self.assertEqual(result.reversed, '0.6.8.4.1.0.0.2')
+
+        # A shared resolver is used as is.
+        resolver = dns.resolver.Resolver(configure=False)
+        result = Net('74.125.225.229', dns_resolver=resolver)
+        self.assertIs(result.dns_resolver, resolver)
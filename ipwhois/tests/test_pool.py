@@ -0,0 +1,157 @@
+import json
+import threading
+import logging
+from ipwhois.tests import TestCommon
+from ipwhois.net import Net
+from ipwhois.pool import HTTPConnectionPool
+
+try:  # pragma: no cover
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:  # pragma: no cover
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    # Avoid delayed ACK stalls between the header and body writes on
+    # persistent connections.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def _respond(self, body):
+
+        body = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if self.path.endswith('close'):
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+
+        self._respond(json.dumps({'path': self.path}))
+
+    def do_POST(self):
+
+        length = int(self.headers['Content-Length'])
+        self._respond(self.rfile.read(length).decode())
+
+    def log_message(self, *args):
+
+        pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+    connections = 0
+
+
+class TestHTTPConnectionPool(TestCommon):
+
+    def setUp(self):
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{0}'.format(
+            self.server.server_address[1])
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuse(self):
+
+        pool = HTTPConnectionPool()
+
+        for i in range(5):
+
+            net = Net('74.125.225.229', http_pool=pool)
+            self.assertEqual(net.get_http_json(
+                url='{0}/entity/{1}'.format(self.url, i)),
+                {'path': '/entity/{0}'.format(i)})
+
+        self.assertEqual(net.get_http_raw(
+            url='{0}/'.format(self.url), request_type='POST',
+            form_data={'key': 'value'}), 'key=value')
+
+        self.assertEqual(self.server.connections, 1)
+        pool.clear()
+
+    def test_no_pool(self):
+
+        net = Net('74.125.225.229')
+        for i in range(2):
+
+            net.get_http_json(url='{0}/'.format(self.url))
+
+        self.assertEqual(self.server.connections, 2)
+
+    def test_idle_timeout(self):
+
+        pool = HTTPConnectionPool(idle_timeout=-1)
+        net = Net('74.125.225.229', http_pool=pool)
+        for i in range(2):
+
+            net.get_http_json(url='{0}/'.format(self.url))
+
+        self.assertEqual(self.server.connections, 2)
+        pool.clear()
+
+    def test_maxsize(self):
+
+        pool = HTTPConnectionPool(maxsize=0)
+        net = Net('74.125.225.229', http_pool=pool)
+        for i in range(2):
+
+            net.get_http_json(url='{0}/'.format(self.url))
+
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(pool._idle[('http', '127.0.0.1:{0}'.format(
+            self.server.server_address[1]))], [])
+
+    def test_connection_close(self):
+
+        pool = HTTPConnectionPool()
+        net = Net('74.125.225.229', http_pool=pool)
+        for i in range(2):
+
+            net.get_http_json(url='{0}/close'.format(self.url))
+
+        self.assertEqual(self.server.connections, 2)
+
+    def test_stale_connection(self):
+
+        pool = HTTPConnectionPool()
+        net = Net('74.125.225.229', http_pool=pool)
+        net.get_http_json(url='{0}/'.format(self.url))
+
+        # Simulate the server dropping the idle connection.
+        for conns in pool._idle.values():
+
+            for conn, last_used in conns:
+
+                conn.sock.close()
+
+        self.assertEqual(net.get_http_json(url='{0}/stale'.format(self.url)),
+                         {'path': '/stale'})
+        self.assertEqual(self.server.connections, 2)
+        pool.clear()
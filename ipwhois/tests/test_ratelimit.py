@@ -0,0 +1,142 @@
+import json
+import time
+import threading
+import logging
+from ipwhois.tests import TestCommon
+from ipwhois.tests.test_pool import Handler, Server
+from ipwhois.exceptions import HTTPRateLimitError
+from ipwhois.net import Net
+from ipwhois.ratelimit import (TokenBucket, RateLimiter, get_registry_key)
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+
+class LimitedHandler(Handler):
+
+    def do_GET(self):
+
+        self.server.requests += 1
+
+        # Rate limit every other request.
+        if self.server.requests % 2:
+
+            body = b'{}'
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        else:
+
+            self._respond(json.dumps({'path': self.path}))
+
+
+class TestTokenBucket(TestCommon):
+
+    def test_acquire(self):
+
+        bucket = TokenBucket(rate=1, capacity=2)
+
+        self.assertTrue(bucket.acquire(blocking=False))
+        self.assertTrue(bucket.acquire(blocking=False))
+        self.assertFalse(bucket.acquire(blocking=False))
+        self.assertGreater(bucket.wait_time(), 0)
+
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.time()
+        for i in range(6):
+
+            bucket.acquire()
+
+        self.assertGreaterEqual(time.time() - start, 0.09)
+
+    def test_penalize_reward(self):
+
+        bucket = TokenBucket(rate=10, capacity=5, max_rate=12)
+
+        bucket.penalize()
+        self.assertEqual(bucket.rate, 5)
+        self.assertFalse(bucket.acquire(blocking=False))
+
+        for i in range(10):
+
+            bucket.penalize()
+
+        self.assertEqual(bucket.rate, bucket.min_rate)
+
+        for i in range(100):
+
+            bucket.reward()
+
+        self.assertEqual(bucket.rate, 12)
+
+        bucket.penalize(retry_after=60)
+        self.assertGreater(bucket.wait_time(), 59)
+
+
+class TestRateLimiter(TestCommon):
+
+    def test_get_registry_key(self):
+
+        self.assertEqual(get_registry_key(
+            url='https://rdap.lacnic.net/rdap/ip/200.57.141.161'), 'lacnic')
+        self.assertEqual(get_registry_key(server='whois.arin.net'), 'arin')
+        self.assertEqual(get_registry_key(url='http://example.com/'),
+                         'other')
+
+    def test_buckets(self):
+
+        limiter = RateLimiter(limits={'lacnic': (1, 1)})
+        opener = object()
+
+        self.assertTrue(limiter.acquire('lacnic', blocking=False))
+        self.assertFalse(limiter.acquire('lacnic', blocking=False))
+
+        # Each registry and proxy opener has its own bucket.
+        self.assertTrue(limiter.acquire('lacnic', opener, blocking=False))
+        self.assertTrue(limiter.acquire('arin', blocking=False))
+        self.assertIs(limiter.get_bucket('lacnic'),
+                      limiter.get_bucket('lacnic'))
+
+        limiter.penalize('arin')
+        self.assertEqual(limiter.get_bucket('arin').rate, 5)
+        limiter.reward('arin')
+        self.assertGreater(limiter.get_bucket('arin').rate, 5)
+
+    def test_get_http_json(self):
+
+        server = Server(('127.0.0.1', 0), LimitedHandler)
+        server.requests = 0
+        url = 'http://127.0.0.1:{0}/ip/74.125.225.229'.format(
+            server.server_address[1])
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        try:
+
+            limiter = RateLimiter(limits={'other': (1000, 10)})
+            net = Net('74.125.225.229', rate_limiter=limiter)
+
+            # The 429 backs off the registry instead of sleeping for
+            # rate_limit_timeout.
+            start = time.time()
+            result = net.get_http_json(url=url, retry_count=1,
+                                       rate_limit_timeout=60)
+            self.assertEqual(result['path'], '/ip/74.125.225.229')
+            self.assertLess(time.time() - start, 5)
+            self.assertEqual(server.requests, 2)
+            self.assertLess(limiter.get_bucket('other').rate, 1000)
+
+            self.assertRaises(HTTPRateLimitError, net.get_http_json, **dict(
+                url=url, retry_count=0
+            ))
+
+        finally:
+
+            server.shutdown()
+            server.server_close()
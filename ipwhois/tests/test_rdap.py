@@ -1,11 +1,16 @@
 import json
 import io
+import copy
+import time
+import random
 from os import path
 import logging
 from ipwhois.tests import TestCommon
 from ipwhois.rdap import (RDAP, _RDAPEntity, _RDAPContact, _RDAPNetwork, Net,
                           InvalidEntityObject, InvalidEntityContactObject,
-                          InvalidNetworkObject, NetError)
+                          InvalidNetworkObject, NetError, parse_rdap,
+                          parse_rdap_batch, VCARD_TYPES)
+from ipwhois.exceptions import HTTPLookupError
 
 LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
               '[%(funcName)s()] %(message)s')
@@ -131,9 +136,120 @@ class TestRDAP(TestCommon):
             depth=0,
             root_ent_check=False), dict)
 
+    def test_parse_rdap(self):
+
+        data_dir = path.dirname(__file__)
+
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        for key, val in data.items():
+
+            log.debug('Testing: {0}'.format(key))
+
+            # The same results as a lookup without entity queries.
+            results = RDAP(Net(key)).lookup(
+                response=copy.deepcopy(val['response']),
+                asn_data=val['asn_data'], root_ent_check=False, inc_raw=True
+            )
+            self.assertEqual(parse_rdap(copy.deepcopy(val['response']),
+                                        query=key, inc_raw=True), results)
+            self.assertEqual(parse_rdap(json.dumps(val['response']),
+                                        query=key, inc_raw=True), results)
+
+        self.assertRaises(InvalidNetworkObject, parse_rdap, {})
+        self.assertRaises(ValueError, parse_rdap, 'a')
+
+    def test_parse_rdap_batch(self):
+
+        data_dir = path.dirname(__file__)
+
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        responses = [(key, json.dumps(val['response']))
+                     for key, val in data.items()]
+        expected = [parse_rdap(response, query=key)
+                    for key, response in responses]
+
+        # Invalid responses are yielded with the error, in order.
+        responses.insert(1, '{}')
+        expected.insert(1, None)
+
+        for processes in (None, 2):
+
+            log.debug('Testing processes: {0}'.format(processes))
+            ret = list(parse_rdap_batch(iter(responses), processes=processes,
+                                        chunk_size=3))
+
+            self.assertEqual([results for results, error in ret], expected)
+            self.assertIsInstance(ret[1][1], InvalidNetworkObject)
+            self.assertTrue(all(error is None for results, error in ret
+                                if results is not None))
+
+        # Closed early.
+        batch = parse_rdap_batch(responses, processes=2, chunk_size=1)
+        self.assertEqual(next(batch)[0], expected[0])
+        batch.close()
+
 
 class TestRDAPContact(TestCommon):
 
+    def test_lookup_max_workers(self):
+
+        data_dir = path.dirname(__file__)
+
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        with io.open(str(data_dir) + '/entity.json', 'r') as data_file:
+            entity = json.load(data_file)
+
+        def get_http_json(url=None, **kwargs):
+
+            # Each entity references two sub-entities, completing out of
+            # order.
+            handle = url.split('/')[-1]
+            time.sleep(random.random() / 100)
+
+            if handle.endswith('-fail'):
+
+                raise HTTPLookupError('HTTP lookup failed for {0}.'.format(
+                    url))
+
+            response = copy.deepcopy(entity)
+            response['handle'] = handle
+            response['entities'] = [
+                {'handle': '{0}-{1}'.format(handle, i), 'roles': [str(i)]}
+                for i in ('a', 'fail')
+            ]
+            return response
+
+        for key, val in data.items():
+
+            log.debug('Testing: {0}'.format(key))
+            net = Net(key)
+            net.get_http_json = get_http_json
+
+            response = copy.deepcopy(val['response'])
+            for ent in response['entities']:
+
+                ent.pop('vcardArray', None)
+
+            expected = RDAP(net).lookup(
+                response=copy.deepcopy(response), asn_data=val['asn_data'],
+                depth=2
+            )
+            self.assertTrue(len(expected['objects']) > 1)
+
+            result = RDAP(net).lookup(
+                response=copy.deepcopy(response), asn_data=val['asn_data'],
+                depth=2, max_workers=4
+            )
+            self.assertEqual(result, expected)
+            self.assertEqual(list(result['objects'].keys()),
+                             list(expected['objects'].keys()))
+
     def test__RDAPContact(self):
 
         self.assertRaises(InvalidEntityContactObject, _RDAPContact, 'a')
@@ -146,6 +262,43 @@ class TestRDAPContact(TestCommon):
         contact = _RDAPContact(data['vcardArray'][1])
         contact.parse()
 
+        self.assertEqual(contact.vars, {
+            'name': 'Google Inc',
+            'kind': 'group',
+            'address': [{
+                'type': None,
+                'value': ('1600 Amphitheatre Parkway\nMountain View\nCA\n'
+                          '94043\nUNITED STATES')
+            }],
+            'phone': [{'type': ['work', 'voice'],
+                       'value': '+1-650-253-0000'}],
+            'email': [{'type': None, 'value': 'arin-contact@google.com'}],
+            'role': None,
+            'title': None
+        })
+
+        # Type lists are copied, with the common labels shared.
+        vcard = [['tel', {'type': [''.join(['wo', 'rk']), 'x']}, 'text',
+                  ' 1 '],
+                 ['adr', {'type': 'home'}, 'text', ['a', 'b ']],
+                 ['email', [], 'text', 'a@b.c'], [], 'fn',
+                 [['fn'], {}, 'text', 'a'], ['title', {}, 'text', 'a']]
+        contact = _RDAPContact(vcard)
+        contact.parse()
+
+        self.assertEqual(contact.vars['phone'],
+                         [{'type': ['work', 'x'], 'value': '1'}])
+        self.assertIsNot(contact.vars['phone'][0]['type'], vcard[0][1]['type'])
+        self.assertIsNot(vcard[0][1]['type'][0], VCARD_TYPES['work'])
+        self.assertIs(contact.vars['phone'][0]['type'][0],
+                      VCARD_TYPES['work'])
+        self.assertEqual(contact.vars['address'],
+                         [{'type': 'home', 'value': 'a\nb'}])
+        self.assertEqual(contact.vars['email'],
+                         [{'type': None, 'value': 'a@b.c'}])
+        self.assertIsNone(contact.vars['name'])
+        self.assertEqual(contact.vars['title'], 'a')
+
         self.assertRaises(IndexError, contact._parse_phone, [])
         self.assertRaises(IndexError, contact._parse_role, [])
         self.assertRaises(IndexError, contact._parse_title, [])
@@ -0,0 +1,120 @@
+import json
+import io
+import copy
+from os import path
+import logging
+from ipwhois.tests import TestCommon
+from ipwhois.cache import (PrefixCache, EntityCache)
+from ipwhois.ipwhois import IPWhois
+from ipwhois.net import Net
+from ipwhois.pool import HTTPConnectionPool
+from ipwhois.rdap import RDAP
+from ipwhois.session import Session
+
+LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
+              '[%(funcName)s()] %(message)s')
+logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
+log = logging.getLogger(__name__)
+
+
+class TestSession(TestCommon):
+
+    def test_net(self):
+        try:
+            from urllib.request import (ProxyHandler,
+                                        build_opener)
+        except ImportError:
+            from urllib2 import (ProxyHandler,
+                                 build_opener)
+
+        session = Session(timeout=3)
+        self.assertIsInstance(session.http_pool, HTTPConnectionPool)
+        self.assertIsInstance(session.entity_cache, EntityCache)
+
+        # Nothing is built until first use, then shared.
+        self.assertIsNone(session._dns_resolver)
+        self.assertIsNone(session._opener)
+
+        net_a = session.net('74.125.225.229')
+        net_b = Net('2001:4860:4860::8888', timeout=10, session=session)
+        self.assertIs(net_a.session, session)
+        self.assertEqual(net_b.timeout, 3)
+        self.assertIs(net_b.http_pool, session.http_pool)
+        self.assertIs(net_a.dns_resolver, net_b.dns_resolver)
+        self.assertIs(net_a.dns_resolver, session.dns_resolver)
+        self.assertEqual(net_a.dns_resolver.timeout, 3)
+        self.assertIs(net_a.opener, net_b.opener)
+        self.assertIs(net_a.opener, session.opener)
+
+        opener = build_opener(ProxyHandler())
+        session = Session(proxy_opener=opener)
+        self.assertIs(session.net('74.125.225.229').opener, opener)
+
+        session.close()
+        self.assertEqual(session.http_pool._idle, {})
+
+    def test_ipwhois(self):
+
+        cache = PrefixCache()
+        session = Session(cache=cache)
+
+        result = session.ipwhois('74.125.225.229')
+        self.assertIsInstance(result, IPWhois)
+        self.assertIs(result.net.session, session)
+        self.assertIs(result.cache, cache)
+        self.assertIs(result.entity_cache, session.entity_cache)
+
+        # The session replaces the arguments.
+        result = IPWhois('74.125.225.229', cache=PrefixCache(),
+                         session=session)
+        self.assertIs(result.cache, cache)
+
+        session = Session(entity_cache=False)
+        self.assertIsNone(session.entity_cache)
+        self.assertIsNone(session.ipwhois('74.125.225.229').entity_cache)
+
+    def test_rdap(self):
+
+        data_dir = path.dirname(__file__)
+
+        with io.open(str(data_dir) + '/rdap.json', 'r') as data_file:
+            data = json.load(data_file)
+
+        with io.open(str(data_dir) + '/entity.json', 'r') as data_file:
+            entity = json.load(data_file)
+
+        requests = []
+
+        def get_http_json(url=None, **kwargs):
+
+            requests.append(url)
+            response = copy.deepcopy(entity)
+            response['handle'] = url.split('/')[-1]
+            response['entities'] = []
+            return response
+
+        session = Session()
+        for key, val in data.items():
+
+            log.debug('Testing: {0}'.format(key))
+            response = copy.deepcopy(val['response'])
+            for ent in response['entities']:
+
+                ent.pop('vcardArray', None)
+
+            # The second lookup is answered from the session entity cache.
+            results = []
+            for i in range(2):
+
+                net = session.net(key)
+                net.get_http_json = get_http_json
+                del requests[:]
+                results.append(RDAP(net).lookup(
+                    response=copy.deepcopy(response),
+                    asn_data=val['asn_data']
+                ))
+
+            self.assertEqual(results[0], results[1])
+            self.assertEqual(requests, [])
+
+        self.assertTrue(len(session.entity_cache) > 0)
@@ -1,14 +1,34 @@
+import re
 import sys
+import io
+import json
+import shutil
+import tempfile
 from os import path
 import logging
 from ipwhois.tests import TestCommon
+
+if sys.version_info >= (3, 3):  # pragma: no cover
+    from ipaddress import (IPv4Address, IPv6Address)
+else:  # pragma: no cover
+    from ipaddr import (IPv4Address, IPv6Address)
 from ipwhois.utils import (ipv4_lstrip_zeros,
                            calculate_cidr,
                            get_countries,
+                           get_country,
+                           get_country_code,
                            ipv4_is_defined,
                            ipv6_is_defined,
+                           ipv4_is_defined_batch,
+                           ipv6_is_defined_batch,
                            unique_everseen,
+                           compile_field_pattern,
+                           JSON_BACKENDS,
+                           json_loads,
+                           json_dumps,
                            unique_addresses,
+                           _unique_addresses_match,
+                           IP_REGEX,
                            ipv4_generate_random,
                            ipv6_generate_random)
 
@@ -55,6 +75,36 @@ class TestFunctions(TestCommon):
         self.assertIsInstance(countries, dict)
         self.assertEqual(countries['US'], 'United States')
 
+        # A new dictionary each call, from the shared frozen table.
+        countries['US'] = 'a'
+        self.assertEqual(get_countries()['US'], 'United States')
+        frozen = get_countries(frozen=True)
+        self.assertIs(get_countries(frozen=True), frozen)
+        self.assertEqual(dict(frozen), get_countries())
+
+        with self.assertRaises(TypeError):
+
+            frozen['US'] = 'a'
+
+    def test_get_country(self):
+
+        self.assertEqual(get_country('US'), 'United States')
+        self.assertEqual(get_country('us'), 'United States')
+        self.assertEqual(get_country('US', is_legacy_xml=True),
+                         'United States')
+        self.assertIsNone(get_country('XX'))
+        self.assertIsNone(get_country(None))
+        self.assertEqual(get_country('', 'a'), 'a')
+
+        self.assertEqual(get_country_code('United States'), 'US')
+        self.assertEqual(get_country_code('UNITED STATES'), 'US')
+        self.assertIsNone(get_country_code('a'))
+        self.assertIsNone(get_country_code(None))
+
+        for code, name in get_countries().items():
+
+            self.assertEqual(get_country(code), name)
+
     def test_ipv4_is_defined(self):
         if sys.version_info >= (3, 3):
             from ipaddress import AddressValueError
@@ -121,6 +171,49 @@ class TestFunctions(TestCommon):
         self.assertEqual(ipv6_is_defined('fc00::'),
                           (True, 'Unique Local Unicast', 'RFC 4193'))
 
+    def test_ipv4_is_defined_batch(self):
+
+        addresses = ['74.125.225.229', '0.0.0.0', '127.0.0.1', '169.254.0.0',
+                     '192.0.0.0', '192.0.2.0', '192.88.99.0', '198.18.0.0',
+                     '198.51.100.0', '203.0.113.0', '224.0.0.0',
+                     '255.255.255.255', '192.168.0.1', '10.255.255.255',
+                     '11.0.0.0', '172.31.255.255', '240.0.0.0']
+
+        expected = [ipv4_is_defined(a) for a in addresses]
+
+        self.assertEqual(ipv4_is_defined_batch(addresses), expected)
+        self.assertEqual(ipv4_is_defined_batch(
+            int(IPv4Address(a)) for a in addresses), expected)
+        self.assertEqual(ipv4_is_defined_batch(
+            [IPv4Address(a) for a in addresses]), expected)
+        self.assertEqual(ipv4_is_defined_batch([]), [])
+
+        self.assertEqual(ipv4_is_defined_batch([0])[0].ietf_name,
+                         'This Network')
+        self.assertRaises(ValueError, ipv4_is_defined_batch, [2**32])
+        self.assertRaises(ValueError, ipv4_is_defined_batch, [-1])
+        self.assertRaises(ValueError, ipv4_is_defined_batch,
+                          ['192.168.0.256'])
+
+    def test_ipv6_is_defined_batch(self):
+
+        addresses = ['2001:4860:4860::8888', 'ff00::', '::', '::1', '100::',
+                     'fe80::', 'fec0::', 'fc00::', '2001:db8::1',
+                     '2001:1ff::', '2001:200::', '1fff::', '2000::', 'e::',
+                     'ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff']
+
+        expected = [ipv6_is_defined(a) for a in addresses]
+
+        self.assertEqual(ipv6_is_defined_batch(addresses), expected)
+        self.assertEqual(ipv6_is_defined_batch(
+            int(IPv6Address(a)) for a in addresses), expected)
+        self.assertEqual(ipv6_is_defined_batch(
+            [IPv6Address(a) for a in addresses]), expected)
+
+        self.assertRaises(ValueError, ipv6_is_defined_batch, [2**128])
+        self.assertRaises(ValueError, ipv6_is_defined_batch,
+                          ['2001:4860:4860::8888::1234'])
+
     def test_unique_everseen(self):
 
         input_list = ['b', 'a', 'c', 'a', 'b', 'x', 'a']
@@ -130,6 +223,44 @@ class TestFunctions(TestCommon):
         self.assertEqual(list(unique_everseen(input_list, str.lower)),
                           ['b', 'a', 'c', 'x'])
 
+    def test_compile_field_pattern(self):
+
+        pattern = compile_field_pattern(r'^country:[^\S\n]+(?P<val>.+?)\n')
+        self.assertIs(compile_field_pattern(
+            r'^country:[^\S\n]+(?P<val>.+?)\n'), pattern)
+        self.assertIs(compile_field_pattern(pattern), pattern)
+        self.assertEqual(pattern.search('country: US\n').group('val'), 'US')
+
+        # Same pattern, different flags.
+        self.assertIsNot(compile_field_pattern(pattern.pattern, re.MULTILINE),
+                         pattern)
+
+    def test_json_loads(self):
+
+        data_dir = path.dirname(__file__)
+
+        with io.open(str(data_dir) + '/rdap.json', 'rb') as data_file:
+            data = data_file.read()
+
+        expected = json.loads(data.decode('utf-8'))
+
+        for backend in JSON_BACKENDS:
+
+            self.assertEqual(json_loads(data, backend=backend), expected)
+            self.assertEqual(json_loads(data.decode('utf-8'),
+                                        backend=backend), expected)
+            self.assertEqual(json_loads(json_dumps(expected, backend=backend),
+                                        backend=backend), expected)
+
+            # Invalid UTF-8 is ignored.
+            self.assertEqual(json_loads(b'{"a": "b\xff/c"}', backend=backend),
+                             {'a': 'b/c'})
+            self.assertRaises(ValueError, json_loads, b'{"a"',
+                              backend=backend)
+
+        self.assertRaises(ValueError, json_loads, b'{}', backend='a')
+        self.assertRaises(ValueError, json_dumps, {}, backend='a')
+
     def test_unique_addresses(self):
 
         self.assertRaises(ValueError, unique_addresses)
@@ -309,6 +440,101 @@ class TestFunctions(TestCommon):
             self.assertEqual(unique_addresses(file_path=fp),
                              fp_expected_result)
 
+    def test_unique_addresses_chunks(self):
+
+        lines = []
+        for i in range(200):
+
+            lines.append('{0} 10.0.{1}.1:{2} [2001:db8::{1}]:443 '
+                         '10.{1}.0.0/16'.format(i, i % 7, 80 + i % 3))
+
+        input_data = '\n'.join(lines) + '\n'
+        expected_result = unique_addresses(input_data)
+        self.assertEqual(expected_result['10.0.1.1'],
+                         {'count': 29, 'ports': {'80': 9, '81': 10,
+                                                 '82': 10}})
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+
+            fp = path.join(tmp_dir, 'addresses.log')
+            with io.open(fp, 'w') as f:
+
+                f.write(u'{0}'.format(input_data))
+
+            # Chunks and byte ranges split lines, which must be handled.
+            for chunk_size in (7, 64, 1000, 100000):
+
+                self.assertEqual(unique_addresses(file_path=fp,
+                                                  chunk_size=chunk_size),
+                                 expected_result)
+
+            self.assertEqual(unique_addresses(file_path=fp, chunk_size=64,
+                                              processes=3),
+                             expected_result)
+
+            # Both data and a file.
+            result = unique_addresses(data='10.0.1.1:80', file_path=fp)
+            self.assertEqual(result['10.0.1.1']['ports']['80'], 10)
+
+            # A single line, without a newline.
+            with io.open(fp, 'w') as f:
+
+                f.write(u'{0}'.format(' '.join(lines)))
+
+            for processes in (None, 3):
+
+                self.assertEqual(unique_addresses(file_path=fp, chunk_size=64,
+                                                  processes=processes),
+                                 expected_result)
+
+        finally:
+
+            shutil.rmtree(tmp_dir)
+
+    def test_unique_addresses_tokens(self):
+
+        # The previous implementation, IP_REGEX over the whole input.
+        def unique_addresses_regex(data):
+
+            ret = {}
+            for match in re.finditer(IP_REGEX, data, re.DOTALL):
+
+                entry = _unique_addresses_match(match.group('ip'))
+                if entry is None:
+
+                    continue
+
+                addr = ret.setdefault(entry[0], {'count': 0, 'ports': {}})
+                addr['count'] += 1
+                if entry[1]:
+
+                    addr['ports'][entry[1]] = addr['ports'].get(entry[1],
+                                                                0) + 1
+
+            return ret
+
+        input_data = (
+            'Mixed 74.125.225.229, (2001:4860:4860::8888) and 10.0.0.1:8080\n'
+            'net=192.168.0.0/24;[2001:db8::1]:443 host1.example.com\n'
+            'not 999.1.1.1 or 1.2.3 but x74.125.225.229y and '
+            '"2001:db8:0:0:0:0:0:2"\ntime 12:30:01 mac 00:1a:2b:3c:4d:5e\n'
+        ) * 3
+
+        self.assertEqual(unique_addresses(input_data),
+                         unique_addresses_regex(input_data))
+
+        if sys.version_info >= (3, 9):
+
+            # IPv6 zone IDs.
+            self.assertEqual(unique_addresses('fe80::1%eth0'),
+                             {'fe80::1%eth0': {'count': 1, 'ports': {}}})
+            self.assertEqual(
+                unique_addresses('a [fe80::1%en_0-a]:80, fe80::2%eth1 b'),
+                {'fe80::1%en_0-a': {'count': 1, 'ports': {'80': 1}},
+                 'fe80::2%eth1': {'count': 1, 'ports': {}}}
+            )
+
     def test_ipv4_generate_random(self):
 
         self.assertEqual(len(list(ipv4_generate_random(1000))), 1000)
@@ -4,7 +4,7 @@ from os import path
 import logging
 from ipwhois.tests import TestCommon
 from ipwhois.net import Net
-from ipwhois.whois import (Whois, RIR_WHOIS, NetError)
+from ipwhois.whois import (Whois, RIR_WHOIS, NetError, BASE_NET)
 
 LOG_FORMAT = ('[%(asctime)s] [%(levelname)s] [%(filename)s:%(lineno)s] '
               '[%(funcName)s()] %(message)s')
@@ -33,11 +33,19 @@ class TestWhois(TestCommon):
 
             try:
 
-                self.assertIsInstance(obj.lookup(response=val['response'],
-                                                 asn_data=val['asn_data'],
-                                                 is_offline=True,
-                                                 inc_raw=True),
-                                      dict)
+                result = obj.lookup(response=val['response'],
+                                    asn_data=val['asn_data'],
+                                    is_offline=True,
+                                    inc_raw=True)
+                self.assertIsInstance(result, dict)
+
+                # The tokenizer must match the regex results.
+                self.assertEqual(obj.lookup(response=val['response'],
+                                            asn_data=val['asn_data'],
+                                            is_offline=True,
+                                            inc_raw=True,
+                                            parser='rpsl'),
+                                 result)
 
             except AssertionError as e:
 
@@ -47,6 +55,10 @@ class TestWhois(TestCommon):
 
                 self.fail('Unexpected exception raised: {0}'.format(e))
 
+        self.assertRaises(ValueError, obj.lookup, response=val['response'],
+                          asn_data=val['asn_data'], is_offline=True,
+                          parser='rspl')
+
     def test__parse_fields(self):
 
         net = Net('74.125.225.229')
@@ -54,7 +66,7 @@ class TestWhois(TestCommon):
 
         # No exception raised, but should provide code coverage for if regex
         # groups are messed up.
-        tmp_dict = RIR_WHOIS['arin']['fields']
+        tmp_dict = RIR_WHOIS['arin']['fields'].copy()
         tmp_dict['name'] = r'(NetName):[^\S\n]+(?P<val1>.+?)\n'
         obj.parse_fields(
             response="\nNetName:        TEST\n",
@@ -76,6 +88,43 @@ class TestWhois(TestCommon):
             dt_format=RIR_WHOIS['arin']['dt_format']
         )
 
+    def test__parse_fields_rpsl(self):
+
+        net = Net('74.125.225.229')
+        obj = Whois(net)
+
+        responses = [
+            # Continuation lines, consecutive keys and a blank line.
+            '\ninetnum: 1.2.3.0 - 1.2.3.255\nnetname:  TEST\n'
+            'descr:    Line 1\n          Line 2\ndescr:    Line 3\n\n'
+            'country:  us\naddress:  Street\nremarks:  x\n'
+            'descr:    Not contiguous\naddress:  Not contiguous\n'
+            'e-mail:   a@example.com b@example.com\n'
+            '% contact c@example.net,\nabuse:    d@example.org\n',
+            # Repeated key without a value, and no trailing newline.
+            '\nnetname:\nnetname:  SECOND\ndescr:    One\ndescr:\n'
+            'descr:    Two\nsource:   TEST\ne-mail: e@example.com',
+            # Email at the start of a line, and colons spanning lines.
+            '\nremarks:\nf@example.com g@example.com\n h@example.com\n'
+        ]
+
+        for response in responses:
+
+            for start in (None, 1):
+
+                self.assertEqual(
+                    obj.parse_fields_rpsl(
+                        response, RIR_WHOIS['ripencc']['fields'],
+                        RIR_WHOIS['ripencc']['keys'], net_end=start,
+                        dt_format=RIR_WHOIS['ripencc']['dt_format']
+                    ),
+                    obj.parse_fields(
+                        response, RIR_WHOIS['ripencc']['fields'],
+                        net_end=start,
+                        dt_format=RIR_WHOIS['ripencc']['dt_format']
+                    )
+                )
+
     def test_get_nets_arin(self):
 
         net = Net('74.125.225.229')
@@ -92,6 +141,16 @@ class TestWhois(TestCommon):
         )
         obj.get_nets_arin(multi_net_response)
 
+        nets = obj.get_nets_arin(
+            '\nCIDR:           74.125.0.0/16\nNetName:        TEST'
+            '\nCIDR:           74.125.1.0/24\nNetName:        TEST2\n'
+        )
+
+        # Each network is a separate record, the base is not modified.
+        nets[0]['name'] = 'TEST'
+        self.assertIsNone(nets[1]['name'])
+        self.assertTrue(all(v is None for v in BASE_NET.values()))
+
     def test_get_nets_lacnic(self):
 
         net = Net('200.57.141.161')
@@ -23,21 +23,22 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 import sys
-from defusedxml.minidom import parseString
 from os import path
 import re
-import copy
 import io
 import csv
+import json
 import random
+from importlib import import_module
+from bisect import bisect_right
 from collections import namedtuple
+from numbers import Integral
 import logging
 
 if sys.version_info >= (3, 3):  # pragma: no cover
     from ipaddress import (ip_address,
                            ip_network,
                            IPv4Address,
-                           IPv4Network,
                            IPv6Address,
                            summarize_address_range,
                            collapse_addresses)
@@ -45,17 +46,36 @@ else:  # pragma: no cover
     from ipaddr import (IPAddress as ip_address,
                         IPNetwork as ip_network,
                         IPv4Address,
-                        IPv4Network,
                         IPv6Address,
                         summarize_address_range,
                         collapse_address_list as collapse_addresses)
 
+try:  # pragma: no cover
+    from types import MappingProxyType
+
+except ImportError:  # pragma: no cover
+    MappingProxyType = dict
+
 try:  # pragma: no cover
     from itertools import filterfalse
 
 except ImportError:  # pragma: no cover
     from itertools import ifilterfalse as filterfalse
 
+# ProcessPoolExecutor, for unique_addresses(), is only imported on first
+# access (Python 3.7+).
+try:  # pragma: no cover
+    import concurrent.futures as futures
+
+except ImportError:  # pragma: no cover
+    futures = None
+
+try:  # pragma: no cover
+    from importlib.util import find_spec
+
+except ImportError:  # pragma: no cover
+    find_spec = None
+
 log = logging.getLogger(__name__)
 
 IETF_RFC_REFERENCES = {
@@ -113,6 +133,19 @@ IP_REGEX = (
     r')'
 )
 
+# The candidate tokens for IP_REGEX in unique_addresses(): runs of the
+# characters of an address, port or network, which include a '.' or ':',
+# and IPv6 zone IDs (e.g., %eth0).
+IP_TOKEN_REGEX = (
+    r'[0-9A-Fa-f.:\[\]/]*[.:](?:[0-9A-Fa-f.:\[\]/]|%[0-9A-Za-z_.\-]+)*'
+)
+
+# The number of bytes unique_addresses() reads from a file at a time.
+UNIQUE_ADDRESSES_CHUNK_SIZE = 1048576
+
+# The maximum number of parsed tokens unique_addresses() caches.
+UNIQUE_ADDRESSES_CACHE_SIZE = 16384
+
 
 def ipv4_lstrip_zeros(address):
     """
@@ -175,10 +208,34 @@ def calculate_cidr(start_address, end_address):
     return [i.__str__() for i in collapse_addresses(tmp_addrs)]
 
 
-def get_countries(is_legacy_xml=False):
+# The country code tables (code to name), parsed once per process, by
+# is_legacy_xml.
+COUNTRIES = {}
+
+# The reverse country tables (lower case name to code), by is_legacy_xml.
+COUNTRY_CODES = {}
+
+
+def _get_data_dir():
     """
-    The function to generate a dictionary containing ISO_3166-1 country codes
-    to names.
+    The function to get the directory containing the data directory.
+
+    Returns:
+        str: The directory path.
+    """
+
+    # Set the data directory based on if the script is a frozen executable.
+    if sys.platform == 'win32' and getattr(sys, 'frozen', False):
+
+        return path.dirname(sys.executable)  # pragma: no cover
+
+    return path.dirname(__file__)
+
+
+def _load_countries(is_legacy_xml=False):
+    """
+    The function to parse the ISO_3166-1 country code file. Use
+    get_countries() instead, which parses it once per process.
 
     Args:
         is_legacy_xml (:obj:`bool`): Whether to use the older country code
@@ -192,14 +249,7 @@ def get_countries(is_legacy_xml=False):
     # Initialize the countries dictionary.
     countries = {}
 
-    # Set the data directory based on if the script is a frozen executable.
-    if sys.platform == 'win32' and getattr(sys, 'frozen', False):
-
-        data_dir = path.dirname(sys.executable)  # pragma: no cover
-
-    else:
-
-        data_dir = path.dirname(__file__)
+    data_dir = _get_data_dir()
 
     if is_legacy_xml:
 
@@ -220,6 +270,7 @@ def get_countries(is_legacy_xml=False):
             return {}
 
         # Parse the data to get the DOM.
+        from defusedxml.minidom import parseString
         dom = parseString(data)
 
         # Retrieve the country entries.
@@ -237,122 +288,299 @@ def get_countries(is_legacy_xml=False):
             # Add to the countries dictionary.
             countries[code] = name.title()
 
-    else:
+        return countries
 
-        log.debug('Opening country code CSV: {0}'.format(
-                str(data_dir) + '/data/iso_3166-1_list_en.xml'))
+    csv_path = str(data_dir) + '/data/iso_3166-1.csv'
 
-        # Create the country codes file object.
-        f = io.open(str(data_dir) + '/data/iso_3166-1.csv', 'r',
-                    encoding='utf-8')
+    log.debug('Opening country code CSV: {0}'.format(csv_path))
 
-        # Create csv reader object.
-        csv_reader = csv.reader(f, delimiter=',', quotechar='"')
+    # Create the country codes file object.
+    f = io.open(csv_path, 'r', encoding='utf-8')
 
-        # Iterate through the rows and add to the countries dictionary.
-        for row in csv_reader:
+    # Create csv reader object.
+    csv_reader = csv.reader(f, delimiter=',', quotechar='"')
 
-            # Retrieve the country code and name columns.
-            code = row[0]
-            name = row[1]
+    # Iterate through the rows and add to the countries dictionary.
+    for row in csv_reader:
 
-            # Add to the countries dictionary.
-            countries[code] = name
+        # Retrieve the country code and name columns.
+        code = row[0]
+        name = row[1]
 
-        f.close()
+        # Add to the countries dictionary.
+        countries[code] = name
+
+    f.close()
 
     return countries
 
 
-def ipv4_is_defined(address):
+def _get_countries_table(is_legacy_xml=False):
     """
-    The function for checking if an IPv4 address is defined (does not need to
-    be resolved).
+    The function to get the memoized (frozen) country code table, parsing
+    the country code file on first use.
 
     Args:
-        address (:obj:`str`): An IPv4 address.
+        is_legacy_xml (:obj:`bool`): Whether to use the older country code
+            list (iso_3166-1_list_en.xml).
 
     Returns:
-        namedtuple:
+        MappingProxyType: A read only mapping of country codes to names (a
+            dict on Python < 3.3).
+    """
 
-        :is_defined (bool): True if given address is defined, otherwise
-            False
-        :ietf_name (str): IETF assignment name if given address is
-            defined, otherwise ''
-        :ietf_rfc (str): IETF assignment RFC if given address is defined,
-            otherwise ''
+    try:
+
+        return COUNTRIES[is_legacy_xml]
+
+    except KeyError:
+
+        pass
+
+    countries = _load_countries(is_legacy_xml)
+
+    COUNTRY_CODES[is_legacy_xml] = dict(
+        (name.lower(), code) for code, name in countries.items()
+    )
+    COUNTRIES[is_legacy_xml] = MappingProxyType(countries)
+
+    return COUNTRIES[is_legacy_xml]
+
+
+def get_countries(is_legacy_xml=False, frozen=False):
     """
+    The function to generate a dictionary containing ISO_3166-1 country codes
+    to names. The country code file is parsed once per process.
 
-    # Initialize the IP address object.
-    query_ip = IPv4Address(str(address))
+    Args:
+        is_legacy_xml (:obj:`bool`): Whether to use the older country code
+            list (iso_3166-1_list_en.xml).
+        frozen (:obj:`bool`): Whether to return the shared, read only
+            mapping instead of a new dictionary. Defaults to False.
+
+    Returns:
+        dict: A mapping of country codes as the keys to the country names as
+            the values (MappingProxyType if frozen).
+    """
+
+    countries = _get_countries_table(is_legacy_xml)
+
+    if frozen:
+
+        return countries
+
+    return dict(countries)
+
+
+def get_country(code, default=None, is_legacy_xml=False):
+    """
+    The function to get the name for an ISO_3166-1 country code.
+
+    Args:
+        code (:obj:`str`): The country code (case insensitive).
+        default (:obj:`object`): The value to return if the code is not
+            found. Defaults to None.
+        is_legacy_xml (:obj:`bool`): Whether to use the older country code
+            list (iso_3166-1_list_en.xml).
+
+    Returns:
+        str: The country name, or default if not found.
+    """
+
+    try:
+
+        countries = COUNTRIES[is_legacy_xml]
+
+    except KeyError:
+
+        countries = _get_countries_table(is_legacy_xml)
+
+    try:
+
+        return countries[code]
+
+    except (KeyError, TypeError):
 
-    # Initialize the results named tuple
-    results = namedtuple('ipv4_is_defined_results', 'is_defined, ietf_name, '
-                                                    'ietf_rfc')
+        pass
 
-    # This Network
-    if query_ip in IPv4Network('0.0.0.0/8'):
+    try:
+
+        return countries.get(code.upper(), default)
+
+    except AttributeError:
+
+        return default
+
+
+def get_country_code(name, default=None, is_legacy_xml=False):
+    """
+    The function to get the ISO_3166-1 country code for a country name.
+
+    Args:
+        name (:obj:`str`): The country name (case insensitive), as returned
+            by get_country().
+        default (:obj:`object`): The value to return if the name is not
+            found. Defaults to None.
+        is_legacy_xml (:obj:`bool`): Whether to use the older country code
+            list (iso_3166-1_list_en.xml).
+
+    Returns:
+        str: The country code, or default if not found.
+    """
+
+    _get_countries_table(is_legacy_xml)
+
+    try:
+
+        return COUNTRY_CODES[is_legacy_xml].get(name.lower(), default)
+
+    except AttributeError:
+
+        return default
+
+
+# The IPv4 defined (reserved) networks, in order of precedence:
+# (network, IETF assignment name, IETF assignment RFC). The Private-Use
+# Networks entries are the remaining ranges of ipaddress is_private.
+IPV4_DEFINED = (
+    ('0.0.0.0/8', 'This Network', 'RFC 1122, Section 3.2.1.3'),
+    ('127.0.0.0/8', 'Loopback', 'RFC 1122, Section 3.2.1.3'),
+    ('169.254.0.0/16', 'Link Local', 'RFC 3927'),
+    ('192.0.0.0/24', 'IETF Protocol Assignments', 'RFC 5736'),
+    ('192.0.2.0/24', 'TEST-NET-1', 'RFC 5737'),
+    ('192.88.99.0/24', '6to4 Relay Anycast', 'RFC 3068'),
+    ('198.18.0.0/15', 'Network Interconnect Device Benchmark Testing',
+     'RFC 2544'),
+    ('198.51.100.0/24', 'TEST-NET-2', 'RFC 5737'),
+    ('203.0.113.0/24', 'TEST-NET-3', 'RFC 5737'),
+    ('224.0.0.0/4', 'Multicast', 'RFC 3171'),
+    ('255.255.255.255/32', 'Limited Broadcast', 'RFC 919, Section 7'),
+    ('10.0.0.0/8', 'Private-Use Networks', 'RFC 1918'),
+    ('172.16.0.0/12', 'Private-Use Networks', 'RFC 1918'),
+    ('192.168.0.0/16', 'Private-Use Networks', 'RFC 1918'),
+    ('240.0.0.0/4', 'Private-Use Networks', 'RFC 1918')
+)
+
+# The IPv6 defined (reserved) networks, in order of precedence. The Reserved
+# and Unique Local Unicast entries are the ipaddress is_reserved and
+# remaining is_private ranges.
+IPV6_DEFINED = (
+    ('ff00::/8', 'Multicast', 'RFC 4291, Section 2.7'),
+    ('::/128', 'Unspecified', 'RFC 4291, Section 2.5.2'),
+    ('::1/128', 'Loopback', 'RFC 4291, Section 2.5.3'),
+    ('::/8', 'Reserved', 'RFC 4291'),
+    ('100::/8', 'Reserved', 'RFC 4291'),
+    ('200::/7', 'Reserved', 'RFC 4291'),
+    ('400::/6', 'Reserved', 'RFC 4291'),
+    ('800::/5', 'Reserved', 'RFC 4291'),
+    ('1000::/4', 'Reserved', 'RFC 4291'),
+    ('4000::/3', 'Reserved', 'RFC 4291'),
+    ('6000::/3', 'Reserved', 'RFC 4291'),
+    ('8000::/3', 'Reserved', 'RFC 4291'),
+    ('a000::/3', 'Reserved', 'RFC 4291'),
+    ('c000::/3', 'Reserved', 'RFC 4291'),
+    ('e000::/4', 'Reserved', 'RFC 4291'),
+    ('f000::/5', 'Reserved', 'RFC 4291'),
+    ('f800::/6', 'Reserved', 'RFC 4291'),
+    ('fe00::/9', 'Reserved', 'RFC 4291'),
+    ('fe80::/10', 'Link-Local', 'RFC 4291, Section 2.5.6'),
+    ('fec0::/10', 'Site-Local', 'RFC 4291, Section 2.5.7'),
+    ('2001::/23', 'Unique Local Unicast', 'RFC 4193'),
+    ('2001:db8::/32', 'Unique Local Unicast', 'RFC 4193'),
+    ('fc00::/7', 'Unique Local Unicast', 'RFC 4193')
+)
+
+IPV4_DEFINED_RESULTS = namedtuple('ipv4_is_defined_results',
+                                  'is_defined, ietf_name, ietf_rfc')
+IPV6_DEFINED_RESULTS = namedtuple('ipv6_is_defined_results',
+                                  'is_defined, ietf_name, ietf_rfc')
+
+
+def _build_defined_table(networks, results):
+    """
+    The function for flattening defined networks into sorted boundaries, for
+    classifying addresses by bisection.
 
-        return results(True, 'This Network', 'RFC 1122, Section 3.2.1.3')
+    Args:
+        networks (:obj:`tuple`): The defined networks, in order of
+            precedence, e.g., IPV4_DEFINED.
+        results (:obj:`namedtuple`): The results class.
 
-    # Loopback
-    elif query_ip.is_loopback:
+    Returns:
+        tuple: (list of range start ints, list of the results for each
+            range)
+    """
 
-        return results(True, 'Loopback', 'RFC 1122, Section 3.2.1.3')
+    ranges = []
+    for network, name, rfc in networks:
 
-    # Link Local
-    elif query_ip.is_link_local:
+        network = ip_network(network)
+        ranges.append((int(network.network_address),
+                       int(network.broadcast_address),
+                       results(True, name, rfc)))
 
-        return results(True, 'Link Local', 'RFC 3927')
+    # Range starts, excluding the end of the address space.
+    boundaries = set([0])
+    for first, last, value in ranges:
 
-    # IETF Protocol Assignments
-    elif query_ip in IPv4Network('192.0.0.0/24'):
+        boundaries.add(first)
 
-        return results(True, 'IETF Protocol Assignments', 'RFC 5736')
+        if last + 1 < 2 ** network.max_prefixlen:
 
-    # TEST-NET-1
-    elif query_ip in IPv4Network('192.0.2.0/24'):
+            boundaries.add(last + 1)
 
-        return results(True, 'TEST-NET-1', 'RFC 5737')
+    starts = []
+    values = []
+    for boundary in sorted(boundaries):
 
-    # 6to4 Relay Anycast
-    elif query_ip in IPv4Network('192.88.99.0/24'):
+        value = results(False, '', '')
+        for first, last, defined in ranges:
 
-        return results(True, '6to4 Relay Anycast', 'RFC 3068')
+            if first <= boundary <= last:
 
-    # Network Interconnect Device Benchmark Testing
-    elif query_ip in IPv4Network('198.18.0.0/15'):
+                value = defined
+                break
 
-        return (results(True,
-                'Network Interconnect Device Benchmark Testing',
-                        'RFC 2544'))
+        # Adjacent ranges with the same result are merged.
+        if not values or values[-1] != value:
 
-    # TEST-NET-2
-    elif query_ip in IPv4Network('198.51.100.0/24'):
+            starts.append(boundary)
+            values.append(value)
 
-        return results(True, 'TEST-NET-2', 'RFC 5737')
+    return starts, values
 
-    # TEST-NET-3
-    elif query_ip in IPv4Network('203.0.113.0/24'):
 
-        return results(True, 'TEST-NET-3', 'RFC 5737')
+IPV4_DEFINED_TABLE = _build_defined_table(IPV4_DEFINED, IPV4_DEFINED_RESULTS)
+IPV6_DEFINED_TABLE = _build_defined_table(IPV6_DEFINED, IPV6_DEFINED_RESULTS)
 
-    # Multicast
-    elif query_ip.is_multicast:
 
-        return results(True, 'Multicast', 'RFC 3171')
+def ipv4_is_defined(address):
+    """
+    The function for checking if an IPv4 address is defined (does not need to
+    be resolved).
 
-    # Limited Broadcast
-    elif query_ip in IPv4Network('255.255.255.255/32'):
+    Args:
+        address (:obj:`str`/:obj:`IPv4Address`): An IPv4 address.
 
-        return results(True, 'Limited Broadcast', 'RFC 919, Section 7')
+    Returns:
+        namedtuple:
 
-    # Private-Use Networks
-    elif query_ip.is_private:
+        :is_defined (bool): True if given address is defined, otherwise
+            False
+        :ietf_name (str): IETF assignment name if given address is
+            defined, otherwise ''
+        :ietf_rfc (str): IETF assignment RFC if given address is defined,
+            otherwise ''
+    """
+
+    # Initialize the IP address object.
+    query_ip = address
+    if not isinstance(query_ip, IPv4Address):
 
-        return results(True, 'Private-Use Networks', 'RFC 1918')
+        query_ip = IPv4Address(str(address))
 
-    return results(False, '', '')
+    starts, values = IPV4_DEFINED_TABLE
+    return values[bisect_right(starts, int(query_ip)) - 1]
 
 
 def ipv6_is_defined(address):
@@ -361,7 +589,7 @@ def ipv6_is_defined(address):
     be resolved).
 
     Args:
-        address (:obj:`str`): An IPv6 address.
+        address (:obj:`str`/:obj:`IPv6Address`): An IPv6 address.
 
     Returns:
         namedtuple:
@@ -375,47 +603,225 @@ def ipv6_is_defined(address):
     """
 
     # Initialize the IP address object.
-    query_ip = IPv6Address(str(address))
+    query_ip = address
+    if not isinstance(query_ip, IPv6Address):
 
-    # Initialize the results named tuple
-    results = namedtuple('ipv6_is_defined_results', 'is_defined, ietf_name, '
-                                                    'ietf_rfc')
-    # Multicast
-    if query_ip.is_multicast:
+        query_ip = IPv6Address(str(address))
 
-        return results(True, 'Multicast', 'RFC 4291, Section 2.7')
+    starts, values = IPV6_DEFINED_TABLE
+    return values[bisect_right(starts, int(query_ip)) - 1]
 
-    # Unspecified
-    elif query_ip.is_unspecified:
 
-        return results(True, 'Unspecified', 'RFC 4291, Section 2.5.2')
+def _is_defined_batch(addresses, table, address_class, max_address):
+    """
+    The function for classifying addresses against a defined networks table.
+
+    Args:
+        addresses (:obj:`iterable`): The addresses (str, int or address
+            objects).
+        table (:obj:`tuple`): IPV4_DEFINED_TABLE or IPV6_DEFINED_TABLE.
+        address_class (:obj:`class`): IPv4Address or IPv6Address.
+        max_address (:obj:`int`): The largest address int.
 
-    # Loopback.
-    elif query_ip.is_loopback:
+    Returns:
+        list of namedtuple: The results, in the order of addresses.
 
-        return results(True, 'Loopback', 'RFC 4291, Section 2.5.3')
+    Raises:
+        ValueError: An address is invalid or out of range.
+    """
 
-    # Reserved
-    elif query_ip.is_reserved:
+    starts, values = table
 
-        return results(True, 'Reserved', 'RFC 4291')
+    ret = []
+    append = ret.append
+    for address in addresses:
 
-    # Link-Local
-    elif query_ip.is_link_local:
+        if isinstance(address, Integral):
 
-        return results(True, 'Link-Local', 'RFC 4291, Section 2.5.6')
+            if not 0 <= address <= max_address:
 
-    # Site-Local
-    elif query_ip.is_site_local:
+                raise ValueError('Address {0} is out of range.'.format(
+                    address))
 
-        return results(True, 'Site-Local', 'RFC 4291, Section 2.5.7')
+            address = int(address)
 
-    # Unique Local Unicast
-    elif query_ip.is_private:
+        elif isinstance(address, address_class):
 
-        return results(True, 'Unique Local Unicast', 'RFC 4193')
+            address = int(address)
 
-    return results(False, '', '')
+        else:
+
+            address = int(address_class(str(address)))
+
+        append(values[bisect_right(starts, address) - 1])
+
+    return ret
+
+
+def ipv4_is_defined_batch(addresses):
+    """
+    The function for checking if IPv4 addresses are defined (do not need to
+    be resolved), for many addresses at once. Equivalent to calling
+    ipv4_is_defined() for each address, but also accepts ints.
+
+    Args:
+        addresses (:obj:`iterable`): The IPv4 addresses, as str, int or
+            IPv4Address.
+
+    Returns:
+        list of namedtuple: The ipv4_is_defined() results, in the order of
+            addresses.
+
+    Raises:
+        ValueError: An address is invalid or out of range.
+    """
+
+    return _is_defined_batch(addresses, IPV4_DEFINED_TABLE, IPv4Address,
+                             2**32 - 1)
+
+
+def ipv6_is_defined_batch(addresses):
+    """
+    The function for checking if IPv6 addresses are defined (do not need to
+    be resolved), for many addresses at once. Equivalent to calling
+    ipv6_is_defined() for each address, but also accepts ints.
+
+    Args:
+        addresses (:obj:`iterable`): The IPv6 addresses, as str, int or
+            IPv6Address.
+
+    Returns:
+        list of namedtuple: The ipv6_is_defined() results, in the order of
+            addresses.
+
+    Raises:
+        ValueError: An address is invalid or out of range.
+    """
+
+    return _is_defined_batch(addresses, IPV6_DEFINED_TABLE, IPv6Address,
+                             2**128 - 1)
+
+
+def _is_installed(name):
+    """
+    The function for checking if an optional module is installed, without
+    importing it where possible.
+
+    Args:
+        name (:obj:`str`): The module name.
+
+    Returns:
+        bool: True if the module is installed.
+    """
+
+    if find_spec is not None:
+
+        return find_spec(name) is not None
+
+    try:  # pragma: no cover
+
+        import_module(name)
+        return True
+
+    except ImportError:  # pragma: no cover
+
+        return False
+
+
+# The JSON backends, in order of preference. The optional faster backends
+# (see json_loads() and json_dumps()) are imported on first use.
+JSON_BACKENDS = tuple(name for name in ('orjson', 'ujson')
+                      if _is_installed(name)) + ('json',)
+
+# The default JSON backend, the first installed.
+JSON_BACKEND = JSON_BACKENDS[0]
+
+
+def json_loads(data, backend=None):
+    """
+    The function for decoding JSON, straight from the response bytes where
+    the backend supports it. Invalid UTF-8 is ignored, as with the
+    standard decode.
+
+    Args:
+        data (:obj:`bytes`/:obj:`str`): The JSON data.
+        backend (:obj:`str`): The JSON backend, one of JSON_BACKENDS.
+            Defaults to None (JSON_BACKEND).
+
+    Returns:
+        The decoded data.
+
+    Raises:
+        ValueError: The data is not valid JSON, or the backend is not
+            installed.
+    """
+
+    backend = backend or JSON_BACKEND
+
+    if backend not in JSON_BACKENDS:
+
+        raise ValueError('JSON backend {0} is not installed.'.format(backend))
+
+    loads = import_module(backend).loads
+
+    if isinstance(data, bytes):
+
+        if backend != 'json':
+
+            try:
+
+                return loads(data)
+
+            except ValueError:
+
+                # Possibly invalid UTF-8, decode as below and retry.
+                pass
+
+        data = data.decode('utf-8', 'ignore')
+
+    return loads(data)
+
+
+def json_dumps(obj, backend=None):
+    """
+    The function for encoding JSON, e.g., for output. The backends may differ
+    in whitespace and escaping, not in the decoded value.
+
+    Args:
+        obj: The data to encode.
+        backend (:obj:`str`): The JSON backend, one of JSON_BACKENDS.
+            Defaults to None (JSON_BACKEND).
+
+    Returns:
+        str: The JSON string.
+
+    Raises:
+        ValueError: The backend is not installed.
+    """
+
+    backend = backend or JSON_BACKEND
+
+    if backend not in JSON_BACKENDS:
+
+        raise ValueError('JSON backend {0} is not installed.'.format(backend))
+
+    if backend == 'orjson':
+
+        return import_module(backend).dumps(obj).decode('utf-8')
+
+    elif backend == 'ujson':
+
+        return import_module(backend).dumps(obj, escape_forward_slashes=False)
+
+    return json.dumps(obj)
+
+
+# Compiled whois field regexes, keyed by (pattern, flags). See
+# compile_field_pattern().
+FIELD_PATTERNS = {}
+
+# The maximum number of compiled whois field regexes to keep.
+FIELD_PATTERNS_MAXSIZE = 1000
 
 
 def unique_everseen(iterable, key=None):
@@ -454,127 +860,357 @@ def unique_everseen(iterable, key=None):
                 yield element
 
 
-def unique_addresses(data=None, file_path=None):
+def compile_field_pattern(pattern, flags=re.DOTALL):
     """
-    The function to search an input string and/or file, extracting and
-    counting IPv4/IPv6 addresses/networks. Summarizes ports with sub-counts.
-    If both a string and file_path are provided, it will process them both.
+    The function for compiling a whois field regex, memoized so each pattern
+    (e.g., the RIR_WHOIS, NIR_WHOIS and ASN_ORIGIN_WHOIS fields, or a custom
+    fields_dict) is only compiled once per process.
 
     Args:
-        data (:obj:`str`): The data to process.
-        file_path (:obj:`str`): An optional file path to process.
+        pattern (:obj:`str`/:obj:`re.Pattern`): The regex to compile. Compiled
+            patterns are returned unchanged.
+        flags (:obj:`int`): The regex flags. Defaults to re.DOTALL.
 
     Returns:
-        dict: The addresses/networks mapped to ports and counts:
+        re.Pattern: The compiled regex.
+    """
 
-        ::
+    if hasattr(pattern, 'finditer'):
 
-            {
-                '1.2.3.4' (dict) - Each address or network found is a
-                    dictionary:
-                    {
-                        'count' (int) - Total number of times seen.
-                        'ports' (dict) - Mapping of port numbers as keys and
-                            the number of times seen for this ip as values.
-                    }
-            }
+        return pattern
 
-    Raises:
-        ValueError: Arguments provided are invalid.
+    key = (pattern, flags)
+
+    try:
+
+        return FIELD_PATTERNS[key]
+
+    except KeyError:
+
+        # Patterns are only added, never evicted individually. Start over if
+        # an unusual number of custom patterns have been compiled.
+        if len(FIELD_PATTERNS) >= FIELD_PATTERNS_MAXSIZE:  # pragma: no cover
+
+            FIELD_PATTERNS.clear()
+
+        compiled = re.compile(str(pattern), flags)
+        FIELD_PATTERNS[key] = compiled
+
+        return compiled
+
+
+def _unique_addresses_match(found):
     """
+    The function for parsing an IP_REGEX match, for unique_addresses().
 
-    if not data and not file_path:
+    Args:
+        found (:obj:`str`): The matched string.
 
-        raise ValueError('No data or file path provided.')
+    Returns:
+        tuple: The address or network (str), and port (str or None). None if
+            the match is not a valid address or network.
+    """
 
-    ret = {}
-    base = {
-        'count': 0,
-        'ports': {}
-    }
+    is_net = False
+    port = None
+    try:
 
-    file_data = None
-    if file_path:
+        if '.' in found and ':' in found:
 
-        log.debug('Opening file for unique address analysis: {0}'.format(
-                str(file_path)))
+            split = found.split(':')
+            ip_or_net = split[0]
+            port = split[1]
 
-        f = open(str(file_path), 'r')
+        elif '[' in found:
 
-        # Read the file.
-        file_data = f.read()
-        f.close()
+            split = found.split(']:')
+            ip_or_net = split[0][1:]
+            port = split[1]
+
+        elif '/' in found:
+
+            is_net = True
+            ip_or_net = found
+
+        else:
+
+            ip_or_net = found
+
+        if is_net:
+
+            ip_obj = ip_network(ip_or_net)
+
+        else:
+            ip_obj = ip_address(ip_or_net)
+
+    except (IndexError, ValueError):
+
+        return None
+
+    return ip_obj.__str__(), str(port) if port else None
+
+
+def _unique_addresses_parse(input_data, ret, parsed):
+    """
+    The function for counting the addresses/networks and ports found in a
+    string, for unique_addresses(). IP_REGEX only runs on the candidate
+    tokens (IP_TOKEN_REGEX), and the addresses parsed from each token are
+    cached.
+
+    Args:
+        input_data (:obj:`str`): The data to process.
+        ret (:obj:`dict`): The results to update, as returned by
+            unique_addresses().
+        parsed (:obj:`dict`): The cache of tokens to the (address or network,
+            port) tuples parsed from them. Updated, and cleared when it
+            reaches UNIQUE_ADDRESSES_CACHE_SIZE.
+    """
 
     pattern = re.compile(
         str(IP_REGEX),
         re.DOTALL
     )
 
-    # Check if there is data.
-    log.debug('Analyzing input/file data'.format(
-                str(file_path)))
-    for input_data in [data, file_data]:
+    for token_match in re.finditer(IP_TOKEN_REGEX, input_data):
+
+        token = token_match.group()
+        try:
 
-        if input_data:
+            entries = parsed[token]
 
-            # Search for IPs.
-            for match in pattern.finditer(input_data):
+        except KeyError:
 
-                is_net = False
-                port = None
-                try:
+            entries = []
+            for match in pattern.finditer(token):
 
-                    found = match.group('ip')
+                entry = _unique_addresses_match(match.group('ip'))
 
-                    if '.' in found and ':' in found:
+                if entry is not None:
 
-                        split = found.split(':')
-                        ip_or_net = split[0]
-                        port = split[1]
+                    entries.append(entry)
 
-                    elif '[' in found:
+            if len(parsed) >= UNIQUE_ADDRESSES_CACHE_SIZE:
 
-                        split = found.split(']:')
-                        ip_or_net = split[0][1:]
-                        port = split[1]
+                parsed.clear()
 
-                    elif '/' in found:
+            parsed[token] = entries = tuple(entries)
 
-                        is_net = True
-                        ip_or_net = found
+        for obj_str, port in entries:
 
-                    else:
+            try:
 
-                        ip_or_net = found
+                addr = ret[obj_str]
 
-                    if is_net:
+            except KeyError:
 
-                        ip_obj = ip_network(ip_or_net)
+                addr = ret[obj_str] = {'count': 0, 'ports': {}}
 
-                    else:
-                        ip_obj = ip_address(ip_or_net)
+            addr['count'] += 1
 
-                    obj_str = ip_obj.__str__()
+            if port:
 
-                    if obj_str not in ret.keys():
+                addr['ports'][port] = addr['ports'].get(port, 0) + 1
 
-                        ret[obj_str] = copy.deepcopy(base)
 
-                    ret[obj_str]['count'] += 1
+def _iter_file_chunks(file_path, start=0, end=None,
+                      chunk_size=UNIQUE_ADDRESSES_CHUNK_SIZE):
+    """
+    The generator for reading a file (or a byte range of it) in chunks that
+    end on line boundaries, so that no address spans two chunks. A range
+    includes the lines which start within it.
+
+    Args:
+        file_path (:obj:`str`): The file path.
+        start (:obj:`int`): The byte offset to start from. Defaults to 0.
+        end (:obj:`int`): The byte offset to stop at. Defaults to None (end of
+            file).
+        chunk_size (:obj:`int`): The number of bytes to read at a time.
+            Defaults to UNIQUE_ADDRESSES_CHUNK_SIZE.
+
+    Yields:
+        str: The decoded chunks.
+    """
+
+    with io.open(str(file_path), 'rb') as f:
+
+        if start > 0:
+
+            # Skip the line that started in the previous range.
+            f.seek(start - 1)
+            f.readline()
+
+        pos = f.tell()
+
+        # The pieces of the current line, joined once it is complete.
+        tail = []
+        while end is None or pos < end:
+
+            size = chunk_size if end is None else min(chunk_size, end - pos)
+            chunk = f.read(size)
+
+            if not chunk:
+
+                break
+
+            pos += len(chunk)
+
+            if end is not None and pos >= end:
+
+                # Finish the line that started within the range.
+                if not chunk.endswith(b'\n'):
+
+                    chunk += f.readline()
+
+                tail.append(chunk)
+                break
+
+            index = chunk.rfind(b'\n')
+
+            if index < 0:
+
+                tail.append(chunk)
+                continue
+
+            tail.append(chunk[:index + 1])
+            yield b''.join(tail).decode('utf-8', 'ignore')
+            tail = [chunk[index + 1:]]
+
+        tail = b''.join(tail)
+        if tail:
+
+            yield tail.decode('utf-8', 'ignore')
+
+
+def _unique_addresses_range(file_path, start=0, end=None,
+                            chunk_size=UNIQUE_ADDRESSES_CHUNK_SIZE):
+    """
+    The function for running unique_addresses() on a byte range of a file (a
+    process pool task).
+
+    Args:
+        file_path (:obj:`str`): The file path.
+        start (:obj:`int`): The byte offset to start from. Defaults to 0.
+        end (:obj:`int`): The byte offset to stop at. Defaults to None (end of
+            file).
+        chunk_size (:obj:`int`): The number of bytes to read at a time.
+            Defaults to UNIQUE_ADDRESSES_CHUNK_SIZE.
+
+    Returns:
+        dict: The addresses/networks mapped to ports and counts, as returned
+            by unique_addresses().
+    """
+
+    ret = {}
+    parsed = {}
+    for chunk in _iter_file_chunks(file_path, start, end, chunk_size):
+
+        _unique_addresses_parse(chunk, ret, parsed)
+
+    return ret
+
+
+def _merge_unique_addresses(ret, other):
+    """
+    The function for merging unique_addresses() results.
+
+    Args:
+        ret (:obj:`dict`): The results to update.
+        other (:obj:`dict`): The results to add.
+    """
+
+    for obj_str, val in other.items():
+
+        try:
+
+            addr = ret[obj_str]
+
+        except KeyError:
+
+            ret[obj_str] = val
+            continue
+
+        addr['count'] += val['count']
+        for port, count in val['ports'].items():
+
+            addr['ports'][port] = addr['ports'].get(port, 0) + count
+
+
+def unique_addresses(data=None, file_path=None,
+                     chunk_size=UNIQUE_ADDRESSES_CHUNK_SIZE, processes=None):
+    """
+    The function to search an input string and/or file, extracting and
+    counting IPv4/IPv6 addresses/networks. Summarizes ports with sub-counts.
+    If both a string and file_path are provided, it will process them both.
+
+    The file is read in chunks ending on line boundaries, so memory use is
+    bounded by chunk_size and the number of unique addresses, rather than the
+    file size.
+
+    Args:
+        data (:obj:`str`): The data to process.
+        file_path (:obj:`str`): An optional file path to process.
+        chunk_size (:obj:`int`): The number of bytes of the file to read at a
+            time. Defaults to UNIQUE_ADDRESSES_CHUNK_SIZE (1 MiB).
+        processes (:obj:`int`): If greater than 1, the file is split into
+            this many byte ranges (on line boundaries), processed in a
+            process pool and the counts merged. Defaults to None (single
+            process).
+
+    Returns:
+        dict: The addresses/networks mapped to ports and counts:
+
+        ::
+
+            {
+                '1.2.3.4' (dict) - Each address or network found is a
+                    dictionary:
+                    {
+                        'count' (int) - Total number of times seen.
+                        'ports' (dict) - Mapping of port numbers as keys and
+                            the number of times seen for this ip as values.
+                    }
+            }
+
+    Raises:
+        ValueError: Arguments provided are invalid.
+    """
+
+    if not data and not file_path:
+
+        raise ValueError('No data or file path provided.')
+
+    ret = {}
+
+    # Check if there is data.
+    log.debug('Analyzing input/file data'.format(
+                str(file_path)))
+    if data:
+
+        _unique_addresses_parse(data, ret, {})
+
+    if file_path:
+
+        log.debug('Opening file for unique address analysis: {0}'.format(
+                str(file_path)))
 
-                    if port:
+        size = path.getsize(str(file_path))
 
-                        try:
+        if processes and processes > 1 and futures and size > chunk_size:
 
-                            ret[obj_str]['ports'][str(port)] += 1
+            bounds = [size * i // processes for i in range(processes + 1)]
+            executor = futures.ProcessPoolExecutor(max_workers=processes)
+            with executor:
 
-                        except KeyError:
+                for result in executor.map(
+                        _unique_addresses_range, [file_path] * processes,
+                        bounds[:-1], bounds[1:], [chunk_size] * processes):
 
-                            ret[obj_str]['ports'][str(port)] = 1
+                    _merge_unique_addresses(ret, result)
 
-                except (KeyError, ValueError):
+        else:
 
-                    continue
+            _merge_unique_addresses(ret, _unique_addresses_range(
+                file_path, chunk_size=chunk_size))
 
     return ret
 
@@ -24,10 +24,10 @@
 
 import sys
 import re
-import copy
+from collections import namedtuple
 from datetime import datetime
 import logging
-from .utils import unique_everseen
+from .utils import (unique_everseen, compile_field_pattern)
 from . import (BlacklistError, WhoisLookupError, NetError)
 
 if sys.version_info >= (3, 3):  # pragma: no cover
@@ -43,7 +43,7 @@ else:  # pragma: no cover
 
 log = logging.getLogger(__name__)
 
-# Legacy base whois output dictionary.
+# Legacy base whois output dictionary (shallow copied per network).
 BASE_NET = {
     'cidr': None,
     'name': None,
@@ -60,6 +60,19 @@ BASE_NET = {
     'updated': None
 }
 
+# The whitespace characters allowed around whois keys and values (regex
+# [^\S\n]).
+WHITESPACE = ' \t\r\x0b\x0c'
+
+# Fields which include continuation lines and consecutive repeated keys, for
+# Whois.parse_fields_rpsl().
+MULTILINE_FIELDS = ('description', 'address')
+
+# Whitespace delimited words, and email addresses, for
+# Whois.parse_fields_rpsl().
+EMAIL_WORD = re.compile(r'[^\s]+')
+EMAIL = re.compile(r'[\w\-\.]+@[\w\-\.]+\.[\w\-]+$')
+
 RIR_WHOIS = {
     'arin': {
         'server': 'whois.arin.net',
@@ -80,7 +93,19 @@ RIR_WHOIS = {
             'created': r'(RegDate):[^\S\n]+(?P<val>.+?)\n',
             'updated': r'(Updated):[^\S\n]+(?P<val>.+?)\n',
         },
-        'dt_format': '%Y-%m-%d'
+        'dt_format': '%Y-%m-%d',
+        'keys': {
+            'name': ('NetName',),
+            'handle': ('NetHandle',),
+            'description': ('OrgName', 'CustName'),
+            'country': ('Country',),
+            'state': ('StateProv',),
+            'city': ('City',),
+            'address': ('Address',),
+            'postal_code': ('PostalCode',),
+            'created': ('RegDate',),
+            'updated': ('Updated',)
+        }
     },
     'ripencc': {
         'server': 'whois.ripe.net',
@@ -103,7 +128,14 @@ RIR_WHOIS = {
                 '[0-9]{2}:[0-9]{2}:[0-9]{2}Z).*?\n'
             )
         },
-        'dt_format': '%Y-%m-%dT%H:%M:%SZ'
+        'dt_format': '%Y-%m-%dT%H:%M:%SZ',
+        'keys': {
+            'name': ('netname',),
+            'handle': ('nic-hdl',),
+            'description': ('descr',),
+            'country': ('country',),
+            'address': ('address',)
+        }
     },
     'apnic': {
         'server': 'whois.apnic.net',
@@ -119,7 +151,14 @@ RIR_WHOIS = {
             ),
             'updated': r'(changed):[^\S\n]+.*(?P<val>[0-9]{8}).*?\n'
         },
-        'dt_format': '%Y%m%d'
+        'dt_format': '%Y%m%d',
+        'keys': {
+            'name': ('netname',),
+            'handle': ('nic-hdl',),
+            'description': ('descr',),
+            'country': ('country',),
+            'address': ('address',)
+        }
     },
     'lacnic': {
         'server': 'whois.lacnic.net',
@@ -134,7 +173,12 @@ RIR_WHOIS = {
             'created': r'(created):[^\S\n]+(?P<val>[0-9]{8}).*?\n',
             'updated': r'(changed):[^\S\n]+(?P<val>[0-9]{8}).*?\n'
         },
-        'dt_format': '%Y%m%d'
+        'dt_format': '%Y%m%d',
+        'keys': {
+            'handle': ('nic-hdl',),
+            'description': ('owner',),
+            'country': ('country',)
+        }
     },
     'afrinic': {
         'server': 'whois.afrinic.net',
@@ -148,6 +192,13 @@ RIR_WHOIS = {
                 r'.+?:.*?[^\S\n]+(?P<val>[\w\-\.]+?@[\w\-\.]+\.[\w\-]+)('
                 '[^\\S\n]+.*?)*?\n'
             ),
+        },
+        'keys': {
+            'name': ('netname',),
+            'handle': ('nic-hdl',),
+            'description': ('descr',),
+            'country': ('country',),
+            'address': ('address',)
         }
     }
 }
@@ -251,10 +302,7 @@ class Whois:
 
         for field, pattern in generate:
 
-            pattern = re.compile(
-                str(pattern),
-                re.DOTALL
-            )
+            pattern = compile_field_pattern(pattern)
 
             if net_start is not None:
 
@@ -292,38 +340,251 @@ class Whois:
 
             if len(values) > 0:
 
-                value = None
-                try:
+                ret[field] = self._format_field(field, values, dt_format)
+
+        return ret
+
+    def _format_field(self, field, values, dt_format=None):
+        """
+        The function for formatting the values parsed for a whois field.
+
+        Args:
+            field (:obj:`str`): The field name.
+            values (:obj:`list` of :obj:`str`): The values parsed, in order.
+            dt_format (:obj:`str`): The format of datetime fields if known.
+                Defaults to None.
+
+        Returns:
+            str/list: The field value, None if it failed to parse.
+        """
+
+        value = None
+        try:
+
+            if field == 'country':
+
+                value = values[0].upper()
+
+            elif field in ['created', 'updated'] and dt_format:
+
+                value = datetime.strptime(
+                    values[0],
+                    str(dt_format)).isoformat('T')
+
+            elif field in ['emails']:
+
+                value = list(unique_everseen(values))
+
+            else:
+
+                values = unique_everseen(values)
+                value = '\n'.join(values).strip()
+
+        except ValueError as e:
+
+            log.debug('Whois field parsing failed for {0}: {1}'.format(
+                field, e))
+            pass
+
+        return value
+
+    def parse_fields_rpsl(self, response, fields_dict, keys_dict,
+                          net_start=None, net_end=None, dt_format=None,
+                          field_list=None):
+        """
+        The function for parsing whois fields from a data input, tokenizing
+        the key: value lines once rather than searching the response for
+        each field. Produces the same output as parse_fields() for whois
+        responses from the RIRs.
+
+        Args:
+            response (:obj:`str`): The response from the whois server.
+            fields_dict (:obj:`dict`): The mapping of fields to regex search
+                values (required). Fields not in keys_dict, other than emails,
+                are parsed with these via parse_fields().
+            keys_dict (:obj:`dict`): The mapping of fields to tuples of whois
+                keys (required), e.g., RIR_WHOIS['ripencc']['keys'].
+                description and address values include continuation lines,
+                and consecutive repeated keys.
+            net_start (:obj:`int`): The starting point of the network (if
+                parsing multiple networks). Defaults to None.
+            net_end (:obj:`int`): The ending point of the network (if parsing
+                multiple networks). Defaults to None.
+            dt_format (:obj:`str`): The format of datetime fields if known.
+                Defaults to None.
+            field_list (:obj:`list` of :obj:`str`): If provided, fields to
+                parse. Defaults to:
+
+                ::
+
+                    ['name', 'handle', 'description', 'country', 'state',
+                    'city', 'address', 'postal_code', 'emails', 'created',
+                    'updated']
+
+        Returns:
+            dict: A dictionary of fields provided in fields_dict, mapping to
+                the values parsed.
+        """
+
+        if not field_list:
+
+            field_list = ['name', 'handle', 'description', 'country', 'state',
+                          'city', 'address', 'postal_code', 'emails',
+                          'created', 'updated']
+
+        field_list = [field for field in field_list if field in fields_dict]
+
+        # Map each key to its field, for the fields to tokenize.
+        key_fields = {}
+        for field in field_list:
+
+            for key in keys_dict.get(field, ()):
+
+                key_fields[key] = field
+
+        # Fields without keys (e.g., dates with value patterns) use regex.
+        regex_fields = [field for field in field_list if field != 'emails'
+                        and field not in keys_dict]
+
+        ret = {}
+        if regex_fields:
+
+            ret = self.parse_fields(
+                response, fields_dict, net_start=net_start, net_end=net_end,
+                dt_format=dt_format, field_list=regex_fields
+            )
+
+        start = net_end or 0
+        lines = response[start:net_start].split('\n')
+
+        # The last line is only complete if the section ends with a newline.
+        complete = len(lines) - 1
+
+        values = {}
+        done = set()
+        emails = []
+        parse_emails = 'emails' in field_list
+
+        # The absolute position of the current line, and of the first colon
+        # after the last email found (which must precede an email).
+        pos = start
+        colon = None
+        scan_start = start
+
+        index = 0
+        while index < len(lines):
+
+            line = lines[index]
+            line_pos = pos
+            pos += len(line) + 1
+            next_index = index + 1
 
-                    if field == 'country':
+            key, sep, rest = line.partition(':')
+            field = key_fields.get(key) if sep else None
 
-                        value = values[0].upper()
+            if (field is not None and field not in done and
+                    len(rest) > 1 and rest[0] in WHITESPACE):
 
-                    elif field in ['created', 'updated'] and dt_format:
+                if field in MULTILINE_FIELDS:
 
-                        value = datetime.strptime(
-                            values[0],
-                            str(dt_format)).isoformat('T')
+                    # The value continues until a line starting with a
+                    # non-whitespace character.
+                    end = next_index
+                    while end < complete and (
+                            not lines[end] or lines[end][0] in WHITESPACE):
 
-                    elif field in ['emails']:
+                        end += 1
 
-                        value = list(unique_everseen(values))
+                    if (end < len(lines) and lines[end] and
+                            lines[end][0] not in WHITESPACE):
+
+                        values.setdefault(field, []).append(
+                            '\n'.join([rest] + lines[next_index:end]).strip()
+                        )
+
+                        # Consecutive keys for the same field are combined.
+                        next_key = lines[end].partition(':')[0]
+                        if key_fields.get(next_key) != field:
+
+                            done.add(field)
 
                     else:
 
-                        values = unique_everseen(values)
-                        value = '\n'.join(values).strip()
+                        done.add(field)
 
-                except ValueError as e:
+                elif index < complete:
 
-                    log.debug('Whois field parsing failed for {0}: {1}'.format(
-                        field, e))
-                    pass
+                    values[field] = [rest.strip()]
+                    done.add(field)
+
+            elif field in values and field not in done:
+
+                # A repeated key without a value ends the run.
+                done.add(field)
+
+            if parse_emails:
+
+                if colon is None:
+
+                    found = line.find(':', max(scan_start + 1 - line_pos, 0))
+                    if found >= 0:
+
+                        colon = line_pos + found
+
+                if '@' in line and colon is not None and index < complete:
+
+                    email = self._get_line_email(line, colon - line_pos)
+
+                    if email:
+
+                        emails.append(email)
+
+                        # The next email must follow another colon.
+                        colon = None
+                        scan_start = pos
+
+            index = next_index
+
+        for field in field_list:
+
+            if field in values:
+
+                ret[field] = self._format_field(field, values[field],
+                                                dt_format)
+
+        if emails:
 
-                ret[field] = value
+            ret['emails'] = self._format_field('emails', emails, dt_format)
 
         return ret
 
+    def _get_line_email(self, line, colon):
+        """
+        The function for finding the first email address in a line, as the
+        emails regex in RIR_WHOIS would. The address must be a whole word,
+        preceded by whitespace and a colon.
+
+        Args:
+            line (:obj:`str`): The line to search.
+            colon (:obj:`int`): The position in line of the first colon
+                allowed. May be negative, for a colon on a previous line.
+
+        Returns:
+            str: The email address, None if not found.
+        """
+
+        for match in EMAIL_WORD.finditer(line):
+
+            # Words at the start of a line are not preceded by whitespace.
+            if match.start() > 0 and colon <= match.start() - 2:
+
+                word = match.group()
+                if '@' in word and EMAIL.match(word):
+
+                    return word
+
+        return None
+
     def get_nets_arin(self, response):
         """
         The function for parsing network blocks from ARIN whois data.
@@ -367,7 +628,7 @@ class Whois:
 
             try:
 
-                net = copy.deepcopy(BASE_NET)
+                net = BASE_NET.copy()
 
                 if len(nets) > 0:
                     temp = pattern.search(response, match.start())
@@ -436,7 +697,7 @@ class Whois:
 
             try:
 
-                net = copy.deepcopy(BASE_NET)
+                net = BASE_NET.copy()
                 net_range = match.group(2).strip()
 
                 try:
@@ -507,7 +768,7 @@ class Whois:
 
             try:
 
-                net = copy.deepcopy(BASE_NET)
+                net = BASE_NET.copy()
                 net_range = match.group(2).strip()
 
                 try:
@@ -547,10 +808,57 @@ class Whois:
 
         return nets
 
+    def get_referral_server(self, response):
+        """
+        The function for parsing the referral (rwhois) server from whois data.
+
+        Args:
+            response (:obj:`str`): The response from the whois server.
+
+        Returns:
+            namedtuple:
+
+            :server (str): The referral server, None if not found.
+            :port (int): The referral server port, 0 if not found.
+        """
+
+        server = None
+        port = 0
+
+        for match in re.finditer(
+            r'^ReferralServer:[^\S\n]+(.+:[0-9]+)$',
+            response,
+            re.MULTILINE
+        ):
+
+            try:
+
+                temp = match.group(1)
+                if 'rwhois://' not in temp:  # pragma: no cover
+                    raise ValueError
+
+                temp = temp.replace('rwhois://', '').split(':')
+
+                if int(temp[1]) > 65535:  # pragma: no cover
+                    raise ValueError
+
+                server = temp[0]
+                port = int(temp[1])
+
+            except (ValueError, KeyError):  # pragma: no cover
+
+                continue
+
+            break
+
+        return_tuple = namedtuple('return_tuple', ['server', 'port'])
+        return return_tuple(server, port)
+
     def lookup(self, inc_raw=False, retry_count=3, response=None,
                get_referral=False, extra_blacklist=None,
                ignore_referral_errors=False, asn_data=None,
-               field_list=None, is_offline=False, get_recursive=True):
+               field_list=None, is_offline=False, get_recursive=True,
+               parser='regex'):
         """
         The function for retrieving and parsing whois information for an IP
         address via port 43/tcp (WHOIS).
@@ -584,6 +892,12 @@ class Whois:
             is_offline (:obj:`bool`): Whether to perform lookups offline. If
                 True, response and asn_data must be provided. Primarily used
                 for testing. Defaults to False.
+            get_recursive (:obj:`bool`): Whether to ask the server to perform
+                recursive queries. Defaults to True.
+            parser (:obj:`str`): The field parsing engine, 'regex'
+                (parse_fields()) or 'rpsl' (parse_fields_rpsl(), a single
+                pass tokenizer). Both produce the same results, 'rpsl' is
+                faster on large responses. Defaults to 'regex'.
 
         Returns:
             dict: The IP whois lookup results
@@ -610,8 +924,15 @@ class Whois:
                     'raw_referral' (str) - Raw referral whois results if the
                         inc_raw parameter is True.
                 }
+
+        Raises:
+            ValueError: parser must be 'regex' or 'rpsl'.
         """
 
+        if parser not in ('regex', 'rpsl'):
+
+            raise ValueError('parser must be \'regex\' or \'rpsl\'')
+
         # Create the return dictionary.
         results = {
             'query': self._net.address_str,
@@ -641,31 +962,8 @@ class Whois:
             if get_referral:
 
                 # Search for a referral server.
-                for match in re.finditer(
-                    r'^ReferralServer:[^\S\n]+(.+:[0-9]+)$',
-                    response,
-                    re.MULTILINE
-                ):
-
-                    try:
-
-                        temp = match.group(1)
-                        if 'rwhois://' not in temp:  # pragma: no cover
-                            raise ValueError
-
-                        temp = temp.replace('rwhois://', '').split(':')
-
-                        if int(temp[1]) > 65535:  # pragma: no cover
-                            raise ValueError
-
-                        referral_server = temp[0]
-                        referral_port = int(temp[1])
-
-                    except (ValueError, KeyError):  # pragma: no cover
-
-                        continue
-
-                    break
+                referral_server, referral_port = self.get_referral_server(
+                    response)
 
         # Retrieve the referral whois data.
         if get_referral and referral_server:
@@ -748,14 +1046,28 @@ class Whois:
 
                 dt_format = None
 
-            temp_net = self.parse_fields(
-                response,
-                RIR_WHOIS[asn_data['asn_registry']]['fields'],
-                section_end,
-                net['end'],
-                dt_format,
-                field_list
-            )
+            if parser == 'rpsl':
+
+                temp_net = self.parse_fields_rpsl(
+                    response,
+                    RIR_WHOIS[asn_data['asn_registry']]['fields'],
+                    RIR_WHOIS[asn_data['asn_registry']]['keys'],
+                    section_end,
+                    net['end'],
+                    dt_format,
+                    field_list
+                )
+
+            else:
+
+                temp_net = self.parse_fields(
+                    response,
+                    RIR_WHOIS[asn_data['asn_registry']]['fields'],
+                    section_end,
+                    net['end'],
+                    dt_format,
+                    field_list
+                )
 
             # Merge the net dictionaries.
             net.update(temp_net)
@@ -0,0 +1,23 @@
+import sys
+from setuptools import setup
+from setuptools.command.build_py import build_py
+
+# Package modules which require Python 3.6+ syntax. These are excluded from
+# Python 2.7-3.5 builds, since byte compiling them fails on install.
+PY36_MODULES = (('ipwhois', 'aio'),)
+
+
+class BuildPy(build_py):
+
+    def find_package_modules(self, package, package_dir):
+
+        modules = build_py.find_package_modules(self, package, package_dir)
+
+        if sys.version_info < (3, 6):
+
+            modules = [m for m in modules if m[:2] not in PY36_MODULES]
+
+        return modules
+
+
+setup(cmdclass={'build_py': BuildPy})